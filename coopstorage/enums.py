@@ -22,3 +22,28 @@ class StorageTopic(CoopEnum):
     RESERVATION_FAILED         = 'storage.reservation_failed'
     TRANSFER_REQUEST_ADDED     = 'storage.transfer_request_added'
     TRANSFER_REQUEST_COMPLETED = 'storage.transfer_request_completed'
+    RESLOT_PLAN                = 'storage.reslot_plan'
+    RESLOT_PROGRESS            = 'storage.reslot_progress'
+
+
+class ConcurrencyMode(CoopEnum):
+    """How Storage serialises concurrent callers.
+
+    GLOBAL:  every public method holds one storage-wide lock (default).
+    STRIPED: transfers lock only the locations/containers they touch; the storage-wide
+             lock is held just long enough to read or update the data store and indexes.
+    """
+    GLOBAL  = auto()
+    STRIPED = auto()
+
+
+class SourceSelectionMode(CoopEnum):
+    """How Storage picks the source of a container-only transfer when no container
+    evaluator is given.
+
+    RANDOM:              any location holding a qualifying container (default).
+    CHEAPEST_RETRIEVAL:  the qualifying container needing the fewest relocation moves
+                         to unblock (see unblock_planner.RetrievalCostModel).
+    """
+    RANDOM             = auto()
+    CHEAPEST_RETRIEVAL = auto()
@@ -0,0 +1,320 @@
+"""
+Vectorised what-if simulation of every channel of a layout at once.
+
+LaneMatrix holds all channels as rows of a 2-D matrix of integer container codes
+(0 = empty slot) and replays batches of add/retrieve ops with NumPy. Ops are split
+into rounds in which each lane gets at most one op, in the order given, so a round
+is a handful of array operations however many lanes it touches.
+
+Channel semantics are those of the built-in processors in channel_processors.py.
+Flow lanes are packed when seeded, as post_process would leave them. A retrieval
+of a container that is not accessible is counted as blocked, together with the
+relocation moves it would need, and left in place.
+
+    m = LaneMatrix.from_storage(storage)
+    status = m.apply(is_add, lanes, m.encode(container_ids))
+    m.stats(), m.lane_stats()
+"""
+
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+import coopstorage.storage.loc_load.channel_processors as cps
+from cooptools.protocols import UniqueIdentifier
+
+logger = logging.getLogger(__name__)
+
+# Op status codes returned by LaneMatrix.apply
+OK, NO_ROOM, NOT_FOUND, BLOCKED = 0, 1, 2, 3
+
+_ALL, _DEEPEST, _SHALLOWEST, _ENDS = 0, 1, 2, 3
+_ACCESS = {'all': _ALL, 'deepest': _DEEPEST, 'shallowest': _SHALLOWEST, 'ends': _ENDS}
+
+_EMPTIES, _FRONT, _BACK, _DOWNWARD, _BOTH_ENDS, _PUSH = 0, 1, 2, 3, 4, 5
+_ADD = {'empties': _EMPTIES, 'front': _FRONT, 'back': _BACK, 'downward': _DOWNWARD, 'ends': _BOTH_ENDS,
+        'push': _PUSH}
+
+
+@dataclass(frozen=True, slots=True)
+class LaneMatrixStats:
+    lanes: int
+    capacity: int
+    containers: int
+    fill_pct: float
+    adds: int
+    rejected_adds: int
+    dropped: int                # pushed out of the last slot of a no-flow push lane
+    retrievals: int
+    blocked_retrievals: int
+    blocking_moves: int         # relocations the blocked retrievals would need
+    not_found: int
+
+    def to_jsonable_dict(self) -> dict:
+        return asdict(self)
+
+
+class LaneMatrix:
+    def __init__(self,
+                 processors: Sequence[cps.IChannelProcessor | type],
+                 capacities: Sequence[int],
+                 lane_ids: Sequence[UniqueIdentifier] = None):
+        """One lane per entry of *processors* (instances or types) and *capacities*.
+
+        Raises ValueError for a processor type without built-in semantics.
+        """
+        if len(processors) != len(capacities):
+            raise ValueError(f"{len(processors)} processors for {len(capacities)} capacities")
+        n_lanes = len(capacities)
+        access, add, flow = (np.zeros(n_lanes, np.int8) for _ in range(3))
+        for ii, processor in enumerate(processors):
+            processor_type = processor if isinstance(processor, type) else type(processor)
+            rule = cps.batch_rule(processor_type)
+            if rule is None:
+                raise ValueError(f"No vectorised semantics for channel processor {processor_type.__name__}")
+            access[ii], add[ii], flow[ii] = _ACCESS[rule.access], _ADD[rule.add], rule.flow
+        self._access, self._add, self._flow = access, add, flow
+
+        self._cap = np.asarray(capacities, dtype=np.int64)
+        width = int(self._cap.max()) if n_lanes else 0
+        self._m = np.zeros((n_lanes, width), dtype=np.int32)
+        self._cols = np.arange(width)
+        self._valid = self._cols < self._cap[:, None]
+        self._count = np.zeros(n_lanes, dtype=np.int64)
+        # Shallowest and deepest occupied slots; (capacity, -1) when empty
+        self._lo = self._cap.copy()
+        self._hi = np.full(n_lanes, -1, dtype=np.int64)
+
+        self._lane_ids = list(lane_ids) if lane_ids is not None else list(range(n_lanes))
+        self._lane_index = {lane_id: ii for ii, lane_id in enumerate(self._lane_ids)}
+        self._codes: Dict[Hashable, int] = {}
+        self._ids: List[Optional[Hashable]] = [None]
+
+        self._counters = {name: np.zeros(n_lanes, dtype=np.int64) for name in
+                          ('adds', 'rejected_adds', 'dropped', 'retrievals', 'blocked_retrievals',
+                           'blocking_moves', 'not_found')}
+
+    @classmethod
+    def from_storage(cls, storage) -> 'LaneMatrix':
+        """One lane per location of *storage*, seeded with its current channel states."""
+        views = list(storage.snapshot().locations.values())
+        matrix = cls([v.Meta.channel_processor for v in views], [v.Capacity for v in views],
+                     lane_ids=[v.Id for v in views])
+        for ii, view in enumerate(views):
+            matrix.load_state(ii, view.state)
+        return matrix
+
+    # ── encoding ──────────────────────────────────────────────────────────────
+
+    def encode(self, ids: Iterable[Hashable]) -> np.ndarray:
+        """Integer codes for *ids*, assigning new ones as needed."""
+        codes = self._codes
+        out = []
+        for id in ids:
+            code = codes.get(id)
+            if code is None:
+                code = codes[id] = len(self._ids)
+                self._ids.append(id)
+            out.append(code)
+        return np.asarray(out, dtype=np.int32)
+
+    def decode(self, code: int) -> Optional[Hashable]:
+        return self._ids[code] if code else None
+
+    def lane_indices(self, lane_ids: Iterable[UniqueIdentifier]) -> np.ndarray:
+        return np.asarray([self._lane_index[x] for x in lane_ids], dtype=np.intp)
+
+    @property
+    def LaneIds(self) -> List[UniqueIdentifier]:
+        return self._lane_ids
+
+    def load_state(self, lane: int, state: Sequence[Optional[Hashable]]) -> None:
+        """Replace lane *lane* with *state*; flow lanes are packed as post_process would."""
+        capacity = int(self._cap[lane])
+        if len(state) != capacity:
+            raise ValueError(f"State of length {len(state)} for lane {self._lane_ids[lane]} of capacity {capacity}")
+        codes = self.encode([x for x in state if x is not None])
+        row = np.zeros(self._m.shape[1], dtype=np.int32)
+        if self._flow[lane] > 0:
+            row[capacity - len(codes):capacity] = codes
+        elif self._flow[lane] < 0:
+            row[:len(codes)] = codes
+        else:
+            row[[ii for ii, x in enumerate(state) if x is not None]] = codes
+        self._m[lane] = row
+        self._count[lane] = len(codes)
+        self._rescan(np.asarray([lane]))
+
+    def lane_state(self, lane: int) -> List[Optional[Hashable]]:
+        return [self.decode(int(c)) for c in self._m[lane, :self._cap[lane]]]
+
+    # ── replay ────────────────────────────────────────────────────────────────
+
+    def add(self, lanes, codes) -> np.ndarray:
+        return self.apply(np.ones(len(lanes), dtype=bool), lanes, codes)
+
+    def retrieve(self, lanes, codes) -> np.ndarray:
+        return self.apply(np.zeros(len(lanes), dtype=bool), lanes, codes)
+
+    def apply(self, is_add, lanes, codes) -> np.ndarray:
+        """Replay ops in order: op i adds (or retrieves, if not is_add[i]) container
+        code codes[i] in lane lanes[i]. Returns a status code per op."""
+        is_add = np.asarray(is_add, dtype=bool)
+        lanes = np.asarray(lanes, dtype=np.intp)
+        codes = np.asarray(codes, dtype=np.int32)
+        n = len(lanes)
+        status = np.zeros(n, dtype=np.int8)
+        if n == 0:
+            return status
+
+        # Rank of each op among the ops on its lane; round r applies every rank-r op
+        order = np.argsort(lanes, kind='stable')
+        starts = np.flatnonzero(np.r_[True, np.diff(lanes[order]) != 0])
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+
+        for r in range(len(bounds) - 1):
+            ops = by_rank[bounds[r]:bounds[r + 1]]
+            adds, rets = ops[is_add[ops]], ops[~is_add[ops]]
+            if len(adds):
+                status[adds] = self._add_step(lanes[adds], codes[adds])
+            if len(rets):
+                status[rets] = self._retrieve_step(lanes[rets], codes[rets])
+        return status
+
+    def _add_step(self, lanes: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        cap, count, lo, hi = self._cap[lanes], self._count[lanes], self._lo[lanes], self._hi[lanes]
+        kind, flow = self._add[lanes], self._flow[lanes]
+        empty = count == 0
+        room = ((count < cap)
+                & ((kind != _DOWNWARD) | empty | (lo > 0))
+                & ((kind != _BOTH_ENDS) | empty | (lo > 0) | (hi < cap - 1)))
+        self._counters['adds'][lanes] += 1
+        self._counters['rejected_adds'][lanes[~room]] += 1
+        status = np.where(room, OK, NO_ROOM).astype(np.int8)
+
+        lanes, codes, cap, count, lo, hi, kind, flow, empty = (
+            x[room] for x in (lanes, codes, cap, count, lo, hi, kind, flow, empty))
+        pushy = (kind == _PUSH) | ((kind == _FRONT) & (flow < 0))
+        shift = pushy & (self._m[lanes, 0] != 0)
+
+        pos = np.zeros(len(lanes), dtype=np.int64)
+        sel = kind == _EMPTIES
+        if sel.any():
+            pos[sel] = ((self._m[lanes[sel]] == 0) & self._valid[lanes[sel]]).argmax(axis=1)
+        sel = (kind == _FRONT) & (flow > 0)
+        pos[sel] = cap[sel] - count[sel] - 1
+        sel = kind == _BACK
+        pos[sel] = count[sel]
+        sel = (kind == _DOWNWARD) | (kind == _BOTH_ENDS)
+        pos[sel] = np.where(empty[sel], cap[sel] - 1,
+                            np.where(lo[sel] > 0, lo[sel] - 1, hi[sel] + 1))
+
+        place = ~shift
+        self._m[lanes[place], pos[place]] = codes[place]
+        self._count[lanes[place]] += 1
+        self._lo[lanes[place]] = np.minimum(lo[place], pos[place])
+        self._hi[lanes[place]] = np.maximum(hi[place], pos[place])
+
+        if shift.any():
+            # Insert at slot 0, shifting the row one slot deeper; the last slot drops out
+            s_lanes, s_cap = lanes[shift], cap[shift]
+            rows = self._m[s_lanes]
+            idx = np.arange(len(s_lanes))
+            dropped = rows[idx, s_cap - 1] != 0
+            rows[:, 1:] = rows[:, :-1].copy()
+            rows[:, 0] = codes[shift]
+            rows[~self._valid[s_lanes]] = 0
+            self._m[s_lanes] = rows
+            self._count[s_lanes] += 1 - dropped
+            self._lo[s_lanes] = 0
+            self._hi[s_lanes] = np.minimum(hi[shift] + 1, s_cap - 1)
+            self._counters['dropped'][s_lanes[dropped]] += 1
+            if dropped.any():
+                self._rescan(s_lanes[dropped])
+        return status
+
+    def _retrieve_step(self, lanes: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        rows = self._m[lanes]
+        hit = rows == codes[:, None]
+        found = hit.any(axis=1)
+        pos = hit.argmax(axis=1)
+        occupied = rows != 0
+        deeper = (occupied & (self._cols > pos[:, None])).sum(axis=1)
+        shallower = (occupied & (self._cols < pos[:, None])).sum(axis=1)
+        access = self._access[lanes]
+        moves = np.select([access == _ALL, access == _DEEPEST, access == _SHALLOWEST],
+                          [0, deeper, shallower], default=np.minimum(deeper, shallower))
+        blocked = found & (moves > 0)
+        ok = found & ~blocked
+
+        counters = self._counters
+        counters['retrievals'][lanes] += 1
+        counters['not_found'][lanes[~found]] += 1
+        counters['blocked_retrievals'][lanes[blocked]] += 1
+        counters['blocking_moves'][lanes[blocked]] += moves[blocked]
+        status = np.select([~found, blocked], [NOT_FOUND, BLOCKED], default=OK).astype(np.int8)
+        if not ok.any():
+            return status
+
+        lanes, rows, pos = lanes[ok], rows[ok], pos[ok]
+        cap, lo, hi, flow = self._cap[lanes], self._lo[lanes], self._hi[lanes], self._flow[lanes]
+        idx = np.arange(len(lanes))
+        rows[idx, pos] = 0
+        cols = self._cols[None, :]
+
+        # Repack flow lanes: the run on the shallow (forward) or deep (backward) side closes the gap
+        fwd = flow > 0
+        if fwd.any():
+            src = np.where((cols > lo[fwd, None]) & (cols <= pos[fwd, None]), cols - 1, cols)
+            rows[fwd] = np.take_along_axis(rows[fwd], src, axis=1)
+            rows[np.flatnonzero(fwd), lo[fwd]] = 0
+        back = flow < 0
+        if back.any():
+            src = np.where((cols >= pos[back, None]) & (cols < hi[back, None]), cols + 1, cols)
+            rows[back] = np.take_along_axis(rows[back], src, axis=1)
+            rows[np.flatnonzero(back), hi[back]] = 0
+        self._m[lanes] = rows
+
+        count = self._count[lanes] - 1
+        self._count[lanes] = count
+        new_lo = np.where(fwd, lo + 1, lo)
+        new_hi = np.where(back, hi - 1, hi)
+        now_empty = count == 0
+        self._lo[lanes] = np.where(now_empty, cap, new_lo)
+        self._hi[lanes] = np.where(now_empty, -1, new_hi)
+        rescan = (flow == 0) & ~now_empty & ((pos == lo) | (pos == hi))
+        if rescan.any():
+            self._rescan(lanes[rescan])
+        return status
+
+    def _rescan(self, lanes: np.ndarray):
+        occupied = self._m[lanes] != 0
+        any_occupied = occupied.any(axis=1)
+        self._lo[lanes] = np.where(any_occupied, occupied.argmax(axis=1), self._cap[lanes])
+        self._hi[lanes] = np.where(any_occupied, self._m.shape[1] - 1 - occupied[:, ::-1].argmax(axis=1), -1)
+
+    # ── reporting ─────────────────────────────────────────────────────────────
+
+    def stats(self) -> LaneMatrixStats:
+        capacity = int(self._cap.sum())
+        containers = int(self._count.sum())
+        totals = {name: int(values.sum()) for name, values in self._counters.items()}
+        return LaneMatrixStats(lanes=len(self._cap), capacity=capacity, containers=containers,
+                               fill_pct=containers / capacity if capacity else 0.0, **totals)
+
+    def lane_stats(self) -> Dict[str, np.ndarray]:
+        """Per-lane arrays, in lane order: fill_pct, containers, and the op counters of stats()."""
+        return {
+            'fill_pct': self._count / np.maximum(self._cap, 1),
+            'containers': self._count.copy(),
+            **{name: values.copy() for name, values in self._counters.items()},
+        }
+
+    def reset_stats(self) -> None:
+        for values in self._counters.values():
+            values[:] = 0
@@ -186,7 +186,7 @@ class LocationMapTree:
             loc_count  — number of locations in the subtree
         """
         loc_ids = self.get_loc_ids(**labels)
-        all_locs = storage.Locations
+        all_locs = storage.snapshot().locations
 
         used = 0
         capacity = 0
@@ -0,0 +1,246 @@
+"""
+Background re-slotting of a fragmented storage layout.
+
+ReslotConfig / plan_reslotting — bounded, benefit-ranked list of single moves
+run_reslotting                  — worker loop that plans and executes them at a
+                                  throttled rate during idle windows
+
+A move's benefit is measured in expected relocation moves saved: taking a container
+off a lane where it buries others that are needed sooner, less what it adds at its
+destination, plus (with heatmap data) a travel term for bringing hot containers
+closer to the front.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Mapping, Optional, Tuple
+
+from pubsub import pub
+
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.enums import StorageTopic
+from coopstorage.storage.loc_load.location import LocationView
+from coopstorage.storage.loc_load.qualifiers import ContainerQualifier, LocationQualifier
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from coopstorage.storage.loc_load.unblock_planner import RetrievalCostModel
+from cooptools.geometry_utils import vector_utils as vec
+from cooptools.protocols import UniqueIdentifier
+from cooptools.qualifiers import PatternMatchQualifier
+
+logger = logging.getLogger(__name__)
+
+
+# ── ReslotConfig ──────────────────────────────────────────────────────────────
+
+@dataclass
+class ReslotConfig:
+    """Config for planning and running background re-slotting."""
+    max_moves:       int   = 25       # moves per planning pass
+    min_benefit:     float = 0.25     # moves worth less than this are dropped
+    front:           Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    travel_weight:   float = 0.01     # benefit per unit of heat x distance brought closer to the front
+    moves_per_sec:   float = 2.0      # execution throttle; 0 = unthrottled
+    pass_interval_s: float = 30.0     # wait between planning passes
+    execute:         bool  = True     # False only plans and publishes
+
+
+RESLOT_DEFAULT = ReslotConfig()
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ReslotMove:
+    container_id: UniqueIdentifier
+    source_loc_id: UniqueIdentifier
+    dest_loc_id: UniqueIdentifier
+    benefit: float
+    reason: str                       # 'blocking' | 'hot'
+
+    def to_jsonable_dict(self) -> dict:
+        return {
+            'container_id': str(self.container_id),
+            'from_loc_id':  str(self.source_loc_id),
+            'to_loc_id':    str(self.dest_loc_id),
+            'benefit':      round(self.benefit, 3),
+            'reason':       self.reason,
+        }
+
+
+# ── planning ──────────────────────────────────────────────────────────────────
+
+def plan_reslotting(
+    storage: Storage,
+    cfg: ReslotConfig = None,
+    heat: Optional[Mapping[str, float]] = None,
+    costs: Optional[RetrievalCostModel] = None,
+) -> List[ReslotMove]:
+    """Up to ``cfg.max_moves`` single-container moves, best first, planned from one
+    storage snapshot without changing anything.
+
+    Only containers that can be removed without unblocking are considered, and each
+    location is the source or destination of at most one move, so the moves stay
+    valid in any order as long as nothing else touches those locations.
+
+    Args:
+        heat:  Optional {str(container_id): retrieval frequency}, e.g.
+               HeatmapTracker.get_container_counts().
+        costs: RetrievalCostModel to reuse across passes.
+    """
+    if cfg is None:
+        cfg = RESLOT_DEFAULT
+    if costs is None:
+        costs = RetrievalCostModel()
+    heat = heat or {}
+
+    snapshot = storage.snapshot()
+    reserved_locs = storage.get_reserved_location_ids()
+    reserved_ctrs = storage.get_reserved_container_ids()
+    containers = storage.get_containers()
+
+    def _dwell_of(container_id: UniqueIdentifier) -> Optional[float]:
+        container = containers.get(container_id)
+        return container.expected_dwell if container is not None else None
+
+    def _travel(view: LocationView, container_id: UniqueIdentifier) -> float:
+        return cfg.travel_weight * heat.get(str(container_id), 0) * vec.distance_between(view.Coords, cfg.front)
+
+    views = [v for v in snapshot.locations.values() if str(v.Id) not in reserved_locs]
+
+    # Upper bound of each candidate's benefit: everything saved at the source, with
+    # the destination adding nothing and sitting at the front
+    candidates: List[Tuple[float, float, LocationView, UniqueIdentifier]] = []
+    for view in views:
+        for cid in view.get_removable_container_ids().values():
+            if cid is None or str(cid) in reserved_ctrs or cid not in containers:
+                continue
+            saved = costs.removed_moves(view, cid, _dwell_of)
+            bound = saved + _travel(view, cid)
+            if bound >= cfg.min_benefit:
+                candidates.append((bound, saved, view, cid))
+    candidates.sort(key=lambda x: -x[0])
+
+    dests = [v for v in views if v.get_addable_positions()]
+    touched = set()
+    moves: List[ReslotMove] = []
+    for bound, saved, source, cid in candidates:
+        if len(moves) >= cfg.max_moves:
+            break
+        if bound < cfg.min_benefit or source.Id in touched:
+            continue
+        container = containers[cid]
+        fits = LocationQualifier(has_addable_position=True).compile(container=container)
+        travel = _travel(source, cid)
+
+        best: Optional[Tuple[float, LocationView]] = None
+        for dest in dests:
+            if dest.Id == source.Id or dest.Id in touched:
+                continue
+            benefit = (saved + travel - _travel(dest, cid)
+                       - costs.added_moves(dest, container.expected_dwell, _dwell_of))
+            if (best is None or benefit > best[0]) and fits(dest):
+                best = (benefit, dest)
+        if best is None or best[0] < cfg.min_benefit:
+            continue
+
+        touched.update((source.Id, best[1].Id))
+        moves.append(ReslotMove(container_id=cid, source_loc_id=source.Id, dest_loc_id=best[1].Id,
+                                benefit=best[0], reason='blocking' if saved > 0 else 'hot'))
+    moves.sort(key=lambda m: -m.benefit)
+    return moves
+
+
+# ── execution ─────────────────────────────────────────────────────────────────
+
+def execute_reslot_move(storage: Storage, move: ReslotMove) -> bool:
+    """Run *move* through handle_transfer_requests. Returns False, without moving
+    anything, if the container is no longer directly removable at its planned source."""
+    source = storage.get_container_loc(move.container_id)
+    if (source is None or source.Id != move.source_loc_id or
+            move.container_id not in source.get_removable_container_ids().values()):
+        return False
+    storage.handle_transfer_requests([TransferRequestCriteria(
+        container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id=str(move.container_id))),
+        dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=str(move.dest_loc_id)),
+                                              has_addable_position=True,
+                                              reserved=False),
+    )])
+    return True
+
+
+def run_reslotting(
+    storage: Storage,
+    cfg: ReslotConfig = None,
+    stop_event: Optional[threading.Event] = None,
+    heat_provider: Optional[Callable[[], Mapping[str, float]]] = None,
+    is_idle: Optional[Callable[[], bool]] = None,
+) -> None:
+    """Plan and execute re-slotting passes on *storage* until ``stop_event`` is set
+    (or forever if None).
+
+    Args:
+        storage:       A Storage instance to operate on.
+        cfg:           ReslotConfig; defaults to RESLOT_DEFAULT.
+        stop_event:    threading.Event that signals the loop to exit cleanly.
+        heat_provider: Optional callable returning {str(container_id): heat} for each
+                       pass, e.g. HeatmapTracker.get_container_counts.
+        is_idle:       Optional callable; planning and moves only run while it returns
+                       True, so the remainder of a pass is dropped when work resumes.
+
+    Publishes StorageTopic.RESLOT_PLAN after each planning pass and
+    StorageTopic.RESLOT_PROGRESS after each move.
+    """
+    if cfg is None:
+        cfg = RESLOT_DEFAULT
+    if stop_event is None:
+        stop_event = threading.Event()
+    costs = RetrievalCostModel()
+    totals = {'passes': 0, 'executed': 0, 'skipped': 0, 'failed': 0, 'benefit': 0.0}
+
+    def _idle() -> bool:
+        return is_idle is None or is_idle()
+
+    while not stop_event.is_set():
+        if not _idle():
+            stop_event.wait(min(1.0, cfg.pass_interval_s))
+            continue
+
+        t0 = time.perf_counter()
+        moves = plan_reslotting(storage, cfg, heat=heat_provider() if heat_provider is not None else None,
+                                costs=costs)
+        totals['passes'] += 1
+        logger.info("reslot  pass=%d  moves=%d  benefit=%.1f  planned in %.0f ms",
+                    totals['passes'], len(moves), sum(m.benefit for m in moves),
+                    (time.perf_counter() - t0) * 1000)
+        pub.sendMessage(StorageTopic.RESLOT_PLAN.value, payload={
+            'pass':          totals['passes'],
+            'moves':         [m.to_jsonable_dict() for m in moves],
+            'total_benefit': round(sum(m.benefit for m in moves), 3),
+            'execute':       cfg.execute,
+        })
+
+        if cfg.execute:
+            for i, move in enumerate(moves):
+                if stop_event.is_set() or not _idle():
+                    break
+                try:
+                    status = 'executed' if execute_reslot_move(storage, move) else 'skipped'
+                except Exception as e:
+                    logger.warning("reslot  move=%s  error=%s: %s", move, type(e).__name__, e)
+                    status = 'failed'
+                totals[status] += 1
+                if status == 'executed':
+                    totals['benefit'] += move.benefit
+                pub.sendMessage(StorageTopic.RESLOT_PROGRESS.value, payload={
+                    'pass':     totals['passes'],
+                    'done':     i + 1,
+                    'planned':  len(moves),
+                    'status':   status,
+                    'move':     move.to_jsonable_dict(),
+                    **{f'total_{k}': round(v, 3) for k, v in totals.items() if k != 'passes'},
+                })
+                if cfg.moves_per_sec > 0 and stop_event.wait(1.0 / cfg.moves_per_sec):
+                    break
+
+        stop_event.wait(cfg.pass_interval_s)
@@ -35,6 +35,8 @@ class SimulationConfig:
     add_weight:    float = 0.45
     move_weight:   float = 0.40
     remove_weight: float = 0.15
+    # When set, new containers get a random Container.expected_dwell in [0, max_expected_dwell)
+    max_expected_dwell: Optional[float] = None
 
 
 SIM_DEFAULT = SimulationConfig()
@@ -63,7 +65,8 @@ def run_simulation(
                             Defaults to evaluators.fewest_containers.
         on_status:          Optional callback invoked periodically with a status dict:
                             {'running': bool, 'ops': int, 'containers': int,
-                             'capacity': int, 'fill_pct': float}
+                             'capacity': int, 'fill_pct': float,
+                             'unblock_moves_per_1k_ops': float}
     """
     if cfg is None:
         cfg = SIM_DEFAULT
@@ -76,6 +79,7 @@ def run_simulation(
 
     container_counter = 0
     max_concurrent    = sum(loc.Capacity for loc in storage.Locations.values())
+    start_moves       = storage.UnblockMoveCount
     start             = time.perf_counter()
     last_status       = start
     STATUS_INTERVAL   = 5.0
@@ -87,13 +91,14 @@ def run_simulation(
         return cid
 
     def _current_count() -> int:
-        return len(storage.ContainerLocs)
+        return storage.StoredContainerCount
 
     def _do_add():
         cid = _new_cid()
+        dwell = random.uniform(0, cfg.max_expected_dwell) if cfg.max_expected_dwell is not None else None
         storage.handle_transfer_requests(
             [TransferRequestCriteria(
-                new_container=dcs.Container(id=cid),
+                new_container=dcs.Container(id=cid, expected_dwell=dwell),
                 dest_loc_query_args=LocationQualifier(at_least_capacity=1, 
                                                       has_addable_position=True,
                                                       reserved=False),
@@ -189,9 +194,10 @@ def run_simulation(
         if now - last_status >= STATUS_INTERVAL:
             elapsed = now - start
             rate    = ops_counter[0] / elapsed if elapsed > 0 else 0
+            unblock = (storage.UnblockMoveCount - start_moves) * 1000 / ops_counter[0]
             logger.info(
-                "sim  ops=%d  concurrent=%d/%d  fill=%.0f%%  elapsed=%.0fs  rate=%.0f/s",
-                ops_counter[0], count, max_concurrent, fill * 100, elapsed, rate,
+                "sim  ops=%d  concurrent=%d/%d  fill=%.0f%%  elapsed=%.0fs  rate=%.0f/s  unblock_moves/1k=%.1f",
+                ops_counter[0], count, max_concurrent, fill * 100, elapsed, rate, unblock,
             )
             if on_status is not None:
                 on_status({
@@ -200,6 +206,7 @@ def run_simulation(
                     'containers': count,
                     'capacity':   max_concurrent,
                     'fill_pct':   round(fill * 100, 1),
+                    'unblock_moves_per_1k_ops': round(unblock, 1),
                 })
             last_status = now
 
@@ -248,7 +255,7 @@ def run_showcase_sim(
     max_concurrent = sum(loc.Capacity for loc in storage.Locations.values())
 
     while not stop_event.is_set():
-        count = len(storage.ContainerLocs)
+        count = storage.StoredContainerCount
         fill  = count / max_concurrent if max_concurrent > 0 else 0
 
         if fill < cfg.min_fill_pct:
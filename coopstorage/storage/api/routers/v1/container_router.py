@@ -23,7 +23,8 @@ def container_router_factory(storage: Storage):
 
     @container_router.put("/containers")
     def put_container(body: ApiContainers):
-        containers = [dcs.Container(id=c.id) for c in body.containers]
+        containers = [dcs.Container(id=c.id) if c.uom is None else dcs.Container(id=c.id, uom=dcs.unit_of_measure(c.uom))
+                      for c in body.containers]
         storage.register_containers(containers=containers)
         return {str(k): str(v) for k, v in storage.get_containers().items()}
 
@@ -39,6 +40,14 @@ def container_router_factory(storage: Storage):
             raise HTTPException(status_code=404, detail=f"Container '{container_id}' not found")
         return containers[container_id]
 
+    @container_router.get("/containers/{container_id}/location")
+    def get_container_location(container_id: str):
+        loc_id = storage.get_container_loc_id(container_id)
+        if loc_id is None:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=404, detail=f"Container '{container_id}' is not stored at any location")
+        return {"container_id": container_id, "location_id": str(loc_id)}
+
     @container_router.delete("/containers")
     def delete_all_containers():
         """Remove all containers from storage, leaving locations intact."""
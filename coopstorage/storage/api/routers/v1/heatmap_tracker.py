@@ -107,10 +107,31 @@ class HeatmapTracker:
 
         return {'location': location_counts, 'load': load_counts}
 
+    def get_container_counts(
+        self,
+        start: Optional[datetime] = None,
+        end:   Optional[datetime] = None,
+    ) -> dict:
+        """
+        Return per-container reservation counts from 'load' records, filtered
+        as in get_counts.  Suitable as a re-slotting heat provider.
+        """
+        with self._lock:
+            records = list(self._records)
+
+        counts: dict[str, int] = {}
+        for rec in records:
+            if rec.record_type != 'load' or rec.container_id is None:
+                continue
+            if start and rec.entry_time < start:
+                continue
+            if end and rec.entry_time > end:
+                continue
+            counts[rec.container_id] = counts.get(rec.container_id, 0) + 1
+        return counts
+
     # ── helpers ───────────────────────────────────────────────────────────────
 
     def _find_container_location(self, container_id: str) -> Optional[str]:
-        for loc_id, loc in self._storage.get_locs().items():
-            if any(str(c) == container_id for c in loc.ContainerIds):
-                return str(loc_id)
-        return None
+        loc_id = self._storage.get_container_loc_id(container_id)
+        return str(loc_id) if loc_id is not None else None
@@ -1,11 +1,12 @@
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Iterable, List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple, Dict, Any, Optional
 
 from coopstorage.storage.loc_load.storage import Storage
 from coopstorage.storage.loc_load import dcs
 from coopstorage.storage.loc_load import qualifiers as qs
+import coopstorage.storage.loc_load.evaluators as evaluators
 import coopstorage.storage.loc_load.channel_processors as cps
 from coopstorage.storage.loc_load.location import Location
 from cooptools.common import LETTERS
@@ -28,11 +29,11 @@ class LocationMetaAPI(BaseModel):
     capacity: int = 1
 
     def as_loc_meta(self) -> dcs.LocationMeta:
-        return dcs.LocationMeta(
+        return dcs.LOCATION_METAS.intern(dcs.LocationMeta(
             dims=self.dims.as_tuple(),
             channel_processor=cps.ChannelProcessorType.by_str(self.channel_processor_type).value,
             capacity=self.capacity,
-        )
+        ))
 
 
 class LocationAPI(BaseModel):
@@ -58,8 +59,8 @@ def location_router_factory(storage: Storage) -> APIRouter:
 
     @location_router.get("/locations")
     def get_locations() -> Dict[str, dict]:
-        locs = storage.get_locs()
-        return {str(k): Location.to_jsonable_dict(v) for k, v in locs.items()}
+        locs = storage.snapshot().locations
+        return {str(k): v.to_jsonable_dict() for k, v in locs.items()}
 
     @location_router.put("/locations")
     def put_locations(body: LocationsRequestAPIWrapper):
@@ -84,12 +85,26 @@ def location_router_factory(storage: Storage) -> APIRouter:
         storage.register_locs(locs=remaining)
         return {"deleted": location_id}
 
+    @location_router.get("/locations/near")
+    def get_locations_near(x: float,
+                           y: float,
+                           z: float = 0.0,
+                           k: int = Query(1, ge=1, description="Number of locations to return"),
+                           occupied: Optional[bool] = Query(None, description="Only occupied (true) or empty (false) locations"),
+                           min_available_capacity: Optional[int] = Query(None, description="Only locations with at least this much free capacity")):
+        """The k locations nearest (x, y, z), closest first, with their distance."""
+        point = (x, y, z)
+        filter = qs.LocationQualifier(is_occupied=occupied, at_least_capacity=min_available_capacity)
+        locs = storage.nearest_locations(point, k=k, filter=filter)
+        return [{'distance': evaluators.distance_from(loc, point), 'location': loc.freeze().to_jsonable_dict()}
+                for loc in locs]
+
     @location_router.get("/locations/{location_id}")
     def get_location(location_id: str):
-        locs = storage.get_locs()
-        if location_id not in locs:
+        loc = storage.snapshot().get(location_id)
+        if loc is None:
             raise HTTPException(status_code=404, detail=f"Location '{location_id}' not found")
-        return Location.to_jsonable_dict(locs[location_id])
+        return loc.to_jsonable_dict()
 
     @location_router.delete("/locations")
     def delete_all_locations():
@@ -23,6 +23,11 @@ _EVALUATORS = {
     "least_available_capacity_pct": evaluators.least_available_capacity_percentage,
 }
 
+# Evaluators that need the storage they run against
+_STORAGE_EVALUATORS = {
+    "fewest_future_unblocks":       Storage.future_blocking_evaluator,
+}
+
 
 class SimulationConfigAPI(BaseModel):
     mode: str = "random"                # "random" or "showcase"
@@ -32,7 +37,8 @@ class SimulationConfigAPI(BaseModel):
     move_weight: float = 0.40
     remove_weight: float = 0.15
     delay_ms: float = 0.0               # ms to sleep between ops (0 = as fast as possible)
-    dest_loc_evaluator: str = "fewest_containers"  # key into _EVALUATORS
+    dest_loc_evaluator: str = "fewest_containers"  # key into _EVALUATORS or _STORAGE_EVALUATORS
+    max_expected_dwell: Optional[float] = None      # random Container.expected_dwell for new containers
 
 
 # Module-level simulation state — one simulation at a time per server instance.
@@ -46,7 +52,7 @@ def simulate_router_factory(storage: Storage, event_bus: StorageEventBus = None)
     def _current_status(running: bool, ops_counter: list) -> dict:
         locs  = storage.Locations
         cap   = sum(loc.Capacity for loc in locs.values()) if locs else 0
-        count = len(storage.ContainerLocs)
+        count = storage.StoredContainerCount
         fill  = count / cap if cap > 0 else 0.0
         return {
             "running":    running,
@@ -54,6 +60,7 @@ def simulate_router_factory(storage: Storage, event_bus: StorageEventBus = None)
             "containers": count,
             "capacity":   cap,
             "fill_pct":   round(fill * 100, 1),
+            "unblock_moves": storage.UnblockMoveCount,
         }
 
     def _emit_status(running: bool, ops_counter: list):
@@ -86,11 +93,15 @@ def simulate_router_factory(storage: Storage, event_bus: StorageEventBus = None)
                           stop_event=_sim_stop, ops_counter=_sim_ops,
                           on_status=_on_status)
         else:
-            if body.dest_loc_evaluator not in _EVALUATORS:
+            if body.dest_loc_evaluator in _STORAGE_EVALUATORS:
+                dest_loc_evaluator = _STORAGE_EVALUATORS[body.dest_loc_evaluator](storage)
+            elif body.dest_loc_evaluator in _EVALUATORS:
+                dest_loc_evaluator = _EVALUATORS[body.dest_loc_evaluator]
+            else:
                 raise HTTPException(
                     status_code=422,
                     detail=f"Unknown dest_loc_evaluator '{body.dest_loc_evaluator}'. "
-                           f"Valid options: {list(_EVALUATORS)}"
+                           f"Valid options: {list(_EVALUATORS) + list(_STORAGE_EVALUATORS)}"
                 )
             cfg = SimulationConfig(
                 min_fill_pct=body.min_fill_pct,
@@ -98,11 +109,12 @@ def simulate_router_factory(storage: Storage, event_bus: StorageEventBus = None)
                 add_weight=body.add_weight,
                 move_weight=body.move_weight,
                 remove_weight=body.remove_weight,
+                max_expected_dwell=body.max_expected_dwell,
             )
             target = run_simulation
             kwargs = dict(storage=storage, cfg=cfg, delay_provider=delay_fn,
                           stop_event=_sim_stop, ops_counter=_sim_ops,
-                          dest_loc_evaluator=_EVALUATORS[body.dest_loc_evaluator],
+                          dest_loc_evaluator=dest_loc_evaluator,
                           on_status=_on_status)
 
         current_ops = _sim_ops
@@ -4,14 +4,14 @@ from typing import Dict, List, Optional
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
-from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.location import Location, LocationView
 from coopstorage.storage.loc_load.reservation_provider import ReservationCheckFailedError
 from coopstorage.storage.loc_load.storage import Storage
 
 logger = logging.getLogger(__name__)
 
 
-def _serialize_location(loc: Location, all_containers: dict) -> dict:
+def _serialize_location(loc: Location | LocationView, all_containers: dict) -> dict:
     positions = loc.ContainerPositions  # {slot_idx: container_id | None}
     slots: List[Optional[str]] = [
         str(positions[i]) if positions.get(i) is not None else None
@@ -66,12 +66,14 @@ def snapshot_router_factory(storage: Storage) -> APIRouter:
 
     @router.get("/snapshot")
     def get_snapshot(offset: int = 0, limit: int = 1000) -> dict:
-        locs = storage.get_locs()
-        containers = storage.get_containers()
+        # Immutable view — serialising a large page never holds up writers
+        locs = storage.snapshot().locations
         tree = storage.LocationMapTree
         all_ids = list(locs.keys())
         total = len(all_ids)
         page_ids = all_ids[offset:offset + limit]
+        containers = storage.get_containers(
+            ids=[cid for loc_id in page_ids for cid in locs[loc_id].ContainerIds])
 
         serialized = {}
         for loc_id in page_ids:
@@ -89,7 +89,7 @@ def layout_router_factory(layout_manager: LayoutManager) -> APIRouter:
     def list_locations(layout_id: str) -> Dict[str, dict]:
         _require_layout(layout_manager, layout_id)
         storage = layout_manager.get_storage(layout_id)
-        locs = storage.get_locs()
+        locs = storage.snapshot().locations
         containers = storage.get_containers()
         tree = storage.LocationMapTree
         result = {}
@@ -106,10 +106,10 @@ def layout_router_factory(layout_manager: LayoutManager) -> APIRouter:
     def put_locations(layout_id: str, body: LocationsRequestAPIWrapper):
         _require_layout(layout_manager, layout_id)
         storage = layout_manager.get_storage(layout_id)
-        locs_data = storage._data_store.LocationsData
 
         # Register tree labels in the LocationMapTree first so SSE events
-        # include tree_path from the initial LOCATION_REGISTERED event.
+        # include tree_path from the initial LOCATION_REGISTERED event, and
+        # backends that support tree labels persist them with the locations.
         for loc_api in body.locations:
             if loc_api.tree_labels:
                 storage.LocationMapTree.register(loc_api.id, **loc_api.tree_labels)
@@ -125,12 +125,6 @@ def layout_router_factory(layout_manager: LayoutManager) -> APIRouter:
                 detail=f"Location(s) already exist in this layout: {dup_label}. Choose a different Zone name.",
             )
 
-        # Persist tree labels to the locations row for backends that support it.
-        if locs_data.supports_tree_labels:
-            for loc_api in body.locations:
-                if loc_api.tree_labels:
-                    locs_data.upsert_tree_labels(loc_api.id, loc_api.tree_labels)
-
         return {"registered": [x.id for x in body.locations]}
 
     @router.get("/layouts/{layout_id}/locations/{loc_id}")
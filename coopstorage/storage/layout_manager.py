@@ -43,12 +43,10 @@ class LayoutManager:
         data_store = StorageDataStore(location_data_store=loc_store)
         tree = LocationMapTree()
 
-        locs_data = data_store.LocationsData
-        if locs_data.supports_tree_labels:
-            for loc_id in locs_data.get().keys():
-                labels = locs_data.get_tree_labels(loc_id)
-                if labels:
-                    tree.register(loc_id, **labels)
+        # One streamed pass over the stored labels; locations load on first use
+        for loc_id, labels in data_store.LocationsData.iter_tree_labels():
+            if labels:
+                tree.register(loc_id, **labels)
 
         storage = Storage(
             data_store=data_store,
@@ -86,8 +84,9 @@ class LayoutManager:
         self._layout_data_store.delete(layout_id)
 
 
-def postgres_layout_manager() -> LayoutManager:
-    """Return a LayoutManager backed by Postgres (DATABASE_URL must be set)."""
+def postgres_layout_manager(lazy_level: str = None) -> LayoutManager:
+    """Return a LayoutManager backed by Postgres (DATABASE_URL must be set).
+    *lazy_level* is passed to SqlLocationDataStore (e.g. 'zone')."""
     from coopstorage.storage.loc_load.data.postgres.db import get_session, init_db
     from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
     from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
@@ -95,12 +94,13 @@ def postgres_layout_manager() -> LayoutManager:
     init_db()
     return LayoutManager(
         layout_data_store=SqlLayoutDataStore(get_session),
-        location_data_store_factory=lambda layout_id: SqlLocationDataStore(layout_id, get_session),
+        location_data_store_factory=lambda layout_id: SqlLocationDataStore(layout_id, get_session, lazy_level),
     )
 
 
-def sqlite_layout_manager(url: str = None) -> LayoutManager:
-    """Return a LayoutManager backed by SQLite. Defaults to coopstorage_dev.db."""
+def sqlite_layout_manager(url: str = None, lazy_level: str = None) -> LayoutManager:
+    """Return a LayoutManager backed by SQLite. Defaults to coopstorage_dev.db.
+    *lazy_level* is passed to SqlLocationDataStore (e.g. 'zone')."""
     from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
     from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
     from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
@@ -110,5 +110,5 @@ def sqlite_layout_manager(url: str = None) -> LayoutManager:
     sqlite_db.init_db()
     return LayoutManager(
         layout_data_store=SqlLayoutDataStore(sqlite_db.get_session),
-        location_data_store_factory=lambda layout_id: SqlLocationDataStore(layout_id, sqlite_db.get_session),
+        location_data_store_factory=lambda layout_id: SqlLocationDataStore(layout_id, sqlite_db.get_session, lazy_level),
     )
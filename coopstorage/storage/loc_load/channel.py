@@ -1,12 +1,14 @@
 import uuid
 import logging
 import coopstorage.storage.loc_load.channel_processors as cps
+from coopstorage.storage.loc_load import tracing
 from typing import Protocol, List, Optional, Iterable, Dict
 from cooptools.protocols import UniqueIdentifier
 from cooptools.dataStore.dataStoreProtocol import DataStoreProtocol
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
+_trace = tracing.tracer(tracing.CHANNEL)
 
 @dataclass(frozen=True, slots=True)
 class ChannelMeta:
@@ -27,6 +29,8 @@ class ChannelStateStore:
 
 
 class Channel:
+    __slots__ = ('_id', '_processor', '_capacity', '_state')
+
     def __init__(self,
                  processor: cps.IChannelProcessor,
                  id: UniqueIdentifier = None,
@@ -44,30 +48,31 @@ class Channel:
 
     def store(self,
              ids: Iterable[UniqueIdentifier]):
-        logger.info(f"Adding channel contents: {self._id}")
+        if _trace.enabled:
+            ids = list(ids)
         self._state = self._processor.process(state=self._state, added=ids)
-        logger.info(f"Done adding channel contents: {self._id}")
+        if _trace.enabled:
+            _trace.emit('stored', channel=self._id, ids=ids, state=tuple(self._state))
         return self
 
 
     def remove(self,
                ids: Iterable[UniqueIdentifier]):
-        logger.info(f"Removing channel contents: {self._id}")
+        if _trace.enabled:
+            ids = list(ids)
         self._state = self._processor.process(state=self._state, removed=ids)
-        logger.info(f"Done removing channel contents: {self._id}")
+        if _trace.enabled:
+            _trace.emit('removed', channel=self._id, ids=ids, state=tuple(self._state))
         return self
 
     def clear(self):
-        logger.info(f"Clearing channel contents: {self._id}")
-        while True:
-            removable = self.get_removable_ids()
-            if len(removable) == 0:
-                break
-            self._state = self._processor.process(state=self._state, removed=[list(removable.values())[0]])
+        self._state = self._processor.process(state=self._state,
+                                              removed=self._processor.removal_order(self._state))
 
         if len(self.StoredIds) > 0:
             raise ValueError(f'Should have cleared loads, but load remains')
-        logger.info(f"Done clearing channel contents: {self._id}")
+        if _trace.enabled:
+            _trace.emit('cleared', channel=self._id)
 
     @property
     def State(self) -> List[Optional[UniqueIdentifier]]:
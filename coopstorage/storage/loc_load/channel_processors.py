@@ -1,4 +1,5 @@
-from typing import Protocol, Iterable, List, Hashable, Dict, Optional
+from typing import Protocol, Iterable, List, Hashable, Dict, Optional, Sequence
+from dataclasses import dataclass
 import logging
 import unittest
 from cooptools.coopEnum import CoopEnum
@@ -16,16 +17,37 @@ def flow(state: Iterable[Optional[Hashable]],
 
     if backwards:
         new = new + [None for _ in range(len(list(state)) - len(new))]
-        logger.info(f"Items flowed backwards: {str_format_channel_state(new)}")
     else:
         new = [None for _ in range(len(list(state)) - len(new))] + new
-        logger.info(f"Items flowed forwards: {str_format_channel_state(new)}")
 
     return new
 
 
+def first_occupied(state: Sequence[Optional[Hashable]]) -> Optional[int]:
+    """Index of the shallowest occupied slot, or None if the channel is empty.
+
+    Stops at the first occupied slot, so a state packed toward slot 0 costs O(1).
+    """
+    for ii, x in enumerate(state):
+        if x is not None:
+            return ii
+    return None
+
+
+def last_occupied(state: Sequence[Optional[Hashable]]) -> Optional[int]:
+    """Index of the deepest occupied slot, or None if the channel is empty.
+
+    Stops at the first occupied slot from the deep end, so a state packed toward
+    slot N-1 costs O(1).
+    """
+    for ii in range(len(state) - 1, -1, -1):
+        if state[ii] is not None:
+            return ii
+    return None
+
+
 def removable_positions(
-        state: Iterable[Optional[Hashable]],
+        state: Sequence[Optional[Hashable]],
         include_first: bool = False,
         include_last: bool = False,
         include_all: bool = False
@@ -36,21 +58,19 @@ def removable_positions(
     ret = []
 
     if include_first:
-        first_item = next((x for x in reversed(list(state)) if x is not None), None)
-        if first_item is not None:
-            first_idx = list(state).index(first_item)
+        first_idx = last_occupied(state)
+        if first_idx is not None:
             ret.append(first_idx)
 
     if include_last:
-        last_item = next((x for x in list(state) if x is not None), None)
-        if last_item is not None:
-            last_idx = list(state).index(last_item)
+        last_idx = first_occupied(state)
+        if last_idx is not None:
             ret.append(last_idx)
 
     return ret
 
 
-def accessible_ids(state: Iterable[Optional[Hashable]],
+def accessible_ids(state: Sequence[Optional[Hashable]],
                    include_first: bool = False,
                    include_last: bool = False,
                    include_all: bool = False) -> Dict[int, Hashable]:
@@ -61,7 +81,41 @@ def accessible_ids(state: Iterable[Optional[Hashable]],
         include_first=include_first
     )
 
-    return {ii: list(state)[ii] for ii in accessible_ids}
+    return {ii: state[ii] for ii in accessible_ids}
+
+
+def end_access_blocking_loads(container_id: Hashable,
+                              state: Sequence[Optional[Hashable]],
+                              deepest: bool,
+                              flow_direction: int = 0) -> Dict[Hashable, int]:
+    """Closed form of IChannelProcessor.get_blocking_loads for processors that only
+    give access to the deepest occupied slot (FIFO) or the shallowest (LIFO).
+
+    The blockers are the containers on the accessible side of the target, nearest
+    the accessible end first. The first is taken from its current slot; after that
+    post_process has packed the channel, so each later one comes from where the
+    packing puts it. flow_direction is +1 if post_process packs toward slot N-1,
+    -1 toward slot 0 and 0 if it leaves the state alone.
+    """
+    try:
+        target = state.index(container_id)
+    except ValueError:
+        return {}
+    occupied = [ii for ii, x in enumerate(state) if x is not None]
+    rank = occupied.index(target)
+    capacity, n = len(state), len(occupied)
+    ranks = range(n - 1, rank, -1) if deepest else range(rank)
+
+    blockers: Dict[Hashable, int] = {}
+    for step, r in enumerate(ranks):
+        pos = occupied[r]
+        if step > 0 and flow_direction:
+            if deepest:
+                pos = capacity - 1 if flow_direction > 0 else r
+            else:
+                pos = capacity - n + r if flow_direction > 0 else 0
+        blockers[state[occupied[r]]] = pos
+    return blockers
 
 
 class ItemNotFoundToRemoveException(Exception):
@@ -188,7 +242,14 @@ class IChannelProcessor(Protocol):
         if removed is None:
             return list(state)
 
-        logger.info(f"Removing Items: {removed}")
+        removed = list(removed)
+        rule = _BATCH_RULES.get(cls)
+        if rule is not None:
+            new_state = _batch_remove(rule, state, removed)
+            if new_state is not None:
+                return new_state
+
+        # One at a time; also raises the exception for a batch the fast path rejected
         new_state = [x for x in state]
 
         for item in removed:
@@ -198,7 +259,6 @@ class IChannelProcessor(Protocol):
             new_state[idx] = None
             new_state = cls.post_process(new_state)
 
-        logger.info(f"Items removed: {removed}")
         return new_state
 
     @classmethod
@@ -210,7 +270,14 @@ class IChannelProcessor(Protocol):
         if added is None:
             return list(state)
 
-        logger.info(f"Adding Items: {added}")
+        added = list(added)
+        rule = _BATCH_RULES.get(cls)
+        if rule is not None and not allow_replacement:
+            new_state = _batch_add(rule, state, added)
+            if new_state is not None:
+                return new_state
+
+        # One at a time; also raises the exception for a batch the fast path rejected
         new_state = [x for x in state]
 
         for item in added:
@@ -237,13 +304,28 @@ class IChannelProcessor(Protocol):
             ''' Post Process'''
             new_state = cls.post_process(new_state)
 
-        logger.info(f"Items added: {added}")
         return new_state
 
     @classmethod
     def get_removeable_ids(cls, state: Iterable[Optional[Hashable]]) -> Dict[int, Hashable]:
         return {ii: state[ii] for ii in cls.get_removable_positions(state)}
 
+    @classmethod
+    def removal_order(cls, state: Sequence[Optional[Hashable]]) -> List[Hashable]:
+        """Every stored container, in an order where each is removable when its turn comes."""
+        rule = _BATCH_RULES.get(cls)
+        if rule is not None:
+            ids = [x for x in state if x is not None]
+            return ids[::-1] if rule.access == 'deepest' else ids
+
+        order = []
+        state = list(state)
+        while removable := cls.get_removeable_ids(state):
+            item = next(iter(removable.values()))
+            order.append(item)
+            state = cls.process(state, removed=[item])
+        return order
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         raise NotImplementedError()
@@ -351,6 +433,12 @@ class FIFOFlowChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=True, flow_direction=+1)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_first=True)
@@ -382,13 +470,19 @@ class FIFOFlowBackwardChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=True, flow_direction=-1)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_first=True)
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return [0] if any(x is None for x in state) else []
+        return [0] if None in state else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Hashable]:
@@ -411,6 +505,12 @@ class LIFOFlowChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=False, flow_direction=+1)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_last=True)
@@ -442,13 +542,19 @@ class LIFOFlowBackwardChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=False, flow_direction=-1)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_last=True)
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return [0] if any(x is None for x in state) else []
+        return [0] if None in state else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Hashable]:
@@ -474,21 +580,24 @@ class FIFONoFlowChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=True, flow_direction=0)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_first=True)  # deepest occupied
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        # Deepest None in the contiguous empty run from the shallow end (slot 0).
-        # Stops scanning as soon as a container is encountered.
-        deepest_open = None
-        for i, x in enumerate(state):
-            if x is None:
-                deepest_open = i
-            else:
-                break
-        return [deepest_open] if deepest_open is not None else []
+        # Deepest None in the contiguous empty run from the shallow end (slot 0),
+        # i.e. the slot just shallower than the shallowest container.
+        lo = first_occupied(state)
+        if lo is None:
+            return [len(state) - 1] if len(state) > 0 else []
+        return [lo - 1] if lo > 0 else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Optional[Hashable]]:
@@ -514,21 +623,24 @@ class LIFONoFlowChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=False, flow_direction=0)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_last=True)  # shallowest occupied
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        # Deepest None in the contiguous empty run from the shallow end (slot 0).
-        # Stops scanning as soon as a container is encountered.
-        deepest_open = None
-        for i, x in enumerate(state):
-            if x is None:
-                deepest_open = i
-            else:
-                break
-        return [deepest_open] if deepest_open is not None else []
+        # Deepest None in the contiguous empty run from the shallow end (slot 0),
+        # i.e. the slot just shallower than the shallowest container.
+        lo = first_occupied(state)
+        if lo is None:
+            return [len(state) - 1] if len(state) > 0 else []
+        return [lo - 1] if lo > 0 else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Optional[Hashable]]:
@@ -554,13 +666,19 @@ class FIFONoFlowPushChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=True, flow_direction=0)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_first=True)
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return [0] if any(x is None for x in state) else []
+        return [0] if None in state else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Optional[Hashable]]:
@@ -586,13 +704,19 @@ class LIFONoFlowPushChannelProcessor(IChannelProcessor):
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_blocking_loads(cls,
+                           container_id: Hashable,
+                           state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+        return end_access_blocking_loads(container_id, state, deepest=False, flow_direction=0)
+
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
         return removable_positions(state=state, include_last=True)
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return [0] if any(x is None for x in state) else []
+        return [0] if None in state else []
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Optional[Hashable]]:
@@ -607,34 +731,23 @@ def omni_addable_positions(state: List[Optional[Hashable]]) -> List[int]:
     Right droppable: min index with no container on the big-index side
                      (leftmost None in the contiguous empty suffix from slot N-1).
 
+    Both come straight from the shallowest and deepest occupied slots.
+
     Example:  [-, -, a, -, b, -, -]
-      Left  → scan right: 0=None, 1=None, 2=a (stop) → left addable = 1
-      Right → scan left:  6=None, 5=None, 4=b (stop) → right addable = 5
+      Left  → shallowest container at 2 → left addable = 1
+      Right → deepest container at 4    → right addable = 5
       result → [1, 5]
     """
-    state = list(state)
-    positions = []
-
-    # Left addable: rightmost None before the first container (scanning left→right)
-    left_add = None
-    for i, x in enumerate(state):
-        if x is None:
-            left_add = i
-        else:
-            break
-    if left_add is not None:
-        positions.append(left_add)
-
-    # Right addable: leftmost None after the last container (scanning right→left)
-    right_add = None
-    for i in range(len(state) - 1, -1, -1):
-        if state[i] is None:
-            right_add = i
-        else:
-            break
-    if right_add is not None and right_add not in positions:
-        positions.append(right_add)
+    lo = first_occupied(state)
+    if lo is None:
+        return [len(state) - 1, 0] if len(state) > 1 else list(range(len(state)))
+    hi = last_occupied(state)
 
+    positions = []
+    if lo > 0:
+        positions.append(lo - 1)
+    if hi < len(state) - 1:
+        positions.append(hi + 1)
     return positions
 
 
@@ -666,14 +779,14 @@ class OMNIChannelProcessor(IChannelProcessor):
 
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        idxs = [ii for ii, x in enumerate(state) if x is not None]
-        if len(idxs) == 0:
+        lo = first_occupied(state)
+        if lo is None:
             return []
-        return list(set([min(idxs), max(idxs)]))
+        return list({lo, last_occupied(state)})
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return omni_addable_positions(list(state))
+        return omni_addable_positions(state)
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Hashable]:
@@ -707,14 +820,14 @@ class OMNIFlowChannelProcessor(IChannelProcessor):
 
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        idxs = [ii for ii, x in enumerate(state) if x is not None]
-        if len(idxs) == 0:
+        lo = first_occupied(state)
+        if lo is None:
             return []
-        return list(set([min(idxs), max(idxs)]))
+        return list({lo, last_occupied(state)})
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return omni_addable_positions(list(state))
+        return omni_addable_positions(state)
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Hashable]:
@@ -747,20 +860,140 @@ class OMNIFlowBackwardChannelProcessor(IChannelProcessor):
 
     @classmethod
     def get_removable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        idxs = [ii for ii, x in enumerate(state) if x is not None]
-        if len(idxs) == 0:
+        lo = first_occupied(state)
+        if lo is None:
             return []
-        return list(set([min(idxs), max(idxs)]))
+        return list({lo, last_occupied(state)})
 
     @classmethod
     def get_addable_positions(cls, state: Iterable[Optional[Hashable]]) -> List[int]:
-        return omni_addable_positions(list(state))
+        return omni_addable_positions(state)
 
     @classmethod
     def post_process(cls, state: Iterable[Optional[Hashable]]) -> List[Hashable]:
         return flow(state, backwards=True)
 
 
+# ── batch add/remove ──────────────────────────────────────────────────────────
+
+@dataclass(frozen=True, slots=True)
+class _BatchRule:
+    access: str     # removable: 'all' | 'deepest' | 'shallowest' | 'ends' occupied slot
+    add: str        # 'empties' first empty slots | 'front' / 'back' of a packed run |
+                    # 'downward' from the shallowest container | 'ends' downward then
+                    # upward past the deepest | 'push' at slot 0
+    flow: int       # +1 post_process packs toward slot N-1, -1 toward slot 0, 0 none
+
+
+# Exact types only: a subclass may override any of this behaviour
+_BATCH_RULES: Dict[type, _BatchRule] = {
+    AllAvailableChannelProcessor:             _BatchRule('all', 'empties', 0),
+    AllAvailableFlowChannelProcessor:         _BatchRule('all', 'front', +1),
+    AllAvailableFlowBackwardChannelProcessor: _BatchRule('all', 'back', -1),
+    FIFOFlowChannelProcessor:                 _BatchRule('deepest', 'front', +1),
+    FIFOFlowBackwardChannelProcessor:         _BatchRule('deepest', 'front', -1),
+    LIFOFlowChannelProcessor:                 _BatchRule('shallowest', 'front', +1),
+    LIFOFlowBackwardChannelProcessor:         _BatchRule('shallowest', 'front', -1),
+    FIFONoFlowChannelProcessor:               _BatchRule('deepest', 'downward', 0),
+    LIFONoFlowChannelProcessor:               _BatchRule('shallowest', 'downward', 0),
+    FIFONoFlowPushChannelProcessor:           _BatchRule('deepest', 'push', 0),
+    LIFONoFlowPushChannelProcessor:           _BatchRule('shallowest', 'push', 0),
+    OMNIChannelProcessor:                     _BatchRule('ends', 'ends', 0),
+    OMNIFlowChannelProcessor:                 _BatchRule('ends', 'front', +1),
+    OMNIFlowBackwardChannelProcessor:         _BatchRule('ends', 'back', -1),
+}
+
+
+def batch_rule(processor_type: type) -> Optional[_BatchRule]:
+    """Batch semantics of a built-in processor type, or None for any other type."""
+    return _BATCH_RULES.get(processor_type)
+
+
+def _batch_remove(rule: _BatchRule,
+                  state: Sequence[Optional[Hashable]],
+                  removed: List[Hashable]) -> Optional[List[Optional[Hashable]]]:
+    """State after removing *removed* in order, with one post_process at the end, or
+    None if some item would not be found or accessible at its turn.
+
+    Flowing keeps containers in order, so accessibility is checked on each
+    container's rank among the occupied slots, which removals never reorder.
+    """
+    positions = [ii for ii, x in enumerate(state) if x is not None]
+    rank_of = {state[pos]: r for r, pos in enumerate(positions)}
+    if len(rank_of) != len(positions):
+        return None
+    lo, hi = 0, len(positions) - 1
+    taken = set()
+    for item in removed:
+        r = rank_of.get(item)
+        if r is None or r in taken:
+            return None
+        if rule.access == 'deepest' or (rule.access == 'ends' and r == hi and r != lo):
+            if r != hi:
+                return None
+            hi -= 1
+        elif rule.access in ('shallowest', 'ends'):
+            if r != lo:
+                return None
+            lo += 1
+        taken.add(r)
+
+    new_state = list(state)
+    for r in taken:
+        new_state[positions[r]] = None
+    return flow(new_state, backwards=rule.flow < 0) if rule.flow else new_state
+
+
+def _batch_add(rule: _BatchRule,
+               state: Sequence[Optional[Hashable]],
+               added: List[Hashable]) -> Optional[List[Optional[Hashable]]]:
+    """State after adding *added* in order, with one post_process at the end, or None
+    if some item would not fit (or, for flow processors, the state is not packed yet)."""
+    capacity = len(state)
+    occupied = [x for x in state if x is not None]
+    n, k = len(occupied), len(added)
+    if n + k > capacity:
+        return None
+
+    if rule.flow:
+        # A packed run grows at one end; an unpacked state takes its first add elsewhere
+        run = state[capacity - n:] if rule.flow > 0 else state[:n]
+        if None in run:
+            return None
+        run = added[::-1] + occupied if rule.add == 'front' else occupied + added
+        pad = [None] * (capacity - n - k)
+        return pad + run if rule.flow > 0 else run + pad
+
+    new_state = list(state)
+    if rule.add == 'empties':
+        empties = [ii for ii, x in enumerate(new_state) if x is None]
+        for pos, item in zip(empties, added):
+            new_state[pos] = item
+        return new_state
+
+    if rule.add == 'push':
+        for item in added:
+            if None not in new_state:
+                return None
+            if new_state[0] is None:
+                new_state[0] = item
+            else:
+                new_state.insert(0, item)
+                new_state.pop()
+        return new_state
+
+    lo = first_occupied(new_state)
+    lo, hi = (capacity, capacity - 1) if lo is None else (lo, last_occupied(new_state))
+    below = min(k, lo)
+    above = k - below
+    if above and (rule.add == 'downward' or above > capacity - 1 - hi):
+        return None
+    for ii in range(below):
+        new_state[lo - 1 - ii] = added[ii]
+    for ii in range(above):
+        new_state[hi + 1 + ii] = added[below + ii]
+    return new_state
+
 
 class MyTestCases(unittest.TestCase):
     def test_allavail_1(self):
@@ -0,0 +1,371 @@
+"""
+Opt-in compact channel state.
+
+CompactChannel is a drop-in for Channel whose slots are a block of one list shared by
+every channel of a store (see SlotArena), and which tracks occupancy with a count and
+the shallowest/deepest occupied slots. For the built-in channel processors, adds,
+removes and addable/removable positions are then worked out from those counters
+without copying or scanning the state. Any other processor goes through its
+IChannelProcessor.process on the decoded state, exactly as Channel does.
+
+A channel costs its slots in the shared list plus a few counters, about the same as
+a list-backed Channel.
+
+Enable it with StorageDataStore(compact_channels=True) (or Storage(compact_channels=True)).
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import coopstorage.storage.loc_load.channel_processors as cps
+from coopstorage.storage.loc_load import tracing
+from cooptools.protocols import UniqueIdentifier
+
+logger = logging.getLogger(__name__)
+_trace = tracing.tracer(tracing.CHANNEL)
+
+
+class SlotArena:
+    """Slot storage shared by the CompactChannels of one store.
+
+    Each channel's slots are a block of one list, so a channel carries no list of its
+    own. Blocks of collected channels are reused.
+    """
+    def __init__(self):
+        self._slots: List[Optional[UniqueIdentifier]] = []
+        # capacity -> bases of blocks given back by collected channels
+        self._free_blocks: Dict[int, List[int]] = {}
+        self._free_slots = 0
+
+    def allocate(self, capacity: int) -> int:
+        """Base index of a block of *capacity* empty slots."""
+        free = self._free_blocks.get(capacity)
+        if free:
+            self._free_slots -= capacity
+            return free.pop()
+        base = len(self._slots)
+        self._slots.extend([None] * capacity)
+        return base
+
+    def free(self, base: int, capacity: int) -> None:
+        self._slots[base:base + capacity] = [None] * capacity
+        self._free_blocks.setdefault(capacity, []).append(base)
+        self._free_slots += capacity
+
+    def __len__(self) -> int:
+        """Slots held by live channels."""
+        return len(self._slots) - self._free_slots
+
+
+@dataclass(frozen=True, slots=True)
+class _Kernel:
+    access: str     # removable: 'all' | 'deepest' (highest occupied index) | 'shallowest' | 'ends'
+    drop: str       # addable: 'empty' | 'front' (slot 0 if empty) | 'room' (slot 0 if any room) | 'prefix' | 'ends'
+    flow: int       # +1 packs toward slot N-1, -1 toward slot 0, 0 no flow
+    push: bool
+
+
+# Exact types only: a subclass may override any of this behaviour
+_KERNELS = {
+    cps.AllAvailableChannelProcessor:             _Kernel('all', 'empty', 0, False),
+    cps.AllAvailableFlowChannelProcessor:         _Kernel('all', 'empty', +1, False),
+    cps.AllAvailableFlowBackwardChannelProcessor: _Kernel('all', 'empty', -1, False),
+    cps.FIFOFlowChannelProcessor:                 _Kernel('deepest', 'front', +1, False),
+    cps.FIFOFlowBackwardChannelProcessor:         _Kernel('deepest', 'room', -1, True),
+    cps.LIFOFlowChannelProcessor:                 _Kernel('shallowest', 'front', +1, False),
+    cps.LIFOFlowBackwardChannelProcessor:         _Kernel('shallowest', 'room', -1, True),
+    cps.FIFONoFlowChannelProcessor:               _Kernel('deepest', 'prefix', 0, False),
+    cps.LIFONoFlowChannelProcessor:               _Kernel('shallowest', 'prefix', 0, False),
+    cps.FIFONoFlowPushChannelProcessor:           _Kernel('deepest', 'room', 0, True),
+    cps.LIFONoFlowPushChannelProcessor:           _Kernel('shallowest', 'room', 0, True),
+    cps.OMNIChannelProcessor:                     _Kernel('ends', 'ends', 0, False),
+    cps.OMNIFlowChannelProcessor:                 _Kernel('ends', 'ends', +1, False),
+    cps.OMNIFlowBackwardChannelProcessor:         _Kernel('ends', 'ends', -1, True),
+}
+
+
+class CompactChannel:
+    """Channel backed by a block of a SlotArena; same API as Channel."""
+    __slots__ = ('_id', '_processor', '_arena', '_capacity', '_base', '_count', '_lo', '_hi', '_kernel')
+
+    def __init__(self,
+                 processor: cps.IChannelProcessor,
+                 arena: SlotArena,
+                 id: UniqueIdentifier = None,
+                 capacity: int = 1,
+                 init_state: Dict[int, UniqueIdentifier] = None
+                 ):
+        self._id = id or uuid.uuid4()
+        self._processor: cps.IChannelProcessor = processor
+        self._arena = arena
+        self._capacity: int = capacity
+        self._base = arena.allocate(capacity)
+        self._count = 0
+        # Shallowest and deepest occupied slots; (capacity, -1) when empty
+        self._lo = capacity
+        self._hi = -1
+        self._kernel: Optional[_Kernel] = _KERNELS.get(type(processor))
+
+        if init_state is not None:
+            for ind, val in init_state.items():
+                if val is not None:
+                    self._place(ind, val)
+        if self._kernel is not None and self._kernel.flow and self._count and self._hi - self._lo + 1 != self._count:
+            # An unflowed initial state: leave it to the processor, as Channel would
+            self._kernel = None
+
+    def __del__(self):
+        try:
+            arena, base, cap = self._arena, self._base, self._capacity
+        except AttributeError:
+            return
+        arena.free(base, cap)
+
+    # ── counters ──────────────────────────────────────────────────────────────
+
+    def _place(self, pos: int, id: UniqueIdentifier):
+        self._arena._slots[self._base + pos] = id
+        self._count += 1
+        self._lo = min(self._lo, pos)
+        self._hi = max(self._hi, pos)
+
+    def _rescan_ends(self):
+        if self._count == 0:
+            self._lo, self._hi = self._capacity, -1
+            return
+        slots, b = self._arena._slots, self._base
+        while slots[b + self._lo] is None:
+            self._lo += 1
+        while slots[b + self._hi] is None:
+            self._hi -= 1
+
+    def _is_removable(self, pos: int) -> bool:
+        access = self._kernel.access
+        if access == 'all':
+            return True
+        if access == 'deepest':
+            return pos == self._hi
+        if access == 'shallowest':
+            return pos == self._lo
+        return pos == self._lo or pos == self._hi
+
+    def _drop_position(self) -> Optional[int]:
+        kernel, count, cap = self._kernel, self._count, self._capacity
+        slots, b = self._arena._slots, self._base
+        drop = kernel.drop
+        if drop == 'room':
+            return 0 if count < cap else None
+        if drop == 'front':
+            return 0 if slots[b] is None else None
+        if drop == 'empty':
+            if count == cap:
+                return None
+            if kernel.flow > 0:
+                return 0
+            if kernel.flow < 0:
+                return self._hi + 1
+            return slots.index(None, b, b + cap) - b
+        if count == 0:
+            return cap - 1
+        if self._lo > 0:
+            return self._lo - 1
+        if drop == 'ends' and self._hi < cap - 1:
+            return self._hi + 1
+        return None
+
+    # ── mutation ──────────────────────────────────────────────────────────────
+
+    def _add(self, id: UniqueIdentifier):
+        pos = self._drop_position()
+        if pos is None:
+            raise cps.NoRoomToAddException(channel_processor=type(self._processor), requested=id, state=self.State)
+        slots, b, cap = self._arena._slots, self._base, self._capacity
+        if slots[b + pos] is not None and not self._kernel.push:
+            raise cps.ItemBlockingToAddException(channel_processor=type(self._processor), requested=id, pos=pos,
+                                                 state=self.State)
+
+        if slots[b + pos] is not None:
+            # Push: shift everything from pos one slot deeper; whatever was in the last slot drops out
+            dropped = slots[b + cap - 1]
+            slots[b + pos + 1:b + cap] = slots[b + pos:b + cap - 1]
+            slots[b + pos] = id
+            self._count += 1
+            self._lo = min(self._lo, pos)
+            if dropped is not None:
+                self._count -= 1
+                self._hi = cap - 1
+                self._rescan_ends()
+            else:
+                self._hi += 1
+        else:
+            self._place(pos, id)
+
+        flow = self._kernel.flow
+        if flow > 0:
+            target = cap - self._count
+            if pos != target:
+                slots[b + pos] = None
+                slots[b + target] = id
+            self._lo, self._hi = target, cap - 1
+        elif flow < 0:
+            target = self._count - 1
+            if pos > target:
+                slots[b + pos] = None
+                slots[b + target] = id
+            self._lo, self._hi = 0, target
+
+    def _remove(self, id: UniqueIdentifier):
+        pos = self._find(id)
+        if pos is None:
+            raise cps.ItemNotFoundToRemoveException(channel_processor=type(self._processor), requested=id,
+                                                    state=self.State)
+        if not self._is_removable(pos):
+            raise cps.ItemNotAccessibleToRemoveException(channel_processor=type(self._processor), requested=id,
+                                                         state=self.State, available=self.get_removable_ids())
+        slots, b = self._arena._slots, self._base
+        slots[b + pos] = None
+        self._count -= 1
+
+        flow = self._kernel.flow
+        if self._count == 0:
+            self._lo, self._hi = self._capacity, -1
+        elif flow > 0:
+            slots[b + self._lo + 1:b + pos + 1] = slots[b + self._lo:b + pos]
+            slots[b + self._lo] = None
+            self._lo += 1
+        elif flow < 0:
+            slots[b + pos:b + self._hi] = slots[b + pos + 1:b + self._hi + 1]
+            slots[b + self._hi] = None
+            self._hi -= 1
+        elif pos == self._lo or pos == self._hi:
+            self._rescan_ends()
+
+    def _find(self, id: UniqueIdentifier) -> Optional[int]:
+        if self._count == 0:
+            return None
+        try:
+            return self._arena._slots.index(id, self._base + self._lo, self._base + self._hi + 1) - self._base
+        except ValueError:
+            return None
+
+    def _apply(self, ids: Iterable[UniqueIdentifier], op):
+        ids = list(ids)
+        if len(ids) <= 1:
+            # A single add or remove is checked before anything changes
+            for id in ids:
+                op(id)
+            return
+        # Several are all-or-nothing, as with IChannelProcessor.process
+        slots, b, cap = self._arena._slots, self._base, self._capacity
+        saved = (slots[b:b + cap], self._count, self._lo, self._hi)
+        try:
+            for id in ids:
+                op(id)
+        except Exception:
+            slots[b:b + cap] = saved[0]
+            self._count, self._lo, self._hi = saved[1:]
+            raise
+
+    def _process(self, added: Iterable[UniqueIdentifier] = None, removed: Iterable[UniqueIdentifier] = None):
+        new_state = list(self._processor.process(state=self.State, added=added, removed=removed))
+        b, cap = self._base, self._capacity
+        self._arena._slots[b:b + cap] = new_state
+        self._count = sum(1 for x in new_state if x is not None)
+        self._lo, self._hi = 0, cap - 1
+        self._rescan_ends()
+
+    def store(self,
+              ids: Iterable[UniqueIdentifier]):
+        if _trace.enabled:
+            ids = list(ids)
+        if self._kernel is None:
+            self._process(added=ids)
+        else:
+            self._apply(ids, self._add)
+        if _trace.enabled:
+            _trace.emit('stored', channel=self._id, ids=ids, state=tuple(self.State))
+        return self
+
+    def remove(self,
+               ids: Iterable[UniqueIdentifier]):
+        if _trace.enabled:
+            ids = list(ids)
+        if self._kernel is None:
+            self._process(removed=ids)
+        else:
+            self._apply(ids, self._remove)
+        if _trace.enabled:
+            _trace.emit('removed', channel=self._id, ids=ids, state=tuple(self.State))
+        return self
+
+    def clear(self):
+        b, cap = self._base, self._capacity
+        self._arena._slots[b:b + cap] = [None] * cap
+        self._count = 0
+        self._lo, self._hi = cap, -1
+        if _trace.enabled:
+            _trace.emit('cleared', channel=self._id)
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+
+    @property
+    def State(self) -> List[Optional[UniqueIdentifier]]:
+        return self._arena._slots[self._base:self._base + self._capacity]
+
+    @property
+    def PopulatedIdxs(self) -> Dict[int, UniqueIdentifier]:
+        return {ii: x for ii, x in enumerate(self.State) if x is not None}
+
+    @property
+    def StoredIds(self) -> List[UniqueIdentifier]:
+        return [x for x in self.State if x is not None]
+
+    @property
+    def Count(self) -> int:
+        return self._count
+
+    def get_removable_ids(self):
+        slots, b = self._arena._slots, self._base
+        return {ii: slots[b + ii] for ii in self.get_removable_positions()}
+
+    def get_removable_positions(self):
+        if self._kernel is None:
+            return self._processor.get_removable_positions(self.State)
+        if self._count == 0:
+            return []
+        access = self._kernel.access
+        if access == 'deepest':
+            return [self._hi]
+        if access == 'shallowest':
+            return [self._lo]
+        if access == 'ends':
+            # Same order as OMNI processors' list(set(...))
+            return list({self._lo, self._hi})
+        if self._kernel.flow:
+            return list(range(self._lo, self._hi + 1))
+        slots, b = self._arena._slots, self._base
+        return [ii for ii in range(self._lo, self._hi + 1) if slots[b + ii] is not None]
+
+    def get_addable_positions(self):
+        if self._kernel is None:
+            return self._processor.get_addable_positions(self.State)
+        drop, cap = self._kernel.drop, self._capacity
+        if drop == 'empty':
+            if self._kernel.flow > 0:
+                return list(range(0, self._lo if self._count else cap))
+            if self._kernel.flow < 0:
+                return list(range(self._hi + 1, cap))
+            return [ii for ii, x in enumerate(self.State) if x is None]
+        if drop == 'ends':
+            if self._count == 0:
+                return [cap - 1] if cap == 1 else [cap - 1, 0]
+            positions = [self._lo - 1] if self._lo > 0 else []
+            if self._hi < cap - 1:
+                positions.append(self._hi + 1)
+            return positions
+        pos = self._drop_position()
+        return [pos] if pos is not None else []
+
+    def __repr__(self):
+        return f"{self._id}: " + cps.str_format_channel_state(self.State)
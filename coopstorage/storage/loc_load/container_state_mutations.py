@@ -56,6 +56,7 @@ def _rebuild_container(container: Container, new_contents: frozenset) -> Contain
         uom_capacities=container.uom_capacities,
         resource_qualifier=container.resource_qualifier,
         uom_qualifier=container.uom_qualifier,
+        expected_dwell=container.expected_dwell,
     )
 
 
@@ -0,0 +1,551 @@
+"""
+Incrementally maintained secondary indexes over a location store.
+
+LocationDataStore keeps these current on add/update/remove/clear so callers never
+need to rescan every Location to answer placement or free-capacity questions.
+"""
+import bisect
+import heapq
+import itertools
+import math
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Optional, Self, Tuple
+
+import numpy as np
+
+import coopstorage.storage.loc_load.dcs as dcs
+import coopstorage.storage.loc_load.qualifiers as qs
+from coopstorage.storage.loc_load.location import Location, LocationView
+from cooptools.protocols import UniqueIdentifier
+
+
+class ContainerLocationIndex:
+    """Reverse index of container id -> id of the location currently holding it.
+
+    Container ids are keyed by ``str`` so lookups from event payloads (which always
+    carry stringified ids) resolve regardless of the original id type.
+    """
+    def __init__(self):
+        self._loc_by_container: Dict[str, UniqueIdentifier] = {}
+        self._containers_by_loc: Dict[UniqueIdentifier, List[str]] = {}
+
+    def index(self, locs: Iterable[Location]) -> Self:
+        """(Re)index the current contents of each location in *locs*."""
+        for loc in locs:
+            self._drop(loc.Id)
+            cids = [str(cid) for cid in loc.ContainerIds]
+            if cids:
+                self._containers_by_loc[loc.Id] = cids
+                for cid in cids:
+                    self._loc_by_container[cid] = loc.Id
+        return self
+
+    def drop(self, loc_ids: Iterable[UniqueIdentifier]) -> Self:
+        for loc_id in loc_ids:
+            self._drop(loc_id)
+        return self
+
+    def _drop(self, loc_id: UniqueIdentifier):
+        for cid in self._containers_by_loc.pop(loc_id, ()):
+            # A later index() may already have re-pointed the container elsewhere
+            if self._loc_by_container.get(cid) == loc_id:
+                del self._loc_by_container[cid]
+
+    def clear(self) -> Self:
+        self._loc_by_container.clear()
+        self._containers_by_loc.clear()
+        return self
+
+    def get(self, container_id: UniqueIdentifier) -> Optional[UniqueIdentifier]:
+        return self._loc_by_container.get(str(container_id))
+
+    def items(self) -> Dict[str, UniqueIdentifier]:
+        return dict(self._loc_by_container)
+
+    def __contains__(self, container_id: UniqueIdentifier) -> bool:
+        return str(container_id) in self._loc_by_container
+
+    def __len__(self) -> int:
+        return len(self._loc_by_container)
+
+
+# (channel processor type name, has addable position, available capacity, is occupied)
+CapacityKey = Tuple[str, bool, int, bool]
+
+
+def capacity_key(loc: Location) -> CapacityKey:
+    return (
+        type(loc.Meta.channel_processor).__name__,
+        len(loc.get_addable_positions()) > 0,
+        loc.AvailableCapacity,
+        len(loc.ContainerIds) > 0,
+    )
+
+
+class LocationCapacityIndex:
+    """Buckets location ids by CapacityKey.
+
+    Answers "which locations could satisfy these capacity/occupancy/processor
+    constraints" by visiting only matching buckets instead of every location.
+    Each location keeps the sequence number it was first indexed with, and buckets
+    hold those numbers sorted, so candidates come back in registration (layout)
+    order: the same order, and so the same first fit, as a front-to-back scan.
+    """
+    def __init__(self):
+        self._key_by_loc: Dict[UniqueIdentifier, CapacityKey] = {}
+        self._seq_by_loc: Dict[UniqueIdentifier, int] = {}
+        self._loc_by_seq: Dict[int, UniqueIdentifier] = {}
+        self._buckets: Dict[CapacityKey, List[int]] = {}
+        self._next_seq = itertools.count()
+
+    def index(self, locs: Iterable[Location]) -> Self:
+        for loc in locs:
+            key = capacity_key(loc)
+            old = self._key_by_loc.get(loc.Id)
+            if old == key:
+                continue
+            seq = self._seq_by_loc.get(loc.Id)
+            if seq is None:
+                seq = self._seq_by_loc[loc.Id] = next(self._next_seq)
+                self._loc_by_seq[seq] = loc.Id
+            if old is not None:
+                self._discard(seq, old)
+            self._key_by_loc[loc.Id] = key
+            bisect.insort(self._buckets.setdefault(key, []), seq)
+        return self
+
+    def drop(self, loc_ids: Iterable[UniqueIdentifier]) -> Self:
+        for loc_id in loc_ids:
+            old = self._key_by_loc.pop(loc_id, None)
+            if old is not None:
+                seq = self._seq_by_loc.pop(loc_id)
+                del self._loc_by_seq[seq]
+                self._discard(seq, old)
+        return self
+
+    def _discard(self, seq: int, key: CapacityKey):
+        bucket = self._buckets[key]
+        del bucket[bisect.bisect_left(bucket, seq)]
+        if not bucket:
+            del self._buckets[key]
+
+    def clear(self) -> Self:
+        self._key_by_loc.clear()
+        self._seq_by_loc.clear()
+        self._loc_by_seq.clear()
+        self._buckets.clear()
+        return self
+
+    def get_key(self, loc_id: UniqueIdentifier) -> Optional[CapacityKey]:
+        return self._key_by_loc.get(loc_id)
+
+    def rank(self, loc_id: UniqueIdentifier) -> int:
+        """Registration order of *loc_id*; unindexed ids sort last."""
+        return self._seq_by_loc.get(loc_id, math.inf)
+
+    @staticmethod
+    def is_applicable(qualifier: Optional[qs.LocationQualifier]) -> bool:
+        return qualifier is not None and (
+            qualifier.has_addable_position is not None or
+            qualifier.at_least_capacity is not None or
+            qualifier.is_occupied is not None or
+            qualifier.channel_processor_types is not None
+        )
+
+    def matching_keys(self, qualifier: qs.LocationQualifier, emptiest_first: bool = False) -> List[CapacityKey]:
+        processor_types = set(qualifier.channel_processor_types) \
+            if qualifier.channel_processor_types is not None else None
+        keys = [
+            key for key in self._buckets
+            if (processor_types is None or key[0] in processor_types)
+            and (qualifier.has_addable_position is None or key[1] == qualifier.has_addable_position)
+            and (qualifier.at_least_capacity is None or key[2] >= qualifier.at_least_capacity)
+            and (qualifier.is_occupied is None or key[3] == qualifier.is_occupied)
+        ]
+        if emptiest_first:
+            keys.sort(key=lambda k: -k[2])
+        return keys
+
+    def candidate_ids(self,
+                      qualifier: qs.LocationQualifier,
+                      emptiest_first: bool = False) -> Optional[Iterator[UniqueIdentifier]]:
+        """Ids of locations whose bucket satisfies *qualifier*'s indexed fields, in
+        registration order. With *emptiest_first*, candidates come emptiest-first
+        instead, and in registration order within each available capacity.
+
+        Returns None when the qualifier has no indexed fields (caller should fall
+        back to a full scan). Candidates must still be passed through
+        ``qualifier.check_if_qualifies`` for the non-indexed fields.
+        """
+        if not self.is_applicable(qualifier):
+            return None
+        # Buckets are copied up front so callers may update locations mid-iteration
+        keys = self.matching_keys(qualifier, emptiest_first)
+        if emptiest_first:
+            seqs = itertools.chain.from_iterable(
+                heapq.merge(*(list(self._buckets[key]) for key in level))
+                for _, level in itertools.groupby(keys, key=lambda k: k[2])
+            )
+        else:
+            seqs = heapq.merge(*(list(self._buckets[key]) for key in keys))
+        loc_by_seq = self._loc_by_seq
+        return (loc_by_seq[seq] for seq in seqs if seq in loc_by_seq)
+
+    def __len__(self) -> int:
+        return len(self._key_by_loc)
+
+
+class LocationArrays:
+    """Columnar NumPy copy of each location's coords, capacity, occupancy, whether it
+    has an addable position, and its LocationMeta (as an interned code).
+
+    One row per location, so batch evaluators (see evaluators.vectorized) can score
+    many candidates with array operations, and simple filters can be applied as a
+    mask (see ``candidate_rows``). Rows are not stable: dropping a location moves the
+    last row into its place, so resolve rows from ids at use time.
+    """
+    def __init__(self):
+        self._ids: List[UniqueIdentifier] = []
+        self._row_by_id: Dict[UniqueIdentifier, int] = {}
+        self._coords = np.zeros((0, 3), dtype=float)
+        self._capacity = np.zeros(0, dtype=np.int64)
+        self._occupancy = np.zeros(0, dtype=np.int64)
+        self._addable = np.zeros(0, dtype=bool)
+        self._meta_code = np.zeros(0, dtype=np.int64)
+        self._metas: List[dcs.LocationMeta] = []
+        # Interned by value; metas that can't be hashed are interned by identity
+        self._code_by_meta: Dict[dcs.LocationMeta, int] = {}
+        self._code_by_meta_id: Dict[int, int] = {}
+
+    def _reserve(self, n_rows: int, n_dims: int):
+        rows, dims = self._coords.shape
+        if n_rows <= rows and n_dims <= dims:
+            return
+        new_rows = max(n_rows, rows * 2, 16) if n_rows > rows else rows
+        coords = np.zeros((new_rows, max(n_dims, dims)), dtype=float)
+        coords[:rows, :dims] = self._coords
+        self._coords = coords
+        self._capacity = self._grow(self._capacity, new_rows)
+        self._occupancy = self._grow(self._occupancy, new_rows)
+        self._addable = self._grow(self._addable, new_rows)
+        self._meta_code = self._grow(self._meta_code, new_rows)
+
+    @staticmethod
+    def _grow(arr: np.ndarray, n_rows: int) -> np.ndarray:
+        grown = np.zeros(n_rows, dtype=arr.dtype)
+        grown[:len(arr)] = arr
+        return grown
+
+    def _intern(self, meta: dcs.LocationMeta) -> int:
+        try:
+            code = self._code_by_meta.get(meta)
+        except TypeError:
+            code = self._code_by_meta_id.get(id(meta))
+            if code is None:
+                code = self._code_by_meta_id[id(meta)] = len(self._metas)
+                self._metas.append(meta)
+            return code
+        if code is None:
+            code = self._code_by_meta[meta] = len(self._metas)
+            self._metas.append(meta)
+        return code
+
+    def index(self, locs: Iterable[Location]) -> Self:
+        for loc in locs:
+            coords = loc.Coords
+            row = self._row_by_id.get(loc.Id)
+            if row is None:
+                row = len(self._ids)
+                self._reserve(row + 1, len(coords))
+                self._ids.append(loc.Id)
+                self._row_by_id[loc.Id] = row
+            else:
+                self._reserve(len(self._ids), len(coords))
+            self._coords[row, :] = 0
+            self._coords[row, :len(coords)] = coords
+            self._capacity[row] = loc.Capacity
+            self._occupancy[row] = len(loc.ContainerIds)
+            self._addable[row] = len(loc.get_addable_positions()) > 0
+            self._meta_code[row] = self._intern(loc.Meta)
+        return self
+
+    def drop(self, loc_ids: Iterable[UniqueIdentifier]) -> Self:
+        for loc_id in loc_ids:
+            row = self._row_by_id.pop(loc_id, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._row_by_id[moved] = row
+                for arr in (self._coords, self._capacity, self._occupancy, self._addable, self._meta_code):
+                    arr[row] = arr[last]
+            self._ids.pop()
+        return self
+
+    def clear(self) -> Self:
+        self.__init__()
+        return self
+
+    def rows(self, loc_ids: Iterable[UniqueIdentifier]) -> np.ndarray:
+        """Row index of each of *loc_ids*, in order."""
+        return np.fromiter((self._row_by_id[loc_id] for loc_id in loc_ids), dtype=np.intp)
+
+    @staticmethod
+    def supports(qualifier: Optional[qs.LocationQualifier]) -> bool:
+        """Whether *qualifier* can be applied by ``candidate_rows``: everything except the
+        id pattern, reservation and container-content fields."""
+        return qualifier is None or (
+            qualifier.id_pattern is None and
+            qualifier.reserved is None and
+            qualifier.has_any_containers is None and
+            qualifier.has_all_containers is None and
+            qualifier.has_content is None
+        )
+
+    def candidate_rows(self,
+                       qualifier: Optional[qs.LocationQualifier],
+                       container: Optional[dcs.Container] = None) -> np.ndarray:
+        """Rows of the locations satisfying *qualifier* (see ``supports``), in row order.
+
+        Occupancy and capacity are compared column-wise; the remaining checks depend
+        only on a location's meta, so they run once per distinct meta.
+        """
+        n = len(self._ids)
+        qualifier = qualifier or qs.LocationQualifier()
+        mask = np.ones(n, dtype=bool)
+        if qualifier.is_occupied is not None:
+            mask &= (self._occupancy[:n] > 0) == qualifier.is_occupied
+        if qualifier.at_least_capacity is not None:
+            mask &= (self._capacity[:n] - self._occupancy[:n]) >= qualifier.at_least_capacity
+        if qualifier.has_addable_position is not None:
+            mask &= self._addable[:n] == qualifier.has_addable_position
+
+        meta_check = replace(qualifier, is_occupied=None, at_least_capacity=None,
+                             has_addable_position=None).compile(container=container)
+        meta_ok = np.fromiter((meta_check(LocationView(id=None, meta=meta, coords=(), state=()))
+                               for meta in self._metas), dtype=bool, count=len(self._metas))
+        if not meta_ok.all():
+            mask &= meta_ok[self._meta_code[:n]]
+        return np.flatnonzero(mask)
+
+    @property
+    def Ids(self) -> List[UniqueIdentifier]:
+        return self._ids
+
+    @property
+    def Coords(self) -> np.ndarray:
+        """(n, dims) location coords; shorter coords are zero-padded."""
+        return self._coords[:len(self._ids)]
+
+    @property
+    def Capacity(self) -> np.ndarray:
+        return self._capacity[:len(self._ids)]
+
+    @property
+    def Occupancy(self) -> np.ndarray:
+        """Number of containers stored at each location."""
+        return self._occupancy[:len(self._ids)]
+
+    def __contains__(self, loc_id: UniqueIdentifier) -> bool:
+        return loc_id in self._row_by_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+# Location coords padded (or truncated) to 3D, and the grid cell holding one
+Point = Tuple[float, float, float]
+Cell = Tuple[int, int, int]
+
+
+def _point3(coords: Iterable[float]) -> Point:
+    p = tuple(float(c) for c in coords)[:3]
+    return p + (0.0,) * (3 - len(p))
+
+
+class LocationGridIndex:
+    """Uniform grid over location coords for nearest-k and bounding-box queries.
+
+    Coords are padded to 3D. If *cell_size* isn't given it is chosen so that an
+    occupied cell holds about *per_cell* locations, and the grid is rebuilt whenever
+    growth moves that choice by more than a factor of two.
+    """
+    def __init__(self, cell_size: Optional[float] = None, per_cell: int = 8):
+        self._fixed_cell_size = cell_size
+        self._cell_size = cell_size
+        self._per_cell = per_cell
+        self._points: Dict[UniqueIdentifier, Point] = {}
+        self._cells: Dict[Cell, Dict[UniqueIdentifier, Point]] = {}
+        # Bounds of every point / cell ever occupied; not shrunk on drop, which only costs empty cell visits
+        self._pmin: Optional[List[float]] = None
+        self._pmax: Optional[List[float]] = None
+        self._lo: Optional[List[int]] = None
+        self._hi: Optional[List[int]] = None
+
+    def _choose_cell_size(self, n: int) -> float:
+        extents = [hi - lo for lo, hi in zip(self._pmin, self._pmax)]
+        extents = [e for e in extents if e > 0]
+        if len(extents) == 0:
+            return 1.0
+        volume = math.prod(extents)
+        return (volume * self._per_cell / n) ** (1 / len(extents))
+
+    def _cell(self, p: Point) -> Cell:
+        return tuple(math.floor(x / self._cell_size) for x in p)
+
+    def _regrid(self, cell_size: float):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._lo = self._hi = None
+        for loc_id, p in self._points.items():
+            self._add(loc_id, p)
+
+    def _add(self, loc_id: UniqueIdentifier, p: Point):
+        cell = self._cell(p)
+        self._points[loc_id] = p
+        self._cells.setdefault(cell, {})[loc_id] = p
+        if self._lo is None:
+            self._lo, self._hi = list(cell), list(cell)
+        else:
+            self._lo = [min(a, b) for a, b in zip(self._lo, cell)]
+            self._hi = [max(a, b) for a, b in zip(self._hi, cell)]
+
+    def index(self, locs: Iterable[Location]) -> Self:
+        moved = [(loc.Id, _point3(loc.Coords)) for loc in locs]
+        moved = [(loc_id, p) for loc_id, p in moved if self._points.get(loc_id) != p]
+        if len(moved) == 0:
+            return self
+        for _, p in moved:
+            if self._pmin is None:
+                self._pmin, self._pmax = list(p), list(p)
+            else:
+                self._pmin = [min(a, b) for a, b in zip(self._pmin, p)]
+                self._pmax = [max(a, b) for a, b in zip(self._pmax, p)]
+        if self._fixed_cell_size is None:
+            size = self._choose_cell_size(len(self._points) + len(moved))
+            if self._cell_size is None or not self._cell_size / 2 < size < self._cell_size * 2:
+                self._regrid(size)
+        for loc_id, p in moved:
+            self._drop(loc_id)
+            self._add(loc_id, p)
+        return self
+
+    def drop(self, loc_ids: Iterable[UniqueIdentifier]) -> Self:
+        for loc_id in loc_ids:
+            self._drop(loc_id)
+        return self
+
+    def _drop(self, loc_id: UniqueIdentifier):
+        p = self._points.pop(loc_id, None)
+        if p is None:
+            return
+        cell = self._cell(p)
+        members = self._cells[cell]
+        del members[loc_id]
+        if len(members) == 0:
+            del self._cells[cell]
+
+    def clear(self) -> Self:
+        self.__init__(cell_size=self._fixed_cell_size, per_cell=self._per_cell)
+        return self
+
+    def _block(self, lo: Cell, hi: Cell) -> List[range]:
+        """Per-axis cell ranges of the block lo..hi, clipped to the occupied bounds."""
+        return [range(max(lo[a], self._lo[a]), min(hi[a], self._hi[a]) + 1) for a in range(3)]
+
+    def _shell(self, center: Cell, r: int) -> Iterator[Cell]:
+        """Cells at Chebyshev distance *r* from *center*, within the occupied bounds."""
+        xs, ys, zs = self._block(tuple(c - r for c in center), tuple(c + r for c in center))
+        for x in xs:
+            for y in ys:
+                if abs(x - center[0]) == r or abs(y - center[1]) == r:
+                    yield from ((x, y, z) for z in zs)
+                else:
+                    yield from ((x, y, z) for z in {center[2] - r, center[2] + r} if z in zs)
+
+    def _rings(self, center: Cell) -> Iterator[Tuple[int, Iterable[Cell]]]:
+        """(r, cells) for the rings of cells around *center* that can be occupied, innermost
+        first; every cell within Chebyshev distance r has been yielded once a pair is.
+
+        Rings are enumerated cell by cell while they are smaller than the set of occupied
+        cells; after that the occupied cells are bucketed by ring once and empty rings skipped.
+        """
+        # Rings nearer than the occupied bounds are empty, and none lie beyond them
+        r = max(max(self._lo[a] - center[a], center[a] - self._hi[a], 0) for a in range(3))
+        max_r = max(max(center[a] - self._lo[a], self._hi[a] - center[a]) for a in range(3))
+        while r <= max_r:
+            block = self._block(tuple(c - r for c in center), tuple(c + r for c in center))
+            if math.prod(len(axis) for axis in block) > len(self._cells):
+                break
+            yield r, self._shell(center, r)
+            r += 1
+        else:
+            return
+        by_ring: Dict[int, List[Cell]] = {}
+        for cell in self._cells:
+            d = max(abs(a - b) for a, b in zip(cell, center))
+            if d >= r:
+                by_ring.setdefault(d, []).append(cell)
+        order = sorted(by_ring)
+        for i, d in enumerate(order):
+            # Nothing is occupied between this ring and the next
+            yield (order[i + 1] - 1 if i + 1 < len(order) else max_r), by_ring[d]
+
+    def iter_nearest(self, point: Iterable[float]) -> Iterator[Tuple[float, UniqueIdentifier]]:
+        """Yield (distance, location id) for every indexed location, nearest *point* first.
+
+        Rings of cells are searched outward from the occupied bounds; a location is
+        yielded once no unsearched cell can hold anything nearer, so taking the first k
+        costs only the rings needed to reach them, however far *point* is from the layout.
+        """
+        if len(self._points) == 0:
+            return
+        p = _point3(point)
+        center = self._cell(p)
+        s = self._cell_size
+        heap: List[Tuple[float, int, UniqueIdentifier]] = []
+        seq = itertools.count()
+        for r, cells in self._rings(center):
+            for cell in cells:
+                for loc_id, q in self._cells.get(cell, {}).items():
+                    heapq.heappush(heap, (math.dist(p, q), next(seq), loc_id))
+            # Distance from p to the nearest side of the searched block still facing occupied cells
+            bound = math.inf
+            for a in range(3):
+                if center[a] - r > self._lo[a]:
+                    bound = min(bound, p[a] - (center[a] - r) * s)
+                if center[a] + r < self._hi[a]:
+                    bound = min(bound, (center[a] + r + 1) * s - p[a])
+            while heap and heap[0][0] <= bound:
+                dist, _, loc_id = heapq.heappop(heap)
+                yield dist, loc_id
+        while heap:
+            dist, _, loc_id = heapq.heappop(heap)
+            yield dist, loc_id
+
+    def ids_in_box(self, lo: Iterable[float], hi: Iterable[float]) -> Iterator[UniqueIdentifier]:
+        """Ids of locations whose coords lie within the box lo..hi (inclusive)."""
+        if len(self._points) == 0:
+            return
+        lo, hi = _point3(lo), _point3(hi)
+        xs, ys, zs = self._block(self._cell(lo), self._cell(hi))
+        if len(xs) * len(ys) * len(zs) > len(self._cells):
+            cells = [cell for cell in self._cells if cell[0] in xs and cell[1] in ys and cell[2] in zs]
+        else:
+            cells = [(x, y, z) for x in xs for y in ys for z in zs]
+        for cell in cells:
+            for loc_id, q in self._cells.get(cell, {}).items():
+                if all(lo[a] <= q[a] <= hi[a] for a in range(3)):
+                    yield loc_id
+
+    @property
+    def CellSize(self) -> Optional[float]:
+        return self._cell_size
+
+    def __contains__(self, loc_id: UniqueIdentifier) -> bool:
+        return loc_id in self._points
+
+    def __len__(self) -> int:
+        return len(self._points)
@@ -0,0 +1,97 @@
+"""
+Copy-on-write, versioned snapshots of location channel state.
+
+Writers only record which locations changed (O(1) per change); the next reader
+folds those changes into a new immutable LocationsSnapshot. Until something
+changes again, every reader shares that same snapshot for free.
+"""
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+from coopstorage.storage.loc_load.location import Location, LocationView
+from cooptools.protocols import UniqueIdentifier
+
+
+@dataclass(frozen=True, slots=True)
+class LocationsSnapshot:
+    """Immutable view of every location at one version."""
+    version: int
+    locations: Mapping[UniqueIdentifier, LocationView]
+    # time.monotonic() when this snapshot was published
+    published_at: float = 0.0
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was published."""
+        return time.monotonic() - self.published_at
+
+    def get(self, loc_id: UniqueIdentifier) -> Optional[LocationView]:
+        return self.locations.get(loc_id)
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+
+class LocationSnapshotPublisher:
+    def __init__(self):
+        # Start dirty so a pre-populated backend is captured on first read
+        self._version = 1
+        self._full_rebuild = True
+        self._dirty: Dict[UniqueIdentifier, Optional[Location]] = {}
+        self._published = LocationsSnapshot(version=0, locations=MappingProxyType({}))
+
+    @property
+    def Version(self) -> int:
+        """Version the next publish() will produce."""
+        return self._version
+
+    @property
+    def Published(self) -> LocationsSnapshot:
+        """Most recently published snapshot (may lag Version)."""
+        return self._published
+
+    def touch(self, locs: Iterable[Location]) -> None:
+        for loc in locs:
+            self._dirty[loc.Id] = loc
+        self._version += 1
+
+    def drop(self, loc_ids: Iterable[UniqueIdentifier]) -> None:
+        for loc_id in loc_ids:
+            self._dirty[loc_id] = None
+        self._version += 1
+
+    def reset(self) -> None:
+        """Discard incremental changes; the next publish rebuilds from the backing store."""
+        self._dirty.clear()
+        self._full_rebuild = True
+        self._version += 1
+
+    def publish(self, all_locs: Callable[[], Iterable[Location]]) -> LocationsSnapshot:
+        """Fold pending changes into a new snapshot. Callers must hold the writers' lock."""
+        if self._published.version == self._version:
+            return self._published
+
+        if self._full_rebuild:
+            locations = {loc.Id: loc.freeze() for loc in all_locs()}
+        else:
+            locations = dict(self._published.locations)
+            for loc_id, loc in self._dirty.items():
+                if loc is None:
+                    locations.pop(loc_id, None)
+                else:
+                    locations[loc_id] = loc.freeze()
+
+        self._dirty.clear()
+        self._full_rebuild = False
+        self._published = LocationsSnapshot(version=self._version, locations=MappingProxyType(locations),
+                                            published_at=time.monotonic())
+        return self._published
+
+    def publish_if_older(self, all_locs: Callable[[], Iterable[Location]], max_age: float) -> LocationsSnapshot:
+        """publish() if there are pending changes and the published snapshot is at
+        least *max_age* seconds old. Callers must hold the writers' lock."""
+        if self._published.version != self._version and self._published.age >= max_age:
+            return self.publish(all_locs)
+        return self._published
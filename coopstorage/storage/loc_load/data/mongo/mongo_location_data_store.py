@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 from coopmongo.mongoCollectionDataStore import MongoCollectionDataStore, ObjectDocumentFacade
 from cooptools.protocols import UniqueIdentifier
@@ -42,8 +42,10 @@ class MongoLocationDataStore:
 
     # ── DataStoreProtocol ─────────────────────────────────────────────────────
 
-    def add(self, items: Iterable[Location]) -> 'MongoLocationDataStore':
+    def add(self, items: Iterable[Location], tree_labels: Dict[str, Dict] = None) -> 'MongoLocationDataStore':
         self._store.add(list(items))
+        for loc_id, labels in (tree_labels or {}).items():
+            self._tree_cache[str(loc_id)] = dict(labels)
         return self
 
     def update(self, items: Iterable[Location]) -> 'MongoLocationDataStore':
@@ -100,5 +102,8 @@ class MongoLocationDataStore:
     def get_tree_labels(self, loc_id: str) -> Dict:
         return dict(self._tree_cache.get(str(loc_id), {}))
 
+    def iter_tree_labels(self) -> Iterable[Tuple[str, Dict]]:
+        return self._tree_cache.items()
+
     def upsert_tree_labels(self, loc_id: str, tree_labels: Dict):
         self._tree_cache[str(loc_id)] = dict(tree_labels)
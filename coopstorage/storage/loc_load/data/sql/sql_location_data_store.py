@@ -1,8 +1,11 @@
 import logging
+import threading
 import uuid
-from typing import Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select, update
 from sqlalchemy import text as sa_text
 from sqlalchemy.exc import IntegrityError
 
@@ -18,54 +21,250 @@ logger = logging.getLogger(__name__)
 
 _TREE_LABEL_COLS = ('zone', 'aisle', 'row', 'bay', 'shelf')
 
+# Locations per bulk INSERT. Each chunk is one executemany, which SQLAlchemy sends
+# as multi-row INSERTs where the driver supports it (insertmanyvalues) and as a
+# native executemany otherwise; chunking bounds the row dicts held at once.
+_INSERT_CHUNK = 5_000
+
+# refresh() re-reads rows stamped this long before the last sync, to catch writes
+# whose statement ran before the sync but committed after it (and, on SQLite,
+# timestamps stored at one-second resolution).
+_DELTA_LAG = timedelta(seconds=2)
+
+# Rows fetched per round trip when streaming a layout (server-side cursor where
+# the driver has one), so a load never holds the whole result set at once.
+_LOAD_CHUNK = 10_000
+
+# Meta columns of a row -> its shared LocationMeta; layouts have few distinct metas
+_ROW_METAS: Dict[tuple, dcs.LocationMeta] = {}
+
 
 class SqlLocationDataStore:
     """
     DataStoreProtocol implementation for Location objects backed by any SQL database.
 
-    Scoped to one layout_id.  All locations are held in an in-process cache;
-    lazily populated on first read and invalidated on structural writes.
+    Scoped to one layout_id.  All locations are held in an in-process cache,
+    lazily populated on first read and maintained in place by this store's own
+    writes; added locations are bulk-inserted in multi-row chunks.  refresh()
+    pulls in what other processes changed since the last sync, using
+    channels.updated_at, without reloading the layout.
     Channel-state updates (slot mutations) use targeted in-place cache refreshes
-    to keep the transfer path fast.
+    to keep the transfer path fast; each location's channel id is cached so they
+    need no lookup, and inside batched_writes() they are written together on exit.
 
     session_factory: a zero-argument callable that returns a context manager
     yielding a SQLAlchemy Session (same signature as get_session() in db modules).
+
+    lazy_level: optional tree-label column ('zone', 'aisle', ...).  When set,
+    reads by id load only the partitions (locations sharing that label) holding
+    the requested ids; reads that need the whole layout load the rest.
     """
 
-    def __init__(self, layout_id: str, session_factory):
+    def __init__(self, layout_id: str, session_factory, lazy_level: str = None):
+        if lazy_level is not None and lazy_level not in _TREE_LABEL_COLS:
+            raise ValueError(f"lazy_level must be one of {_TREE_LABEL_COLS}, not {lazy_level!r}")
         self._layout_id = uuid.UUID(str(layout_id))
         self._session_factory = session_factory
+        self._lazy_level = lazy_level
         self._loc_cache: Dict[str, Location] = {}
         self._tree_cache: Dict[str, Dict] = {}
         self._cache_valid = False
+        # loc id -> channels.id; kept even while the location cache is unloaded
+        self._channel_ids: Dict[str, uuid.UUID] = {}
+        self._batch = threading.local()
+        # Database time at the start of the first load, then of the last refresh()
+        self._synced_at = None
 
     # ── Cache management ──────────────────────────────────────────────────────
 
-    def _invalidate_cache(self):
-        self._loc_cache.clear()
-        self._tree_cache.clear()
-        self._cache_valid = False
-
     def _ensure_cache(self):
         if not self._cache_valid:
-            self._loc_cache, self._tree_cache = self._load_all_from_db()
+            self._load_rows(self._layout_rows())
             self._cache_valid = True
 
-    def _load_all_from_db(self) -> Tuple[Dict[str, Location], Dict[str, Dict]]:
+    def _ensure_ids(self, loc_ids: List[str]):
+        """Make sure every existing location in *loc_ids* is cached."""
+        if self._cache_valid:
+            return
+        if self._lazy_level is None:
+            self._ensure_cache()
+            return
+        missing = [loc_id for loc_id in loc_ids if loc_id not in self._loc_cache]
+        if missing:
+            self._load_partitions_of(missing)
+
+    def _load_partitions_of(self, loc_ids: List[str]):
+        col = loc_table.c[self._lazy_level]
+        with self._session_factory() as sess:
+            values = set(sess.execute(
+                select(col).distinct().where(and_(
+                    loc_table.c.id.in_(loc_ids),
+                    loc_table.c.layout_id == self._layout_id,
+                ))
+            ).scalars())
+        if not values:
+            return
+        named = [v for v in values if v is not None]
+        conds = ([col.in_(named)] if named else []) + ([col.is_(None)] if None in values else [])
+        self._load_rows(self._layout_rows().where(or_(*conds)))
+
+    def _layout_rows(self):
+        # Only the columns a cached location needs: each UUID or timestamp left out
+        # is one less conversion per row on a cold load
+        return (
+            select(
+                loc_table.c.id, loc_table.c.x, loc_table.c.y, loc_table.c.z,
+                loc_table.c.dim_x, loc_table.c.dim_y, loc_table.c.dim_z,
+                loc_table.c.delete_on_receive, loc_table.c.channel_id,
+                *(loc_table.c[col] for col in _TREE_LABEL_COLS), loc_table.c.extra_labels,
+                chan_table.c.processor_type, chan_table.c.capacity, chan_table.c.channel_axis, chan_table.c.slots,
+            )
+            .join(chan_table, loc_table.c.channel_id == chan_table.c.id)
+            .where(loc_table.c.layout_id == self._layout_id)
+        )
+
+    def _load_rows(self, stmt):
+        """Stream *stmt*'s rows into the cache, building each location and its tree
+        labels in the same pass.  Locations already cached are kept as they are."""
+        loc_cache, tree_cache, channel_ids = self._loc_cache, self._tree_cache, self._channel_ids
+        with self._session_factory() as sess:
+            if self._synced_at is None:
+                self._synced_at = sess.execute(select(func.current_timestamp())).scalar()
+            for row in sess.execute(stmt.execution_options(yield_per=_LOAD_CHUNK)):
+                loc_id = row.id
+                if loc_id in loc_cache:
+                    continue
+                loc_cache[loc_id] = self._row_to_location(row)
+                tree_cache[loc_id] = self._row_to_tree_labels(row)
+                channel_ids[loc_id] = row.channel_id
+
+    def _recache(self, loc_id: str, loc: Location):
+        """Replace a written location in the cache if the cache covers it."""
+        if self._cache_valid or loc_id in self._loc_cache:
+            self._loc_cache[loc_id] = loc
+
+    def _cache_removed(self, loc_ids: Iterable[str]):
+        for loc_id in loc_ids:
+            self._loc_cache.pop(loc_id, None)
+            self._tree_cache.pop(loc_id, None)
+            self._channel_ids.pop(loc_id, None)
+
+    def refresh(self) -> Tuple[List[Location], List[str]]:
+        """
+        Bring the cache up to date with writes made through other stores or
+        processes since the last sync, and return (changed locations, removed ids).
+
+        Only rows whose channels.updated_at is at or after the last sync (less
+        _DELTA_LAG) are read.  Removals leave no row behind, so when the layout's
+        row count disagrees with the cache the location ids alone are read to find
+        them.  Rows this store wrote itself may be returned again.  Loads the whole
+        layout if the cache has not been loaded yet.
+        """
+        if not self._cache_valid:
+            self._ensure_cache()
+            return list(self._loc_cache.values()), []
         with self._session_factory() as sess:
-            stmt = (
-                select(loc_table, chan_table)
-                .join(chan_table, loc_table.c.channel_id == chan_table.c.id)
-                .where(loc_table.c.layout_id == self._layout_id)
+            synced_at = sess.execute(select(func.current_timestamp())).scalar()
+            rows = sess.execute(
+                self._layout_rows().where(chan_table.c.updated_at > self._synced_at - _DELTA_LAG)
+            ).fetchall()
+            changed: List[Location] = []
+            for row in rows:
+                loc = self._row_to_location(row)
+                loc_id = str(loc.Id)
+                self._loc_cache[loc_id] = loc
+                self._tree_cache[loc_id] = self._row_to_tree_labels(row)
+                self._channel_ids[loc_id] = row.channel_id
+                changed.append(loc)
+
+            # The cache now holds every row in the layout, plus any removed elsewhere
+            removed: List[str] = []
+            n_rows = sess.execute(
+                select(func.count()).select_from(loc_table).where(loc_table.c.layout_id == self._layout_id)
+            ).scalar()
+            if n_rows != len(self._loc_cache):
+                live = set(sess.execute(
+                    select(loc_table.c.id).where(loc_table.c.layout_id == self._layout_id)
+                ).scalars())
+                removed = [loc_id for loc_id in self._loc_cache if loc_id not in live]
+                self._cache_removed(removed)
+        self._synced_at = synced_at
+        return changed, removed
+
+    def _resolve_channel_ids(self, sess, loc_ids: Iterable[str]) -> Dict[str, uuid.UUID]:
+        """channels.id of each of *loc_ids* that exists; uncached ids are looked up in one query."""
+        missing = [loc_id for loc_id in loc_ids if loc_id not in self._channel_ids]
+        if missing:
+            rows = sess.execute(
+                select(loc_table.c.id, loc_table.c.channel_id).where(and_(
+                    loc_table.c.id.in_(missing),
+                    loc_table.c.layout_id == self._layout_id,
+                ))
+            ).fetchall()
+            self._channel_ids.update((row.id, row.channel_id) for row in rows)
+        return {loc_id: self._channel_ids[loc_id] for loc_id in loc_ids if loc_id in self._channel_ids}
+
+    def _update_slots(self, sess, locs: Iterable[Location], channel_ids: Dict[str, uuid.UUID]):
+        """One executemany UPDATE of channels.slots for every location in *channel_ids*."""
+        params = [{'b_channel_id': channel_ids[str(loc.Id)], 'b_slots': loc.Slots}
+                  for loc in locs if str(loc.Id) in channel_ids]
+        if params:
+            sess.execute(
+                update(chan_table)
+                .where(chan_table.c.id == bindparam('b_channel_id'))
+                .values(slots=bindparam('b_slots'), updated_at=sa_text('CURRENT_TIMESTAMP')),
+                params,
             )
-            rows = sess.execute(stmt).fetchall()
-        locs: Dict[str, Location] = {}
-        trees: Dict[str, Dict] = {}
-        for row in rows:
-            loc = self._row_to_location(row)
-            locs[str(loc.Id)] = loc
-            trees[str(loc.Id)] = self._row_to_tree_labels(row)
-        return locs, trees
+
+    def _write_slots(self, locs: List[Location]):
+        if not locs:
+            return
+        with self._session_factory() as sess:
+            channel_ids = self._resolve_channel_ids(sess, [str(loc.Id) for loc in locs])
+            for loc in locs:
+                if str(loc.Id) not in channel_ids:
+                    logger.warning(
+                        "update: location %s not found in layout %s — skipping",
+                        loc.Id, self._layout_id,
+                    )
+            self._update_slots(sess, locs, channel_ids)
+
+    @contextmanager
+    def batched_writes(self):
+        """Hold this thread's slot updates and write them in one transaction when the
+        outermost block exits (also on error, as the cache already reflects them)."""
+        if getattr(self._batch, 'pending', None) is not None:
+            yield
+            return
+        self._batch.pending = {}
+        try:
+            yield
+        finally:
+            pending, self._batch.pending = self._batch.pending, None
+            self._write_slots(list(pending.values()))
+
+    def _insert_rows(self, sess, locs: List[Location], tree_labels: Dict[str, Dict]) -> Dict[str, uuid.UUID]:
+        """Bulk INSERTs of the channel and location rows of *locs*, tree labels included,
+        _INSERT_CHUNK locations per executemany.  Returns the new channel ids."""
+        channel_ids: Dict[str, uuid.UUID] = {}
+        for start in range(0, len(locs), _INSERT_CHUNK):
+            loc_rows, chan_rows = [], []
+            for loc in locs[start:start + _INSERT_CHUNK]:
+                loc_row, chan_row = self._location_to_rows(loc, tree_labels=tree_labels.get(str(loc.Id)))
+                loc_rows.append(loc_row)
+                chan_rows.append(chan_row)
+                channel_ids[loc_row['id']] = chan_row['id']
+            sess.execute(insert(chan_table), chan_rows)
+            sess.execute(insert(loc_table), loc_rows)
+        return channel_ids
+
+    def _cache_added(self, locs: List[Location], tree_labels: Dict[str, Dict], channel_ids: Dict[str, uuid.UUID]):
+        self._channel_ids.update(channel_ids)
+        if self._cache_valid:
+            for loc in locs:
+                loc_id = str(loc.Id)
+                self._loc_cache[loc_id] = loc
+                self._tree_cache[loc_id] = dict(tree_labels.get(loc_id) or {})
 
     # ── Row ↔ domain conversion ───────────────────────────────────────────────
 
@@ -75,13 +274,17 @@ class SqlLocationDataStore:
         for i, cid in enumerate(row.slots or []):
             if cid is not None:
                 channel_state[i] = cid
-        meta = dcs.LocationMeta(
-            dims=(row.dim_x, row.dim_y, row.dim_z),
-            channel_processor=row.processor_type,
-            capacity=row.capacity,
-            channel_axis=row.channel_axis,
-            delete_on_receive=row.delete_on_receive,
-        )
+        key = (row.dim_x, row.dim_y, row.dim_z, row.processor_type,
+               row.capacity, row.channel_axis, row.delete_on_receive)
+        meta = _ROW_METAS.get(key)
+        if meta is None:
+            meta = _ROW_METAS.setdefault(key, dcs.LOCATION_METAS.intern(dcs.LocationMeta(
+                dims=key[:3],
+                channel_processor=row.processor_type,
+                capacity=row.capacity,
+                channel_axis=row.channel_axis,
+                delete_on_receive=row.delete_on_receive,
+            )))
         return Location(
             id=row.id,
             location_meta=meta,
@@ -100,7 +303,15 @@ class SqlLocationDataStore:
         labels.update(extra)
         return labels
 
-    def _location_to_rows(self, loc: Location, existing_channel_id=None) -> Tuple[dict, dict]:
+    @staticmethod
+    def _split_tree_labels(tree_labels: Dict) -> Tuple[Dict, Optional[Dict]]:
+        """(standard column values, extra_labels) for *tree_labels*."""
+        std_keys = set(_TREE_LABEL_COLS)
+        standard = {k: v for k, v in tree_labels.items() if k in std_keys}
+        extra = {k: v for k, v in tree_labels.items() if k not in std_keys} or None
+        return standard, extra
+
+    def _location_to_rows(self, loc: Location, existing_channel_id=None, tree_labels: Dict = None) -> Tuple[dict, dict]:
         channel_id = existing_channel_id if existing_channel_id is not None else uuid.uuid4()
         channel_row = {
             'id': channel_id,
@@ -117,94 +328,72 @@ class SqlLocationDataStore:
             'delete_on_receive': loc.Meta.delete_on_receive,
             'channel_id': channel_id,
         }
+        # Every row carries every label column so rows can share one compiled INSERT
+        standard, extra = self._split_tree_labels(tree_labels or {})
+        for col in _TREE_LABEL_COLS:
+            loc_row[col] = standard.get(col)
+        loc_row['extra_labels'] = extra
         return loc_row, channel_row
 
     # ── DataStoreProtocol ─────────────────────────────────────────────────────
 
-    def add(self, items: Iterable[Location]) -> 'SqlLocationDataStore':
+    def add(self, items: Iterable[Location], tree_labels: Dict[str, Dict] = None) -> 'SqlLocationDataStore':
+        """
+        Bulk-inserts *items* in one transaction.  *tree_labels* (loc id -> labels)
+        are written with the rows, so no per-location upsert_tree_labels is needed.
+        """
         items_list = list(items)
         if not items_list:
             return self
+        tree_labels = tree_labels or {}
         try:
             with self._session_factory() as sess:
-                for loc in items_list:
-                    loc_row, chan_row = self._location_to_rows(loc)
-                    sess.execute(insert(chan_table).values(**chan_row))
-                    sess.execute(insert(loc_table).values(**loc_row))
+                channel_ids = self._insert_rows(sess, items_list, tree_labels)
         except IntegrityError as exc:
             raise DuplicateRecordException(
                 f"One or more locations already exist in layout {self._layout_id}"
             ) from exc
-        self._invalidate_cache()
+        self._cache_added(items_list, tree_labels, channel_ids)
         return self
 
     def update(self, items: Iterable[Location]) -> 'SqlLocationDataStore':
         """
         On the transfer hot-path only channel slots change; loc_table rows are
-        static.  Updates only channels.slots and does a targeted in-place cache
-        refresh instead of a full reload.
+        static.  Updates only channels.slots, in one executemany (deferred to the
+        end of an enclosing batched_writes block), and does a targeted in-place
+        cache refresh instead of a full reload.
         """
         items_list = list(items)
         if not items_list:
             return self
-        with self._session_factory() as sess:
+        pending = getattr(self._batch, 'pending', None)
+        if pending is not None:
             for loc in items_list:
-                row = sess.execute(
-                    select(loc_table.c.channel_id).where(and_(
-                        loc_table.c.id == str(loc.Id),
-                        loc_table.c.layout_id == self._layout_id,
-                    ))
-                ).fetchone()
-                if row is None:
-                    logger.warning(
-                        "update: location %s not found in layout %s — skipping",
-                        loc.Id, self._layout_id,
-                    )
-                    continue
-                sess.execute(
-                    update(chan_table)
-                    .where(chan_table.c.id == row.channel_id)
-                    .values(slots=loc.Slots, updated_at=sa_text('CURRENT_TIMESTAMP'))
-                )
-        if self._cache_valid:
-            for loc in items_list:
-                self._loc_cache[str(loc.Id)] = loc
+                pending[str(loc.Id)] = loc
+        else:
+            self._write_slots(items_list)
+        for loc in items_list:
+            self._recache(str(loc.Id), loc)
         return self
 
     def add_or_update(self, items: Iterable[Location]) -> 'SqlLocationDataStore':
         items_list = list(items)
         if not items_list:
             return self
-        inserted_any = False
+        latest = {str(loc.Id): loc for loc in items_list}
         try:
             with self._session_factory() as sess:
-                for loc in items_list:
-                    row = sess.execute(
-                        select(loc_table.c.channel_id).where(and_(
-                            loc_table.c.id == str(loc.Id),
-                            loc_table.c.layout_id == self._layout_id,
-                        ))
-                    ).fetchone()
-                    if row is not None:
-                        sess.execute(
-                            update(chan_table)
-                            .where(chan_table.c.id == row.channel_id)
-                            .values(slots=loc.Slots, updated_at=sa_text('CURRENT_TIMESTAMP'))
-                        )
-                    else:
-                        loc_row, chan_row = self._location_to_rows(loc)
-                        sess.execute(insert(chan_table).values(**chan_row))
-                        sess.execute(insert(loc_table).values(**loc_row))
-                        inserted_any = True
+                channel_ids = self._resolve_channel_ids(sess, list(latest))
+                self._update_slots(sess, latest.values(), channel_ids)
+                new = [loc for loc_id, loc in latest.items() if loc_id not in channel_ids]
+                new_channel_ids = self._insert_rows(sess, new, {})
         except IntegrityError as exc:
             raise DuplicateRecordException(
                 f"One or more locations already exist in layout {self._layout_id}"
             ) from exc
-        if inserted_any:
-            self._invalidate_cache()
-        elif self._cache_valid:
-            for loc in items_list:
-                self._loc_cache[str(loc.Id)] = loc
+        self._cache_added(new, {}, new_channel_ids)
+        for loc_id, loc in latest.items():
+            self._recache(loc_id, loc)
         return self
 
     def remove(
@@ -221,12 +410,7 @@ class SqlLocationDataStore:
         if not target_ids:
             return self
         with self._session_factory() as sess:
-            chan_ids = sess.execute(
-                select(loc_table.c.channel_id).where(and_(
-                    loc_table.c.id.in_(target_ids),
-                    loc_table.c.layout_id == self._layout_id,
-                ))
-            ).scalars().all()
+            chan_ids = self._resolve_channel_ids(sess, target_ids).values()
             sess.execute(
                 delete(loc_table).where(and_(
                     loc_table.c.id.in_(target_ids),
@@ -235,7 +419,7 @@ class SqlLocationDataStore:
             )
             if chan_ids:
                 sess.execute(delete(chan_table).where(chan_table.c.id.in_(list(chan_ids))))
-        self._invalidate_cache()
+        self._cache_removed(target_ids)
         return self
 
     def get(
@@ -246,12 +430,20 @@ class SqlLocationDataStore:
         query: Dict = None,
         id_query: PatternMatchQualifier = None,
     ) -> Dict[UniqueIdentifier, Location]:
-        self._ensure_cache()
-        result: Dict[str, Location] = dict(self._loc_cache)
-
         if ids is not None:
-            id_set = {str(i) for i in ids}
-            result = {k: v for k, v in result.items() if str(k) in id_set}
+            if not self._cache_valid:
+                ids = [str(i) for i in ids]
+                self._ensure_ids(ids)
+            # Direct lookups: the transfer path fetches one or two locations at a time
+            cache = self._loc_cache
+            result: Dict[str, Location] = {}
+            for i in ids:
+                loc = cache.get(str(i))
+                if loc is not None:
+                    result[str(i)] = loc
+        else:
+            self._ensure_cache()
+            result = dict(self._loc_cache)
 
         if id_query is not None:
             qual = id_query.qualify(list(result.keys()))
@@ -267,6 +459,11 @@ class SqlLocationDataStore:
         return list(self._loc_cache.values())
 
     def count(self) -> int:
+        if not self._cache_valid and self._lazy_level is not None:
+            with self._session_factory() as sess:
+                return sess.execute(
+                    select(func.count()).select_from(loc_table).where(loc_table.c.layout_id == self._layout_id)
+                ).scalar()
         self._ensure_cache()
         return len(self._loc_cache)
 
@@ -280,24 +477,45 @@ class SqlLocationDataStore:
             sess.execute(delete(loc_table).where(loc_table.c.layout_id == self._layout_id))
             if chan_ids:
                 sess.execute(delete(chan_table).where(chan_table.c.id.in_(list(chan_ids))))
-        self._invalidate_cache()
+            if self._synced_at is None:
+                self._synced_at = sess.execute(select(func.current_timestamp())).scalar()
+        # The layout is now known to be empty
+        self._loc_cache.clear()
+        self._tree_cache.clear()
+        self._channel_ids.clear()
+        self._cache_valid = True
         return self
 
     def __contains__(self, item) -> bool:
-        self._ensure_cache()
         item_id = str(item.Id) if hasattr(item, 'Id') else str(item)
+        self._ensure_ids([item_id])
         return item_id in self._loc_cache
 
     # ── Tree-label helpers ────────────────────────────────────────────────────
 
     def get_tree_labels(self, loc_id: str) -> Dict:
-        self._ensure_cache()
+        self._ensure_ids([str(loc_id)])
         return dict(self._tree_cache.get(str(loc_id), {}))
 
+    def iter_tree_labels(self) -> Iterator[Tuple[str, Dict]]:
+        """(loc id, labels) for every location, without copying the label dicts;
+        callers must not mutate them.  With lazy_level set and the layout not yet
+        loaded, streams the label columns alone instead of loading locations."""
+        if self._cache_valid or self._lazy_level is None:
+            self._ensure_cache()
+            yield from self._tree_cache.items()
+            return
+        stmt = (
+            select(loc_table.c.id, *(loc_table.c[col] for col in _TREE_LABEL_COLS), loc_table.c.extra_labels)
+            .where(loc_table.c.layout_id == self._layout_id)
+            .execution_options(yield_per=_LOAD_CHUNK)
+        )
+        with self._session_factory() as sess:
+            for row in sess.execute(stmt):
+                yield row.id, self._tree_cache.get(row.id) or self._row_to_tree_labels(row)
+
     def upsert_tree_labels(self, loc_id: str, tree_labels: Dict):
-        std_keys = set(_TREE_LABEL_COLS)
-        standard = {k: v for k, v in tree_labels.items() if k in std_keys}
-        extra = {k: v for k, v in tree_labels.items() if k not in std_keys} or None
+        standard, extra = self._split_tree_labels(tree_labels)
 
         vals = {**standard}
         if extra is not None:
@@ -312,5 +530,13 @@ class SqlLocationDataStore:
                 ))
                 .values(**vals)
             )
-        if self._cache_valid:
+            # Stamp the channel so other stores' refresh() picks up the new labels
+            channel_id = self._resolve_channel_ids(sess, [str(loc_id)]).get(str(loc_id))
+            if channel_id is not None:
+                sess.execute(
+                    update(chan_table)
+                    .where(chan_table.c.id == channel_id)
+                    .values(updated_at=sa_text('CURRENT_TIMESTAMP'))
+                )
+        if self._cache_valid or str(loc_id) in self._loc_cache:
             self._tree_cache[str(loc_id)] = dict(tree_labels)
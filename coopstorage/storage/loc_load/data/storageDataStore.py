@@ -1,12 +1,20 @@
 from cooptools.dataStore.inMemoryDataStore import InMemoryDataStore
 from cooptools.dataStore.dataStoreProtocol import DataStoreProtocol
 import coopstorage.storage.loc_load.qualifiers as qs
-from typing import Self, List, Iterable, Dict, Optional
+from typing import Self, List, Iterable, Iterator, Dict, Optional, Tuple
+import contextlib
+import itertools
 from coopstorage.storage.loc_load import dcs
 from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.compact_channel import SlotArena
 from coopstorage.storage.loc_load.transferRequest import TransferRequest
+from coopstorage.storage.loc_load.data.location_indexes import ContainerLocationIndex, LocationCapacityIndex, LocationArrays, LocationGridIndex
+from coopstorage.storage.loc_load.data.location_snapshots import LocationsSnapshot, LocationSnapshotPublisher
 from cooptools.protocols import UniqueIdentifier
 
+# Candidate ids from the capacity index are resolved against the backing store in chunks of this size
+_CANDIDATE_CHUNK = 64
+
 class ContainerDataStore:
     def __init__(self,
                  data_store: DataStoreProtocol):
@@ -39,8 +47,109 @@ class ContainerDataStore:
 
 class LocationDataStore:
     def __init__(self,
-                 data_store: DataStoreProtocol):
+                 data_store: DataStoreProtocol,
+                 arena: SlotArena = None):
         self._data_store = data_store
+        # When set, locations are switched to CompactChannel state as they are added
+        self._arena = arena
+        # Built lazily so pre-populated (e.g. SQL) backends are indexed on first use
+        self._container_index: Optional[ContainerLocationIndex] = None
+        self._capacity_index: Optional[LocationCapacityIndex] = None
+        self._arrays: Optional[LocationArrays] = None
+        self._spatial_index: Optional[LocationGridIndex] = None
+        self._snapshots = LocationSnapshotPublisher()
+
+    @property
+    def ContainerIndex(self) -> ContainerLocationIndex:
+        if self._container_index is None:
+            self._container_index = ContainerLocationIndex().index(self._data_store.iter_values())
+        return self._container_index
+
+    @property
+    def CapacityIndex(self) -> LocationCapacityIndex:
+        if self._capacity_index is None:
+            self._capacity_index = LocationCapacityIndex().index(self._data_store.iter_values())
+        return self._capacity_index
+
+    @property
+    def Arrays(self) -> LocationArrays:
+        if self._arrays is None:
+            self._arrays = LocationArrays().index(self._data_store.iter_values())
+        return self._arrays
+
+    @property
+    def Arena(self) -> Optional[SlotArena]:
+        return self._arena
+
+    def _compact(self, locs: List[Location]):
+        if self._arena is not None:
+            for loc in locs:
+                loc.compact(self._arena)
+
+    @property
+    def SpatialIndex(self) -> LocationGridIndex:
+        if self._spatial_index is None:
+            self._spatial_index = LocationGridIndex().index(self._data_store.iter_values())
+        return self._spatial_index
+
+    def reindex(self, locs: Iterable[Location] = None) -> Self:
+        """Refresh the secondary indexes for *locs*, or rebuild them from scratch if None.
+
+        Needed after mutating Location objects in place without going through update().
+        """
+        if locs is None:
+            self._container_index = None
+            self._capacity_index = None
+            self._arrays = None
+            self._spatial_index = None
+            self._snapshots.reset()
+            return self
+        self._index(list(locs))
+        return self
+
+    def _index(self, locs: List[Location]):
+        self._snapshots.touch(locs)
+        if self._container_index is not None:
+            self._container_index.index(locs)
+        if self._capacity_index is not None:
+            self._capacity_index.index(locs)
+        if self._arrays is not None:
+            self._arrays.index(locs)
+        if self._spatial_index is not None:
+            self._spatial_index.index(locs)
+
+    @property
+    def SnapshotVersion(self) -> int:
+        return self._snapshots.Version
+
+    @property
+    def PublishedSnapshot(self) -> LocationsSnapshot:
+        """Last published snapshot, without folding in pending changes."""
+        return self._snapshots.Published
+
+    def snapshot(self) -> LocationsSnapshot:
+        """Snapshot at the current version. Callers must exclude concurrent writers."""
+        return self._snapshots.publish(self._data_store.iter_values)
+
+    def refresh_snapshot(self, max_age: float) -> LocationsSnapshot:
+        """Publish pending changes if the published snapshot is *max_age* seconds old.
+        Callers must exclude concurrent writers."""
+        return self._snapshots.publish_if_older(self._data_store.iter_values, max_age)
+
+    def iter_candidates(self,
+                        qualifier: qs.LocationQualifier = None,
+                        emptiest_first: bool = False) -> Iterator[Location]:
+        """Locations that may satisfy *qualifier*, narrowed by the capacity index where possible.
+
+        Callers must still apply the qualifier (``compile`` or ``check_if_qualifies``) to each result.
+        """
+        candidate_ids = self.CapacityIndex.candidate_ids(qualifier, emptiest_first=emptiest_first)
+        if candidate_ids is None:
+            yield from self._data_store.iter_values()
+            return
+
+        while chunk := list(itertools.islice(candidate_ids, _CANDIDATE_CHUNK)):
+            yield from self._data_store.get(ids=chunk).values()
 
     def get(self,
             qualifier: qs.LocationQualifier = None,
@@ -51,32 +160,87 @@ class LocationDataStore:
         if ids is not None:
             return self._data_store.get(ids=ids)
 
-        ret = self._data_store.get(id_query=qualifier.id_pattern if qualifier is not None else None)
-        if qualifier is not None:
-            ret = {k: v for k, v in ret.items() if qualifier.check_if_qualifies(
-                v, container_provider=container_provider,
-                is_reserved=is_reserved, is_container_reserved=is_container_reserved)}
-        return ret
+        if qualifier is None:
+            return self._data_store.get()
+
+        qualifies = qualifier.compile(container_provider=container_provider,
+                                      is_reserved=is_reserved, is_container_reserved=is_container_reserved)
+        if LocationCapacityIndex.is_applicable(qualifier):
+            return {loc.Id: loc for loc in self.iter_candidates(qualifier) if qualifies(loc)}
+
+        ret = self._data_store.get(id_query=qualifier.id_pattern)
+        return {k: v for k, v in ret.items() if qualifies(v)}
 
     def clear(self) -> Self:
         self._data_store.clear()
+        self._container_index = ContainerLocationIndex()
+        self._capacity_index = LocationCapacityIndex()
+        self._arrays = LocationArrays()
+        self._spatial_index = LocationGridIndex()
+        self._snapshots.reset()
         return self
 
     def iter_values(self) -> Iterable[Location]:
         return self._data_store.iter_values()
 
-    def add(self, locs: Iterable[Location]):
-        self._data_store.add(locs)
+    def add(self, locs: Iterable[Location], tree_labels: Dict[UniqueIdentifier, Dict] = None):
+        """*tree_labels* (loc id -> labels) are persisted with the locations by
+        backends that support tree labels and ignored otherwise."""
+        locs = list(locs)
+        self._compact(locs)
+        if tree_labels and self.supports_tree_labels:
+            self._data_store.add(locs, tree_labels={str(k): v for k, v in tree_labels.items()})
+        else:
+            self._data_store.add(locs)
+        self._index(locs)
         return self
 
     def update(self, locs: Iterable[Location]):
+        locs = list(locs)
+        self._compact(locs)
         self._data_store.update(locs)
+        self._index(locs)
         return self
 
     def remove(self, locs: Iterable[Location] = None, ids: Iterable[UniqueIdentifier] = None):
+        locs = list(locs) if locs is not None else None
+        ids = list(ids) if ids is not None else None
         self._data_store.remove(locs, ids=ids)
+        self._drop([loc.Id for loc in locs or []] + (ids or []))
         return self
 
+    def _drop(self, dropped: List[UniqueIdentifier]):
+        if self._container_index is not None:
+            self._container_index.drop(dropped)
+        if self._capacity_index is not None:
+            self._capacity_index.drop(dropped)
+        if self._arrays is not None:
+            self._arrays.drop(dropped)
+        if self._spatial_index is not None:
+            self._spatial_index.drop(dropped)
+        self._snapshots.drop(dropped)
+
+    def refresh(self) -> Tuple[List[Location], List[UniqueIdentifier]]:
+        """Pull in locations changed or removed in the backend by other processes since
+        the last sync, re-index them, and return (changed locations, removed ids).
+        A no-op for backends without a delta refresh."""
+        if not hasattr(self._data_store, 'refresh'):
+            return [], []
+        changed, removed = self._data_store.refresh()
+        if removed:
+            self._drop(removed)
+        if changed:
+            self._compact(changed)
+            self._index(changed)
+        return changed, removed
+
+    def batched_writes(self):
+        """Context in which the backend may defer location updates and write them
+        together on exit (a no-op for backends that write in place)."""
+        if hasattr(self._data_store, 'batched_writes'):
+            return self._data_store.batched_writes()
+        return contextlib.nullcontext()
+
     @property
     def supports_tree_labels(self) -> bool:
         return hasattr(self._data_store, 'get_tree_labels')
@@ -86,6 +250,16 @@ class LocationDataStore:
             return {}
         return self._data_store.get_tree_labels(loc_id)
 
+    def iter_tree_labels(self) -> Iterator[Tuple[UniqueIdentifier, Dict]]:
+        """(loc id, labels) for every location; the dicts may be shared, so don't mutate them."""
+        if not self.supports_tree_labels:
+            return
+        if hasattr(self._data_store, 'iter_tree_labels'):
+            yield from self._data_store.iter_tree_labels()
+            return
+        for loc_id in self._data_store.get().keys():
+            yield loc_id, self._data_store.get_tree_labels(loc_id)
+
     def upsert_tree_labels(self, loc_id: UniqueIdentifier, tree_labels: Dict) -> None:
         if self.supports_tree_labels:
             self._data_store.upsert_tree_labels(loc_id, tree_labels)
@@ -116,11 +290,13 @@ class StorageDataStore:
     def __init__(self,
                  containers_data_store: DataStoreProtocol = None,
                  location_data_store: DataStoreProtocol = None,
-                 transfer_request_data_store: DataStoreProtocol = None
+                 transfer_request_data_store: DataStoreProtocol = None,
+                 compact_channels: bool = False
                  ):
         self._containers_data_store: ContainerDataStore = ContainerDataStore(data_store=containers_data_store or InMemoryDataStore())
         self._locs_data_store: LocationDataStore = LocationDataStore(
-            data_store=location_data_store or InMemoryDataStore())
+            data_store=location_data_store or InMemoryDataStore(),
+            arena=SlotArena() if compact_channels else None)
         self._transfer_requests_data_store: TransferRequestDataStore = TransferRequestDataStore(
             data_store=transfer_request_data_store or InMemoryDataStore())
 
@@ -1,6 +1,6 @@
 from cooptools.geometry_utils.vector_utils import FloatVec, IterVec
 from dataclasses import dataclass, field, asdict
-from typing import Dict, Optional, List, Union, Tuple, Iterable, Self
+from typing import Dict, Generic, Optional, List, TypeVar, Union, Tuple, Iterable, Self
 import uuid
 from cooptools.geometry_utils import vector_utils as vec
 import coopstorage.storage.loc_load.channel_processors as cps
@@ -8,6 +8,29 @@ from cooptools.protocols import UniqueIdentifier
 from cooptools.coopDataclass import BaseDataClass, BaseIdentifiedDataClass
 from cooptools.qualifiers import WhiteBlackListQualifier
 
+T = TypeVar('T')
+
+
+class InternPool(Generic[T]):
+    """Flyweight pool: hands out one shared instance per distinct (equal) value.
+    Unhashable values are returned as given."""
+    __slots__ = ('_pool',)
+
+    def __init__(self):
+        self._pool: Dict[T, T] = {}
+
+    def intern(self, obj: T) -> T:
+        try:
+            return self._pool.setdefault(obj, obj)
+        except TypeError:
+            return obj
+
+    def clear(self):
+        self._pool.clear()
+
+    def __len__(self):
+        return len(self._pool)
+
 
 @dataclass(frozen=True, slots=True, kw_only=True)
 class Resource(BaseIdentifiedDataClass):
@@ -21,6 +44,36 @@ class UnitOfMeasure(BaseIdentifiedDataClass):
     dimensions: vec.FloatVec = field(default_factory=lambda: vec.homogeneous_vector(3, 1))
 
 
+# ── flyweight pools ───────────────────────────────────────────────────────────
+# Resource and UnitOfMeasure compare by their random id, so two separately built
+# instances never match; they are shared by name instead. LocationMeta is interned
+# by value (LOCATION_METAS).
+
+# frozenset() is a new 216-byte object on every call; share one
+_EMPTY: frozenset = frozenset()
+
+_NAMED_UOMS: Dict[tuple, UnitOfMeasure] = {}
+_NAMED_RESOURCES: Dict[tuple, Resource] = {}
+
+
+def unit_of_measure(name: str, dimensions: vec.FloatVec = (1, 1, 1)) -> UnitOfMeasure:
+    """The shared UnitOfMeasure called *name* with *dimensions*, created on first use."""
+    key = (name, tuple(dimensions))
+    uom = _NAMED_UOMS.get(key)
+    if uom is None:
+        uom = _NAMED_UOMS.setdefault(key, UnitOfMeasure(name=name, dimensions=key[1]))
+    return uom
+
+
+def resource(name: str, description: str = None) -> Resource:
+    """The shared Resource called *name*, created on first use."""
+    key = (name, description)
+    res = _NAMED_RESOURCES.get(key)
+    if res is None:
+        res = _NAMED_RESOURCES.setdefault(key, Resource(name=name, description=description))
+    return res
+
+
 @dataclass(frozen=True, slots=True, kw_only=True)
 class UoMCapacity(BaseDataClass):
     uom: UnitOfMeasure
@@ -40,12 +93,15 @@ class ContainerContent(BaseIdentifiedDataClass):
 
 @dataclass(frozen=True, slots=True, kw_only=True)
 class Container(BaseIdentifiedDataClass):
-    uom: UnitOfMeasure = field(default_factory=lambda: UnitOfMeasure(name='EA'))
+    uom: UnitOfMeasure = field(default_factory=lambda: unit_of_measure('EA'))
     weight: float = None
-    contents: frozenset[ContainerContent] = field(default_factory=frozenset)
-    uom_capacities: frozenset[UoMCapacity] = field(default_factory=frozenset)
+    contents: frozenset[ContainerContent] = _EMPTY
+    uom_capacities: frozenset[UoMCapacity] = _EMPTY
     resource_qualifier: Optional[WhiteBlackListQualifier] = field(default=None, hash=False)
     uom_qualifier: Optional[WhiteBlackListQualifier] = field(default=None, hash=False)
+    # Expected time until retrieval (any consistent unit); lower means needed sooner, so
+    # priorities can be expressed as a rank. Used by evaluators.fewest_future_unblocks.
+    expected_dwell: Optional[float] = None
 
     @property
     def ResourceTypes(self) -> Dict[Resource, float]:
@@ -58,7 +114,7 @@ class Container(BaseIdentifiedDataClass):
 @dataclass(frozen=True, slots=True, kw_only=True)
 class LoadPosition(BaseIdentifiedDataClass):
     loc_offset: FloatVec
-    uom_capacities: frozenset[UoMCapacity] = field(default_factory=frozenset)
+    uom_capacities: frozenset[UoMCapacity] = _EMPTY
     is_controlled: bool = True
     boundary: IterVec = field(default_factory=list)
 
@@ -82,6 +138,9 @@ class LocationMeta(BaseDataClass):
         ret.update({'channel_processor': type(self.channel_processor).__name__})
         return ret
 
+
+LOCATION_METAS: InternPool[LocationMeta] = InternPool()
+
 if __name__ == "__main__":
     from pprint import pprint
 
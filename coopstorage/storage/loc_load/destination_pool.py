@@ -0,0 +1,92 @@
+"""
+Best-first destination queue shared by the putaways of one transfer batch.
+
+Storage.handle_transfer_request_batch builds one DestinationPool per distinct
+destination filter, so the layout is scanned and scored once per batch rather than
+once per container.
+"""
+import heapq
+import itertools
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import coopstorage.storage.loc_load.dcs as dcs
+import coopstorage.storage.loc_load.qualifiers as qs
+from coopstorage.storage.loc_load.location import Location
+from cooptools.protocols import UniqueIdentifier
+
+
+class DestinationPool:
+    """Qualifying locations for one filter, ordered by evaluator score.
+
+    Ties (and every location, when there is no evaluator) go to the location that
+    ranks first under *rank* (registration order; see LocationCapacityIndex.rank),
+    so without an evaluator the pool fills first-fit, like Storage.select_location.
+
+    An optional *penalty* ranks ahead of the score: a location with a lower penalty
+    is always taken first.
+
+    Locations are looked up through *current* at pick time, so the pool always sees
+    the batch's planned state. Call ``offer`` whenever a location's state changes to
+    re-score it; older entries for that location are then ignored.
+    """
+    def __init__(self,
+                 filter: Optional[qs.LocationQualifier],
+                 evaluator: Optional[Callable[[Location], float]],
+                 providers: Dict,
+                 current: Callable[[UniqueIdentifier], Optional[Location]],
+                 penalty: Optional[Callable[[Location], float]] = None,
+                 rank: Optional[Callable[[UniqueIdentifier], float]] = None):
+        self._filter = filter or qs.LocationQualifier()
+        self._evaluator = evaluator
+        self._penalty = penalty
+        self._rank = rank
+        self._providers = providers
+        self._qualifies = self._filter.compile(**providers)
+        self._current = current
+        self._heap: List[Tuple[float, float, float, int, UniqueIdentifier]] = []
+        self._seq = itertools.count()
+        # loc id -> seq of its only valid heap entry
+        self._live: Dict[UniqueIdentifier, int] = {}
+
+    def offer(self, locs: Iterable[Location]) -> 'DestinationPool':
+        for loc in locs:
+            self._live.pop(loc.Id, None)
+            # Planning only ever fills locations, so a full one can be dropped for good
+            if not loc.get_addable_positions() or not self._qualifies(loc):
+                continue
+            penalty = self._penalty(loc) if self._penalty is not None else 0
+            score = self._evaluator(loc) if self._evaluator is not None else 0
+            rank = self._rank(loc.Id) if self._rank is not None else 0
+            seq = next(self._seq)
+            self._live[loc.Id] = seq
+            heapq.heappush(self._heap, (penalty, -score, rank, seq, loc.Id))
+        return self
+
+    def take(self, container: dcs.Container) -> Optional[Location]:
+        """Remove and return the best location *container* fits in, or None.
+
+        Locations that only fail the container-specific checks stay in the pool.
+        """
+        fits = self._filter.compile(container=container, **self._providers)
+        skipped = []
+        try:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                loc_id = entry[4]
+                if self._live.get(loc_id) != entry[3]:
+                    continue
+                loc = self._current(loc_id)
+                if loc is None or not self._qualifies(loc):
+                    del self._live[loc_id]
+                    continue
+                if fits(loc):
+                    del self._live[loc_id]
+                    return loc
+                skipped.append(entry)
+            return None
+        finally:
+            for entry in skipped:
+                heapq.heappush(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._live)
@@ -3,28 +3,145 @@ Standard location evaluators for use with TransferRequestCriteria.dest_loc_evalu
 and Storage.select_location().
 
 An evaluator is a callable ``(Location) -> float`` where higher scores are preferred.
+
+Evaluators may be decorated with ``bounded`` to declare the best score they can
+return; Storage.select_location stops scanning once that score has been seen.
+
+Evaluators may also be decorated with ``vectorized`` to attach a batch form that
+scores many locations at once from the store's LocationArrays; Storage.select_location
+uses it in place of calling the evaluator per candidate.
+
+Evaluators decorated with ``container_aware`` score locations for a particular
+container; Storage binds them to the container being stored before selecting its
+destination.
 """
 import random as rnd
+from typing import Callable, Optional, Protocol
+import numpy as np
+import coopstorage.storage.loc_load.dcs as dcs
 from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.data.location_indexes import LocationArrays
+from coopstorage.storage.loc_load.unblock_planner import RetrievalCostModel
+from cooptools.protocols import UniqueIdentifier
 from cooptools.geometry_utils import vector_utils as vec
 
 
+class BatchEvaluator(Protocol):
+    def __call__(self, arrays: LocationArrays, rows: np.ndarray) -> np.ndarray:
+        """Score the locations at *rows* of *arrays*; one float per row, higher preferred."""
+        ...
+
+
+def bounded(upper_bound: float, emptiest_first: bool = False):
+    """Declare *upper_bound* as the highest score the decorated evaluator can return.
+
+    ``emptiest_first`` hints that the best scores are found at the emptiest
+    locations, so candidates should be scanned in that order.
+    """
+    def wrap(evaluator: Callable[[Location], float]):
+        evaluator.upper_bound = upper_bound
+        evaluator.emptiest_first = emptiest_first
+        return evaluator
+    return wrap
+
+def vectorized(batch: BatchEvaluator):
+    """Attach *batch* as the array form of the decorated evaluator. Both forms must
+    give the same score for the same location."""
+    def wrap(evaluator: Callable[[Location], float]):
+        evaluator.batch = batch
+        return evaluator
+    return wrap
+
+def container_aware(bind: Callable[[dcs.Container], Callable[[Location], float]]):
+    """Attach *bind*, which returns the decorated evaluator specialized to a container."""
+    def wrap(evaluator: Callable[[Location], float]):
+        evaluator.bind = bind
+        return evaluator
+    return wrap
+
+def is_container_aware(evaluator: Optional[Callable[[Location], float]]) -> bool:
+    return getattr(evaluator, 'bind', None) is not None
+
+def bind_container(evaluator: Optional[Callable[[Location], float]],
+                   container: Optional[dcs.Container]) -> Optional[Callable[[Location], float]]:
+    """*evaluator* specialized to *container*, or unchanged if it isn't container-aware."""
+    if container is None or not is_container_aware(evaluator):
+        return evaluator
+    return evaluator.bind(container)
+
+def get_batch(evaluator: Callable[[Location], float]) -> Optional[BatchEvaluator]:
+    return getattr(evaluator, 'batch', None)
+
+def get_upper_bound(evaluator: Callable[[Location], float]) -> Optional[float]:
+    return getattr(evaluator, 'upper_bound', None)
+
+def prefers_emptiest(evaluator: Callable[[Location], float]) -> bool:
+    return getattr(evaluator, 'emptiest_first', False)
+
+def _available_fraction(arrays: LocationArrays, rows: np.ndarray) -> np.ndarray:
+    capacity = arrays.Capacity[rows]
+    available = (capacity - arrays.Occupancy[rows]).astype(float)
+    return np.divide(available, capacity, out=np.zeros(len(rows)), where=capacity > 0)
+
+@bounded(0, emptiest_first=True)
+@vectorized(lambda arrays, rows: -arrays.Occupancy[rows].astype(float))
 def fewest_containers(loc: Location) -> float:
     """Prefer locations with fewer containers, promoting an even spread across all locations."""
     return -len(loc.ContainerIds)
 
+@bounded(1.0, emptiest_first=True)
+@vectorized(_available_fraction)
 def max_available_capacity_percentage(loc: Location) -> float:
     """Prefer locations with more available capacity."""
     return loc.AvailableCapacity / loc.Capacity if loc.Capacity > 0 else 0
 
+@bounded(0.0)
+@vectorized(lambda arrays, rows: -_available_fraction(arrays, rows))
 def least_available_capacity_percentage(loc: Location) -> float:
     """Prefer locations with more available capacity."""
     return -max_available_capacity_percentage(loc)
 
+# Draws from the ``random`` module either way, so seeding it still makes selection repeatable
+@vectorized(lambda arrays, rows: np.array([rnd.random() for _ in range(len(rows))]))
 def random_score(loc: Location) -> float:
     """Assign a random score to each location, for random selection."""
     return rnd.random()
 
 def distance_from(loc: Location, point: tuple[float, float, float]) -> float:
     """Calculate the Euclidean distance from the location to a given point."""
-    return vec.distance_between(loc.Coords, point)
\ No newline at end of file
+    return vec.distance_between(loc.Coords, point)
+
+def closest_to(point: tuple[float, float, float]) -> Callable[[Location], float]:
+    """Evaluator preferring locations nearest *point* (scored by negative distance)."""
+    target = np.asarray(point, dtype=float)
+
+    def _batch(arrays: LocationArrays, rows: np.ndarray) -> np.ndarray:
+        coords = arrays.Coords[rows, :len(target)]
+        return -np.sqrt(((coords - target[:coords.shape[1]]) ** 2).sum(axis=1))
+
+    @vectorized(_batch)
+    def _closest(loc: Location) -> float:
+        return -distance_from(loc, point)
+    return _closest
+
+def fewest_future_unblocks(dwell_of: Callable[[UniqueIdentifier], Optional[float]],
+                           costs: Optional[RetrievalCostModel] = None) -> Callable[[Location], float]:
+    """Evaluator preferring locations where storing the container adds the fewest
+    expected relocation moves for later retrievals (scored by negative moves).
+
+    Uses the location's channel processor, its current contents and expected dwells:
+    *dwell_of* gives the expected dwell of a stored container id (None if unknown),
+    and the stored container's own comes from Container.expected_dwell once bound.
+    Burying a container expected to leave sooner costs a move; burying one expected
+    to leave later costs nothing; unknown dwells count as even odds.
+    """
+    costs = costs if costs is not None else RetrievalCostModel()
+
+    def _for(dwell: Optional[float]) -> Callable[[Location], float]:
+        @bounded(0)
+        def _fewest_future_unblocks(loc: Location) -> float:
+            return -costs.added_moves(loc, dwell, dwell_of)
+        return _fewest_future_unblocks
+
+    evaluator = _for(None)
+    return container_aware(lambda container: _for(container.expected_dwell))(evaluator)
@@ -58,6 +58,8 @@ class StorageEventBus:
         pub.subscribe(self._on_reservation_failed,        StorageTopic.RESERVATION_FAILED.value)
         pub.subscribe(self._on_transfer_request_added,    StorageTopic.TRANSFER_REQUEST_ADDED.value)
         pub.subscribe(self._on_transfer_request_completed, StorageTopic.TRANSFER_REQUEST_COMPLETED.value)
+        pub.subscribe(self._on_reslot_plan,               StorageTopic.RESLOT_PLAN.value)
+        pub.subscribe(self._on_reslot_progress,           StorageTopic.RESLOT_PROGRESS.value)
 
     # ── lifecycle ─────────────────────────────────────────────────────────────
 
@@ -168,3 +170,9 @@ class StorageEventBus:
 
     def _on_transfer_request_completed(self, payload):
         self._emit(StorageEvent('transfer_request_completed', payload))
+
+    def _on_reslot_plan(self, payload):
+        self._emit(StorageEvent('reslot_plan', payload))
+
+    def _on_reslot_progress(self, payload):
+        self._emit(StorageEvent('reslot_progress', payload))
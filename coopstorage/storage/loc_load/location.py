@@ -2,28 +2,111 @@ import logging
 
 import coopstorage.storage.loc_load.dcs as dcs
 from cooptools.protocols import UniqueIdentifier
-from typing import List, Optional, Dict, Iterable, Self
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Iterable, Self, Tuple
 from cooptools.geometry_utils import vector_utils as vec
 from coopstorage.storage.loc_load.channel import Channel
+from coopstorage.storage.loc_load.compact_channel import CompactChannel, SlotArena
+from coopstorage.storage.loc_load import tracing
 
 logger = logging.getLogger(__name__)
+_trace = tracing.tracer(tracing.LOCATION)
+
+
+@dataclass(frozen=True, slots=True)
+class SlotGeometry:
+    """Static slot geometry of a location type: computed once per distinct
+    (dims, capacity, channel_axis) and shared by every location using it."""
+    dims: vec.FloatVec
+    offsets: Tuple[vec.FloatVec, ...]
+    _fits: Dict[vec.FloatVec, bool] = field(default_factory=dict, compare=False, repr=False)
+
+    def fits(self, container_dims: vec.FloatVec) -> bool:
+        """Whether a container of *container_dims* fits in one slot (dims of a different
+        length can't be compared and always fit). Memoised per container dims."""
+        try:
+            return self._fits[container_dims]
+        except KeyError:
+            ret = self._fits[container_dims] = self._check_fits(container_dims)
+            return ret
+        except TypeError:
+            return self._check_fits(container_dims)
+
+    def _check_fits(self, container_dims: vec.FloatVec) -> bool:
+        return len(container_dims) != len(self.dims) or all(c <= s for c, s in zip(container_dims, self.dims))
+
+
+_GEOMETRY: Dict[tuple, SlotGeometry] = {}
+
+
+def slot_geometry(meta: dcs.LocationMeta) -> SlotGeometry:
+    """The shared SlotGeometry of *meta*."""
+    key = (tuple(meta.dims), meta.capacity, meta.channel_axis)
+    geometry = _GEOMETRY.get(key)
+    if geometry is None:
+        dims, capacity, axis = key
+        slot = list(dims)
+        slot[axis] = dims[axis] / capacity
+        offsets = []
+        for i in range(capacity):
+            off = [0.0] * len(dims)
+            off[axis] = i * slot[axis]
+            offsets.append(tuple(off))
+        geometry = _GEOMETRY.setdefault(key, SlotGeometry(dims=tuple(slot), offsets=tuple(offsets)))
+    return geometry
+
+
+def slot_dims(meta: dcs.LocationMeta) -> vec.FloatVec:
+    """3D size of each slot (location dims divided along channel_axis by capacity)."""
+    return slot_geometry(meta).dims
+
+
+def slot_offsets(meta: dcs.LocationMeta) -> Tuple[vec.FloatVec, ...]:
+    """Per-slot offset from the location's coords to that slot's origin corner."""
+    return slot_geometry(meta).offsets
+
 
 class Location:
+    __slots__ = ('_id', '_coords', '_meta', '_channel', '_geometry')
+
     def __init__(self,
                  id: UniqueIdentifier,
                  location_meta: dcs.LocationMeta,
                  coords: vec.FloatVec,
-                 channel_state: Dict[int, UniqueIdentifier] = None):
+                 channel_state: Dict[int, UniqueIdentifier] = None,
+                 arena: SlotArena = None):
         self._id = id
         self._coords: vec.FloatVec = coords
         self._meta = location_meta
-        self._channel: Channel = Channel(
-            processor=location_meta.channel_processor,
-            id=f"{id}_channel",
-            capacity=location_meta.capacity,
+        self._channel: Channel | CompactChannel = self._make_channel(channel_state, arena)
+        self._validate_geometry()
+        self._geometry = slot_geometry(location_meta)
+
+    def _make_channel(self, channel_state: Optional[Dict[int, UniqueIdentifier]], arena: Optional[SlotArena]):
+        if arena is not None:
+            return CompactChannel(
+                processor=self._meta.channel_processor,
+                arena=arena,
+                id=f"{self._id}_channel",
+                capacity=self._meta.capacity,
+                init_state=channel_state
+            )
+        return Channel(
+            processor=self._meta.channel_processor,
+            id=f"{self._id}_channel",
+            capacity=self._meta.capacity,
             init_state=channel_state
         )
-        self._validate_geometry()
+
+    @property
+    def IsCompact(self) -> bool:
+        return isinstance(self._channel, CompactChannel)
+
+    def compact(self, arena: SlotArena) -> Self:
+        """Switch this location to a CompactChannel with its slots in *arena*, keeping its state."""
+        if not self.IsCompact:
+            self._channel = self._make_channel(self._channel.PopulatedIdxs, arena)
+        return self
 
     def _validate_geometry(self):
         dims = self._meta.dims
@@ -37,24 +120,19 @@ class Location:
                 f"Location '{self._id}': all dims must be > 0, got {dims}"
             )
 
+    @property
+    def SlotGeometry(self) -> SlotGeometry:
+        return self._geometry
+
     @property
     def SlotDims(self) -> vec.FloatVec:
         """3D size of each slot (location dims divided along channel_axis by capacity)."""
-        dims = list(self._meta.dims)
-        dims[self._meta.channel_axis] = dims[self._meta.channel_axis] / self.Capacity
-        return tuple(dims)
+        return self._geometry.dims
 
     @property
-    def SlotOffsets(self) -> List[vec.FloatVec]:
+    def SlotOffsets(self) -> Tuple[vec.FloatVec, ...]:
         """Per-slot offset from loc.Coords to that slot's origin corner."""
-        axis   = self._meta.channel_axis
-        step   = self.SlotDims[axis]
-        result = []
-        for i in range(self.Capacity):
-            off = [0.0] * len(self._meta.dims)
-            off[axis] = i * step
-            result.append(tuple(off))
-        return result
+        return self._geometry.offsets
 
     @property
     def Capacity(self) -> int:
@@ -106,15 +184,19 @@ class Location:
         return self._channel.get_removable_ids()
 
     def store_containers(self, container_ids: Iterable[UniqueIdentifier]):
-        logger.info(f"Storing containers {[x for x in container_ids]} in location \'{self._id}\': {str(self._channel)}")
+        """Store *container_ids* in order as one batch; all or none of them are stored."""
+        container_ids = list(container_ids)
         self._channel.store(container_ids)
-        logger.info(f"Done storing containers {[x for x in container_ids]} in location \'{self._id}\': {str(self._channel)}")
+        if _trace.enabled:
+            _trace.emit('stored', location=self._id, ids=container_ids)
         return self
 
     def remove_containers(self, container_ids: Iterable[UniqueIdentifier]):
-        logger.info(f"Removing containers {[x for x in container_ids]} from location \'{self._id}\': {str(self._channel)}")
+        """Remove *container_ids* in order as one batch; all or none of them are removed."""
+        container_ids = list(container_ids)
         self._channel.remove(container_ids)
-        logger.info(f"Done removing containers {[x for x in container_ids]} from location \'{self._id}\': {str(self._channel)}")
+        if _trace.enabled:
+            _trace.emit('removed', location=self._id, ids=container_ids)
         return self
 
     def clear_containers(self):
@@ -132,6 +214,19 @@ class Location:
     def get_id(self) -> UniqueIdentifier:
         return self._id
 
+    def copy(self) -> 'Location':
+        """Detached Location with the same id, meta, coords and channel state.
+
+        Always list-backed, so planning copies never take SlotArena slots.
+        """
+        return Location(id=self._id, location_meta=self._meta, coords=self._coords,
+                        channel_state=self._channel.PopulatedIdxs)
+
+    def freeze(self) -> 'LocationView':
+        """Immutable copy of this location's current channel state."""
+        return LocationView(id=self._id, meta=self._meta, coords=self._coords,
+                            state=tuple(self._channel.State))
+
     @classmethod
     def to_jsonable_dict(cls, obj: Self) -> Dict:
         return {
@@ -145,12 +240,97 @@ class Location:
     def from_jsonable_dict(cls, data: Dict) -> Self:
         return Location(
             id=data['id'],
-            location_meta=dcs.LocationMeta(**data['meta']),
+            location_meta=dcs.LOCATION_METAS.intern(dcs.LocationMeta(**data['meta'])),
             coords=data['coords'],
             channel_state={int(k): v for k, v in data['channel'].items()}
         )
 
 
+
+@dataclass(frozen=True, slots=True)
+class LocationView:
+    """Read-only point-in-time copy of a Location.
+
+    Mirrors Location's read API so serialisers accept either; nothing a writer does
+    to the live Location afterwards is visible through a view.
+    """
+    id: UniqueIdentifier
+    meta: dcs.LocationMeta
+    coords: vec.FloatVec
+    state: Tuple[Optional[UniqueIdentifier], ...]
+
+    @property
+    def Id(self) -> UniqueIdentifier:
+        return self.id
+
+    @property
+    def Meta(self) -> dcs.LocationMeta:
+        return self.meta
+
+    @property
+    def Coords(self) -> vec.FloatVec:
+        return self.coords
+
+    @property
+    def Capacity(self) -> int:
+        return self.meta.capacity
+
+    @property
+    def ContainerIds(self) -> List[UniqueIdentifier]:
+        return [x for x in self.state if x is not None]
+
+    @property
+    def AvailableCapacity(self) -> int:
+        return self.meta.capacity - len(self.ContainerIds)
+
+    @property
+    def ContainerPositions(self) -> Dict[int, UniqueIdentifier]:
+        return {ii: x for ii, x in enumerate(self.state)}
+
+    @property
+    def Slots(self) -> list:
+        return [str(x) if x is not None else None for x in self.state]
+
+    @property
+    def SlotGeometry(self) -> SlotGeometry:
+        return slot_geometry(self.meta)
+
+    @property
+    def SlotDims(self) -> vec.FloatVec:
+        return slot_geometry(self.meta).dims
+
+    @property
+    def SlotOffsets(self) -> Tuple[vec.FloatVec, ...]:
+        return slot_geometry(self.meta).offsets
+
+    def get_addable_positions(self):
+        return self.meta.channel_processor.get_addable_positions(list(self.state))
+
+    def get_removable_positions(self):
+        return self.meta.channel_processor.get_removable_positions(list(self.state))
+
+    def get_removable_container_ids(self) -> Dict[int, UniqueIdentifier]:
+        return self.meta.channel_processor.get_removeable_ids(list(self.state))
+
+    def channel_access_state(self) -> dict:
+        return {
+            'addable_slots':  self.get_addable_positions(),
+            'removable_slots': self.get_removable_positions(),
+        }
+
+    def get_id(self) -> UniqueIdentifier:
+        return self.id
+
+    def to_jsonable_dict(self) -> Dict:
+        """Same shape as Location.to_jsonable_dict."""
+        return {
+            'id': str(self.id),
+            'meta': self.meta.to_jsonable_dict(),
+            'channel': {str(k): v for k, v in enumerate(self.state) if v is not None},
+            'coords': self.coords
+        }
+
+
 if __name__ == "__main__":
     import coopstorage.storage.loc_load.channel_processors as cps
     logging.basicConfig(level=logging.DEBUG)
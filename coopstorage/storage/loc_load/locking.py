@@ -0,0 +1,111 @@
+"""
+Lock primitives backing Storage's STRIPED concurrency mode.
+"""
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List
+
+
+class LockStripes:
+    """A fixed pool of re-entrant locks; each key maps to one stripe.
+
+    ``hold`` acquires every stripe needed for a set of keys in ascending stripe
+    order, so two callers locking overlapping key sets (e.g. a source/dest pair
+    in either direction) can never deadlock against each other.
+    """
+    def __init__(self, n_stripes: int = 64):
+        if n_stripes < 1:
+            raise ValueError(f"n_stripes must be >= 1, got {n_stripes}")
+        self._stripes: List[threading.RLock] = [threading.RLock() for _ in range(n_stripes)]
+
+    def stripe_of(self, key) -> int:
+        # crc32 rather than hash() so stripe assignment is stable across processes
+        return zlib.crc32(str(key).encode()) % len(self._stripes)
+
+    def stripes_for(self, keys: Iterable) -> List[int]:
+        return sorted({self.stripe_of(key) for key in keys})
+
+    @contextmanager
+    def hold(self, keys: Iterable) -> Iterator[List[int]]:
+        idxs = self.stripes_for(keys)
+        acquired = []
+        try:
+            for idx in idxs:
+                self._stripes[idx].acquire()
+                acquired.append(idx)
+            yield idxs
+        finally:
+            for idx in reversed(acquired):
+                self._stripes[idx].release()
+
+    def __len__(self) -> int:
+        return len(self._stripes)
+
+
+class SharedExclusiveLock:
+    """Many shared holders or one exclusive holder.
+
+    Striped transfers run under ``shared()``; whole-storage operations (clear_all,
+    transfers that must unblock other containers) take ``exclusive()``. Both sides
+    are re-entrant, and the exclusive holder may also enter ``shared()``, so code
+    running under it can call back into striped paths. Waiting exclusive callers
+    block new shared entrants so they can't be starved. A thread holding only
+    ``shared()`` must release it before asking for ``exclusive()``.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._shared = 0
+        self._exclusive_waiting = 0
+        self._owner = None
+        self._depth = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self):
+        me = threading.get_ident()
+        held = getattr(self._local, 'shared_depth', 0)
+        with self._cond:
+            counted = self._owner != me and held == 0
+            if counted:
+                while self._owner is not None or self._exclusive_waiting > 0:
+                    self._cond.wait()
+                self._shared += 1
+        self._local.shared_depth = held + 1
+        try:
+            yield
+        finally:
+            self._local.shared_depth = held
+            if counted:
+                with self._cond:
+                    self._shared -= 1
+                    if self._shared == 0:
+                        self._cond.notify_all()
+
+    def held_exclusively(self) -> bool:
+        """True if the calling thread currently holds the exclusive side."""
+        return self._owner == threading.get_ident()
+
+    @contextmanager
+    def exclusive(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner != me:
+                if getattr(self._local, 'shared_depth', 0) > 0:
+                    raise RuntimeError("cannot upgrade a shared hold to exclusive")
+                self._exclusive_waiting += 1
+                try:
+                    while self._owner is not None or self._shared > 0:
+                        self._cond.wait()
+                finally:
+                    self._exclusive_waiting -= 1
+                self._owner = me
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._owner = None
+                    self._cond.notify_all()
@@ -1,6 +1,7 @@
+import re
 from coopstorage.storage.loc_load.location import Location
 import coopstorage.storage.loc_load.dcs as dcs
-from typing import Callable, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from dataclasses import dataclass
 import cooptools.geometry_utils.vector_utils as vec
 from cooptools.qualifiers import PatternMatchQualifier, WhiteBlackListQualifier
@@ -12,6 +13,10 @@ ReservedProvider = Callable[[UniqueIdentifier], bool]
 # Signature: (ids: Iterable[UniqueIdentifier]) -> Dict[UniqueIdentifier, dcs.Container]
 ContainerByIdProvider = Callable[[Iterable[UniqueIdentifier]], Dict[UniqueIdentifier, dcs.Container]]
 
+# A qualifier specialised by compile() into a single-argument check
+LocationPredicate = Callable[[Location], bool]
+ContainerPredicate = Callable[[dcs.Container], bool]
+
 
 def _pattern_qualifies(pattern: PatternMatchQualifier, value: str) -> bool:
     """PatternMatchQualifier.qualify() takes a list and returns a dict of results."""
@@ -30,6 +35,77 @@ def _dims_within_min(dims, min_dims) -> bool:
     return all(dims[ii] >= min_dims[ii] for ii in range(len(min_dims)))
 
 
+def _membership(values: Iterable) -> Any:
+    """A container supporting fast ``in`` checks, falling back to a tuple for unhashable values."""
+    values = list(values)
+    try:
+        return frozenset(values)
+    except TypeError:
+        return tuple(values)
+
+
+def compile_pattern(pattern: PatternMatchQualifier) -> Callable[[str], bool]:
+    """Equivalent of ``_pattern_qualifies(pattern, value)`` with regexes compiled once and
+    white/black lists turned into sets, and without building any result objects."""
+    checks: List[Callable[[str], bool]] = []
+    if pattern.id is not None:
+        checks.append(lambda value, _id=pattern.id: value == _id)
+    if pattern.regex_all is not None:
+        regex_all = [re.compile(x).match for x in pattern.regex_all]
+        checks.append(lambda value: all(m(value) for m in regex_all))
+    if pattern.regex_any is not None:
+        regex_any = [re.compile(x).match for x in pattern.regex_any]
+        checks.append(lambda value: any(m(value) for m in regex_any))
+    wbl = pattern.white_list_black_list_qualifier
+    if wbl is not None and wbl.white_list:
+        white = _membership(wbl.white_list)
+        checks.append(lambda value: value in white)
+    if wbl is not None and wbl.black_list:
+        black = _membership(wbl.black_list)
+        checks.append(lambda value: value not in black)
+    return _all_of(checks)
+
+
+def _all_of(checks: List[Callable[[Any], bool]]) -> Callable[[Any], bool]:
+    if len(checks) == 0:
+        return lambda _: True
+    if len(checks) == 1:
+        return checks[0]
+
+    def predicate(value) -> bool:
+        for check in checks:
+            if not check(value):
+                return False
+        return True
+    return predicate
+
+
+def _per_meta(check: Callable[[Location], bool]) -> LocationPredicate:
+    """Memoise a check whose result depends only on ``loc.Meta``.
+
+    Generated locations of the same type carry equal LocationMetas, so the check runs
+    once per distinct meta rather than once per location. Metas that can't be hashed
+    (e.g. list-valued qualifiers) are memoised by identity instead.
+    """
+    by_value: Dict[dcs.LocationMeta, bool] = {}
+    by_identity: Dict[int, tuple] = {}
+
+    def predicate(loc: Location) -> bool:
+        meta = loc.Meta
+        try:
+            ret = by_value.get(meta)
+        except TypeError:
+            hit = by_identity.get(id(meta))
+            # Keep the meta alive alongside the result so its id() can't be reused
+            if hit is None or hit[0] is not meta:
+                hit = by_identity[id(meta)] = (meta, check(loc))
+            return hit[1]
+        if ret is None:
+            ret = by_value[meta] = check(loc)
+        return ret
+    return predicate
+
+
 @dataclass(frozen=True, slots=True)
 class ContainerQualifier:
     pattern: Optional[PatternMatchQualifier] = None
@@ -59,6 +135,22 @@ class ContainerQualifier:
 
         return True
 
+    def compile(self, is_reserved: Optional[ReservedProvider] = None) -> ContainerPredicate:
+        """Specialise this qualifier into a predicate equivalent to ``check_if_qualifies``."""
+        checks: List[ContainerPredicate] = []
+        if self.reserved is not None:
+            if is_reserved is None:
+                raise ValueError("is_reserved is required when using reserved qualifier")
+            checks.append(lambda c, _want=self.reserved: is_reserved(c.id) == _want)
+        if self.pattern is not None:
+            matches = compile_pattern(self.pattern)
+            checks.append(lambda c: matches(str(c.id)))
+        if self.max_dims is not None:
+            checks.append(lambda c: _dims_within_max(c.uom.dimensions, self.max_dims))
+        if self.min_dims is not None:
+            checks.append(lambda c: _dims_within_min(c.uom.dimensions, self.min_dims))
+        return _all_of(checks)
+
 
 @dataclass(frozen=True, slots=True)
 class LocationQualifier:
@@ -71,6 +163,7 @@ class LocationQualifier:
     at_least_capacity:  Optional[int] = None
     has_addable_position:  Optional[bool] = None
     is_occupied:  Optional[bool] = None
+    channel_processor_types: Optional[Iterable[str]] = None  # channel processor class names, e.g. 'FIFOFlowChannelProcessor'
     has_content:  Optional[dcs.ContainerContent] = None
     min_slot_dims: Optional[vec.FloatVec] = None  # all slot dims must be >= this
     ignore_uom_qualifier: bool = False  # if True, ignore the location's uom_qualifier (treat as if None)
@@ -96,7 +189,7 @@ class LocationQualifier:
 
         # Disqualify if the container's dims don't fit within a slot at this location
         if container is not None:
-            if not _dims_within_max(container.uom.dimensions, loc.SlotDims):
+            if not loc.SlotGeometry.fits(container.uom.dimensions):
                 return False
 
         # Disqualify if doesn't have any of has_any_containers
@@ -143,6 +236,11 @@ class LocationQualifier:
             if occupied != self.is_occupied:
                 return False
 
+        # Disqualify on channel processor type
+        if self.channel_processor_types is not None and \
+                type(loc.Meta.channel_processor).__name__ not in self.channel_processor_types:
+            return False
+
         # Disqualify if total qty of (resource, uom) across all containers is less than required
         if self.has_content is not None:
             if container_provider is None:
@@ -159,8 +257,7 @@ class LocationQualifier:
 
         # Disqualify if any slot dims are smaller than the required minimum
         if self.min_slot_dims is not None:
-            slot_dims = loc.SlotDims
-            if not _dims_within_min(slot_dims, self.min_slot_dims):
+            if not _dims_within_min(loc.SlotDims, self.min_slot_dims):
                 return False
 
         # Disqualify if container's UoM doesn't satisfy the qualifier
@@ -177,6 +274,87 @@ class LocationQualifier:
         
         return True
 
+    def compile(self,
+                container_provider: ContainerByIdProvider = None,
+                container: Optional[dcs.Container] = None,
+                is_reserved: Optional[ReservedProvider] = None,
+                is_container_reserved: Optional[ReservedProvider] = None) -> LocationPredicate:
+        """Specialise this qualifier (optionally bound to *container*) into a predicate
+        equivalent to ``check_if_qualifies`` with the same arguments.
+
+        Only the active checks are kept. Occupancy and capacity run first, then
+        checks that depend only on the location's meta (memoised per meta), then
+        processor access, the id pattern and reservation. Checks that call
+        *container_provider* run last.
+        """
+        if self.reserved is not None and is_reserved is None:
+            raise ValueError("is_reserved is required when using reserved qualifier")
+        for name in ('has_any_containers', 'has_all_containers', 'has_content'):
+            if getattr(self, name) is not None and container_provider is None:
+                raise ValueError(f"container_provider is required when using {name} qualifier")
+
+        # ── occupancy / capacity: cheapest and most selective ──
+        checks: List[LocationPredicate] = []
+        if self.is_occupied is not None:
+            checks.append(lambda loc, _want=self.is_occupied: (len(loc.ContainerIds) > 0) == _want)
+        if self.at_least_capacity is not None:
+            checks.append(lambda loc, _min=self.at_least_capacity: loc.AvailableCapacity >= _min)
+
+        # ── meta-only checks (dims, slot fit, processor type, uom/resource qualifiers) ──
+        meta_checks: List[LocationPredicate] = []
+        if self.max_dims is not None:
+            meta_checks.append(lambda loc: _dims_within_max(loc.Meta.dims, self.max_dims))
+        if self.min_dims is not None:
+            meta_checks.append(lambda loc: _dims_within_min(loc.Meta.dims, self.min_dims))
+        if container is not None:
+            meta_checks.append(lambda loc, _dims=container.uom.dimensions: loc.SlotGeometry.fits(_dims))
+        if self.min_slot_dims is not None:
+            meta_checks.append(lambda loc: _dims_within_min(loc.SlotDims, self.min_slot_dims))
+        if self.channel_processor_types is not None:
+            processor_types = _membership(self.channel_processor_types)
+            meta_checks.append(lambda loc: type(loc.Meta.channel_processor).__name__ in processor_types)
+        if container is not None and not self.ignore_uom_qualifier:
+            meta_checks.append(lambda loc: loc.Meta.uom_qualifier is None or
+                               loc.Meta.uom_qualifier.qualify([container.uom])[container.uom].result)
+        if container is not None and not self.ignore_resource_type_qualifier:
+            resource_types = list(container.ResourceTypes.keys())
+            meta_checks.append(lambda loc: loc.Meta.resource_type_qualifier is None or
+                               all(v.result for v in loc.Meta.resource_type_qualifier.qualify(resource_types).values()))
+
+        if meta_checks:
+            checks.append(_per_meta(_all_of(meta_checks)))
+
+        # ── processor access, id pattern, reservation ──
+        if self.has_addable_position is not None:
+            checks.append(lambda loc, _want=self.has_addable_position: (len(loc.get_addable_positions()) > 0) == _want)
+        if self.id_pattern is not None:
+            id_matches = compile_pattern(self.id_pattern)
+            checks.append(lambda loc: id_matches(str(loc.Id)))
+        if self.reserved is not None:
+            checks.append(lambda loc, _want=self.reserved: is_reserved(loc.Id) == _want)
+
+        # ── container-provider lookups ──
+        if self.has_any_containers is not None:
+            any_preds = [q.compile(is_reserved=is_container_reserved) for q in self.has_any_containers]
+            checks.append(lambda loc: any(p(c) for c in container_provider(loc.ContainerIds).values() for p in any_preds))
+        if self.has_all_containers is not None:
+            all_preds = [q.compile(is_reserved=is_container_reserved) for q in self.has_all_containers]
+
+            def _has_all(loc: Location) -> bool:
+                loc_containers = list(container_provider(loc.ContainerIds).values())
+                return all(any(p(c) for c in loc_containers) for p in all_preds)
+            checks.append(_has_all)
+        if self.has_content is not None:
+            want = self.has_content
+            checks.append(lambda loc: sum(
+                c.qty
+                for ctr in container_provider(loc.ContainerIds).values()
+                for c in ctr.contents
+                if c.resource == want.resource and c.uom == want.uom
+            ) >= want.qty)
+
+        return _all_of(checks)
+
 
 def get_destination_location_qualifier(
         container: dcs.Container,
@@ -1,6 +1,7 @@
 import threading
 import time
-from typing import Iterable, Optional, Protocol
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple
 import logging
 import requests
 
@@ -41,12 +42,42 @@ class ReservationProvider(Protocol):
     def get_reserved_ids(self, resource_ids: Iterable[str]) -> set: ...
 
 
+# (resource, requester, resource_type)
+ReservationAsk = Tuple[str, str, Optional[str]]
+
+
+def reserve_many(reservation_provider: ReservationProvider, asks: Iterable[ReservationAsk]) -> List[Optional[str]]:
+    """Reserve each ask, returning a token (or None if denied) per ask, in order.
+
+    Uses the provider's own ``reserve_many`` (one round trip) when it has one, else
+    reserves one at a time. If a call raises, tokens already granted are released first.
+    """
+    asks = list(asks)
+    bulk = getattr(reservation_provider, 'reserve_many', None)
+    if bulk is not None:
+        return bulk(asks)
+
+    tokens: List[Optional[str]] = []
+    try:
+        for resource, requester, resource_type in asks:
+            tokens.append(reservation_provider.reserve(resource, requester, resource_type=resource_type))
+    except ReservationFailedError:
+        for (resource, requester, _), token in zip(asks, tokens):
+            if token is not None:
+                reservation_provider.unreserve(resource, requester, token=token)
+        raise
+    return tokens
+
+
 class PassthroughReservationProvider:
     """Always grants reservations. Used as the default when no external provider is configured."""
 
     def reserve(self, resource: str, requester: str, resource_type: str = None) -> Optional[str]:
         return resource
 
+    def reserve_many(self, asks: Iterable[ReservationAsk]) -> List[Optional[str]]:
+        return [resource for resource, _, _ in asks]
+
     def unreserve(self, resource: str, requester: str, token: str) -> bool:
         return True
 
@@ -57,6 +88,140 @@ class PassthroughReservationProvider:
         return set()
 
 
+@dataclass(frozen=True, slots=True)
+class ReservationCacheStats:
+    hits: int
+    misses: int
+    fetched_ids: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class CachingReservationProvider:
+    """Wraps any ReservationProvider, answering reservation checks from memory.
+
+    The state of each resource is fetched from the wrapped provider at most once per
+    *ttl* seconds; checks within that window are set lookups. Reservations made or
+    released through this wrapper update the cache immediately, so its own changes
+    are always visible. Changes made by other clients are picked up when the TTL
+    lapses, or sooner via invalidate().
+    """
+
+    def __init__(self, provider: ReservationProvider, ttl: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self._provider = provider
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._reserved: set = set()
+        # resource -> clock time its state was last learned
+        self._fetched_at: Dict[str, float] = {}
+        # resource -> count of local changes/invalidations, and the same for invalidate();
+        # a fetch only lands if neither moved while it was in flight
+        self._generation: Dict[str, int] = {}
+        self._epoch = 0
+        self._hits = 0
+        self._misses = 0
+        self._fetched_ids = 0
+
+    @property
+    def Provider(self) -> ReservationProvider:
+        return self._provider
+
+    @property
+    def Stats(self) -> ReservationCacheStats:
+        with self._lock:
+            return ReservationCacheStats(hits=self._hits, misses=self._misses, fetched_ids=self._fetched_ids)
+
+    def invalidate(self, resource_ids: Iterable[str] = None) -> None:
+        """Forget the cached state of *resource_ids* (or of everything), forcing a refetch."""
+        with self._lock:
+            if resource_ids is None:
+                self._fetched_at.clear()
+                self._epoch += 1
+                return
+            for resource in resource_ids:
+                self._fetched_at.pop(str(resource), None)
+                self._bump(str(resource))
+
+    def _bump(self, resource: str) -> None:
+        self._generation[resource] = self._generation.get(resource, 0) + 1
+
+    def _learn(self, resource: str, reserved: bool, now: float) -> None:
+        if reserved:
+            self._reserved.add(resource)
+        else:
+            self._reserved.discard(resource)
+        self._fetched_at[resource] = now
+
+    def reserve(self, resource: str, requester: str, resource_type: str = None) -> Optional[str]:
+        token = self._provider.reserve(resource, requester, resource_type=resource_type)
+        with self._lock:
+            # A denial means someone else holds it — reserved either way
+            self._bump(str(resource))
+            self._learn(str(resource), True, self._clock())
+        return token
+
+    def reserve_many(self, asks: Iterable[ReservationAsk]) -> List[Optional[str]]:
+        asks = list(asks)
+        tokens = reserve_many(self._provider, asks)
+        with self._lock:
+            now = self._clock()
+            for resource, _, _ in asks:
+                self._bump(str(resource))
+                self._learn(str(resource), True, now)
+        return tokens
+
+    def unreserve(self, resource: str, requester: str, token: str) -> bool:
+        try:
+            released = self._provider.unreserve(resource, requester, token=token)
+        except ReservationFailedError:
+            self.invalidate([resource])
+            raise
+        with self._lock:
+            self._bump(str(resource))
+            if released:
+                self._learn(str(resource), False, self._clock())
+            else:
+                self._fetched_at.pop(str(resource), None)
+        return released
+
+    def is_reserved(self, resource: str) -> bool:
+        return str(resource) in self.get_reserved_ids([resource])
+
+    def get_reserved_ids(self, resource_ids: Iterable[str]) -> set:
+        ids = [str(r) for r in resource_ids]
+        with self._lock:
+            cutoff = self._clock() - self._ttl
+            stale = [r for r in ids if self._fetched_at.get(r, cutoff) <= cutoff]
+            if not stale:
+                self._hits += 1
+                return {r for r in ids if r in self._reserved}
+            self._misses += 1
+            epoch = self._epoch
+            generations = {r: self._generation.get(r, 0) for r in stale}
+
+        # Fetch outside the lock — the wrapped provider may be remote
+        fetched = self._provider.get_reserved_ids(stale)
+        with self._lock:
+            now = self._clock()
+            answer = {r for r in ids if r in self._reserved}
+            for r in stale:
+                # A reserve/unreserve made while fetching is newer than the fetched answer
+                if self._generation.get(r, 0) != generations[r]:
+                    continue
+                answer.discard(r)
+                if r in fetched:
+                    answer.add(r)
+                # Not cached if everything was invalidated while fetching
+                if epoch == self._epoch:
+                    self._learn(r, r in fetched, now)
+            self._fetched_ids += len(stale)
+            return answer
+
+
 class _HttpReservationBase:
     """Shared HTTP transport, retry, and logging logic for reservation providers.
 
@@ -259,6 +424,34 @@ class _HttpReservationBase:
         )
         return None
 
+    def reserve_many(self, asks: Iterable[ReservationAsk]) -> List[Optional[str]]:
+        """Reserve every ask in a single POST; results are matched to asks by position."""
+        asks = list(asks)
+        if not asks:
+            return []
+        try:
+            results = self._post('/api/v1/Reservation/reserve', [
+                {'requester': requester, 'resource': resource, 'resourceType': resource_type or 'storage'}
+                for resource, requester, resource_type in asks
+            ])
+        except (RateLimitedError, AuthError) as exc:
+            raise ReservationFailedError(f"reserve_many auth error: {exc}: {len(asks)} resources") from exc
+        if len(results) != len(asks):
+            logger.error(f"Bulk reserve returned {len(results)} results for {len(asks)} resources: response={results}")
+
+        tokens: List[Optional[str]] = []
+        for idx, (resource, requester, _) in enumerate(asks):
+            result = results[idx] if idx < len(results) else {}
+            token = result.get('releaseToken') if result.get('status') == 'SUCCESS' else None
+            if token is None:
+                logger.error(
+                    f"Reserve FAILED: resource={resource} requester={requester} "
+                    f"explanation={result.get('explanation', 'no result')}"
+                )
+            tokens.append(token)
+        logger.debug(f"Bulk reserve: {sum(t is not None for t in tokens)}/{len(asks)} granted")
+        return tokens
+
     def unreserve(self, resource: str, requester: str, token: str) -> bool:
         try:
             results = self._post('/api/v1/Reservation/unreserve', [
@@ -1,29 +1,45 @@
+import heapq
+import itertools
 import logging
 import pprint
 import threading
+import time
 import uuid
+from contextlib import contextmanager
 from dataclasses import replace
 
+import numpy as np
 from cooptools.register import Register
 from cooptools.reservation.reservationmanager import ReservationManager
 import coopstorage.storage.loc_load.dcs as dcs
 import coopstorage.storage.loc_load.exceptions as errs
 import coopstorage.storage.loc_load.container_state_mutations as csm
 import coopstorage.storage.loc_load.evaluators as evaluators
-from typing import Dict, Iterable, Callable, List, Optional, Type, Tuple
+from typing import Collection, Dict, Iterable, Iterator, Callable, List, Optional, Type, Tuple
 from cooptools.protocols import UniqueIdentifier
 from coopstorage.storage.loc_load.location import Location
 import coopstorage.storage.loc_load.qualifiers as qs
-from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria, TransferRequest
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria, TransferRequest, TransferResult
+from coopstorage.storage.loc_load.destination_pool import DestinationPool
+from coopstorage.storage.loc_load.unblock_planner import BlockagePenalty, RetrievalCostModel, UnblockMove, UnblockPlan
 from coopstorage.storage.loc_load.reservation_provider import ReservationProvider, PassthroughReservationProvider, ReservationFailedError, ReservationCheckFailedError, RateLimitedError, AuthError
 import cooptools.common as comm
 from coopstorage.storage.loc_load import data as data
+from coopstorage.storage.loc_load.data.location_indexes import LocationArrays
+from coopstorage.storage.loc_load.data.location_snapshots import LocationsSnapshot
 from cooptools.qualifiers import PatternMatchQualifier, WhiteBlackListQualifier
 
 from pubsub import pub
-from coopstorage.enums import StorageTopic
+from coopstorage.enums import StorageTopic, ConcurrencyMode, SourceSelectionMode
+from coopstorage.storage.loc_load.locking import LockStripes, SharedExclusiveLock
+from coopstorage.storage.loc_load import tracing
 
 logger = logging.getLogger(__name__)
+_trace = tracing.tracer(tracing.STORAGE)
+
+# STRIPED mode: how many times a transfer is re-resolved after losing a race before
+# it falls back to an exclusive hold
+_STRIPED_RESOLVE_ATTEMPTS = 3
 
 
 def _build_transfer_payload(transfer_request: 'TransferRequest',
@@ -56,11 +72,34 @@ class Storage:
                  locs: Iterable[Location] = None,
                  id: UniqueIdentifier = None,
                  location_map_tree=None,
-                 reservation_provider: ReservationProvider = None):
-
+                 reservation_provider: ReservationProvider = None,
+                 concurrency_mode: ConcurrencyMode = ConcurrencyMode.GLOBAL,
+                 lock_stripes: int = 64,
+                 source_selection: SourceSelectionMode = SourceSelectionMode.RANDOM,
+                 compact_channels: bool = False,
+                 snapshot_max_age: float = 1.0):
+
+        # GLOBAL: held for the whole of every public call. STRIPED: held only around
+        # data store / index access; transfers additionally hold per-location/container
+        # stripes, and whole-storage operations take the gate exclusively.
         self._lock = threading.RLock()
+        self._concurrency_mode = concurrency_mode
+        self._stripes = LockStripes(lock_stripes)
+        self._gate = SharedExclusiveLock()
+        # STRIPED: loc id -> number of in-flight transfers touching it
+        self._claimed_loc_ids: Dict[UniqueIdentifier, int] = {}
+        # STRIPED: reserved-id sets the calling thread fetched before taking the lock
+        self._prefetched = threading.local()
         self._reservation_provider = reservation_provider or PassthroughReservationProvider()
-        self._data_store = data_store if data_store is not None else data.StorageDataStore()
+        self._source_selection = source_selection
+        self._retrieval_costs = RetrievalCostModel()
+        # Relocation moves made by unblock plans since creation
+        self._unblock_moves = 0
+        # Writers republish the snapshot once it is this many seconds behind
+        self._snapshot_max_age = snapshot_max_age
+        # compact_channels only shapes the default store; pass a configured data_store otherwise
+        self._data_store = data_store if data_store is not None else data.StorageDataStore(
+            compact_channels=compact_channels)
 
         self._id = id or uuid.uuid4()
         from coopstorage.location_map_tree import LocationMapTree
@@ -100,12 +139,17 @@ class Storage:
     def register_locs(self, locs: Iterable[Location]=None):
         with self._lock:
             if locs is not None:
-                self._data_store.LocationsData.add(locs)
+                locs = list(locs)
+                tree_paths = {}
                 for loc in locs:
                     try:
-                        tree_path = self._location_map_tree.get_path(loc.Id)
+                        tree_paths[loc.Id] = self._location_map_tree.get_path(loc.Id)
                     except (KeyError, AttributeError):
-                        tree_path = None
+                        pass
+                # Labels already registered in the tree are persisted with the locations
+                self._data_store.LocationsData.add(locs, tree_labels=tree_paths)
+                for loc in locs:
+                    tree_path = tree_paths.get(loc.Id)
                     pub.sendMessage(StorageTopic.LOCATION_REGISTERED.value, payload={
                         'id': str(loc.Id),
                         'coords': list(loc.Coords),
@@ -165,19 +209,20 @@ class Storage:
         return self
 
     def get_containers(self,
-                  criteria: qs.ContainerQualifier=None)->Dict[UniqueIdentifier, dcs.Container]:
+                  criteria: qs.ContainerQualifier=None,
+                  ids: Iterable[UniqueIdentifier]=None)->Dict[UniqueIdentifier, dcs.Container]:
         with self._lock:
             if criteria is not None and criteria.reserved is not None:
                 _reserved_ctr_ids = self.get_reserved_container_ids()
                 is_reserved = lambda cid: str(cid) in _reserved_ctr_ids
             else:
                 is_reserved = None
-            return self._data_store.ContainersData.get(qualifier=criteria, is_reserved=is_reserved)
+            return self._data_store.ContainersData.get(ids=ids, qualifier=criteria, is_reserved=is_reserved)
 
     def add_content_to_container_at_location(self,
                                              loc_id: UniqueIdentifier,
                                              contents: List[dcs.ContainerContent]):
-        with self._lock:
+        with self._striped([self._loc_key(loc_id)]), self._lock:
             self._verify_loc(loc_id)
             loc = self._data_store.LocationsData.get(ids=[loc_id])[loc_id]
             container_ids = loc.ContainerIds
@@ -199,7 +244,7 @@ class Storage:
     def remove_content_from_container_at_location(self,
                                                   loc_id: UniqueIdentifier,
                                                   content: dcs.ContainerContent):
-        with self._lock:
+        with self._striped([self._loc_key(loc_id)]), self._lock:
             self._verify_loc(loc_id)
             loc = self._data_store.LocationsData.get(ids=[loc_id])[loc_id]
             container_ids = loc.ContainerIds
@@ -219,14 +264,23 @@ class Storage:
             })
 
 
-    def filter(self,
-               filter: qs.LocationQualifier = None,
-               container: dcs.Container = None) -> List[Location]:
-        if filter is None and container is None:
-            return list(self._data_store.LocationsData.iter_values())
+    def _qualifier_providers(self,
+                             filter: Optional[qs.LocationQualifier],
+                             reserved: Optional[Dict[str, set]] = None) -> Dict:
+        """Keyword arguments for LocationQualifier.compile / check_if_qualifies, fetching reservation
+        snapshots only when *filter* actually needs them.
+
+        Pass the same *reserved* dict for several filters to share one snapshot between them.
+        """
+        def _snapshot(key: str) -> set:
+            if reserved is None:
+                return self._reserved_ids(key)
+            if key not in reserved:
+                reserved[key] = self._reserved_ids(key)
+            return reserved[key]
 
         if filter is not None and filter.reserved is not None:
-            _reserved_loc_ids = self.get_reserved_location_ids()
+            _reserved_loc_ids = _snapshot('locations')
             is_reserved = lambda loc_id: str(loc_id) in _reserved_loc_ids
         else:
             is_reserved = None
@@ -234,18 +288,35 @@ class Storage:
         _needs_ctr = (filter is not None and
                       (filter.has_any_containers is not None or filter.has_all_containers is not None))
         if _needs_ctr:
-            _reserved_ctr_ids = self.get_reserved_container_ids()
+            _reserved_ctr_ids = _snapshot('containers')
             is_container_reserved = lambda cid: str(cid) in _reserved_ctr_ids
         else:
             is_container_reserved = None
 
-        container_provider = self._data_store.ContainersData.get
-        return [
-            loc for loc in self._data_store.LocationsData.iter_values()
-            if filter is None or filter.check_if_qualifies(
-                loc, container_provider=container_provider, container=container,
-                is_reserved=is_reserved, is_container_reserved=is_container_reserved)
-        ]
+        return dict(container_provider=self._data_store.ContainersData.get,
+                    is_reserved=is_reserved,
+                    is_container_reserved=is_container_reserved)
+
+    def _iter_qualifying(self,
+                         filter: qs.LocationQualifier = None,
+                         container: dcs.Container = None,
+                         emptiest_first: bool = False,
+                         skip: Collection[UniqueIdentifier] = ()) -> Iterator[Location]:
+        """Lazily yield locations matching *filter*, except those in *skip*; reservation
+        snapshots are taken once up front."""
+        if filter is None and container is None:
+            yield from (loc for loc in self._data_store.LocationsData.iter_values() if loc.Id not in skip)
+            return
+
+        qualifies = (filter or qs.LocationQualifier()).compile(container=container, **self._qualifier_providers(filter))
+        for loc in self._data_store.LocationsData.iter_candidates(filter, emptiest_first=emptiest_first):
+            if loc.Id not in skip and qualifies(loc):
+                yield loc
+
+    def filter(self,
+               filter: qs.LocationQualifier = None,
+               container: dcs.Container = None) -> List[Location]:
+        return list(self._iter_qualifying(filter=filter, container=container))
 
 
     def evaluate(self,
@@ -255,42 +326,170 @@ class Storage:
             x: evaluator(x) for x in options
         }
 
+    def select_locations(self,
+                         filter: qs.LocationQualifier = None,
+                         evaluator: Callable[[Location], float] = None,
+                         container: dcs.Container = None,
+                         k: int = 1) -> List[Location]:
+        """Up to *k* qualifying locations, best first.
+
+        Without an evaluator these are the first *k* candidates found. With one, a
+        bounded min-heap keeps the *k* best scores seen so far; ties go to the
+        earlier candidate, matching a stable sort. If the evaluator declares an
+        upper bound (see evaluators.bounded), the scan stops as soon as every kept
+        location has reached it.
+
+        Evaluators with a batch form (see evaluators.vectorized) score every
+        candidate in one array call instead, unless they prefer the emptiest
+        locations: those reach their bound at the head of the scan, so stopping
+        early is cheaper. If the filter only uses fields LocationArrays can mask,
+        qualification is vectorized too and Location objects are only fetched for
+        the winners.
+
+        In STRIPED mode, locations claimed by in-flight transfers are passed over
+        unless nothing else qualifies, so concurrent transfers spread out instead of
+        queueing on the same stripe.
+        """
+        if self._concurrency_mode == ConcurrencyMode.STRIPED and self._claimed_loc_ids:
+            with self._lock:
+                claimed = frozenset(self._claimed_loc_ids)
+            selected = self._select_locations(filter, evaluator, container, k, skip=claimed)
+            if len(selected) > 0:
+                return selected
+        return self._select_locations(filter, evaluator, container, k)
+
+    def _select_locations(self,
+                          filter: Optional[qs.LocationQualifier],
+                          evaluator: Optional[Callable[[Location], float]],
+                          container: Optional[dcs.Container],
+                          k: int,
+                          skip: Collection[UniqueIdentifier] = ()) -> List[Location]:
+        candidates = self._iter_qualifying(filter=filter, container=container,
+                                           emptiest_first=evaluator is not None and evaluators.prefers_emptiest(evaluator),
+                                           skip=skip)
+        if evaluator is None:
+            return list(itertools.islice(candidates, k))
+
+        batch = evaluators.get_batch(evaluator)
+        if batch is not None and not evaluators.prefers_emptiest(evaluator):
+            if LocationArrays.supports(filter):
+                return self._select_locations_masked(filter, container, batch, k, skip)
+            return self._select_locations_batch(candidates, batch, k)
+
+        upper_bound = evaluators.get_upper_bound(evaluator)
+        heap: List[Tuple[float, int, Location]] = []
+        for seq, loc in enumerate(candidates):
+            # -seq so that, among equal scores, the later candidate is the smallest entry
+            entry = (evaluator(loc), -seq, loc)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+            if upper_bound is not None and len(heap) == k and heap[0][0] >= upper_bound:
+                break
+        return [loc for _, _, loc in sorted(heap, key=lambda e: (e[0], e[1]), reverse=True)]
+
+    def _select_locations_batch(self,
+                                candidates: Iterable[Location],
+                                batch: evaluators.BatchEvaluator,
+                                k: int) -> List[Location]:
+        locs = list(candidates)
+        if len(locs) == 0:
+            return []
+        arrays = self._data_store.LocationsData.Arrays
+        scores = np.asarray(batch(arrays, arrays.rows(loc.Id for loc in locs)), dtype=float)
+        # Stable, so ties go to the earlier candidate as in the per-location path
+        best = np.argsort(-scores, kind='stable')[:k]
+        return [locs[i] for i in best]
+
+    def _select_locations_masked(self,
+                                 filter: Optional[qs.LocationQualifier],
+                                 container: Optional[dcs.Container],
+                                 batch: evaluators.BatchEvaluator,
+                                 k: int,
+                                 skip: Collection[UniqueIdentifier]) -> List[Location]:
+        """Batch selection with *filter* applied as an array mask (see LocationArrays.supports).
+
+        Ties go to the fuller location, then to the earlier row.
+        """
+        arrays = self._data_store.LocationsData.Arrays
+        rows = arrays.candidate_rows(filter, container)
+        if len(skip) > 0:
+            rows = np.setdiff1d(rows, arrays.rows(x for x in skip if x in arrays), assume_unique=True)
+        if len(rows) == 0:
+            return []
+        scores = np.asarray(batch(arrays, rows), dtype=float)
+        available = arrays.Capacity[rows] - arrays.Occupancy[rows]
+        # lexsort orders by the last key first
+        best = rows[np.lexsort((rows, available, -scores))[:k]]
+        ids = [arrays.Ids[row] for row in best]
+        locs = self._data_store.LocationsData.get(ids=ids)
+        return [locs[loc_id] for loc_id in ids]
+
     def select_location(self,
                         filter: qs.LocationQualifier = None,
                         evaluator: Callable[[Location], float] = None,
                         container: dcs.Container = None):
-        # Fast path: no custom evaluator — return the first qualifying location immediately
-        if evaluator is None:
-            if filter is not None and filter.reserved is not None:
-                _reserved_loc_ids = self.get_reserved_location_ids()
-                is_reserved = lambda loc_id: str(loc_id) in _reserved_loc_ids
-            else:
-                is_reserved = None
+        selected = self.select_locations(filter=filter, evaluator=evaluator, container=container, k=1)
+        if len(selected) == 0:
+            raise errs.NoLocationsMatchFilterCriteriaException(filter)
+        return selected[0]
 
-            _needs_ctr = (filter is not None and
-                          (filter.has_any_containers is not None or filter.has_all_containers is not None))
-            if _needs_ctr:
-                _reserved_ctr_ids = self.get_reserved_container_ids()
-                is_container_reserved = lambda cid: str(cid) in _reserved_ctr_ids
-            else:
-                is_container_reserved = None
+    # ── spatial queries ───────────────────────────────────────────────────────
 
-            container_provider = self._data_store.ContainersData.get
-            for loc in self._data_store.LocationsData.iter_values():
-                if filter is None or filter.check_if_qualifies(
-                        loc, container_provider=container_provider, container=container,
-                        is_reserved=is_reserved, is_container_reserved=is_container_reserved):
-                    return loc
-            raise errs.NoLocationsMatchFilterCriteriaException(filter)
+    def _spatial_qualifier(self,
+                           filter: Optional[qs.LocationQualifier],
+                           container: Optional[dcs.Container]) -> Callable[[Location], bool]:
+        if filter is None and container is None:
+            return lambda loc: True
+        return (filter or qs.LocationQualifier()).compile(container=container, **self._qualifier_providers(filter))
 
-        # Scored path: collect all options, evaluate, and sort
-        options = self.filter(filter=filter, container=container)
-        if len(options) == 0:
-            raise errs.NoLocationsMatchFilterCriteriaException(filter)
-        scores = self.evaluate(options, evaluator)
-        ordered = sorted([(k, v) for k, v in scores.items()],
-                         key=lambda tup: tup[1], reverse=True)
-        return ordered[0][0]
+    def iter_nearest_locations(self,
+                               point: Iterable[float],
+                               filter: qs.LocationQualifier = None,
+                               container: dcs.Container = None) -> Iterator[Tuple[float, Location]]:
+        """Yield (distance, location) for every location matching *filter*, nearest *point* first.
+
+        The order is taken under the storage lock when called, so it reflects one
+        consistent state; use nearest_locations when only the first few are needed.
+        """
+        with self._lock:
+            ret = list(self._iter_nearest_locations(point, filter, container))
+        return iter(ret)
+
+    def _iter_nearest_locations(self,
+                                point: Iterable[float],
+                                filter: Optional[qs.LocationQualifier],
+                                container: Optional[dcs.Container]) -> Iterator[Tuple[float, Location]]:
+        """Lazy walk of the grid index; only the cells around *point* are read until
+        enough qualifying locations have been found. Callers must hold the lock."""
+        qualifies = self._spatial_qualifier(filter, container)
+        locs_data = self._data_store.LocationsData
+        for dist, loc_id in locs_data.SpatialIndex.iter_nearest(point):
+            loc = locs_data.get(ids=[loc_id]).get(loc_id)
+            if loc is not None and qualifies(loc):
+                yield dist, loc
+
+    def nearest_locations(self,
+                          point: Iterable[float],
+                          k: int = 1,
+                          filter: qs.LocationQualifier = None,
+                          container: dcs.Container = None) -> List[Location]:
+        """Up to *k* locations matching *filter*, nearest *point* first."""
+        with self._lock:
+            return [loc for _, loc in itertools.islice(self._iter_nearest_locations(point, filter, container), k)]
+
+    def locations_in_box(self,
+                         lo: Iterable[float],
+                         hi: Iterable[float],
+                         filter: qs.LocationQualifier = None,
+                         container: dcs.Container = None) -> List[Location]:
+        """Locations matching *filter* whose coords lie within the box *lo*..*hi* (inclusive)."""
+        qualifies = self._spatial_qualifier(filter, container)
+        with self._lock:
+            locs_data = self._data_store.LocationsData
+            ids = list(locs_data.SpatialIndex.ids_in_box(lo, hi))
+            return [loc for loc in locs_data.get(ids=ids).values() if qualifies(loc)]
 
     def resolve_transfer_request_criteria(
             self,
@@ -319,12 +518,15 @@ class Storage:
             # select the container from that location. This ensures the container and
             # source are always consistent (avoids picking a container at L1 but
             # a source at L2 when the qualifier matches multiple containers).
-            source = self.select_location(filter=qs.LocationQualifier(
-                has_any_containers=[criteria.container_query_args]
-            ),
-                evaluator=container_evaluator or evaluators.random_score
-            )
-            container = self.select_container(loc=source, filter=criteria.container_query_args)
+            if container_evaluator is None and self._source_selection == SourceSelectionMode.CHEAPEST_RETRIEVAL:
+                source, container = self._select_cheapest_container(criteria.container_query_args)
+            else:
+                source = self.select_location(filter=qs.LocationQualifier(
+                    has_any_containers=[criteria.container_query_args]
+                ),
+                    evaluator=container_evaluator or evaluators.random_score
+                )
+                container = self.select_container(loc=source, filter=criteria.container_query_args)
 
         elif criteria.new_container is not None:
             # New container arriving — no source
@@ -332,6 +534,7 @@ class Storage:
 
         # ── Dest (resolved after container is known; slot fit enforced) ───────
         dest = None
+        dest_loc_evaluator = evaluators.bind_container(dest_loc_evaluator, container)
         if criteria.dest_loc_query_args is not None:
             dest = self.select_location(criteria.dest_loc_query_args, evaluator=dest_loc_evaluator, container=container)
         elif criteria.new_container is not None and criteria.dest_loc_query_args is None:
@@ -344,12 +547,57 @@ class Storage:
             dest_loc=dest
         )
 
+    def retrieval_cost(self, container_id: UniqueIdentifier) -> int:
+        """Relocation moves needed before *container_id* can be removed from where it is stored."""
+        with self._lock:
+            loc_id = self._data_store.LocationsData.ContainerIndex.get(container_id)
+            if loc_id is None:
+                raise errs.UnknownLoadIdException(container_id)
+            loc = self._data_store.LocationsData.get(ids=[loc_id])[loc_id]
+            return self._retrieval_costs.moves(loc, container_id)
+
+    def future_blocking_evaluator(self) -> Callable[[Location], float]:
+        """evaluators.fewest_future_unblocks over this storage's containers, for use as
+        a dest_loc_evaluator."""
+        def _dwell_of(container_id: UniqueIdentifier) -> Optional[float]:
+            container = self._data_store.ContainersData.get(ids=[container_id]).get(container_id)
+            return container.expected_dwell if container is not None else None
+        return evaluators.fewest_future_unblocks(_dwell_of, self._retrieval_costs)
+
+    def _select_cheapest_container(self, filter: qs.ContainerQualifier) -> Tuple[Location, dcs.Container]:
+        """The stored container matching *filter* that needs the fewest relocation moves
+        to retrieve, and its location. Ties go to the first found; a container needing
+        no moves ends the search."""
+        loc_filter = qs.LocationQualifier(has_any_containers=[filter])
+        if filter.reserved is not None:
+            _reserved_ctr_ids = self._reserved_ids('containers')
+            is_reserved = lambda cid: str(cid) in _reserved_ctr_ids
+        else:
+            is_reserved = None
+
+        best: Optional[Tuple[int, Location, dcs.Container]] = None
+        for loc in self._iter_qualifying(filter=loc_filter):
+            costs = self._retrieval_costs.position_costs(loc)
+            containers = self._data_store.ContainersData.get(ids=loc.ContainerIds)
+            for position, cid in sorted(loc.ContainerPositions.items(), key=lambda x: costs[x[0]] or 0):
+                if cid is None or (best is not None and costs[position] >= best[0]):
+                    continue
+                container = containers.get(cid)
+                if container is not None and filter.check_if_qualifies(container, is_reserved=is_reserved):
+                    best = (costs[position], loc, container)
+                    break
+            if best is not None and best[0] == 0:
+                break
+        if best is None:
+            raise errs.NoLocationsMatchFilterCriteriaException(loc_filter)
+        return best[1], best[2]
+
     def select_container(self,
                     loc: Location,
                     filter: qs.ContainerQualifier):
         containers = list(self._data_store.ContainersData.get(ids=loc.ContainerIds).values())
         if filter.reserved is not None:
-            _reserved_ctr_ids = self.get_reserved_container_ids()
+            _reserved_ctr_ids = self._reserved_ids('containers')
             is_reserved = lambda cid: str(cid) in _reserved_ctr_ids
         else:
             is_reserved = None
@@ -357,65 +605,188 @@ class Storage:
         return ret[0]
 
 
-    def _unblock(self,
-                 container: dcs.Container,
-                 source_loc: Location,
-                 unblock_dest_evaluator: Callable[[Location], float],
-                 _unblocking_ids: set) -> None:
-        """Move any containers that block *container* from being removed at *source_loc*.
+    # ── unblocking ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _unblock_dest_filter(source_loc_id: UniqueIdentifier) -> qs.LocationQualifier:
+        return qs.LocationQualifier(
+            at_least_capacity=1,
+            has_addable_position=True,
+            id_pattern=PatternMatchQualifier(
+                white_list_black_list_qualifier=WhiteBlackListQualifier(
+                    black_list=[str(source_loc_id)]
+                )
+            ),
+            reserved=False,
+        )
 
-        Raises UnblockDeadlockError if a circular blocking chain is detected.
+    def plan_unblock(self,
+                     container_id: UniqueIdentifier,
+                     unblock_dest_evaluator: Optional[Callable[[Location], float]] = None) -> UnblockPlan:
+        """The moves that would make *container_id* removable where it is stored, without executing them."""
+        with self._lock:
+            loc_id = self._data_store.LocationsData.ContainerIndex.get(container_id)
+            if loc_id is None:
+                raise errs.UnknownLoadIdException(container_id)
+            container = self._data_store.ContainersData.get(ids=[container_id])[container_id]
+            source_loc = self._data_store.LocationsData.get(ids=[loc_id])[loc_id]
+            return self._plan_unblock(container, source_loc,
+                                      unblock_dest_evaluator or evaluators.random_score, set())
+
+    def _plan_unblock(self,
+                      container: dcs.Container,
+                      source_loc: Location,
+                      unblock_dest_evaluator: Callable[[Location], float],
+                      _unblocking_ids: set) -> UnblockPlan:
+        """Pick a destination for every blocker of *container* in one pass.
+
+        Candidates are scanned and scored once into a DestinationPool. Destinations
+        where one more container would block containers already stored there rank
+        last, and each pick is applied to a planned copy so later picks see it.
+        Raises NoLocationsMatchFilterCriteriaException before anything moves if a
+        blocker has nowhere to go.
         """
+        start = time.perf_counter()
         state = [source_loc.ContainerPositions.get(i) for i in range(source_loc.Capacity)]
-        cp = source_loc.Meta.channel_processor
-        blockers = cp.get_blocking_loads(container.id, state)
+        blockers = source_loc.Meta.channel_processor.get_blocking_loads(container.id, state)
+        if len(blockers) == 0:
+            return UnblockPlan(container_id=container.id, source_loc_id=source_loc.Id,
+                               compute_time_s=time.perf_counter() - start)
 
         for blocker_id in blockers:
             if str(blocker_id) in _unblocking_ids:
                 raise errs.UnblockDeadlockError(container.id, blocker_id, _unblocking_ids)
             _unblocking_ids.add(str(blocker_id))
-            self.handle_transfer_requests(
-                [TransferRequestCriteria(
-                    container_query_args=qs.ContainerQualifier(
-                        pattern=PatternMatchQualifier(id=blocker_id)
-                    ),
-                    dest_loc_query_args=qs.LocationQualifier(
-                        at_least_capacity=1,
-                        has_addable_position=True,
-                        id_pattern=PatternMatchQualifier(
-                            white_list_black_list_qualifier=WhiteBlackListQualifier(
-                                black_list=[str(source_loc.Id)]
-                            )
-                        ),
-                        reserved=False,
-                    ),
-                )],
-                dest_loc_evaluator=unblock_dest_evaluator,
-                _unblocking_ids=_unblocking_ids,
-            )
 
-    def _handle_transfer_request(self, transfer_request: TransferRequest):
-        updated_src = None
-        source_txt = ""
-        if transfer_request.source_loc is not None:
-            src_id = transfer_request.source_loc.get_id()
-            updated_src = (self._data_store.LocationsData.get(ids=[src_id])[src_id]
-                           .remove_containers(container_ids=[transfer_request.container.id]))
-            self._data_store.LocationsData.update([updated_src])
-            source_txt = f" from {transfer_request.source_loc.Id}"
+        planned: Dict[UniqueIdentifier, Location] = {}
+
+        def _current(loc_id: UniqueIdentifier) -> Optional[Location]:
+            loc = planned.get(loc_id)
+            return loc if loc is not None else self._data_store.LocationsData.get(ids=[loc_id]).get(loc_id)
 
+        dest_filter = self._unblock_dest_filter(source_loc.Id)
+        penalty = BlockagePenalty()
+        pool = DestinationPool(dest_filter, unblock_dest_evaluator,
+                               providers=self._qualifier_providers(dest_filter),
+                               current=_current, penalty=penalty,
+                               rank=self._data_store.LocationsData.CapacityIndex.rank)
+        pool.offer(self._data_store.LocationsData.iter_candidates(dest_filter))
+
+        blocker_containers = self._data_store.ContainersData.get(ids=list(blockers))
+        moves = []
+        newly_blocked = 0
+        for blocker_id in blockers:
+            blocker = blocker_containers[blocker_id]
+            dest = pool.take(blocker)
+            if dest is None:
+                raise errs.NoLocationsMatchFilterCriteriaException(dest_filter)
+            newly_blocked += penalty(dest)
+            working = planned.get(dest.Id) or dest.copy()
+            planned[dest.Id] = working.store_containers([blocker_id])
+            pool.offer([working])
+            moves.append(UnblockMove(container=blocker, source_loc_id=source_loc.Id, dest_loc_id=dest.Id))
+
+        plan = UnblockPlan(container_id=container.id, source_loc_id=source_loc.Id, moves=tuple(moves),
+                           newly_blocked=newly_blocked, compute_time_s=time.perf_counter() - start)
+        if _trace.enabled:
+            _trace.emit('unblock_plan', container=container.id, location=source_loc.Id, moves=plan.MoveCount,
+                        newly_blocked=plan.newly_blocked, compute_time_s=plan.compute_time_s)
+        return plan
+
+    def _unblock(self,
+                 container: dcs.Container,
+                 source_loc: Location,
+                 unblock_dest_evaluator: Callable[[Location], float],
+                 _unblocking_ids: set) -> Optional[UnblockPlan]:
+        """Move any containers that block *container* from being removed at *source_loc*.
+
+        The whole plan is computed first, then its moves are reserved in one provider
+        call and executed in order. Raises UnblockDeadlockError if a circular blocking
+        chain is detected.
+        """
+        plan = self._plan_unblock(container, source_loc, unblock_dest_evaluator, _unblocking_ids)
+        if plan.MoveCount == 0:
+            return None
+
+        locs = self._data_store.LocationsData.get(ids={source_loc.Id, *(m.dest_loc_id for m in plan.moves)})
+        dest_filter = self._unblock_dest_filter(source_loc.Id)
+        requests = [TransferRequest(
+            criteria=TransferRequestCriteria(
+                container_query_args=qs.ContainerQualifier(pattern=PatternMatchQualifier(id=move.container.id)),
+                dest_loc_query_args=dest_filter,
+            ),
+            container=move.container,
+            source_loc=locs[move.source_loc_id],
+            dest_loc=locs[move.dest_loc_id],
+        ) for move in plan.moves]
+
+        requests = TransferRequest.acquire_reservations_many(requests, self._reservation_provider)
+        try:
+            denied = [r for r in requests
+                      if r.container_reservation_token is None or r.destination_reservation_token is None]
+            if denied:
+                raise ReservationFailedError(
+                    f"Could not reserve {len(denied)} of {len(requests)} unblock moves for {container.id}")
+            for request in requests:
+                current = self._data_store.LocationsData.get(ids=[request.source_loc.Id, request.dest_loc.Id])
+                request = replace(request, source_loc=current[request.source_loc.Id],
+                                  dest_loc=current[request.dest_loc.Id])
+                self._execute_transfer_request(request, unblock_dest_evaluator, _unblocking_ids,
+                                               release_reservations=False)
+        finally:
+            TransferRequest.release_reservations_many(requests, self._reservation_provider)
+        self._unblock_moves += plan.MoveCount
+        return plan
+
+    def _handle_transfer_request(self, transfer_request: TransferRequest, release_reservations: bool = True):
+        updated_src, updated_dst = self._moved_locations(transfer_request)
+        self._persist_transfer(updated_src, updated_dst)
+        self._publish_transfer(transfer_request, updated_src, updated_dst)
+        if release_reservations:
+            self._release_transfer_reservations(transfer_request)
+
+    def _moved_locations(self,
+                         transfer_request: TransferRequest,
+                         detached: bool = False) -> Tuple[Optional[Location], Optional[Location]]:
+        """Source and dest of *transfer_request* with its container moved.
+
+        The stored locations are changed in place or, with *detached*, copies of the
+        request's own source and dest (the caller must hold their stripes).
+        """
+        container_ids = [transfer_request.container.id]
+        moved: Dict[UniqueIdentifier, Location] = {}
+
+        def _working(loc: Location) -> Location:
+            if loc.Id not in moved:
+                moved[loc.Id] = loc.copy() if detached else self._data_store.LocationsData.get(ids=[loc.Id])[loc.Id]
+            return moved[loc.Id]
+
+        updated_src = None
         updated_dst = None
-        dest_txt = ""
+        if transfer_request.source_loc is not None:
+            updated_src = _working(transfer_request.source_loc).remove_containers(container_ids=container_ids)
         if transfer_request.dest_loc is not None:
-            dst_id = transfer_request.dest_loc.get_id()
-            updated_dst = (self._data_store.LocationsData.get(ids=[dst_id])[dst_id]
-                           .store_containers(container_ids=[transfer_request.container.id]))
-            self._data_store.LocationsData.update([updated_dst])
-            dest_txt = f" to {transfer_request.dest_loc.Id}"
-
-        logger.info(f"Container {transfer_request.container.id} transferred{source_txt}{dest_txt}")
+            updated_dst = _working(transfer_request.dest_loc).store_containers(container_ids=container_ids)
+        return updated_src, updated_dst
+
+    def _persist_transfer(self, updated_src: Optional[Location], updated_dst: Optional[Location]):
+        # Source and destination are persisted together
+        with self._data_store.LocationsData.batched_writes():
+            self._data_store.LocationsData.update([loc for loc in (updated_src, updated_dst) if loc is not None])
+        self._data_store.LocationsData.refresh_snapshot(self._snapshot_max_age)
+
+    def _publish_transfer(self,
+                          transfer_request: TransferRequest,
+                          updated_src: Optional[Location],
+                          updated_dst: Optional[Location]):
+        if _trace.enabled:
+            _trace.emit('transferred', container=transfer_request.container.id,
+                        source=updated_src.Id if updated_src is not None else None,
+                        dest=updated_dst.Id if updated_dst is not None else None)
         pub.sendMessage(StorageTopic.CONTAINER_MOVED.value,
                         payload=_build_transfer_payload(transfer_request, updated_src, updated_dst))
+
+    def _release_transfer_reservations(self, transfer_request: TransferRequest):
         transfer_request.release_reservations(self._reservation_provider)
         req_id = str(transfer_request.get_id())
         if transfer_request.container_reservation_token is not None:
@@ -436,6 +807,14 @@ class Storage:
                                  container_evaluator: Optional[Callable[[dcs.Container], float]] = None,
                                  _unblocking_ids: Optional[set] = None):
         _resolved_evaluator = unblock_dest_evaluator if unblock_dest_evaluator is not None else evaluators.random_score
+        # Under an exclusive hold (clear_all, escalated transfers) striping buys nothing
+        if self._concurrency_mode == ConcurrencyMode.STRIPED and not self._gate.held_exclusively():
+            for criteria in transfer_request_criteria:
+                unblocking = _unblocking_ids if _unblocking_ids is not None else set()
+                self._handle_criteria_striped(criteria, dest_loc_evaluator, _resolved_evaluator,
+                                              container_evaluator, unblocking)
+            return
+
         with self._lock:
             for criteria in transfer_request_criteria:
                 # Each top-level criteria gets a fresh unblock chain; recursive calls inherit.
@@ -446,68 +825,434 @@ class Storage:
                     dest_loc_evaluator=dest_loc_evaluator,
                     container_evaluator=container_evaluator
                 )
+                self._process_transfer_request(request, _resolved_evaluator, unblocking)
 
-                # Reserve before unblocking — dest_loc is recorded in TransferRequestsData,
-                # so _unblock's reserved=False dest filter will naturally exclude it.
-                try:
-                    request = request.acquire_reservations(self._reservation_provider)
-                except ReservationFailedError as e:
-                    if isinstance(e.__cause__, RateLimitedError):
-                        logger.error(
-                            f"Reservation rate-limited (retryAfter={e.__cause__.retry_after:.1f}s) — "
-                            f"abandoning transfer request batch"
-                        )
-                        raise
-                    if isinstance(e.__cause__, AuthError):
-                        logger.error(
-                            f"Reservation auth forbidden (status={e.__cause__.status_code}) — "
-                            f"abandoning transfer request batch"
-                        )
-                        raise
+    def _process_transfer_request(self,
+                                  request: TransferRequest,
+                                  unblock_dest_evaluator: Callable[[Location], float],
+                                  unblocking: set,
+                                  striped: bool = False) -> Optional[TransferRequest]:
+        """Reserve, record, unblock and execute a resolved request.
+
+        The reservation provider is called outside the storage-wide lock, so in
+        STRIPED mode slow reservation calls don't stall readers (in GLOBAL mode the
+        caller already holds the lock). With *striped*, the caller holds the request's
+        stripes and has checked that nothing blocks its container.
+
+        Returns the executed request, or None if its reservation failed and it was skipped.
+        """
+        # Reserve before unblocking — dest_loc is recorded in TransferRequestsData,
+        # so _unblock's reserved=False dest filter will naturally exclude it.
+        try:
+            request = request.acquire_reservations(self._reservation_provider)
+        except ReservationFailedError as e:
+            if isinstance(e.__cause__, RateLimitedError):
+                logger.error(
+                    f"Reservation rate-limited (retryAfter={e.__cause__.retry_after:.1f}s) — "
+                    f"abandoning transfer request batch"
+                )
+                raise
+            if isinstance(e.__cause__, AuthError):
+                logger.error(
+                    f"Reservation auth forbidden (status={e.__cause__.status_code}) — "
+                    f"abandoning transfer request batch"
+                )
+                raise
+
+            #TODO: Decide what to do with the transfer request. Options include:
+            # - Skip it and continue with the rest of the batch (current behavior)
+            # - Retry with exponential backoff until it succeeds or a max retry count is reached
+            # - Fail the entire batch immediately (probably not ideal)
+            # - Queue it for later processing by a background worker that handles retries
+
+            #for now, we'll just log the error and skip the request
+            logger.error(f"Reservation failed — skipping request: {e}")
+            return None
+
+        if striped:
+            return self._execute_transfer_request_striped(request)
+        return self._execute_transfer_request(request, unblock_dest_evaluator, unblocking)
+
+    def _execute_transfer_request(self,
+                                  request: TransferRequest,
+                                  unblock_dest_evaluator: Callable[[Location], float],
+                                  unblocking: set,
+                                  release_reservations: bool = True) -> TransferRequest:
+        """Record, unblock and execute a request whose reservations are already held.
+
+        With *release_reservations* False the caller releases them (see handle_transfer_request_batch).
+        """
+        with self._lock:
+            self._data_store.TransferRequestsData.add([request])
+            self._data_store.ContainersData.add_or_update(containers=[request.container])
+            self._publish_request_added(request)
+
+            if request.source_loc is not None:
+                unblocking.add(str(request.container.id))
+                self._unblock(request.container,
+                              request.source_loc,
+                              unblock_dest_evaluator,
+                              unblocking)
+                # Refresh source_loc — _unblock modifies the location in the data store
+                # (removes blockers); the snapshot captured before unblocking is stale.
+                src_id = request.source_loc.get_id()
+                request = replace(request, source_loc=self._data_store.LocationsData.get(ids=[src_id])[src_id])
+
+            if request.Ready:
+                self._handle_transfer_request(request, release_reservations=release_reservations)
+                self._data_store.TransferRequestsData.remove(requests=[request])
+                self._publish_request_completed(request)
+                if self._deletes_container(request):
+                    self._data_store.ContainersData.remove(containers=[request.container])
+                    pub.sendMessage(StorageTopic.CONTAINER_REMOVED.value,
+                                    payload={'id': str(request.container.id)})
+            else:
+                logger.error(f"Transfer request not ready: \n{pprint.pformat(request)}")
+                raise NotImplementedError()
+        return request
 
-                    #TODO: Decide what to do with the transfer request. Options include:
-                    # - Skip it and continue with the rest of the batch (current behavior)
-                    # - Retry with exponential backoff until it succeeds or a max retry count is reached
-                    # - Fail the entire batch immediately (probably not ideal)
-                    # - Queue it for later processing by a background worker that handles retries
+    def _execute_transfer_request_striped(self, request: TransferRequest) -> TransferRequest:
+        """_execute_transfer_request for a request whose stripes are held and whose
+        container is not blocked (see _handle_criteria_striped).
+
+        Only the data store and index updates take the storage-wide lock: the channels
+        are changed on detached copies under the stripes, and the reservations are
+        released after the lock is dropped.
+        """
+        with self._lock:
+            self._data_store.TransferRequestsData.add([request])
+            self._data_store.ContainersData.add_or_update(containers=[request.container])
+        self._publish_request_added(request)
+        if not request.Ready:
+            logger.error(f"Transfer request not ready: \n{pprint.pformat(request)}")
+            raise NotImplementedError()
+
+        updated_src, updated_dst = self._moved_locations(request, detached=True)
+        deletes = self._deletes_container(request)
+        with self._lock:
+            self._persist_transfer(updated_src, updated_dst)
+            self._data_store.TransferRequestsData.remove(requests=[request])
+            if deletes:
+                self._data_store.ContainersData.remove(containers=[request.container])
+
+        self._publish_transfer(request, updated_src, updated_dst)
+        self._release_transfer_reservations(request)
+        self._publish_request_completed(request)
+        if deletes:
+            pub.sendMessage(StorageTopic.CONTAINER_REMOVED.value, payload={'id': str(request.container.id)})
+        return request
+
+    @staticmethod
+    def _deletes_container(request: TransferRequest) -> bool:
+        dest_deletes = request.dest_loc is not None and request.dest_loc.Meta.delete_on_receive
+        return request.criteria.delete_container_on_transfer or dest_deletes
 
-                    #for now, we'll just log the error and skip the request
-                    logger.error(f"Reservation failed — skipping request: {e}")
+    @staticmethod
+    def _publish_request_added(request: TransferRequest):
+        pub.sendMessage(StorageTopic.TRANSFER_REQUEST_ADDED.value, payload={
+            'transfer_request_id': str(request.get_id()),
+            'container_id':        str(request.container.id),
+            'source_loc_id':       str(request.source_loc.Id) if request.source_loc else None,
+            'dest_loc_id':         str(request.dest_loc.Id)   if request.dest_loc   else None,
+        })
+
+    @staticmethod
+    def _publish_request_completed(request: TransferRequest):
+        pub.sendMessage(StorageTopic.TRANSFER_REQUEST_COMPLETED.value, payload={
+            'transfer_request_id': str(request.get_id()),
+        })
+
+    # ── batched transfers ─────────────────────────────────────────────────────
+
+    def handle_transfer_request_batch(self,
+                                      transfer_request_criteria: Iterable[TransferRequestCriteria],
+                                      dest_loc_evaluator: Callable[[Location], float] = None,
+                                      unblock_dest_evaluator: Optional[Callable[[Location], float]] = None,
+                                      container_evaluator: Optional[Callable[[dcs.Container], float]] = None
+                                      ) -> List[TransferResult]:
+        """Handle every criteria in one exclusive pass, returning one TransferResult per item, in order.
+
+        Consecutive new-container putaways are planned together: reserved ids are fetched
+        once, each distinct destination filter is scanned and scored once, and
+        destinations are assigned against the batch's own planned placements so no two
+        items are given the same slot. Their reservations are then acquired in a single
+        provider call. Moves and removals are handled one at a time, as by
+        handle_transfer_requests. Backends that support it persist the batch's
+        location updates together at the end.
+
+        A failing item is reported in its result; the rest of the batch still runs.
+        """
+        criteria = list(transfer_request_criteria)
+        _resolved_evaluator = unblock_dest_evaluator if unblock_dest_evaluator is not None else evaluators.random_score
+        results: List[TransferResult] = []
+        with self._gate.exclusive(), self._lock, self._data_store.LocationsData.batched_writes():
+            run: List[TransferRequestCriteria] = []
+            # Container-aware evaluators score each container separately, so can't share a pool
+            plan_putaways = not evaluators.is_container_aware(dest_loc_evaluator)
+            for item in criteria:
+                if plan_putaways and self._is_batch_putaway(item):
+                    run.append(item)
                     continue
-                self._data_store.TransferRequestsData.add([request])
-                self._data_store.ContainersData.add_or_update(containers=[request.container])
-                pub.sendMessage(StorageTopic.TRANSFER_REQUEST_ADDED.value, payload={
-                    'transfer_request_id': str(request.get_id()),
-                    'container_id':        str(request.container.id),
-                    'source_loc_id':       str(request.source_loc.Id) if request.source_loc else None,
-                    'dest_loc_id':         str(request.dest_loc.Id)   if request.dest_loc   else None,
-                })
-
-                if request.source_loc is not None:
-                    unblocking.add(str(request.container.id))
-                    self._unblock(request.container,
-                                  request.source_loc,
-                                  _resolved_evaluator,
-                                  unblocking)
-                    # Refresh source_loc — _unblock modifies the location in the data store
-                    # (removes blockers); the snapshot captured before unblocking is stale.
-                    src_id = request.source_loc.get_id()
-                    request = replace(request, source_loc=self._data_store.LocationsData.get(ids=[src_id])[src_id])
-
-                if request.Ready:
-                    self._handle_transfer_request(request)
-                    self._data_store.TransferRequestsData.remove(requests=[request])
-                    pub.sendMessage(StorageTopic.TRANSFER_REQUEST_COMPLETED.value, payload={
-                        'transfer_request_id': str(request.get_id()),
-                    })
-                    dest_deletes = request.dest_loc is not None and request.dest_loc.Meta.delete_on_receive
-                    if request.criteria.delete_container_on_transfer or dest_deletes:
-                        self._data_store.ContainersData.remove(containers=[request.container])
-                        pub.sendMessage(StorageTopic.CONTAINER_REMOVED.value,
-                                        payload={'id': str(request.container.id)})
-                else:
-                    logger.error(f"Transfer request not ready: \n{pprint.pformat(request)}")
-                    raise NotImplementedError()
+                results += self._handle_putaway_run(run, dest_loc_evaluator, _resolved_evaluator)
+                run = []
+                results.append(self._handle_batch_item(item, dest_loc_evaluator, _resolved_evaluator,
+                                                       container_evaluator))
+            results += self._handle_putaway_run(run, dest_loc_evaluator, _resolved_evaluator)
+        return results
+
+    @staticmethod
+    def _is_batch_putaway(criteria: TransferRequestCriteria) -> bool:
+        return (criteria.new_container is not None and
+                criteria.source_loc_query_args is None and
+                criteria.container_query_args is None)
+
+    def _handle_batch_item(self,
+                           criteria: TransferRequestCriteria,
+                           dest_loc_evaluator: Optional[Callable[[Location], float]],
+                           unblock_dest_evaluator: Callable[[Location], float],
+                           container_evaluator: Optional[Callable[[dcs.Container], float]]) -> TransferResult:
+        try:
+            request = self.resolve_transfer_request_criteria(
+                criteria=criteria,
+                dest_loc_evaluator=dest_loc_evaluator,
+                container_evaluator=container_evaluator
+            )
+            executed = self._process_transfer_request(request, unblock_dest_evaluator, set())
+        except Exception as e:
+            logger.error(f"Batch transfer failed: {e}")
+            return TransferResult(criteria=criteria, error=e)
+        if executed is None:
+            return TransferResult(criteria=criteria, request=request,
+                                  error=ReservationFailedError(f"Reservation failed for {request.get_id()}"))
+        return TransferResult(criteria=criteria, request=executed)
+
+    def _plan_putaways(self,
+                       criteria: List[TransferRequestCriteria],
+                       dest_loc_evaluator: Optional[Callable[[Location], float]]) -> List[TransferRequest | Exception]:
+        """Assign a destination to each putaway without touching the data store.
+
+        Planned placements are applied to detached copies of their locations, which
+        every pool then sees in place of the stored location.
+        """
+        planned: Dict[UniqueIdentifier, Location] = {}
+
+        def _current(loc_id: UniqueIdentifier) -> Optional[Location]:
+            loc = planned.get(loc_id)
+            return loc if loc is not None else self._data_store.LocationsData.get(ids=[loc_id]).get(loc_id)
+
+        reserved: Dict[str, set] = {}
+        pools: List[Tuple[Optional[qs.LocationQualifier], DestinationPool]] = []
+        ret: List[TransferRequest | Exception] = []
+        for item in criteria:
+            dest_filter = item.dest_loc_query_args
+            pool = next((p for f, p in pools if f == dest_filter), None)
+            if pool is None:
+                pool = DestinationPool(dest_filter, dest_loc_evaluator,
+                                       providers=self._qualifier_providers(dest_filter, reserved=reserved),
+                                       current=_current,
+                                       rank=self._data_store.LocationsData.CapacityIndex.rank)
+                pool.offer(_current(loc.Id) for loc in self._data_store.LocationsData.iter_candidates(dest_filter))
+                pools.append((dest_filter, pool))
+
+            dest = pool.take(item.new_container)
+            if dest is None:
+                ret.append(errs.NoLocationsMatchFilterCriteriaException(dest_filter))
+                continue
+
+            working = planned.get(dest.Id) or dest.copy()
+            planned[dest.Id] = working.store_containers([item.new_container.id])
+            for _, p in pools:
+                p.offer([working])
+            ret.append(TransferRequest(criteria=item, container=item.new_container,
+                                       dest_loc=self._data_store.LocationsData.get(ids=[dest.Id])[dest.Id]))
+        return ret
+
+    def _handle_putaway_run(self,
+                            criteria: List[TransferRequestCriteria],
+                            dest_loc_evaluator: Optional[Callable[[Location], float]],
+                            unblock_dest_evaluator: Callable[[Location], float]) -> List[TransferResult]:
+        if not criteria:
+            return []
+        planned = self._plan_putaways(criteria, dest_loc_evaluator)
+        requests = [p for p in planned if isinstance(p, TransferRequest)]
+        try:
+            requests = TransferRequest.acquire_reservations_many(requests, self._reservation_provider)
+            reservation_error = None
+        except ReservationFailedError as e:
+            logger.error(f"Bulk reservation failed — skipping {len(requests)} putaways: {e}")
+            reservation_error = e
+
+        results = []
+        reserved = iter(requests)
+        try:
+            for item, plan in zip(criteria, planned):
+                if isinstance(plan, Exception):
+                    results.append(TransferResult(criteria=item, error=plan))
+                    continue
+                request = next(reserved)
+                if reservation_error is not None:
+                    results.append(TransferResult(criteria=item, request=request, error=reservation_error))
+                    continue
+                if request.container_reservation_token is None or request.destination_reservation_token is None:
+                    results.append(TransferResult(criteria=item, request=request, error=ReservationFailedError(
+                        f"Reservation failed for {request.get_id()}")))
+                    continue
+                try:
+                    dst_id = request.dest_loc.Id
+                    request = replace(request, dest_loc=self._data_store.LocationsData.get(ids=[dst_id])[dst_id])
+                    results.append(TransferResult(criteria=item, request=self._execute_transfer_request(
+                        request, unblock_dest_evaluator, set(), release_reservations=False)))
+                except Exception as e:
+                    logger.error(f"Batch putaway failed: {e}")
+                    results.append(TransferResult(criteria=item, request=request, error=e))
+        finally:
+            if reservation_error is None:
+                TransferRequest.release_reservations_many(requests, self._reservation_provider)
+        return results
+
+    # ── STRIPED concurrency ───────────────────────────────────────────────────
+
+    @staticmethod
+    def _loc_key(loc_id: UniqueIdentifier) -> str:
+        return f"loc:{loc_id}"
+
+    @staticmethod
+    def _container_key(container_id: UniqueIdentifier) -> str:
+        return f"ctr:{container_id}"
+
+    @contextmanager
+    def _striped(self, keys: Iterable[str]):
+        """Hold the stripes for *keys* (STRIPED mode only; a no-op in GLOBAL mode).
+
+        Lock order is always gate → stripes → storage-wide lock.
+        """
+        if self._concurrency_mode != ConcurrencyMode.STRIPED:
+            yield
+            return
+        with self._gate.shared(), self._stripes.hold(keys):
+            yield
+
+    def _claim(self, loc_ids: Iterable[UniqueIdentifier], delta: int) -> None:
+        for loc_id in loc_ids:
+            n = self._claimed_loc_ids.get(loc_id, 0) + delta
+            if n > 0:
+                self._claimed_loc_ids[loc_id] = n
+            else:
+                self._claimed_loc_ids.pop(loc_id, None)
+
+    def _request_keys(self, request: TransferRequest) -> List[str]:
+        keys = [self._container_key(request.container.id)]
+        for loc in (request.source_loc, request.dest_loc):
+            if loc is not None:
+                keys.append(self._loc_key(loc.Id))
+        return keys
+
+    def _revalidate(self, request: TransferRequest) -> Optional[TransferRequest]:
+        """Re-read a request resolved before its stripes were held.
+
+        Returns the request with fresh source/dest/container snapshots, or None if a
+        concurrent transfer has invalidated it (container moved, dest no longer qualifies).
+        """
+        container = request.container
+        source = request.source_loc
+        if source is not None:
+            if self._data_store.LocationsData.ContainerIndex.get(container.id) != source.Id:
+                return None
+            source = self._data_store.LocationsData.get(ids=[source.Id])[source.Id]
+            container = self._data_store.ContainersData.get(ids=[container.id]).get(container.id, container)
+
+        dest = request.dest_loc
+        if dest is not None:
+            dest = self._data_store.LocationsData.get(ids=[dest.Id]).get(dest.Id)
+            if dest is None:
+                return None
+            dest_filter = request.criteria.dest_loc_query_args or qs.LocationQualifier()
+            if not dest_filter.compile(container=container, **self._qualifier_providers(dest_filter))(dest):
+                return None
+
+        return replace(request, container=container, source_loc=source, dest_loc=dest)
+
+    def _needs_unblock(self, request: TransferRequest) -> bool:
+        source = request.source_loc
+        if source is None:
+            return False
+        state = [source.ContainerPositions.get(i) for i in range(source.Capacity)]
+        return len(source.Meta.channel_processor.get_blocking_loads(request.container.id, state)) > 0
+
+    def _prefetch_reserved(self, criteria: TransferRequestCriteria) -> Dict[str, set]:
+        """The reserved-id sets resolving *criteria* will consult (see _qualifier_providers)."""
+        loc_filters = [f for f in (criteria.source_loc_query_args, criteria.dest_loc_query_args) if f is not None]
+        reserved = {}
+        if any(f.reserved is not None for f in loc_filters):
+            reserved['locations'] = self.get_reserved_location_ids()
+        if criteria.container_query_args is not None or any(
+                f.has_any_containers is not None or f.has_all_containers is not None for f in loc_filters):
+            reserved['containers'] = self.get_reserved_container_ids()
+        return reserved
+
+    @contextmanager
+    def _using_reserved(self, reserved: Dict[str, set]):
+        """Answer this thread's reserved-id lookups from *reserved* where it has them."""
+        self._prefetched.reserved = reserved
+        try:
+            yield
+        finally:
+            self._prefetched.reserved = None
+
+    def _reserved_ids(self, key: str) -> set:
+        """Reserved 'locations' or 'containers' ids, prefetched by this thread if available."""
+        prefetched = getattr(self._prefetched, 'reserved', None)
+        if prefetched is not None and key in prefetched:
+            return prefetched[key]
+        return self.get_reserved_location_ids() if key == 'locations' else self.get_reserved_container_ids()
+
+    def _handle_criteria_striped(self,
+                                 criteria: TransferRequestCriteria,
+                                 dest_loc_evaluator: Optional[Callable[[Location], float]],
+                                 unblock_dest_evaluator: Callable[[Location], float],
+                                 container_evaluator: Optional[Callable[[dcs.Container], float]],
+                                 unblocking: set) -> None:
+        """Resolve under the storage-wide lock, then run the transfer holding only the
+        stripes of its source, dest and container.
+
+        Reserved-id sets are fetched before the lock is taken, so the provider is never
+        called while it is held.
+
+        If a concurrent transfer keeps invalidating the resolution, or the container is
+        blocked and other containers must be moved first, the request falls back to an
+        exclusive hold and runs exactly as in GLOBAL mode.
+        """
+        for _ in range(_STRIPED_RESOLVE_ATTEMPTS):
+            reserved = self._prefetch_reserved(criteria)
+            with self._lock, self._using_reserved(reserved):
+                request = self.resolve_transfer_request_criteria(
+                    criteria=criteria,
+                    dest_loc_evaluator=dest_loc_evaluator,
+                    container_evaluator=container_evaluator
+                )
+                claimed = [loc.Id for loc in (request.source_loc, request.dest_loc) if loc is not None]
+                self._claim(claimed, 1)
+            try:
+                with self._striped(self._request_keys(request)):
+                    with self._lock, self._using_reserved(reserved):
+                        request = self._revalidate(request)
+                        if request is None:
+                            continue
+                        if self._needs_unblock(request):
+                            break
+                    self._process_transfer_request(request, unblock_dest_evaluator, unblocking, striped=True)
+                    return
+            finally:
+                with self._lock:
+                    self._claim(claimed, -1)
+
+        with self._gate.exclusive(), self._lock:
+            request = self.resolve_transfer_request_criteria(
+                criteria=criteria,
+                dest_loc_evaluator=dest_loc_evaluator,
+                container_evaluator=container_evaluator
+            )
+            self._process_transfer_request(request, unblock_dest_evaluator, unblocking)
 
     def clear_all(self) -> dict:
         """Remove all containers and locations, fire CONTAINER_REMOVED events,
@@ -515,7 +1260,7 @@ class Storage:
 
         Returns counts of what was cleared.
         """
-        with self._lock:
+        with self._gate.exclusive(), self._lock:
             all_containers = list(self._data_store.ContainersData.get().values())
             loc_count      = len(self._data_store.LocationsData.get())
             # Clear channel processors
@@ -540,11 +1285,12 @@ class Storage:
 
         Returns the number of containers cleared.
         """
-        with self._lock:
+        with self._gate.exclusive(), self._lock:
             all_containers = list(self._data_store.ContainersData.get().values())
             # Clear channel processors in every location
             for loc in self._data_store.LocationsData.iter_values():
                 loc.clear_containers()
+            self._data_store.LocationsData.reindex()
             # Wipe the data store
             self._data_store.ContainersData.clear()
             # Notify subscribers
@@ -554,21 +1300,95 @@ class Storage:
         logger.info("clear_containers: removed %d containers", len(all_containers))
         return len(all_containers)
 
+    def refresh_locations(self) -> Tuple[int, int]:
+        """Pull in location changes other processes made to a shared backend since the
+        last sync, without reloading the layout. Tree labels of changed locations are
+        re-registered in the LocationMapTree.
+
+        Returns (changed, removed) counts.
+        """
+        with self._gate.exclusive(), self._lock:
+            locs_data = self._data_store.LocationsData
+            changed, removed = locs_data.refresh()
+            for loc in changed:
+                labels = locs_data.get_tree_labels(loc.Id)
+                if labels:
+                    self._location_map_tree.register(loc.Id, **labels)
+        return len(changed), len(removed)
+
     @property
     def Containers(self) -> List[dcs.Container]:
         return list(self._data_store.ContainersData.get().values())
 
+    @property
+    def UnblockMoveCount(self) -> int:
+        """Relocation moves made to unblock retrievals since this storage was created."""
+        return self._unblock_moves
+
     @property
     def ContainerLocs(self) -> Dict[dcs.Container, Location]:
         with self._lock:
-            ret = {}
-            loc_map = self._data_store.LocationsData.get()
+            index = self._data_store.LocationsData.ContainerIndex
             container_map = self._data_store.ContainersData.get()
-            for _, loc in loc_map.items():
-                for container_id in loc.ContainerIds:
-                    if container_id in container_map:
-                        ret[container_map[container_id]] = loc
-            return ret
+            placed = {cid: index.get(cid) for cid in container_map}
+            placed = {cid: loc_id for cid, loc_id in placed.items() if loc_id is not None}
+            loc_map = self._data_store.LocationsData.get(ids=set(placed.values()))
+            return {container_map[cid]: loc_map[loc_id] for cid, loc_id in placed.items()}
+
+    @property
+    def ContainerLocIds(self) -> Dict[str, UniqueIdentifier]:
+        """{str(container_id): location_id} for every container currently stored at a location."""
+        with self._lock:
+            return self._data_store.LocationsData.ContainerIndex.items()
+
+    @property
+    def StoredContainerCount(self) -> int:
+        """Number of containers currently stored across all locations."""
+        with self._lock:
+            return len(self._data_store.LocationsData.ContainerIndex)
+
+    @property
+    def SnapshotVersion(self) -> int:
+        """Version of the next snapshot; a snapshot with a lower version is stale."""
+        return self._data_store.LocationsData.SnapshotVersion
+
+    def snapshot(self) -> LocationsSnapshot:
+        """Immutable, versioned view of every location's channel state.
+
+        Free when nothing has changed since the last call. Otherwise the pending
+        changes are folded in, unless a writer currently holds the storage lock, in
+        which case the last published version is returned rather than waiting. A
+        snapshot never reflects a half-applied transfer.
+
+        Writers republish after any transfer that finds the published snapshot more
+        than ``snapshot_max_age`` seconds old, so even during a long batch the result
+        lags by at most that long plus one transfer. Check ``age`` (seconds) or
+        compare ``version`` with SnapshotVersion to tell how stale it is.
+        """
+        locs_data = self._data_store.LocationsData
+        published = locs_data.PublishedSnapshot
+        if published.version == locs_data.SnapshotVersion:
+            return published
+        # Version 0 is the empty placeholder — wait for the first real snapshot
+        if not self._lock.acquire(blocking=published.version == 0):
+            return published
+        try:
+            return locs_data.snapshot()
+        finally:
+            self._lock.release()
+
+    def get_container_loc_id(self, container_id: UniqueIdentifier) -> Optional[UniqueIdentifier]:
+        """Id of the location currently holding *container_id*, or None if it is not stored."""
+        with self._lock:
+            return self._data_store.LocationsData.ContainerIndex.get(container_id)
+
+    def get_container_loc(self, container_id: UniqueIdentifier) -> Optional[Location]:
+        """The location currently holding *container_id*, or None if it is not stored."""
+        with self._lock:
+            loc_id = self._data_store.LocationsData.ContainerIndex.get(container_id)
+            if loc_id is None:
+                return None
+            return self._data_store.LocationsData.get(ids=[loc_id]).get(loc_id)
 
     @property
     def LocContainers(self) -> Dict[Location, List[dcs.Container]]:
@@ -607,17 +1427,18 @@ class Storage:
         """Return the set of container IDs that currently have an active reservation."""
         with self._lock:
             ids = [str(k) for k in self._data_store.ContainersData.get().keys()]
-            return self._reservation_provider.get_reserved_ids(ids)
+        # Provider may be remote — don't hold the storage lock across the call
+        return self._reservation_provider.get_reserved_ids(ids)
 
     def get_reserved_location_ids(self) -> set:
         """Return the set of location IDs that currently have an active reservation."""
         with self._lock:
             ids = [str(k) for k in self._data_store.LocationsData.get().keys()]
-            try:
-                return self._reservation_provider.get_reserved_ids(ids)
-            except ReservationCheckFailedError as e:
-                logger.warning(f"get_reserved_location_ids failed — returning empty set: {e}")
-                return set()
+        try:
+            return self._reservation_provider.get_reserved_ids(ids)
+        except ReservationCheckFailedError as e:
+            logger.warning(f"get_reserved_location_ids failed — returning empty set: {e}")
+            return set()
 
     def content_at_location(self, loc_id: UniqueIdentifier) -> List[dcs.ContainerContent]:
         """All ContainerContent across every container at a location, aggregated by (resource, uom)."""
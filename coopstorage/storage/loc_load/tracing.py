@@ -0,0 +1,123 @@
+"""
+Structured trace events for the channel, location and storage hot paths.
+
+Each subsystem has one Tracer. Call sites check its `enabled` flag before building
+anything, so a subsystem that is off costs one attribute read per event:
+
+    _trace = tracing.tracer(tracing.CHANNEL)
+    ...
+    if _trace.enabled:
+        _trace.emit('stored', channel=self._id, ids=ids, state=self.State)
+
+Event fields are kept as given and only rendered to text by a sink that needs text
+(LoggingTraceSink formats a record only if its logger would emit it).
+
+    sink = tracing.RecordingTraceSink()
+    tracing.enable(tracing.CHANNEL, tracing.LOCATION, sink=sink)
+    ...
+    tracing.disable()
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Protocol
+
+CHANNEL = 'channel'
+LOCATION = 'location'
+STORAGE = 'storage'
+SUBSYSTEMS = (CHANNEL, LOCATION, STORAGE)
+
+
+@dataclass(frozen=True, slots=True)
+class TraceEvent:
+    subsystem: str
+    event: str
+    fields: Dict[str, Any]
+    timestamp: float
+
+    def __str__(self):
+        return f"{self.subsystem}.{self.event} " + ' '.join(f"{k}={v!r}" for k, v in self.fields.items())
+
+
+class TraceSink(Protocol):
+    def emit(self, event: TraceEvent) -> None:
+        pass
+
+
+class RecordingTraceSink:
+    """Keeps the last *maxlen* events in memory (thread-safe append)."""
+
+    def __init__(self, maxlen: Optional[int] = 10_000):
+        self._events = deque(maxlen=maxlen)
+
+    def emit(self, event: TraceEvent) -> None:
+        self._events.append(event)
+
+    @property
+    def Events(self) -> List[TraceEvent]:
+        return list(self._events)
+
+    def clear(self):
+        self._events.clear()
+
+
+class LoggingTraceSink:
+    """Writes events to the `coopstorage.trace.<subsystem>` loggers at *level*; the
+    message is formatted only if the record is actually emitted."""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self._level = level
+        self._loggers = {s: logging.getLogger(f'coopstorage.trace.{s}') for s in SUBSYSTEMS}
+
+    def emit(self, event: TraceEvent) -> None:
+        self._loggers[event.subsystem].log(self._level, '%s', event)
+
+
+class Tracer:
+    __slots__ = ('subsystem', 'enabled', '_sink')
+
+    def __init__(self, subsystem: str):
+        self.subsystem = subsystem
+        self.enabled = False
+        self._sink: Optional[TraceSink] = None
+
+    def emit(self, event: str, **fields) -> None:
+        sink = self._sink
+        if sink is not None:
+            sink.emit(TraceEvent(self.subsystem, event, fields, time.time()))
+
+
+_TRACERS: Dict[str, Tracer] = {s: Tracer(s) for s in SUBSYSTEMS}
+_lock = threading.Lock()
+
+
+def tracer(subsystem: str) -> Tracer:
+    try:
+        return _TRACERS[subsystem]
+    except KeyError:
+        raise ValueError(f"Unknown trace subsystem {subsystem!r}; expected one of {SUBSYSTEMS}") from None
+
+
+def enable(*subsystems: str, sink: TraceSink) -> None:
+    """Send events of *subsystems* (all if none given) to *sink*."""
+    with _lock:
+        for s in subsystems or SUBSYSTEMS:
+            t = tracer(s)
+            t._sink = sink
+            t.enabled = True
+
+
+def disable(*subsystems: str) -> None:
+    """Stop tracing *subsystems* (all if none given)."""
+    with _lock:
+        for s in subsystems or SUBSYSTEMS:
+            t = tracer(s)
+            t.enabled = False
+            t._sink = None
+
+
+def is_enabled(subsystem: str) -> bool:
+    return tracer(subsystem).enabled
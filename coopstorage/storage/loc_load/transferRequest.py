@@ -4,8 +4,8 @@ import coopstorage.storage.loc_load.qualifiers as lq
 from coopstorage.storage.loc_load.location import Location
 import logging
 from pprint import pformat
-from typing import Callable, Optional, Self, Dict
-from coopstorage.storage.loc_load.reservation_provider import ReservationProvider, ReservationFailedError, RateLimitedError
+from typing import Callable, Optional, Self, Dict, List
+from coopstorage.storage.loc_load.reservation_provider import ReservationProvider, ReservationFailedError, RateLimitedError, reserve_many
 from pubsub import pub
 from coopstorage.enums import StorageTopic
 
@@ -56,7 +56,7 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
 
         raise ValueError(f"Unhandled Transfer Request \n{pformat(self)}")
 
-    def release_reservations(self, reservation_provider: ReservationProvider) -> None:
+    def release_reservations(self, reservation_provider: ReservationProvider, release_destination: bool = True) -> None:
         requester = str(self.get_id())
         if self.container_reservation_token is not None:
             try:
@@ -74,7 +74,7 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
                     f"Container unreserve returned False — skipping CONTAINER_UNRESERVED event: "
                     f"container={self.container.id} requester={requester}"
                 )
-        if self.destination_reservation_token is not None:
+        if release_destination and self.destination_reservation_token is not None:
             try:
                 released = reservation_provider.unreserve(str(self.dest_loc.Id), requester, token=self.destination_reservation_token)
             except ReservationFailedError as exc:
@@ -94,13 +94,13 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
     def acquire_reservations(self, reservation_provider: ReservationProvider) -> 'TransferRequest':
         requester = str(self.get_id())
         container_id = str(self.container.id)
-        logger.debug(f"Reserving container={container_id} requester={requester}")
+        logger.debug("Reserving container=%s requester=%s", container_id, requester)
 
         # Raises ReservationFailedError (with __cause__=RateLimitedError) on 429 threshold breach.
         # Returns None for normal denial (resource held by another requester).
         container_token = reservation_provider.reserve(container_id, requester, resource_type="container")
         if container_token is not None:
-            logger.debug(f"Container reservation OK: container={container_id} token={container_token}")
+            logger.debug("Container reservation OK: container=%s token=%s", container_id, container_token)
             pub.sendMessage(StorageTopic.CONTAINER_RESERVED.value, payload={
                 'container_id': container_id,
                 'transfer_request_id': requester,
@@ -115,7 +115,7 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
         dest_token = None
         if self.dest_loc is not None:
             dest_id = str(self.dest_loc.Id)
-            logger.debug(f"Reserving dest_loc={dest_id} requester={requester}")
+            logger.debug("Reserving dest_loc=%s requester=%s", dest_id, requester)
             try:
                 dest_token = reservation_provider.reserve(dest_id, requester, resource_type="location")
             except ReservationFailedError:
@@ -124,7 +124,7 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
                     reservation_provider.unreserve(container_id, requester, token=container_token)
                 raise
             if dest_token is not None:
-                logger.debug(f"Dest reservation OK: dest_loc={dest_id} token={dest_token}")
+                logger.debug("Dest reservation OK: dest_loc=%s token=%s", dest_id, dest_token)
                 pub.sendMessage(StorageTopic.LOCATION_RESERVED.value, payload={
                     'location_id': dest_id,
                     'transfer_request_id': requester,
@@ -142,6 +142,76 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
             destination_reservation_token=dest_token,
         )
 
+    @staticmethod
+    def _dest_holders(requests: List['TransferRequest']) -> Dict[str, str]:
+        """Destination id -> requester holding a batch's single reservation on it (its first request)."""
+        holders: Dict[str, str] = {}
+        for request in requests:
+            if request.dest_loc is not None:
+                holders.setdefault(str(request.dest_loc.Id), str(request.get_id()))
+        return holders
+
+    @staticmethod
+    def acquire_reservations_many(requests: List['TransferRequest'],
+                                  reservation_provider: ReservationProvider) -> List['TransferRequest']:
+        """Reserve the containers and destinations of a batch of requests in one provider call.
+
+        Each distinct destination is reserved once and its token shared by every request
+        sent there, so the batch must be released with release_reservations_many rather
+        than per request. A denied reservation leaves that token None.
+        """
+        holders = TransferRequest._dest_holders(requests)
+        asks = [(str(r.container.id), str(r.get_id()), "container") for r in requests]
+        asks += [(dest_id, requester, "location") for dest_id, requester in holders.items()]
+        tokens = reserve_many(reservation_provider, asks)
+        container_tokens = tokens[:len(requests)]
+        dest_tokens = dict(zip(holders, tokens[len(requests):]))
+
+        for dest_id, requester in holders.items():
+            if dest_tokens[dest_id] is not None:
+                pub.sendMessage(StorageTopic.LOCATION_RESERVED.value, payload={
+                    'location_id': dest_id,
+                    'transfer_request_id': requester,
+                })
+            else:
+                logger.warning(f"Dest reservation FAILED: dest_loc={dest_id} requester={requester}")
+
+        ret = []
+        for request, container_token in zip(requests, container_tokens):
+            requester = str(request.get_id())
+            if container_token is not None:
+                pub.sendMessage(StorageTopic.CONTAINER_RESERVED.value, payload={
+                    'container_id': str(request.container.id),
+                    'transfer_request_id': requester,
+                })
+            else:
+                logger.warning(f"Container reservation FAILED: container={request.container.id} requester={requester}")
+                pub.sendMessage(StorageTopic.RESERVATION_FAILED.value, payload={
+                    'transfer_request_id': requester,
+                    'failed_resource': 'container',
+                })
+
+            dest_token = None
+            if request.dest_loc is not None:
+                dest_token = dest_tokens[str(request.dest_loc.Id)]
+                if dest_token is None:
+                    pub.sendMessage(StorageTopic.RESERVATION_FAILED.value, payload={
+                        'transfer_request_id': requester,
+                        'failed_resource': 'destination',
+                    })
+            ret.append(replace(request, container_reservation_token=container_token,
+                               destination_reservation_token=dest_token))
+        return ret
+
+    @staticmethod
+    def release_reservations_many(requests: List['TransferRequest'],
+                                  reservation_provider: ReservationProvider) -> None:
+        """Release reservations taken by acquire_reservations_many, each shared destination once."""
+        holders = TransferRequest._dest_holders(requests)
+        for request in requests:
+            is_holder = request.dest_loc is not None and holders.get(str(request.dest_loc.Id)) == str(request.get_id())
+            request.release_reservations(reservation_provider, release_destination=is_holder)
+
     @property
     def Ready(self) -> bool:
         if self.container_reservation_token is None:
@@ -196,3 +266,15 @@ class TransferRequest(dcs.BaseIdentifiedDataClass):
             source_loc=Location.from_jsonable_dict(obj['source_loc']) if obj.get('source_loc') else None,
             dest_loc=Location.from_jsonable_dict(obj['dest_loc']) if obj.get('dest_loc') else None
         )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class TransferResult:
+    """Outcome of one item of Storage.handle_transfer_request_batch."""
+    criteria: TransferRequestCriteria
+    request: Optional[TransferRequest] = None
+    error: Optional[Exception] = None
+
+    @property
+    def Succeeded(self) -> bool:
+        return self.error is None
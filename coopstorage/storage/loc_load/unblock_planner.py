@@ -0,0 +1,226 @@
+"""
+Relocation plans for retrieving a container from deep in a FIFO/LIFO/OMNI channel.
+
+Storage.plan_unblock works out every blocker's destination in one pass before
+anything moves, and Storage executes the resulting UnblockPlan as one batch of
+transfers sharing a single reservation round trip. RetrievalCostModel lets source
+selection avoid needing a plan at all where it can.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import math
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.loc_load.location import Location
+from cooptools.protocols import UniqueIdentifier
+
+# What IChannelProcessor.process raises when a slot pattern can't take another
+# container, or can't give up the one asked for yet
+_ADD_ERRORS = (cps.NoRoomToAddException, cps.ItemBlockingToAddException)
+_REMOVE_ERRORS = (cps.ItemNotAccessibleToRemoveException,)
+
+# Simulation caches are keyed by processor type and slot pattern; deep lanes of many
+# processor types have more patterns than are worth keeping
+DEFAULT_CACHE_SIZE = 16384
+
+
+class _LruCache:
+    """Mapping capped at *maxsize* entries, evicting the least recently used."""
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key: Hashable) -> Any:
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class UnblockMove:
+    container: dcs.Container
+    source_loc_id: UniqueIdentifier
+    dest_loc_id: UniqueIdentifier
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class UnblockPlan:
+    """Moves, in execution order, that make *container_id* removable at *source_loc_id*."""
+    container_id: UniqueIdentifier
+    source_loc_id: UniqueIdentifier
+    moves: Tuple[UnblockMove, ...] = ()
+    # Containers at the chosen destinations that were accessible before the plan and aren't after it
+    newly_blocked: int = 0
+    compute_time_s: float = 0.0
+
+    @property
+    def MoveCount(self) -> int:
+        return len(self.moves)
+
+
+class BlockagePenalty:
+    """Penalty for storing one more container at a location: how many of the containers
+    already there it would block.
+
+    Only the occupied-slot pattern matters, so results are memoized per channel
+    processor type and pattern, keeping the *cache_size* most recently used.
+    """
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._cache = _LruCache(cache_size)
+
+    def __call__(self, loc: Location) -> int:
+        cp = loc.Meta.channel_processor
+        state = [loc.ContainerPositions.get(i) for i in range(loc.Capacity)]
+        key = (type(cp), tuple(x is not None for x in state))
+        if key not in self._cache:
+            self._cache[key] = self._newly_blocked(cp, key[1])
+        return self._cache[key]
+
+    @staticmethod
+    def _newly_blocked(cp, occupied: Tuple[bool, ...]) -> int:
+        # Slot indexes stand in for container ids; -1 is the added container
+        state: list[Optional[Hashable]] = [i if occ else None for i, occ in enumerate(occupied)]
+        before = set(cp.get_removeable_ids(state).values())
+        try:
+            after = set(cp.get_removeable_ids(list(cp.process(state, added=[-1]))).values())
+        except _ADD_ERRORS:
+            return len(occupied)
+        return len(before - after)
+
+
+class RetrievalCostModel:
+    """Relocation moves needed before each container of a location can be removed,
+    per IChannelProcessor.get_blocking_loads.
+
+    Blocking depends only on which slots are occupied, so each processor type and
+    occupied-slot pattern is simulated once and reused for every location sharing it.
+    Each simulation cache keeps the *cache_size* most recently used patterns.
+    """
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._blocking = _LruCache(cache_size)
+        self._after_add = _LruCache(cache_size)
+        self._after_remove = _LruCache(cache_size)
+
+    @staticmethod
+    def _pattern(loc: Location) -> Tuple[bool, ...]:
+        positions = loc.ContainerPositions
+        return tuple(positions.get(i) is not None for i in range(loc.Capacity))
+
+    def blocking_positions(self, cp, occupied: Tuple[bool, ...]) -> Tuple[Tuple[int, ...], ...]:
+        """For each slot, the slots whose containers must be moved first (empty for empty slots)."""
+        key = (type(cp), occupied)
+        if key not in self._blocking:
+            # Slot indexes stand in for container ids
+            state = [i if occ else None for i, occ in enumerate(occupied)]
+            self._blocking[key] = tuple(tuple(cp.get_blocking_loads(i, state)) if occ else ()
+                                        for i, occ in enumerate(occupied))
+        return self._blocking[key]
+
+    def after_add(self, cp, occupied: Tuple[bool, ...]) -> Optional[Tuple[Optional[int], ...]]:
+        """Where each slot's container ends up once one more is added: the new state as
+        old slot indexes, with -1 for the added container. None if nothing can be added."""
+        key = (type(cp), occupied)
+        if key not in self._after_add:
+            state = [i if occ else None for i, occ in enumerate(occupied)]
+            try:
+                self._after_add[key] = tuple(cp.process(state, added=[-1]))
+            except _ADD_ERRORS:
+                self._after_add[key] = None
+        return self._after_add[key]
+
+    def after_remove(self, cp, occupied: Tuple[bool, ...], position: int) -> Optional[Tuple[Optional[int], ...]]:
+        """The state, as old slot indexes, once the container in *position* is removed.
+        None if it can't be removed yet."""
+        key = (type(cp), occupied, position)
+        if key not in self._after_remove:
+            state = [i if occ else None for i, occ in enumerate(occupied)]
+            try:
+                self._after_remove[key] = tuple(cp.process(state, removed=[position]))
+            except _REMOVE_ERRORS:
+                self._after_remove[key] = None
+        return self._after_remove[key]
+
+    def position_costs(self, loc: Location) -> Tuple[Optional[int], ...]:
+        """Moves needed to retrieve the container in each slot (None for empty slots)."""
+        occupied = self._pattern(loc)
+        blocking = self.blocking_positions(loc.Meta.channel_processor, occupied)
+        return tuple(len(b) if occ else None for b, occ in zip(blocking, occupied))
+
+    def moves(self, loc: Location, container_id: UniqueIdentifier) -> int:
+        """Moves needed to retrieve *container_id* from *loc*."""
+        costs = self.position_costs(loc)
+        for position, cid in loc.ContainerPositions.items():
+            if cid == container_id:
+                return costs[position]
+        raise KeyError(container_id)
+
+    def expected_moves(self, cp, dwells: List[Optional[float]], occupied: Tuple[bool, ...]) -> float:
+        """Expected relocation moves to retrieve every container of a lane in dwell order.
+
+        Each (blocker, blocked) pair costs a move if the blocked container is expected
+        to leave first: 1 if its dwell is shorter, 0 if longer, 0.5 if either is unknown
+        or they are equal.
+        """
+        total = 0.0
+        for pos, blockers in enumerate(self.blocking_positions(cp, occupied)):
+            for blocker in blockers:
+                a, b = dwells[pos], dwells[blocker]
+                if a is None or b is None or a == b:
+                    total += 0.5
+                elif a < b:
+                    total += 1
+        return total
+
+    def added_moves(self,
+                    loc: Location,
+                    dwell: Optional[float],
+                    dwell_of: Callable[[UniqueIdentifier], Optional[float]]) -> float:
+        """Expected relocation moves added by storing one more container (of expected
+        *dwell*) at *loc*; infinite if it can't take one."""
+        cp = loc.Meta.channel_processor
+        occupied = self._pattern(loc)
+        after = self.after_add(cp, occupied)
+        if after is None:
+            return math.inf
+        if not any(occupied):
+            return 0.0
+        positions = loc.ContainerPositions
+        dwells = [dwell_of(positions[i]) if occ else None for i, occ in enumerate(occupied)]
+        after_dwells = [None if x is None else dwell if x == -1 else dwells[x] for x in after]
+        added = (self.expected_moves(cp, after_dwells, tuple(x is not None for x in after)) -
+                 self.expected_moves(cp, dwells, occupied))
+        return max(0.0, added)
+
+    def removed_moves(self,
+                      loc: Location,
+                      container_id: UniqueIdentifier,
+                      dwell_of: Callable[[UniqueIdentifier], Optional[float]]) -> float:
+        """Expected relocation moves saved at *loc* by taking *container_id* out; 0 if
+        it can't be removed yet."""
+        cp = loc.Meta.channel_processor
+        occupied = self._pattern(loc)
+        positions = loc.ContainerPositions
+        position = next((p for p, cid in positions.items() if cid == container_id), None)
+        after = self.after_remove(cp, occupied, position) if position is not None else None
+        if after is None:
+            return 0.0
+        dwells = [dwell_of(positions[i]) if occ else None for i, occ in enumerate(occupied)]
+        after_dwells = [None if x is None else dwells[x] for x in after]
+        return max(0.0, self.expected_moves(cp, dwells, occupied) -
+                   self.expected_moves(cp, after_dwells, tuple(x is not None for x in after)))
+
+    def __len__(self) -> int:
+        return len(self._blocking)
@@ -10,6 +10,7 @@ from cooptools.geometry_utils import vector_utils as vec
 import coopstorage.storage.loc_load.dcs as dcs
 from coopstorage.storage.loc_load.storage import Storage
 from coopstorage.storage.loc_load.reservation_provider import ReservationProvider
+from coopstorage.enums import ConcurrencyMode
 import coopstorage.storage.loc_load.channel_processors as cps
 from coopstorage.location_map_tree import LocationMapTree
 import math
@@ -169,6 +170,7 @@ def build_all_processor_storage(
     location_capacity: int = 5,
     loc_spacing: float = 15.0,
     reservation_provider: ReservationProvider = None,
+    concurrency_mode: ConcurrencyMode = ConcurrencyMode.GLOBAL,
 ) -> Storage:
     """Build a Storage with N locations per channel processor type, arranged in
     parallel rows — one row per processor type."""
@@ -186,7 +188,8 @@ def build_all_processor_storage(
         for type_idx, cp in enumerate(cps.ChannelProcessorType)
         for i in range(locs_per_type)
     ]
-    return Storage(locs=locations, reservation_provider=reservation_provider)
+    return Storage(locs=locations, reservation_provider=reservation_provider,
+                   concurrency_mode=concurrency_mode)
 
 
 def build_showcase_storage(
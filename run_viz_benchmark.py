@@ -55,6 +55,7 @@ from dataclasses import replace
 from coopstorage.viz_helper import start_visualizer
 from coopstorage.storage.loc_load.reservation_provider import (
     ApiKeyReservationProvider,
+    CachingReservationProvider,
     JwtExchangeReservationProvider,
 )
 from coopstorage.storage.layout_manager import sqlite_layout_manager
@@ -94,6 +95,8 @@ def main():
                         help="Auth mode for the reservation API: jwt (default) or apikey")
     parser.add_argument("--latency-warning", type=int, default=1000, metavar="MS",
                         help="Warn if reservation API response exceeds this threshold in ms (default: 1000)")
+    parser.add_argument("--reservation-cache-ttl", type=float, default=None, metavar="SECONDS",
+                        help="Cache reservation checks for this many seconds (default: no cache)")
     args = parser.parse_args()
 
     if args.reservation_url and not args.api_key:
@@ -105,6 +108,8 @@ def main():
             reservation_provider = JwtExchangeReservationProvider(args.reservation_url, args.api_key, slow_threshold=slow_threshold)
         else:
             reservation_provider = ApiKeyReservationProvider(args.reservation_url, args.api_key, slow_threshold=slow_threshold)
+        if args.reservation_cache_ttl is not None:
+            reservation_provider = CachingReservationProvider(reservation_provider, ttl=args.reservation_cache_ttl)
     else:
         reservation_provider = None
 
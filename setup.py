@@ -8,6 +8,7 @@ with open(HERE / 'README.md') as f:
 
 CORE_REQUIRES = [
     'cooptools>=1.57',
+    'numpy',
     'PyPubSub',
     'requests',
 ]
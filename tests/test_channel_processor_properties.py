@@ -0,0 +1,229 @@
+"""
+Property tests for channel_processors.py
+
+Checks get_removable_positions, get_addable_positions, get_removeable_ids,
+get_blocking_loads and multi-item process() of all 14 processor types against
+reference implementations (the original scan-based and one-item-at-a-time
+versions) over random states, flowed and unflowed.
+"""
+import random
+import unittest
+from typing import Dict, Hashable, List, Optional
+
+import coopstorage.storage.loc_load.channel_processors as cps
+
+_PROCESSORS = [
+    cps.AllAvailableChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+    cps.AllAvailableFlowBackwardChannelProcessor, cps.FIFOFlowChannelProcessor,
+    cps.FIFOFlowBackwardChannelProcessor, cps.LIFOFlowChannelProcessor,
+    cps.LIFOFlowBackwardChannelProcessor, cps.FIFONoFlowChannelProcessor,
+    cps.LIFONoFlowChannelProcessor, cps.FIFONoFlowPushChannelProcessor,
+    cps.LIFONoFlowPushChannelProcessor, cps.OMNIChannelProcessor,
+    cps.OMNIFlowChannelProcessor, cps.OMNIFlowBackwardChannelProcessor,
+]
+
+
+# ── reference implementations ─────────────────────────────────────────────────
+
+def _ref_removable(cls, state: List[Optional[Hashable]]) -> List[int]:
+    idxs = [ii for ii, x in enumerate(state) if x is not None]
+    if not idxs:
+        return []
+    if cls in (cps.AllAvailableChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+               cps.AllAvailableFlowBackwardChannelProcessor):
+        return idxs
+    if cls in (cps.OMNIChannelProcessor, cps.OMNIFlowChannelProcessor, cps.OMNIFlowBackwardChannelProcessor):
+        return list(set([min(idxs), max(idxs)]))
+    if cls.__name__.startswith('FIFO'):
+        return [max(idxs)]
+    return [min(idxs)]
+
+
+def _ref_addable(cls, state: List[Optional[Hashable]]) -> List[int]:
+    if cls in (cps.AllAvailableChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+               cps.AllAvailableFlowBackwardChannelProcessor):
+        return [ii for ii, x in enumerate(state) if x is None]
+    if cls in (cps.FIFOFlowChannelProcessor, cps.LIFOFlowChannelProcessor):
+        return [0] if state[0] is None else []
+    if cls._allow_push and cls not in (cps.OMNIFlowBackwardChannelProcessor,):
+        return [0] if any(x is None for x in state) else []
+
+    left_add = None
+    for i, x in enumerate(state):
+        if x is None:
+            left_add = i
+        else:
+            break
+    positions = [left_add] if left_add is not None else []
+    if cls in (cps.FIFONoFlowChannelProcessor, cps.LIFONoFlowChannelProcessor):
+        return positions
+
+    right_add = None
+    for i in range(len(state) - 1, -1, -1):
+        if state[i] is None:
+            right_add = i
+        else:
+            break
+    if right_add is not None and right_add not in positions:
+        positions.append(right_add)
+    return positions
+
+
+def _ref_blocking(cls, container_id: Hashable, state: List[Optional[Hashable]]) -> Dict[Hashable, int]:
+    """Simulate removing accessible containers one at a time until the target is accessible."""
+    state = list(state)
+    if container_id not in state:
+        return {}
+    blockers = {}
+    for _ in range(len(state)):
+        removable = _ref_removable(cls, state)
+        if not removable:
+            break
+        target_pos = state.index(container_id)
+        if target_pos in removable:
+            break
+        chosen = cls._next_blocker_position(removable, target_pos, state)
+        blockers[state[chosen]] = chosen
+        state[chosen] = None
+        state = list(cls.post_process(state))
+    return blockers
+
+
+def _ref_process(cls, state, added=None, removed=None):
+    """One item at a time, re-running post_process after each."""
+    state = list(state)
+    for item in removed or []:
+        cls.verify_removable(item, state)
+        state[state.index(item)] = None
+        state = list(cls.post_process(state))
+    for item in added or []:
+        addable = cls.get_addable_positions(state)
+        idx = addable[0] if addable else None
+        if idx is None or (not cls._allow_push and len([x for x in state if x is not None]) + 1 > len(state)):
+            raise cps.NoRoomToAddException(channel_processor=cls, requested=item, state=state)
+        if state[idx] is not None and state[idx] != item and not cls._allow_push:
+            raise cps.ItemBlockingToAddException(channel_processor=cls, requested=item, pos=idx, state=state)
+        if cls._allow_push and state[idx] is not None:
+            state.insert(idx, item)
+            state = state[:-1]
+        else:
+            state[idx] = item
+        state = list(cls.post_process(state))
+    return state
+
+
+def _outcome(fn):
+    try:
+        return fn()
+    except Exception as e:
+        return type(e)
+
+
+def _random_state(rng: random.Random, capacity: int, flowed_by=None) -> List[Optional[str]]:
+    state = [f'c{ii}' if rng.random() < rng.random() else None for ii in range(capacity)]
+    return list(flowed_by.post_process(state)) if flowed_by is not None else state
+
+
+# ── properties ────────────────────────────────────────────────────────────────
+
+class TestPositionsMatchReference(unittest.TestCase):
+
+    def _states(self, cls):
+        rng = random.Random(cls.__name__)
+        for _ in range(300):
+            capacity = rng.randint(1, 10)
+            yield _random_state(rng, capacity)
+            yield _random_state(rng, capacity, flowed_by=cls)
+
+    def test_removable_positions(self):
+        for cls in _PROCESSORS:
+            for state in self._states(cls):
+                self.assertEqual(cls.get_removable_positions(state), _ref_removable(cls, state),
+                                 f"{cls.__name__} {state}")
+
+    def test_removable_ids(self):
+        for cls in _PROCESSORS:
+            for state in self._states(cls):
+                self.assertEqual(cls.get_removeable_ids(state),
+                                 {ii: state[ii] for ii in _ref_removable(cls, state)}, f"{cls.__name__} {state}")
+
+    def test_addable_positions(self):
+        for cls in _PROCESSORS:
+            for state in self._states(cls):
+                self.assertEqual(cls.get_addable_positions(state), _ref_addable(cls, state),
+                                 f"{cls.__name__} {state}")
+
+    def test_tuple_states(self):
+        for cls in _PROCESSORS:
+            for state in self._states(cls):
+                self.assertEqual(cls.get_removable_positions(tuple(state)), cls.get_removable_positions(state))
+                self.assertEqual(cls.get_addable_positions(tuple(state)), cls.get_addable_positions(state))
+
+
+class TestBlockingLoadsMatchReference(unittest.TestCase):
+
+    def test_every_container_of_random_states(self):
+        for cls in _PROCESSORS:
+            rng = random.Random(cls.__name__)
+            for _ in range(300):
+                capacity = rng.randint(1, 10)
+                for state in (_random_state(rng, capacity), _random_state(rng, capacity, flowed_by=cls)):
+                    for cid in [x for x in state if x is not None] + ['absent']:
+                        self.assertEqual(list(cls.get_blocking_loads(cid, state).items()),
+                                         list(_ref_blocking(cls, cid, state).items()),
+                                         f"{cls.__name__} {cid} {state}")
+
+    def test_state_is_not_mutated(self):
+        state = [None, 'a', 'b', 'c']
+        for cls in _PROCESSORS:
+            cls.get_blocking_loads('a', state)
+            cls.get_blocking_loads('c', state)
+            self.assertEqual(state, [None, 'a', 'b', 'c'])
+
+
+class TestBatchProcessMatchesReference(unittest.TestCase):
+
+    def test_random_batches(self):
+        for cls in _PROCESSORS:
+            rng = random.Random(cls.__name__)
+            for trial in range(400):
+                capacity = rng.randint(1, 8)
+                state = _random_state(rng, capacity, flowed_by=cls if rng.random() < 0.7 else None)
+                stored = [x for x in state if x is not None]
+                if stored and rng.random() < 0.5:
+                    # Mostly a valid removal order, sometimes shuffled or with an unknown id
+                    k = rng.randint(1, len(stored))
+                    removed = cls.removal_order(state)[:k]
+                    if rng.random() < 0.3:
+                        rng.shuffle(removed)
+                    if rng.random() < 0.1:
+                        removed.append('absent')
+                    kwargs = dict(removed=removed)
+                else:
+                    kwargs = dict(added=[f'n{ii}' for ii in range(rng.randint(1, capacity))])
+                expected = _outcome(lambda: _ref_process(cls, state, **kwargs))
+                before = list(state)
+                self.assertEqual(_outcome(lambda: list(cls.process(state, **kwargs))), expected,
+                                 f"{cls.__name__} {state} {kwargs}")
+                self.assertEqual(state, before)
+
+    def test_removal_order_empties_channel(self):
+        for cls in _PROCESSORS:
+            rng = random.Random(cls.__name__)
+            for _ in range(100):
+                state = _random_state(rng, rng.randint(1, 8), flowed_by=cls)
+                self.assertEqual(_ref_process(cls, state, removed=cls.removal_order(state)), [None] * len(state))
+
+
+class TestDuplicateValues(unittest.TestCase):
+    """Positions are by slot, not by value, so repeated values don't collapse to their first slot."""
+
+    def test_fifo_removable_is_deepest_slot(self):
+        self.assertEqual(cps.FIFONoFlowChannelProcessor.get_removable_positions(['x', None, 'x']), [2])
+
+    def test_lifo_removable_is_shallowest_slot(self):
+        self.assertEqual(cps.LIFONoFlowChannelProcessor.get_removable_positions([None, 'x', 'x']), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
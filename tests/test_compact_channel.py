@@ -0,0 +1,144 @@
+"""
+Tests for compact_channel.py
+
+Covers:
+- SlotArena block allocation and reuse
+- CompactChannel matches Channel (state, addable/removable positions, exceptions) over
+  random add/remove sequences for every built-in channel processor
+- All-or-nothing multi-item adds, fallback for unknown processors
+- Storage(compact_channels=True) end to end
+"""
+import random
+import unittest
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.loc_load.channel import Channel
+from coopstorage.storage.loc_load.compact_channel import CompactChannel, SlotArena
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import ContainerQualifier, LocationQualifier
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from cooptools.qualifiers import PatternMatchQualifier
+
+_PROCESSORS = [
+    cps.AllAvailableChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+    cps.AllAvailableFlowBackwardChannelProcessor, cps.FIFOFlowChannelProcessor,
+    cps.FIFOFlowBackwardChannelProcessor, cps.LIFOFlowChannelProcessor,
+    cps.LIFOFlowBackwardChannelProcessor, cps.FIFONoFlowChannelProcessor,
+    cps.LIFONoFlowChannelProcessor, cps.FIFONoFlowPushChannelProcessor,
+    cps.LIFONoFlowPushChannelProcessor, cps.OMNIChannelProcessor,
+    cps.OMNIFlowChannelProcessor, cps.OMNIFlowBackwardChannelProcessor,
+]
+
+
+def _outcome(fn):
+    try:
+        fn()
+        return None
+    except Exception as e:
+        return type(e)
+
+
+class TestSlotArena(unittest.TestCase):
+
+    def test_channels_get_disjoint_blocks(self):
+        arena = SlotArena()
+        a = CompactChannel(cps.LIFOFlowChannelProcessor(), arena, capacity=3).store(['a'])
+        b = CompactChannel(cps.LIFOFlowChannelProcessor(), arena, capacity=2).store(['b'])
+        self.assertEqual((a.State, b.State), ([None, None, 'a'], [None, 'b']))
+        self.assertEqual(len(arena), 5)
+
+    def test_collected_channel_block_is_reused_empty(self):
+        arena = SlotArena()
+        compact = CompactChannel(cps.LIFOFlowChannelProcessor(), arena, capacity=3, init_state={2: 'a'})
+        base = compact._base
+        del compact
+        self.assertEqual(len(arena), 0)
+        reused = CompactChannel(cps.LIFOFlowChannelProcessor(), arena, capacity=3)
+        self.assertEqual(reused._base, base)
+        self.assertEqual(reused.State, [None, None, None])
+
+
+class TestCompactChannelMatchesChannel(unittest.TestCase):
+
+    def _check_same(self, compact, channel, msg):
+        self.assertEqual(compact.State, channel.State, msg)
+        self.assertEqual(compact.get_addable_positions(), channel.get_addable_positions(), msg)
+        self.assertEqual(compact.get_removable_positions(), channel.get_removable_positions(), msg)
+        self.assertEqual(compact.get_removable_ids(), channel.get_removable_ids(), msg)
+
+    def test_random_sequences(self):
+        rng = random.Random(3)
+        for processor_type in _PROCESSORS:
+            for capacity in (1, 2, 5):
+                compact = CompactChannel(processor_type(), SlotArena(), capacity=capacity)
+                channel = Channel(processor_type(), capacity=capacity)
+                # Built-in processors must take the counter-based path, not the fallback
+                self.assertIsNotNone(compact._kernel, processor_type.__name__)
+                next_id = 0
+                for step in range(200):
+                    msg = f"{processor_type.__name__} cap={capacity} step={step} {channel.State}"
+                    stored = channel.StoredIds
+                    if stored and rng.random() < 0.5:
+                        # Mostly accessible ids, sometimes blocked or unknown ones
+                        pool = list(channel.get_removable_ids().values()) if rng.random() < 0.7 else stored + ['zz']
+                        ids = [rng.choice(pool)]
+                        expected = _outcome(lambda: channel.remove(ids))
+                        self.assertEqual(_outcome(lambda: compact.remove(ids)), expected, msg)
+                    else:
+                        ids = [f'c{next_id + i}' for i in range(rng.choice((1, 1, 2)))]
+                        next_id += len(ids)
+                        expected = _outcome(lambda: channel.store(ids))
+                        self.assertEqual(_outcome(lambda: compact.store(ids)), expected, msg)
+                    self._check_same(compact, channel, msg)
+
+    def test_failed_multi_add_changes_nothing(self):
+        compact = CompactChannel(cps.LIFOFlowChannelProcessor(), SlotArena(), capacity=3)
+        compact.store(['a'])
+        with self.assertRaises(cps.NoRoomToAddException):
+            compact.store(['b', 'c', 'd'])
+        self.assertEqual(compact.State, [None, None, 'a'])
+        compact.store(['b', 'c'])
+        self.assertEqual(compact.State, ['c', 'b', 'a'])
+
+    def test_unknown_processor_falls_back(self):
+        class _Custom(cps.LIFOFlowChannelProcessor):
+            pass
+        compact = CompactChannel(_Custom(), SlotArena(), capacity=3)
+        channel = Channel(_Custom(), capacity=3)
+        for c in (compact, channel):
+            c.store(['a', 'b']).remove(['b'])
+        self._check_same(compact, channel, 'custom')
+
+    def test_clear_empties_slots(self):
+        compact = CompactChannel(cps.FIFOFlowChannelProcessor(), SlotArena(), capacity=4, init_state={2: 'b', 3: 'a'})
+        compact.clear()
+        self.assertEqual(compact.StoredIds, [])
+        self.assertEqual(compact.get_addable_positions(), [0])
+
+
+class TestCompactStorage(unittest.TestCase):
+
+    def test_transfers_with_compact_channels(self):
+        s = Storage(compact_channels=True)
+        meta = dcs.LocationMeta(dims=(3000, 1000, 1000), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=3)
+        s.register_locs([Location(id=loc_id, coords=(0, 0, 0), location_meta=meta) for loc_id in ('A', 'B')])
+        for cid in ('C0', 'C1', 'C2'):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                new_container=dcs.Container(id=cid),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='A')))])
+        self.assertEqual(s.get_locs()['A'].ContainerPositions, {0: 'C2', 1: 'C1', 2: 'C0'})
+
+        # Retrieving the deepest container unblocks the other two into B
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C0')),
+            delete_container_on_transfer=True)])
+        self.assertEqual(s.get_locs()['A'].ContainerIds, [])
+        self.assertEqual(sorted(s.get_locs()['B'].ContainerIds), ['C1', 'C2'])
+        # Both locations' slots live in the store's arena
+        self.assertEqual(len(s._data_store.LocationsData.Arena), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
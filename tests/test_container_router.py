@@ -0,0 +1,34 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.api.routers.v1.container_router import container_router_factory
+from coopstorage.storage.loc_load.storage import Storage
+
+
+def _client(storage: Storage) -> TestClient:
+    app = FastAPI()
+    app.include_router(container_router_factory(storage))
+    return TestClient(app, raise_server_exceptions=True)
+
+
+class TestPutContainers(unittest.TestCase):
+
+    def test_named_uom_is_shared(self):
+        s = Storage()
+        resp = _client(s).put('/containers', json={'containers': [{'id': 'C1', 'uom': 'CS'}, {'id': 'C2', 'uom': 'CS'}]})
+        self.assertEqual(resp.status_code, 200)
+        containers = s.get_containers()
+        self.assertIs(containers['C1'].uom, dcs.unit_of_measure('CS'))
+        self.assertIs(containers['C2'].uom, containers['C1'].uom)
+
+    def test_missing_uom_uses_default(self):
+        s = Storage()
+        _client(s).put('/containers', json={'containers': [{'id': 'C1'}]})
+        self.assertIs(s.get_containers()['C1'].uom, dcs.Container(id='X').uom)
+
+
+if __name__ == '__main__':
+    unittest.main()
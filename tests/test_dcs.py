@@ -0,0 +1,69 @@
+"""
+Tests for dcs.py
+
+Covers:
+- InternPool returns one shared instance per distinct value
+- Named UnitOfMeasure / Resource lookups and the shared container defaults
+- LocationMetas rebuilt from SQL rows are shared
+"""
+import unittest
+from types import SimpleNamespace
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+
+
+def _row(loc_id):
+    return SimpleNamespace(id=loc_id, slots=[None, 'C1'], dim_x=10.0, dim_y=10.0, dim_z=10.0,
+                           processor_type='FIFOFlowChannelProcessor', capacity=2, channel_axis=0,
+                           delete_on_receive=False, x=0.0, y=0.0, z=0.0)
+
+
+class TestInternPool(unittest.TestCase):
+
+    def test_equal_values_share_an_instance(self):
+        pool = dcs.InternPool()
+        a = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.ChannelProcessorType.FIFOFlowChannelProcessor.value)
+        b = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.ChannelProcessorType.FIFOFlowChannelProcessor.value)
+        self.assertIsNot(a, b)
+        self.assertIs(pool.intern(a), a)
+        self.assertIs(pool.intern(b), a)
+        self.assertEqual(len(pool), 1)
+
+    def test_unhashable_value_returned_as_given(self):
+        pool = dcs.InternPool()
+        meta = dcs.LocationMeta(dims=[10, 10, 10])
+        self.assertIs(pool.intern(meta), meta)
+        self.assertEqual(len(pool), 0)
+
+
+class TestNamedFlyweights(unittest.TestCase):
+
+    def test_unit_of_measure(self):
+        self.assertIs(dcs.unit_of_measure('CS', (2, 2, 2)), dcs.unit_of_measure('CS', [2, 2, 2]))
+        self.assertIsNot(dcs.unit_of_measure('CS', (2, 2, 2)), dcs.unit_of_measure('CS', (3, 3, 3)))
+        self.assertEqual(dcs.unit_of_measure('CS', (3, 3, 3)).dimensions, (3, 3, 3))
+
+    def test_resource(self):
+        self.assertIs(dcs.resource('SKU-A'), dcs.resource('SKU-A'))
+        self.assertIsNot(dcs.resource('SKU-A'), dcs.resource('SKU-B'))
+
+    def test_container_defaults_are_shared(self):
+        a, b = dcs.Container(id='A'), dcs.Container(id='B')
+        self.assertIs(a.uom, b.uom)
+        self.assertIs(a.contents, b.uom_capacities)
+        self.assertEqual((a.uom.name, a.uom.dimensions), ('EA', (1, 1, 1)))
+
+
+class TestSqlRowsShareMeta(unittest.TestCase):
+
+    def test_row_to_location(self):
+        a = SqlLocationDataStore._row_to_location(_row('A'))
+        b = SqlLocationDataStore._row_to_location(_row('B'))
+        self.assertIs(a.Meta, b.Meta)
+        self.assertEqual(b.ContainerIds, ['C1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
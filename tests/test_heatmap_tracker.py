@@ -59,6 +59,18 @@ class TestHeatmapTrackerGetCounts(unittest.TestCase):
         ]
         self.assertEqual(tracker.get_counts(end=end)['location']['loc1'], 2)
 
+    def test_get_container_counts_counts_load_records_per_container(self):
+        now = datetime.now(timezone.utc)
+        tracker = self._make_tracker()
+        tracker._records = [
+            HeatmapRecord('loc1', 'load',     now, container_id='c1'),
+            HeatmapRecord('loc2', 'load',     now, container_id='c1'),
+            HeatmapRecord('loc1', 'load',     now - timedelta(minutes=10), container_id='c2'),
+            HeatmapRecord('loc1', 'location', now),
+        ]
+        self.assertEqual(tracker.get_container_counts(), {'c1': 2, 'c2': 1})
+        self.assertEqual(tracker.get_container_counts(start=now - timedelta(minutes=5)), {'c1': 2})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for lane_matrix.py
+
+Covers:
+- Replaying random add/retrieve batches matches Channel op for op (status and state)
+  for every built-in channel processor, including repeated lanes within a batch
+- Blocking moves match IChannelProcessor.get_blocking_loads
+- Seeding from a live Storage, unknown processors, stats
+"""
+import random
+import unittest
+
+import numpy as np
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.lane_matrix import LaneMatrix, OK, NO_ROOM, NOT_FOUND, BLOCKED
+from coopstorage.storage.loc_load.channel import Channel
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import LocationQualifier
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from cooptools.qualifiers import PatternMatchQualifier
+
+_PROCESSORS = [
+    cps.AllAvailableChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+    cps.AllAvailableFlowBackwardChannelProcessor, cps.FIFOFlowChannelProcessor,
+    cps.FIFOFlowBackwardChannelProcessor, cps.LIFOFlowChannelProcessor,
+    cps.LIFOFlowBackwardChannelProcessor, cps.FIFONoFlowChannelProcessor,
+    cps.LIFONoFlowChannelProcessor, cps.FIFONoFlowPushChannelProcessor,
+    cps.LIFONoFlowPushChannelProcessor, cps.OMNIChannelProcessor,
+    cps.OMNIFlowChannelProcessor, cps.OMNIFlowBackwardChannelProcessor,
+]
+
+
+def _channel_status(channel: Channel, is_add: bool, cid: str) -> int:
+    try:
+        if is_add:
+            channel.store([cid])
+        else:
+            channel.remove([cid])
+        return OK
+    except (cps.NoRoomToAddException, cps.ItemBlockingToAddException):
+        return NO_ROOM
+    except cps.ItemNotFoundToRemoveException:
+        return NOT_FOUND
+    except cps.ItemNotAccessibleToRemoveException:
+        return BLOCKED
+
+
+class TestLaneMatrixMatchesChannel(unittest.TestCase):
+
+    def test_random_batches(self):
+        rng = random.Random(7)
+        processors = [p for p in _PROCESSORS for _ in range(3)]
+        capacities = [rng.randint(1, 6) for _ in processors]
+        matrix = LaneMatrix(processors, capacities)
+        channels = [Channel(p(), capacity=c) for p, c in zip(processors, capacities)]
+        next_id = 0
+
+        for batch in range(60):
+            ops = []
+            for _ in range(rng.randint(1, 80)):
+                lane = rng.randrange(len(channels))
+                stored = channels[lane].StoredIds
+                if stored and rng.random() < 0.45:
+                    ops.append((False, lane, rng.choice(stored + ['absent'])))
+                else:
+                    ops.append((True, lane, f'c{next_id}'))
+                    next_id += 1
+
+            expected = [_channel_status(channels[lane], is_add, cid) for is_add, lane, cid in ops]
+            status = matrix.apply([o[0] for o in ops], [o[1] for o in ops], matrix.encode(o[2] for o in ops))
+            self.assertEqual(status.tolist(), expected, f"batch {batch}")
+            for lane, channel in enumerate(channels):
+                self.assertEqual(matrix.lane_state(lane), channel.State,
+                                 f"batch {batch} lane {lane} {processors[lane].__name__}")
+
+    def test_blocking_moves_match_blocking_loads(self):
+        for processor in _PROCESSORS:
+            state = list(processor.process([None] * 5, added=['a', 'b', 'c', 'd']))
+            for cid in ['a', 'b', 'c', 'd']:
+                matrix = LaneMatrix([processor], [5])
+                matrix.load_state(0, state)
+                status = matrix.retrieve([0], matrix.encode([cid]))
+                moves = len(processor.get_blocking_loads(cid, state))
+                self.assertEqual(status[0], BLOCKED if moves else OK, f"{processor.__name__} {cid}")
+                self.assertEqual(matrix.stats().blocking_moves, moves, f"{processor.__name__} {cid}")
+
+
+class TestLaneMatrix(unittest.TestCase):
+
+    def test_from_storage(self):
+        meta = dcs.LocationMeta(dims=(3000, 1000, 1000), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=3)
+        s = Storage(locs=[Location(id=loc_id, coords=(0, 0, 0), location_meta=meta) for loc_id in ('A', 'B')])
+        for cid in ('C0', 'C1'):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                new_container=dcs.Container(id=cid),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='A')))])
+
+        matrix = LaneMatrix.from_storage(s)
+        a = int(matrix.lane_indices(['A'])[0])
+        self.assertEqual(matrix.lane_state(a), s.get_locs()['A'].Slots[:1] + ['C1', 'C0'])
+        stats = matrix.stats()
+        self.assertEqual((stats.containers, stats.capacity), (2, 6))
+
+        status = matrix.retrieve([a, a], matrix.encode(['C0', 'C1']))
+        self.assertEqual(status.tolist(), [BLOCKED, OK])
+        self.assertEqual(matrix.lane_stats()['blocked_retrievals'][a], 1)
+
+    def test_unknown_processor_raises(self):
+        class _Custom(cps.LIFOFlowChannelProcessor):
+            pass
+        with self.assertRaises(ValueError):
+            LaneMatrix([_Custom()], [3])
+
+    def test_rejected_and_dropped_counted(self):
+        matrix = LaneMatrix([cps.FIFOFlowChannelProcessor, cps.FIFONoFlowPushChannelProcessor], [2, 3])
+        matrix.load_state(1, ['x', None, 'y'])
+        status = matrix.add([0, 0, 0, 1], matrix.encode(['a', 'b', 'c', 'd']))
+        self.assertEqual(status.tolist(), [OK, OK, NO_ROOM, OK])
+        # Pushing into the no-flow push lane shifts 'y' out of its last slot
+        self.assertEqual(matrix.lane_state(1), ['d', 'x', None])
+        stats = matrix.stats()
+        self.assertEqual((stats.rejected_adds, stats.dropped, stats.containers), (1, 1, 4))
+        np.testing.assert_allclose(matrix.lane_stats()['fill_pct'], [1.0, 2 / 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -79,6 +79,21 @@ class TestLayoutManager(unittest.TestCase):
         fresh_storage = self.manager.get_storage(str(layout.id))
         self.assertIn('Z1-a0-b0-s0', fresh_storage.get_locs())
 
+    def test_tree_labels_restored_on_reload(self):
+        layout = self.manager.create_layout('with-labels')
+        storage = self.manager.get_storage(str(layout.id))
+        storage.LocationMapTree.register('Z1-a0', zone='Z1', aisle='0')
+        storage.register_locs(locs=[Location(
+            id='Z1-a0',
+            location_meta=dcs.LocationMeta(dims=(10, 10, 10)),
+            coords=(0.0, 0.0, 0.0),
+        )])
+
+        for lazy_level in (None, 'zone'):
+            fresh = sqlite_layout_manager(url=f'sqlite:///{self._db_path}', lazy_level=lazy_level)
+            tree = fresh.get_storage(str(layout.id)).LocationMapTree
+            self.assertEqual(tree.get_path('Z1-a0'), {'zone': 'Z1', 'aisle': '0'})
+
     def test_delete_layout_removes_record(self):
         layout = self.manager.create_layout('to-delete')
         self.manager.delete_layout(str(layout.id))
@@ -8,6 +8,7 @@ Covers:
 - Reservation system
 - FIFO/LIFO access rules via channel processor
 - to_jsonable_dict / from_jsonable_dict round-trip
+- Slot geometry shared across locations of the same type
 """
 import unittest
 
@@ -95,6 +96,18 @@ class TestStoreLoads(unittest.TestCase):
         with self.assertRaises(NoRoomToAddException):
             loc.store_containers(['L3'])
 
+    def test_store_batch_from_generator(self):
+        loc = _lifo_loc(capacity=3)
+        loc.store_containers(f'L{ii}' for ii in range(3))
+        self.assertEqual(loc.get_removable_container_ids(), {0: 'L2'})
+
+    def test_failed_batch_stores_nothing(self):
+        loc = _fifo_loc(capacity=3)
+        loc.store_containers(['L1'])
+        with self.assertRaises(NoRoomToAddException):
+            loc.store_containers(['L2', 'L3', 'L4'])
+        self.assertEqual(loc.ContainerIds, ['L1'])
+
 
 # ── remove_containers ──────────────────────────────────────────────────────────────
 
@@ -138,6 +151,21 @@ class TestRemoveLoads(unittest.TestCase):
         with self.assertRaises(ItemNotAccessibleToRemoveException):
             loc.remove_containers(['L1'])
 
+    def test_remove_batch_in_access_order(self):
+        loc = _fifo_loc(capacity=3)
+        loc.store_containers(['L1', 'L2', 'L3'])
+        with self.assertRaises(ItemNotAccessibleToRemoveException):
+            loc.remove_containers(['L2', 'L1'])
+        self.assertEqual(len(loc.ContainerIds), 3)
+        loc.remove_containers(['L1', 'L2'])
+        self.assertEqual(loc.ContainerIds, ['L3'])
+
+    def test_clear_containers_fifo(self):
+        loc = _fifo_loc(capacity=3)
+        loc.store_containers(['L1', 'L2', 'L3'])
+        loc.clear_containers()
+        self.assertEqual(loc.ContainerIds, [])
+
     def test_clear_containers(self):
         loc = _all_avail_loc()
         loc.store_containers(['L1', 'L2', 'L3'])
@@ -175,5 +203,30 @@ class TestLocationSerialization(unittest.TestCase):
             restored.remove_containers(['L1'])
 
 
+# ── Slot geometry ─────────────────────────────────────────────────────────────
+
+class TestSlotGeometry(unittest.TestCase):
+
+    def test_shared_by_locations_with_same_dims(self):
+        a = _fifo_loc(capacity=5, loc_id='A')
+        b = _lifo_loc(capacity=5, loc_id='B')
+        self.assertIs(a.SlotGeometry, b.SlotGeometry)
+        self.assertIs(a.SlotOffsets, b.SlotOffsets)
+        self.assertIsNot(a.SlotGeometry, _fifo_loc(capacity=4).SlotGeometry)
+
+    def test_dims_and_offsets(self):
+        loc = _fifo_loc(capacity=5)
+        self.assertEqual(loc.SlotDims, (2.0, 10, 10))
+        self.assertEqual(loc.SlotOffsets, tuple((ii * 2.0, 0.0, 0.0) for ii in range(5)))
+        self.assertIs(loc.freeze().SlotGeometry, loc.SlotGeometry)
+
+    def test_fits(self):
+        geometry = _fifo_loc(capacity=5).SlotGeometry
+        self.assertTrue(geometry.fits((2.0, 10.0, 10.0)))
+        self.assertFalse(geometry.fits((2.5, 1.0, 1.0)))
+        self.assertFalse(geometry.fits([2.5, 1.0, 1.0]))
+        self.assertTrue(geometry.fits((100.0, 100.0)))
+
+
 if __name__ == "__main__":
     unittest.main()
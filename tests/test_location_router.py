@@ -0,0 +1,51 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.api.routers.v1.location_router import location_router_factory
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.storage import Storage
+
+
+def _client(storage: Storage) -> TestClient:
+    app = FastAPI()
+    app.include_router(location_router_factory(storage))
+    return TestClient(app, raise_server_exceptions=True)
+
+
+def _storage() -> Storage:
+    meta = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.AllAvailableChannelProcessor(), capacity=1)
+    locs = [Location(id=f'L{i}', location_meta=meta, coords=(10.0 * i, 0.0, 0.0)) for i in range(10)]
+    s = Storage(locs=locs)
+    locs[4].store_containers(['C1'])
+    s._data_store.LocationsData.reindex([locs[4]])
+    return s
+
+
+class TestLocationsNear(unittest.TestCase):
+
+    def test_returns_nearest_first_with_distance(self):
+        resp = _client(_storage()).get('/locations/near', params={'x': 42, 'y': 0, 'k': 3})
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual([r['location']['id'] for r in body], ['L4', 'L5', 'L3'])
+        self.assertAlmostEqual(body[0]['distance'], 2.0)
+
+    def test_filters_by_occupancy(self):
+        resp = _client(_storage()).get('/locations/near', params={'x': 42, 'y': 0, 'occupied': False})
+        self.assertEqual([r['location']['id'] for r in resp.json()], ['L5'])
+
+    def test_rejects_non_positive_k(self):
+        resp = _client(_storage()).get('/locations/near', params={'x': 0, 'y': 0, 'k': 0})
+        self.assertEqual(resp.status_code, 422)
+
+    def test_does_not_shadow_location_by_id(self):
+        resp = _client(_storage()).get('/locations/L2')
+        self.assertEqual(resp.json()['id'], 'L2')
+
+
+if __name__ == '__main__':
+    unittest.main()
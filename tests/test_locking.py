@@ -0,0 +1,114 @@
+"""
+Tests for locking.py
+
+Covers:
+- LockStripes: stable, sorted, de-duplicated stripe assignment
+- LockStripes.hold: opposite-order key sets don't deadlock
+- SharedExclusiveLock: shared concurrency, exclusive exclusion, re-entrancy, upgrade refusal
+"""
+import threading
+import unittest
+
+from coopstorage.storage.loc_load.locking import LockStripes, SharedExclusiveLock
+
+
+class TestLockStripes(unittest.TestCase):
+
+    def test_stripes_sorted_and_unique(self):
+        stripes = LockStripes(8)
+        idxs = stripes.stripes_for(['b', 'a', 'b', 'c'])
+        self.assertEqual(idxs, sorted(set(idxs)))
+
+    def test_stripe_assignment_stable(self):
+        self.assertEqual(LockStripes(16).stripe_of('loc:A'), LockStripes(16).stripe_of('loc:A'))
+
+    def test_invalid_stripe_count_raises(self):
+        with self.assertRaises(ValueError):
+            LockStripes(0)
+
+    def test_opposite_order_pairs_do_not_deadlock(self):
+        stripes = LockStripes(4)
+        counter = [0]
+
+        def work(keys):
+            for _ in range(200):
+                with stripes.hold(keys):
+                    counter[0] += 1
+
+        threads = [threading.Thread(target=work, args=(keys,))
+                   for keys in (['loc:A', 'loc:B'], ['loc:B', 'loc:A'])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertFalse(any(t.is_alive() for t in threads))
+        self.assertEqual(counter[0], 400)
+
+    def test_hold_is_reentrant(self):
+        stripes = LockStripes(2)
+        with stripes.hold(['x']):
+            with stripes.hold(['x', 'y']):
+                pass
+
+
+class TestSharedExclusiveLock(unittest.TestCase):
+
+    def test_shared_holders_run_together(self):
+        lock = SharedExclusiveLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def work():
+            with lock.shared():
+                barrier.wait()
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertFalse(barrier.broken)
+
+    def test_exclusive_waits_for_shared(self):
+        lock = SharedExclusiveLock()
+        order = []
+        in_shared, release = threading.Event(), threading.Event()
+
+        def reader():
+            with lock.shared():
+                in_shared.set()
+                release.wait(5)
+                order.append('shared')
+
+        def writer():
+            with lock.exclusive():
+                order.append('exclusive')
+
+        r = threading.Thread(target=reader)
+        r.start()
+        in_shared.wait(5)
+        w = threading.Thread(target=writer)
+        w.start()
+        release.set()
+        r.join(5)
+        w.join(5)
+        self.assertEqual(order, ['shared', 'exclusive'])
+
+    def test_exclusive_reentrant_and_may_enter_shared(self):
+        lock = SharedExclusiveLock()
+        with lock.exclusive():
+            self.assertTrue(lock.held_exclusively())
+            with lock.exclusive():
+                with lock.shared():
+                    pass
+        self.assertFalse(lock.held_exclusively())
+
+    def test_upgrade_refused(self):
+        lock = SharedExclusiveLock()
+        with lock.shared():
+            with self.assertRaises(RuntimeError):
+                with lock.exclusive():
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ Covers:
 - ContainerQualifier: pattern, max_dims, min_dims
 - LocationQualifier: id_pattern, max_dims, min_dims, any_loads, all_loads,
                      at_least_capacity, reserved
+- compile(): compiled predicates agree with check_if_qualifies
 """
 import unittest
 import coopstorage.storage.loc_load.dcs as dcs
@@ -723,5 +724,99 @@ class TestLocationQualifierResourceTypeQualifier(unittest.TestCase):
         self.assertTrue(LocationQualifier().check_if_qualifies(loc, container=c))
 
 
+# ── compiled qualifiers ───────────────────────────────────────────────────────
+
+class TestCompiledQualifiers(unittest.TestCase):
+    """compile() must agree with check_if_qualifies for every combination."""
+
+    def _locs(self):
+        from cooptools.qualifiers import WhiteBlackListQualifier
+        full = _loc(id='FULL', capacity=1)
+        full.store_containers(['L1'])
+        part = _loc(id='PART', capacity=3)
+        part.store_containers(['L2'])
+        restricted = Location(
+            id='R1',
+            location_meta=dcs.LocationMeta(
+                dims=(4.0, 4.0, 4.0),
+                channel_processor=cps.FIFOFlowChannelProcessor(),
+                capacity=2,
+                uom_qualifier=WhiteBlackListQualifier(white_list=[EA]),
+            ),
+            coords=(0, 0, 0),
+        )
+        return [_loc(id='A'), _loc(id='B2', dims=(1.0, 1.0, 1.0)), full, part, restricted]
+
+    def _containers(self, ids):
+        loads = {'L1': _load('L1'), 'L2': _load('L2', uom=BIG)}
+        return {i: loads[i] for i in ids if i in loads}
+
+    def _qualifiers(self):
+        from cooptools.qualifiers import WhiteBlackListQualifier
+        return [
+            LocationQualifier(),
+            LocationQualifier(id_pattern=PatternMatchQualifier(regex='^[AB]')),
+            LocationQualifier(id_pattern=PatternMatchQualifier(
+                white_list_black_list_qualifier=WhiteBlackListQualifier(black_list=['A', 'FULL']))),
+            LocationQualifier(id_pattern=PatternMatchQualifier(regex_any=['^P', '^R'], id='PART')),
+            LocationQualifier(max_dims=(5.0, 5.0, 5.0)),
+            LocationQualifier(min_dims=(5.0, 5.0, 5.0)),
+            LocationQualifier(at_least_capacity=2, has_addable_position=True),
+            LocationQualifier(is_occupied=True),
+            LocationQualifier(is_occupied=False, channel_processor_types=['FIFOFlowChannelProcessor']),
+            LocationQualifier(min_slot_dims=(2.0, 2.0, 2.0)),
+            LocationQualifier(reserved=True),
+            LocationQualifier(reserved=False, at_least_capacity=1),
+            LocationQualifier(has_any_containers=[ContainerQualifier(max_dims=(2.0, 2.0, 2.0))]),
+            LocationQualifier(has_all_containers=[ContainerQualifier(pattern=PatternMatchQualifier(id='L2'))]),
+            LocationQualifier(ignore_uom_qualifier=True),
+        ]
+
+    def test_compiled_matches_interpreted(self):
+        is_reserved = lambda loc_id: loc_id in ('A', 'PART')
+        for q in self._qualifiers():
+            for container in (None, _load('N1'), _load('N2', uom=BIG)):
+                compiled = q.compile(container_provider=self._containers, container=container,
+                                     is_reserved=is_reserved)
+                for loc in self._locs():
+                    self.assertEqual(
+                        compiled(loc),
+                        q.check_if_qualifies(loc, container_provider=self._containers,
+                                             container=container, is_reserved=is_reserved),
+                        (q, container, loc.Id))
+
+    def test_compiled_container_qualifier_matches_interpreted(self):
+        qualifiers = [ContainerQualifier(),
+                      ContainerQualifier(pattern=PatternMatchQualifier(regex='^L')),
+                      ContainerQualifier(max_dims=(2.0, 2.0, 2.0), min_dims=(0.5, 0.5, 0.5)),
+                      ContainerQualifier(reserved=True)]
+        is_reserved = lambda cid: cid == 'L1'
+        for q in qualifiers:
+            compiled = q.compile(is_reserved=is_reserved)
+            for c in (_load('L1'), _load('L2', uom=BIG), _load('Z9')):
+                self.assertEqual(compiled(c), q.check_if_qualifies(c, is_reserved=is_reserved), (q, c.id))
+
+    def test_missing_provider_raises_at_compile(self):
+        with self.assertRaises(ValueError):
+            LocationQualifier(reserved=True).compile()
+        with self.assertRaises(ValueError):
+            LocationQualifier(has_any_containers=[ContainerQualifier()]).compile()
+
+    def test_meta_checks_evaluated_once_per_meta(self):
+        meta = dcs.LocationMeta(dims=(10.0, 10.0, 10.0),
+                                channel_processor=cps.AllAvailableChannelProcessor(), capacity=2)
+        locs = [Location(id=f'M{i}', location_meta=meta, coords=(0, 0, 0)) for i in range(5)]
+        calls = []
+
+        class _CountingDims(tuple):
+            def __getitem__(self, item):
+                calls.append(item)
+                return tuple.__getitem__(self, item)
+
+        compiled = LocationQualifier(max_dims=_CountingDims((20.0, 20.0, 20.0))).compile()
+        self.assertTrue(all(compiled(loc) for loc in locs))
+        self.assertEqual(len(calls), 3)
+
+
 if __name__ == "__main__":
     unittest.main()
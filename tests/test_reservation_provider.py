@@ -5,6 +5,8 @@ Covers:
 - PassthroughReservationProvider.is_reserved / get_reserved_ids
 - ApiKeyReservationProvider.is_reserved / get_reserved_ids  (_get + POST /check)
 - JwtExchangeReservationProvider.is_reserved / get_reserved_ids (_get with token/retry)
+- reserve_many (bulk POST /reserve, and the per-item fallback)
+- CachingReservationProvider (TTL refresh, local coherence, in-flight fetches, hit/miss stats)
 """
 import time
 import unittest
@@ -12,9 +14,12 @@ from unittest.mock import MagicMock, patch
 
 from coopstorage.storage.loc_load.reservation_provider import (
     PassthroughReservationProvider,
+    CachingReservationProvider,
     ApiKeyReservationProvider,
     JwtExchangeReservationProvider,
     ReservationCheckFailedError,
+    ReservationFailedError,
+    reserve_many,
 )
 
 
@@ -128,6 +133,23 @@ class TestApiKeyReservationProviderCheckMethods(unittest.TestCase):
             self.provider.get_reserved_ids(['r1', 'r2'])
         self.assertEqual(ctx.exception.retry_after, 20.0)
 
+    def test_reserve_many_posts_once_and_matches_by_position(self):
+        self.mock_session.post.return_value = self._mock_post_response([
+            {'status': 'SUCCESS', 'releaseToken': 't1'},
+            {'status': 'FAILED', 'explanation': 'held'},
+        ])
+        tokens = self.provider.reserve_many([('r1', 'q', 'container'), ('r2', 'q', None)])
+        self.assertEqual(tokens, ['t1', None])
+        self.mock_session.post.assert_called_once_with(
+            'http://test-host/api/v1/Reservation/reserve',
+            json=[
+                {'requester': 'q', 'resource': 'r1', 'resourceType': 'container'},
+                {'requester': 'q', 'resource': 'r2', 'resourceType': 'storage'},
+            ],
+            headers=self._expected_headers,
+            timeout=10.0,
+        )
+
 
 # ── JwtExchangeReservationProvider ────────────────────────────────────────────
 
@@ -203,5 +225,123 @@ class TestJwtExchangeReservationProviderCheckMethods(unittest.TestCase):
         self.assertEqual(self.provider.get_reserved_ids(['r1']), set())
 
 
+# ── reserve_many ──────────────────────────────────────────────────────────────
+
+class TestReserveMany(unittest.TestCase):
+
+    def test_passthrough_grants_every_ask(self):
+        tokens = reserve_many(PassthroughReservationProvider(), [('a', 'q', None), ('b', 'q', None)])
+        self.assertEqual(tokens, ['a', 'b'])
+
+    def test_falls_back_to_reserve_per_ask(self):
+        provider = MagicMock(spec=['reserve', 'unreserve'])
+        provider.reserve.side_effect = ['t1', None]
+        self.assertEqual(reserve_many(provider, [('a', 'q', None), ('b', 'q', None)]), ['t1', None])
+        self.assertEqual(provider.reserve.call_count, 2)
+
+    def test_fallback_releases_granted_tokens_on_failure(self):
+        provider = MagicMock(spec=['reserve', 'unreserve'])
+        provider.reserve.side_effect = ['t1', ReservationFailedError('rate limited')]
+        with self.assertRaises(ReservationFailedError):
+            reserve_many(provider, [('a', 'q', None), ('b', 'q', None)])
+        provider.unreserve.assert_called_once_with('a', 'q', token='t1')
+
+
+# ── CachingReservationProvider ────────────────────────────────────────────────
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCachingReservationProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.inner = MagicMock()
+        self.inner.get_reserved_ids.side_effect = lambda ids: {i for i in ids if i in self.externally_reserved}
+        self.inner.reserve.side_effect = lambda resource, requester, resource_type=None: f"tok-{resource}"
+        self.inner.unreserve.return_value = True
+        self.externally_reserved = {'b'}
+        self.clock = _FakeClock()
+        self.cache = CachingReservationProvider(self.inner, ttl=5.0, clock=self.clock)
+
+    def test_repeat_check_within_ttl_is_a_hit(self):
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b', 'c']), {'b'})
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b', 'c']), {'b'})
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 1)
+        stats = self.cache.Stats
+        self.assertEqual((stats.hits, stats.misses, stats.fetched_ids), (1, 1, 3))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_only_unknown_ids_are_fetched(self):
+        self.cache.get_reserved_ids(['a', 'b'])
+        self.cache.get_reserved_ids(['a', 'b', 'c'])
+        self.inner.get_reserved_ids.assert_called_with(['c'])
+
+    def test_refetches_after_ttl(self):
+        self.cache.get_reserved_ids(['a', 'b'])
+        self.externally_reserved = {'a'}
+        self.clock.now = 5.0
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b']), {'a'})
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 2)
+
+    def test_own_reserve_and_unreserve_visible_without_refetch(self):
+        self.cache.get_reserved_ids(['a'])
+        token = self.cache.reserve('a', 'req')
+        self.assertTrue(self.cache.is_reserved('a'))
+        self.assertTrue(self.cache.unreserve('a', 'req', token=token))
+        self.assertFalse(self.cache.is_reserved('a'))
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 1)
+        self.inner.is_reserved.assert_not_called()
+
+    def test_failed_unreserve_forces_refetch(self):
+        self.cache.reserve('a', 'req')
+        self.inner.unreserve.return_value = False
+        self.cache.unreserve('a', 'req', token='tok-a')
+        self.cache.get_reserved_ids(['a'])
+        self.inner.get_reserved_ids.assert_called_once_with(['a'])
+
+    def test_invalidate_forces_refetch(self):
+        self.cache.get_reserved_ids(['a', 'b'])
+        self.cache.invalidate(['b'])
+        self.cache.get_reserved_ids(['a', 'b'])
+        self.inner.get_reserved_ids.assert_called_with(['b'])
+
+    def test_reserve_many_marks_resources_reserved(self):
+        self.inner.reserve_many.return_value = ['tok-a', None]
+        self.assertEqual(self.cache.reserve_many([('a', 'q', None), ('c', 'q', None)]), ['tok-a', None])
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'c']), {'a', 'c'})
+        self.inner.get_reserved_ids.assert_not_called()
+
+    def _fetch_during(self, action):
+        """Run *action* while get_reserved_ids is waiting on the wrapped provider."""
+        def slow_fetch(ids):
+            answer = {i for i in ids if i in self.externally_reserved}
+            action()
+            return answer
+        self.inner.get_reserved_ids.side_effect = slow_fetch
+
+    def test_reserve_during_fetch_is_not_overwritten(self):
+        self._fetch_during(lambda: self.cache.reserve('a', 'req'))
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b']), {'a', 'b'})
+        self.assertTrue(self.cache.is_reserved('a'))
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 1)
+
+    def test_unreserve_during_fetch_is_not_overwritten(self):
+        self._fetch_during(lambda: self.cache.unreserve('b', 'req', token='tok-b'))
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b']), set())
+        self.assertFalse(self.cache.is_reserved('b'))
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 1)
+
+    def test_invalidate_during_fetch_is_not_cached(self):
+        self._fetch_during(lambda: self.cache.invalidate())
+        self.assertEqual(self.cache.get_reserved_ids(['a', 'b']), {'b'})
+        self.cache.get_reserved_ids(['a', 'b'])
+        self.assertEqual(self.inner.get_reserved_ids.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
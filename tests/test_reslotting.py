@@ -0,0 +1,165 @@
+"""
+Tests for reslotting.py
+
+Covers:
+- plan_reslotting: unburying containers needed sooner, bringing hot containers to the
+  front, the max_moves bound and benefit ordering, reserved containers, no side effects
+- execute_reslot_move: runs the move, skips stale moves
+- run_reslotting: worker thread executes the plan and publishes reslot topics a StorageEventBus forwards
+"""
+import threading
+import unittest
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.reslotting import ReslotConfig, ReslotMove, plan_reslotting, execute_reslot_move, run_reslotting
+from coopstorage.storage.loc_load.event_bus import StorageEventBus
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import LocationQualifier
+from coopstorage.storage.loc_load.reservation_provider import PassthroughReservationProvider
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from cooptools.qualifiers import PatternMatchQualifier
+
+
+def _storage(locs, stored, **storage_kwargs):
+    """*locs*: (id, processor, capacity, x); *stored*: (loc id, container id, expected dwell) in put order."""
+    s = Storage(**storage_kwargs)
+    s.register_locs([Location(id=loc_id, coords=(x, 0, 0), location_meta=dcs.LocationMeta(
+        dims=(1000 * capacity, 1000, 1000), channel_processor=processor, capacity=capacity))
+        for loc_id, processor, capacity, x in locs])
+    for loc_id, cid, dwell in stored:
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=dcs.Container(id=cid, expected_dwell=dwell),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)))])
+    return s
+
+
+class _FixedReservations(PassthroughReservationProvider):
+    def __init__(self, reserved):
+        self._reserved = set(reserved)
+
+    def get_reserved_ids(self, resource_ids) -> set:
+        return self._reserved.intersection(resource_ids)
+
+
+def _buried_lanes(n, **storage_kwargs):
+    """*n* LIFO lanes, each with a container needed soon under one needed late, plus one empty lane."""
+    locs = [(f'X{i}', cps.LIFOFlowChannelProcessor(), 3, i) for i in range(n)]
+    locs.append(('E', cps.AllAvailableChannelProcessor(), 10, 0))
+    stored = []
+    for i in range(n):
+        stored += [(f'X{i}', f'SOON{i}', 1), (f'X{i}', f'LATE{i}', 100 + i)]
+    return _storage(locs, stored, **storage_kwargs)
+
+
+class TestPlanReslotting(unittest.TestCase):
+
+    def test_moves_container_burying_one_needed_sooner(self):
+        s = _buried_lanes(1)
+        self.assertEqual(plan_reslotting(s), [
+            ReslotMove(container_id='LATE0', source_loc_id='X0', dest_loc_id='E', benefit=1.0, reason='blocking')])
+
+    def test_ordered_lanes_need_nothing(self):
+        s = _storage([('X', cps.LIFOFlowChannelProcessor(), 3, 0), ('E', cps.AllAvailableChannelProcessor(), 10, 0)],
+                     [('X', 'LATE', 100), ('X', 'SOON', 1)])
+        self.assertEqual(plan_reslotting(s), [])
+
+    def test_hot_container_moves_to_front(self):
+        s = _storage([('FAR', cps.AllAvailableChannelProcessor(), 2, 100),
+                      ('NEAR', cps.AllAvailableChannelProcessor(), 2, 10)],
+                     [('FAR', 'HOT', None), ('FAR', 'COLD', None)])
+        moves = plan_reslotting(s, ReslotConfig(travel_weight=0.01), heat={'HOT': 5})
+        self.assertEqual([(m.container_id, m.dest_loc_id, m.reason) for m in moves], [('HOT', 'NEAR', 'hot')])
+        self.assertAlmostEqual(moves[0].benefit, 0.01 * 5 * 90)
+
+    def test_bounded_and_one_move_per_location(self):
+        s = _buried_lanes(4)
+        moves = plan_reslotting(s, ReslotConfig(max_moves=10))
+        # Only E can take a container, so only one move is planned
+        self.assertEqual(len(moves), 1)
+        s.register_locs([Location(id=f'E{i}', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+            dims=(10000, 1000, 1000), channel_processor=cps.AllAvailableChannelProcessor(), capacity=10))
+            for i in range(4)])
+        moves = plan_reslotting(s, ReslotConfig(max_moves=3))
+        self.assertEqual(len(moves), 3)
+        self.assertEqual(len({m.source_loc_id for m in moves} | {m.dest_loc_id for m in moves}), 6)
+        self.assertEqual([m.benefit for m in moves], sorted((m.benefit for m in moves), reverse=True))
+
+    def test_reserved_containers_are_left_alone(self):
+        s = _buried_lanes(1, reservation_provider=_FixedReservations(['LATE0']))
+        self.assertEqual(plan_reslotting(s), [])
+
+    def test_planning_has_no_side_effects(self):
+        s = _buried_lanes(2)
+        before = s.summary()
+        plan_reslotting(s)
+        self.assertEqual(s.summary(), before)
+
+
+class TestExecuteReslotMove(unittest.TestCase):
+
+    def test_executes_planned_move(self):
+        s = _buried_lanes(1)
+        move = plan_reslotting(s)[0]
+        self.assertTrue(execute_reslot_move(s, move))
+        self.assertEqual(s.get_container_loc_id('LATE0'), 'E')
+        self.assertEqual(plan_reslotting(s), [])
+
+    def test_stale_move_is_skipped(self):
+        s = _buried_lanes(1)
+        move = plan_reslotting(s)[0]
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=dcs.Container(id='NEW'),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='X0')))])
+        before = s.summary()
+        self.assertFalse(execute_reslot_move(s, move))
+        self.assertEqual(s.summary(), before)
+
+
+class TestRunReslotting(unittest.TestCase):
+
+    def test_worker_executes_and_publishes_progress(self):
+        s = _buried_lanes(3)
+        s.register_locs([Location(id='E2', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+            dims=(10000, 1000, 1000), channel_processor=cps.AllAvailableChannelProcessor(), capacity=10))])
+        bus = StorageEventBus()
+        sub_id = bus.subscribe()
+        stop = threading.Event()
+        worker = threading.Thread(target=run_reslotting, daemon=True, kwargs=dict(
+            storage=s, cfg=ReslotConfig(moves_per_sec=0, pass_interval_s=0.05), stop_event=stop))
+        worker.start()
+        try:
+            for _ in range(100):
+                if not plan_reslotting(s):
+                    break
+                stop.wait(0.05)
+        finally:
+            stop.set()
+            worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(plan_reslotting(s), [])
+
+        events = list(bus._subscribers[sub_id].buffer)
+        progress = [e.payload for e in events if e.type == 'reslot_progress']
+        # Two destinations take one move each per pass; the third lane waits for the next pass
+        self.assertEqual(events[0].type, 'reslot_plan')
+        self.assertEqual(len(events[0].payload['moves']), 2)
+        self.assertEqual([p['status'] for p in progress], ['executed'] * 3)
+        self.assertEqual(progress[-1]['total_executed'], 3)
+
+    def test_waits_while_not_idle(self):
+        s = _buried_lanes(1)
+        stop = threading.Event()
+        worker = threading.Thread(target=run_reslotting, daemon=True, kwargs=dict(
+            storage=s, cfg=ReslotConfig(moves_per_sec=0, pass_interval_s=0.01), stop_event=stop,
+            is_idle=lambda: False))
+        worker.start()
+        stop.wait(0.1)
+        stop.set()
+        worker.join(timeout=5)
+        self.assertEqual(s.get_container_loc_id('LATE0'), 'X0')
+
+
+if __name__ == '__main__':
+    unittest.main()
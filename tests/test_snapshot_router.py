@@ -10,7 +10,7 @@ from coopstorage.storage.loc_load.reservation_provider import ReservationCheckFa
 
 def _make_endpoint(reservation_side_effect=None):
     storage = MagicMock()
-    storage.get_locs.return_value = {}
+    storage.snapshot.return_value.locations = {}
     storage.get_containers.return_value = {}
     storage._data_store.TransferRequestsData.get.return_value = {}
     if reservation_side_effect:
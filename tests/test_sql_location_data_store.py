@@ -0,0 +1,262 @@
+"""
+Tests for sql_location_data_store.py (against a SQLite file)
+
+Covers:
+- update persists channel slots without looking up channel ids once they are cached
+- batched_writes defers updates to one executemany when the outermost block exits
+- add_or_update updates existing rows and inserts new ones
+- add bulk-inserts rows with their tree labels and merges them into a warm cache
+- Storage.register_locs persists the labels registered in its LocationMapTree
+- remove and clear maintain a warm cache without reloading it
+- refresh pulls in rows another store changed, added or removed since the last sync
+- lazy_level loads only the partitions holding requested ids; iter_tree_labels streams labels
+- a Storage transfer writes source and destination in one statement
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import event, update
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
+from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+from coopstorage.storage.loc_load.data.sql.tables import channels as chan_table
+from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
+from coopstorage.storage.loc_load.data.storageDataStore import StorageDataStore
+from coopstorage.storage.loc_load.exceptions import DuplicateRecordException
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import ContainerQualifier, LocationQualifier
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from cooptools.qualifiers import PatternMatchQualifier
+
+_META = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.FIFOFlowChannelProcessor(), capacity=3)
+
+
+def _loc(loc_id: str) -> Location:
+    return Location(id=loc_id, coords=(0, 0, 0), location_meta=_META)
+
+
+class _SqlStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self._db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        sqlite_db.set_url(f'sqlite:///{self._db_path}')
+        sqlite_db.init_db()
+        self._engine = sqlite_db.get_engine()
+        self.layout_id = SqlLayoutDataStore(sqlite_db.get_session).create('test').id
+        self.store = SqlLocationDataStore(self.layout_id, sqlite_db.get_session)
+        self.statements = []
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+
+    def tearDown(self):
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+        self._engine.dispose()
+        try:
+            os.unlink(self._db_path)
+        except FileNotFoundError:
+            pass
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement.split()[0].upper(), executemany))
+
+    def _persisted(self, loc_id: str) -> list:
+        """Slots as stored, read through a store with a cold cache."""
+        return SqlLocationDataStore(self.layout_id, sqlite_db.get_session).get(ids=[loc_id])[loc_id].Slots
+
+
+class TestUpdate(_SqlStoreTestCase):
+
+    def test_update_uses_cached_channel_ids(self):
+        self.store.add([_loc('A'), _loc('B')])
+        locs = self.store.get()
+        self.statements.clear()
+        self.store.update([locs['A'].store_containers(['C1']), locs['B'].store_containers(['C2'])])
+        self.assertEqual(self.statements, [('UPDATE', True)])
+        self.assertEqual(self._persisted('A'), [None, None, 'C1'])
+        self.assertEqual(self._persisted('B'), [None, None, 'C2'])
+
+    def test_unknown_location_skipped(self):
+        self.store.add([_loc('A')])
+        self.store.update([_loc('missing').store_containers(['C1'])])
+        self.assertEqual(self.store.count(), 1)
+
+    def test_batched_writes_defers_to_one_statement(self):
+        self.store.add([_loc('A'), _loc('B')])
+        locs = self.store.get()
+        self.statements.clear()
+        with self.store.batched_writes():
+            self.store.update([locs['A'].store_containers(['C1'])])
+            with self.store.batched_writes():
+                self.store.update([locs['B'].store_containers(['C2'])])
+            self.store.update([locs['A'].store_containers(['C3'])])
+            self.assertEqual(self.statements, [])
+            self.assertEqual(self.store.get(ids=['A'])['A'].Slots, [None, 'C3', 'C1'])
+        self.assertEqual(self.statements, [('UPDATE', True)])
+        self.assertEqual(self._persisted('A'), [None, 'C3', 'C1'])
+        self.assertEqual(self._persisted('B'), [None, None, 'C2'])
+
+    def test_add_or_update(self):
+        self.store.add([_loc('A')])
+        a = self.store.get()['A'].store_containers(['C1'])
+        self.store.add_or_update([a, _loc('B')])
+        self.assertEqual(self.store.count(), 2)
+        self.assertEqual(self._persisted('A'), [None, None, 'C1'])
+
+
+class TestBulkAdd(_SqlStoreTestCase):
+
+    def test_tree_labels_written_with_rows(self):
+        self.store.add([_loc('A'), _loc('B')], tree_labels={'A': {'zone': 'Z1', 'aisle': '2', 'level': 'top'}})
+        self.assertEqual(self.statements, [('INSERT', True), ('INSERT', True)])
+        cold = SqlLocationDataStore(self.layout_id, sqlite_db.get_session)
+        self.assertEqual(cold.get_tree_labels('A'), {'zone': 'Z1', 'aisle': '2', 'level': 'top'})
+        self.assertEqual(cold.get_tree_labels('B'), {})
+
+    def test_warm_cache_updated_without_reload(self):
+        self.store.add([_loc('A')])
+        self.store.get()
+        self.store.add([_loc('B')], tree_labels={'B': {'zone': 'Z1'}})
+        self.statements.clear()
+        self.assertEqual(sorted(self.store.get()), ['A', 'B'])
+        self.assertEqual(self.store.get_tree_labels('B'), {'zone': 'Z1'})
+        self.assertEqual(self.statements, [])
+        self.store.update([self.store.get()['B'].store_containers(['C1'])])
+        self.assertEqual([kind for kind, _ in self.statements], ['UPDATE'])
+
+    def test_duplicate_rolls_back(self):
+        self.store.add([_loc('A')])
+        self.store.get()
+        with self.assertRaises(DuplicateRecordException):
+            self.store.add([_loc('B'), _loc('A')])
+        self.assertEqual(sorted(self.store.get()), ['A'])
+        self.assertEqual(SqlLocationDataStore(self.layout_id, sqlite_db.get_session).count(), 1)
+
+    def test_register_locs_persists_tree_labels(self):
+        storage = Storage(data_store=StorageDataStore(location_data_store=self.store))
+        storage.LocationMapTree.register('A', zone='Z1', bay='3')
+        storage.register_locs(locs=[_loc('A'), _loc('B')])
+        cold = SqlLocationDataStore(self.layout_id, sqlite_db.get_session)
+        self.assertEqual(cold.get_tree_labels('A'), {'zone': 'Z1', 'bay': '3'})
+        self.assertEqual(cold.count(), 2)
+
+
+class TestCacheMaintenance(_SqlStoreTestCase):
+
+    def test_remove_keeps_cache_warm(self):
+        self.store.add([_loc('A'), _loc('B')])
+        self.store.get()
+        self.statements.clear()
+        self.store.remove(ids=['A'])
+        self.assertEqual([kind for kind, _ in self.statements], ['DELETE', 'DELETE'])
+        self.statements.clear()
+        self.assertEqual(list(self.store.get()), ['B'])
+        self.assertEqual(self.statements, [])
+        self.assertEqual(SqlLocationDataStore(self.layout_id, sqlite_db.get_session).count(), 1)
+
+    def test_clear_leaves_empty_warm_cache(self):
+        self.store.add([_loc('A')])
+        self.store.clear()
+        self.statements.clear()
+        self.assertEqual(self.store.count(), 0)
+        self.assertEqual(self.statements, [])
+
+
+class TestRefresh(_SqlStoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store.add([_loc('A'), _loc('B')])
+        self.store.get()
+        self.other = SqlLocationDataStore(self.layout_id, sqlite_db.get_session)
+
+    def test_changes_from_another_store(self):
+        self.other.update([self.other.get()['A'].store_containers(['C1'])])
+        self.other.add([_loc('C')], tree_labels={'C': {'zone': 'Z2'}})
+        self.other.remove(ids=['B'])
+        changed, removed = self.store.refresh()
+        self.assertTrue({'A', 'C'} <= {loc.Id for loc in changed})
+        self.assertEqual(removed, ['B'])
+        self.assertEqual(sorted(self.store.get()), ['A', 'C'])
+        self.assertEqual(self.store.get(ids=['A'])['A'].Slots, [None, None, 'C1'])
+        self.assertEqual(self.store.get_tree_labels('C'), {'zone': 'Z2'})
+
+    def test_rows_older_than_last_sync_not_read(self):
+        with sqlite_db.get_session() as sess:
+            sess.execute(update(chan_table).values(updated_at=datetime(2000, 1, 1)))
+        self.assertEqual(self.store.refresh(), ([], []))
+
+    def test_tree_label_change_is_picked_up(self):
+        self.other.upsert_tree_labels('A', {'zone': 'Z9'})
+        self.store.refresh()
+        self.assertEqual(self.store.get_tree_labels('A'), {'zone': 'Z9'})
+
+    def test_storage_refresh_reindexes(self):
+        storage = Storage(data_store=StorageDataStore(location_data_store=self.store))
+        self.other.update([self.other.get()['B'].store_containers(['C1'])])
+        storage.refresh_locations()
+        self.assertEqual(storage.get_container_loc_id('C1'), 'B')
+
+
+class TestLazyLoading(_SqlStoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store.add([_loc('A'), _loc('B'), _loc('C'), _loc('D')],
+                       tree_labels={'A': {'zone': 'Z1'}, 'B': {'zone': 'Z1'}, 'C': {'zone': 'Z2'}})
+        self.lazy = SqlLocationDataStore(self.layout_id, sqlite_db.get_session, lazy_level='zone')
+        self.statements.clear()
+
+    def test_reads_by_id_load_one_partition(self):
+        a = self.lazy.get(ids=['A'])['A']
+        self.statements.clear()
+        self.assertEqual(list(self.lazy.get(ids=['B'])), ['B'])
+        self.assertEqual(self.lazy.get_tree_labels('A'), {'zone': 'Z1'})
+        self.assertEqual(self.statements, [])
+        self.assertIn('C', self.lazy)
+        self.assertIn('D', self.lazy)
+        self.assertNotIn('X', self.lazy)
+        self.assertEqual(sorted(self.lazy.get()), ['A', 'B', 'C', 'D'])
+        self.assertIs(self.lazy.get(ids=['A'])['A'], a)
+
+    def test_count_and_tree_labels_without_loading(self):
+        self.assertEqual(self.lazy.count(), 4)
+        self.assertEqual(dict(self.lazy.iter_tree_labels()),
+                         {'A': {'zone': 'Z1'}, 'B': {'zone': 'Z1'}, 'C': {'zone': 'Z2'}, 'D': {}})
+        self.assertTrue(all(kind == 'SELECT' for kind, _ in self.statements))
+        self.assertEqual(self.lazy.get(ids=[]), {})
+
+    def test_update_of_loaded_location_is_cached(self):
+        a = self.lazy.get(ids=['A'])['A'].store_containers(['C1'])
+        self.lazy.update([a])
+        self.assertEqual(self.lazy.get()['A'].Slots, [None, None, 'C1'])
+
+    def test_unknown_level_raises(self):
+        with self.assertRaises(ValueError):
+            SqlLocationDataStore(self.layout_id, sqlite_db.get_session, lazy_level='nope')
+
+
+class TestStorageTransfer(_SqlStoreTestCase):
+
+    def test_move_is_one_update(self):
+        self.store.add([_loc('A'), _loc('B')])
+        storage = Storage(data_store=StorageDataStore(location_data_store=self.store))
+
+        def _to(loc_id, **kwargs):
+            return TransferRequestCriteria(
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)), **kwargs)
+
+        storage.handle_transfer_requests([_to('A', new_container=dcs.Container(id='C1'))])
+        self.statements.clear()
+        storage.handle_transfer_requests([_to('B', container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C1')))])
+        self.assertEqual([s for s in self.statements if s[0] != 'SELECT'], [('UPDATE', True)])
+        self.assertEqual(self._persisted('A'), [None, None, None])
+        self.assertEqual(self._persisted('B'), [None, None, 'C1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,27 +5,39 @@ Covers:
 - register_locs / get_locs
 - register_containers / get_containers
 - filter with LocationQualifier
-- select_location
+- select_location / select_locations (scored top-k, evaluator upper bounds)
 - select_container
+- unblock planning for deep-lane retrievals, retrieval-cost source selection
+- putaway scoring by expected future unblock moves (fewest_future_unblocks)
+- nearest-k and bounding-box spatial queries
 - handle_transfer_requests: all 3 transfer types
   1. new container → dest (no source)
   2. source → dest (move)
   3. source only (remove)
 - ContainerLocs / LocContainers properties
+- Container → location index lookups
+- Free-capacity index candidate selection
 - from_meta factory
-- Thread safety (concurrent writes don't corrupt state)
+- Thread safety (concurrent writes don't corrupt state), STRIPED concurrency mode
 """
+import math
+import random
 import threading
 import unittest
 
 from pubsub import pub
-from coopstorage.enums import StorageTopic
+from coopstorage.enums import StorageTopic, ConcurrencyMode, SourceSelectionMode
 import coopstorage.storage.loc_load.channel_processors as cps
 import coopstorage.storage.loc_load.dcs as dcs
+import coopstorage.storage.loc_load.evaluators as evaluators
 from coopstorage.storage.loc_load.location import Location
 from coopstorage.storage.loc_load.qualifiers import LocationQualifier, ContainerQualifier
 from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.data.storageDataStore import StorageDataStore
+from coopstorage.storage.loc_load.data.location_indexes import LocationArrays
 from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from coopstorage.storage.loc_load.unblock_planner import BlockagePenalty, RetrievalCostModel
+from coopstorage.storage.loc_load.reservation_provider import PassthroughReservationProvider, CachingReservationProvider
 from coopstorage.storage.loc_load.exceptions import (
     NoLocationsMatchFilterCriteriaException,
     UnexpectedContainerCountException,
@@ -155,6 +167,214 @@ class TestSelectLocation(unittest.TestCase):
             )
 
 
+
+class TestScoredSelection(unittest.TestCase):
+
+    def _counting(self, fn, calls):
+        def wrapped(loc):
+            calls.append(loc.Id)
+            return fn(loc)
+        return wrapped
+
+    def test_best_score_wins(self):
+        s = _storage_with_locs('A', 'B', 'C')
+        scores = {'A': 1, 'B': 3, 'C': 2}
+        self.assertEqual(s.select_location(evaluator=lambda loc: scores[loc.Id]).Id, 'B')
+
+    def test_ties_go_to_first_candidate(self):
+        s = _storage_with_locs('A', 'B', 'C')
+        self.assertEqual(s.select_location(evaluator=lambda loc: 0).Id, 'A')
+
+    def test_select_locations_top_k_ordered(self):
+        s = _storage_with_locs('A', 'B', 'C', 'D')
+        scores = {'A': 1, 'B': 4, 'C': 2, 'D': 3}
+        top = s.select_locations(evaluator=lambda loc: scores[loc.Id], k=3)
+        self.assertEqual([loc.Id for loc in top], ['B', 'D', 'C'])
+
+    def test_select_locations_k_larger_than_candidates(self):
+        s = _storage_with_locs('A', 'B')
+        self.assertEqual(len(s.select_locations(evaluator=lambda loc: 0, k=5)), 2)
+
+    def test_upper_bound_stops_scan(self):
+        s = _storage_with_locs('A', 'B', 'C')
+        calls = []
+        evaluator = evaluators.bounded(0)(self._counting(lambda loc: 0, calls))
+        self.assertEqual(s.select_location(evaluator=evaluator).Id, 'A')
+        self.assertEqual(calls, ['A'])
+
+    def test_fewest_containers_scans_emptiest_first(self):
+        s = _storage_with_locs('A', 'B', 'C')
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=_load('L1'),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='A')))])
+        loc = s.select_location(LocationQualifier(at_least_capacity=1, has_addable_position=True),
+                                evaluator=evaluators.fewest_containers)
+        self.assertEqual(loc.Id, 'B')
+
+    def test_emptiest_first_ties_follow_layout_order_across_processors(self):
+        s = Storage()
+        s.register_locs([
+            Location(id='A', location_meta=dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=3), coords=(0, 0, 0)),
+            Location(id='B', location_meta=dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.FIFOFlowChannelProcessor(), capacity=3), coords=(0, 0, 0)),
+        ])
+        for evaluator in (evaluators.fewest_containers, evaluators.max_available_capacity_percentage):
+            loc = s.select_location(LocationQualifier(at_least_capacity=1), evaluator=evaluator)
+            self.assertEqual(loc.Id, 'A')
+
+    def test_unbounded_evaluator_scores_every_candidate(self):
+        s = _storage_with_locs('A', 'B', 'C')
+        calls = []
+        s.select_location(evaluator=self._counting(lambda loc: 0, calls))
+        self.assertEqual(sorted(calls), ['A', 'B', 'C'])
+
+
+class TestVectorizedEvaluators(unittest.TestCase):
+
+    def _storage(self):
+        s = Storage()
+        s.register_locs([Location(id=f'L{i}', location_meta=_meta(capacity=i % 3 + 1), coords=(i, 2 * i, 0))
+                         for i in range(6)])
+        for cid, loc_id in (('C1', 'L2'), ('C2', 'L2'), ('C3', 'L4')):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                new_container=_load(cid),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)))])
+        return s
+
+    def test_batch_matches_scalar(self):
+        s = self._storage()
+        locs = list(s.get_locs().values())
+        arrays = s._data_store.LocationsData.Arrays
+        rows = arrays.rows(loc.Id for loc in locs)
+        for evaluator in (evaluators.fewest_containers,
+                          evaluators.max_available_capacity_percentage,
+                          evaluators.least_available_capacity_percentage,
+                          evaluators.closest_to((3, 5, 0))):
+            batch = evaluators.get_batch(evaluator)
+            for loc, score in zip(locs, batch(arrays, rows)):
+                self.assertAlmostEqual(score, evaluator(loc), msg=f"{evaluator.__name__} at {loc.Id}")
+
+    def test_closest_to_selects_nearest(self):
+        s = self._storage()
+        self.assertEqual(s.select_location(evaluator=evaluators.closest_to((3, 5, 0))).Id, 'L3')
+        self.assertEqual([loc.Id for loc in s.select_locations(evaluator=evaluators.closest_to((0, 0, 0)), k=2)],
+                         ['L0', 'L1'])
+
+    def test_batch_selection_matches_per_location(self):
+        s = self._storage()
+        evaluator = evaluators.closest_to((2.4, 5, 0))
+        scalar_only = lambda loc: evaluator(loc)
+        for filter in (None, LocationQualifier(at_least_capacity=1, has_addable_position=True)):
+            self.assertEqual(s.select_location(filter, evaluator=evaluator).Id,
+                             s.select_location(filter, evaluator=scalar_only).Id)
+
+    def test_candidate_rows_match_compiled_filter(self):
+        s = self._storage()
+        arrays = s._data_store.LocationsData.Arrays
+        for filter in (None,
+                       LocationQualifier(is_occupied=True),
+                       LocationQualifier(is_occupied=False, has_addable_position=True),
+                       LocationQualifier(at_least_capacity=2),
+                       LocationQualifier(min_slot_dims=(4, 4, 4), at_least_capacity=1)):
+            self.assertTrue(LocationArrays.supports(filter))
+            expected = {loc.Id for loc in s.filter(filter)}
+            self.assertEqual({arrays.Ids[row] for row in arrays.candidate_rows(filter)}, expected, msg=filter)
+        self.assertFalse(LocationArrays.supports(LocationQualifier(id_pattern=PatternMatchQualifier(id='L1'))))
+
+    def test_seeded_random_score_is_repeatable(self):
+        s = self._storage()
+        picks = []
+        for _ in range(2):
+            random.seed(7)
+            picks.append([loc.Id for loc in s.select_locations(evaluator=evaluators.random_score, k=3)])
+        self.assertEqual(picks[0], picks[1])
+
+    def test_arrays_follow_updates_and_removal(self):
+        s = self._storage()
+        arrays = s._data_store.LocationsData.Arrays
+        self.assertEqual(arrays.Occupancy[arrays.rows(['L2'])][0], 2)
+        s._data_store.LocationsData.remove(ids=['L0'])
+        self.assertNotIn('L0', arrays.Ids)
+        self.assertEqual(len(arrays), 5)
+        for loc in s.get_locs().values():
+            row = arrays.rows([loc.Id])[0]
+            self.assertEqual(tuple(arrays.Coords[row]), tuple(float(c) for c in loc.Coords))
+            self.assertEqual(arrays.Occupancy[row], len(loc.ContainerIds))
+            self.assertEqual(arrays.Capacity[row], loc.Capacity)
+
+
+# ── spatial queries ───────────────────────────────────────────────────────────
+
+class TestSpatialQueries(unittest.TestCase):
+
+    def _storage(self, n=300, seed=3):
+        rng = random.Random(seed)
+        s = Storage()
+        s.register_locs([Location(id=f'L{i}', location_meta=_meta(capacity=1),
+                                  coords=(rng.uniform(0, 100), rng.uniform(0, 40), rng.choice((0, 5))))
+                         for i in range(n)])
+        return s
+
+    def _brute_nearest(self, s, point, filter=None):
+        return sorted(s.filter(filter), key=lambda loc: math.dist(point, loc.Coords))
+
+    def test_nearest_matches_full_scan(self):
+        s = self._storage()
+        for point in ((50, 20, 0), (-30, 60, 2), (99, 0, 5)):
+            expected = [loc.Id for loc in self._brute_nearest(s, point)[:7]]
+            self.assertEqual([loc.Id for loc in s.nearest_locations(point, k=7)], expected)
+
+    def test_nearest_applies_filter(self):
+        s = self._storage()
+        s.handle_transfer_requests([TransferRequestCriteria(new_container=_load(f'C{i}'),
+                                                            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=f'L{i}')))
+                                    for i in range(0, 300, 2)])
+        empty = LocationQualifier(is_occupied=False)
+        expected = [loc.Id for loc in self._brute_nearest(s, (10, 10, 0), empty)[:5]]
+        self.assertEqual([loc.Id for loc in s.nearest_locations((10, 10, 0), k=5, filter=empty)], expected)
+
+    def test_nearest_yields_distances_in_order(self):
+        s = self._storage()
+        dists = [d for d, _ in s.iter_nearest_locations((40, 10, 0))]
+        self.assertEqual(len(dists), 300)
+        self.assertEqual(dists, sorted(dists))
+
+    def test_box_matches_full_scan(self):
+        s = self._storage()
+        lo, hi = (20, 5, 0), (45, 30, 0)
+        expected = {loc.Id for loc in s.filter()
+                    if all(a <= c <= b for a, c, b in zip(lo, loc.Coords, hi))}
+        self.assertEqual({loc.Id for loc in s.locations_in_box(lo, hi)}, expected)
+        self.assertGreater(len(expected), 0)
+
+    def test_index_follows_registration_and_removal(self):
+        s = self._storage(n=10)
+        s.register_locs([Location(id='NEW', location_meta=_meta(), coords=(1000, 1000, 0))])
+        self.assertEqual(s.nearest_locations((999, 999, 0))[0].Id, 'NEW')
+        s._data_store.LocationsData.remove(ids=['NEW'])
+        self.assertNotEqual(s.nearest_locations((999, 999, 0))[0].Id, 'NEW')
+
+    def test_far_query_matches_full_scan(self):
+        s = self._storage()
+        for point in ((1e7, 0, 0), (-1e9, 1e9, 1e9)):
+            expected = [loc.Id for loc in self._brute_nearest(s, point)[:3]]
+            self.assertEqual([loc.Id for loc in s.nearest_locations(point, k=3)], expected)
+
+    def test_cell_size_follows_locations_added_one_at_a_time(self):
+        s = Storage()
+        for i in range(400):
+            s.register_locs([Location(id=f'L{i}', location_meta=_meta(capacity=1),
+                                      coords=((i % 20) * 1000, (i // 20) * 1000, 0))])
+        # About eight locations per occupied cell, not the 1.0 a lone first location implies
+        self.assertGreater(s._data_store.LocationsData.SpatialIndex.CellSize, 1000)
+        point = (10400, 7300, 0)
+        expected = [loc.Id for loc in self._brute_nearest(s, point)[:4]]
+        self.assertEqual(sorted(loc.Id for loc in s.nearest_locations(point, k=4)), sorted(expected))
+
+    def test_empty_storage(self):
+        self.assertEqual(Storage().nearest_locations((0, 0, 0), k=3), [])
+        self.assertEqual(Storage().locations_in_box((0, 0, 0), (1, 1, 1)), [])
+
+
 # ── handle_transfer_requests: type 1 (new container → dest) ──────────────────
 
 class TestTransferType1NewContainerToDest(unittest.TestCase):
@@ -310,6 +530,170 @@ class TestStorageProperties(unittest.TestCase):
         self.assertEqual(container_locs[l1].Id, 'A')
 
 
+# ── Container → location index ────────────────────────────────────────────────
+
+class TestContainerLocationIndex(unittest.TestCase):
+
+    def _store(self, s, container_id, loc_id):
+        s.handle_transfer_requests([
+            TransferRequestCriteria(
+                new_container=_load(container_id),
+                dest_loc_query_args=LocationQualifier(
+                    id_pattern=PatternMatchQualifier(id=loc_id)
+                ),
+            )
+        ])
+
+    def test_lookup_after_store(self):
+        s = _storage_with_locs('A', 'B')
+        self._store(s, 'L1', 'B')
+        self.assertEqual(s.get_container_loc_id('L1'), 'B')
+        self.assertEqual(s.get_container_loc('L1').Id, 'B')
+        self.assertEqual(s.StoredContainerCount, 1)
+
+    def test_unknown_container_returns_none(self):
+        s = _storage_with_locs('A')
+        self.assertIsNone(s.get_container_loc_id('nope'))
+        self.assertIsNone(s.get_container_loc('nope'))
+
+    def test_lookup_follows_move(self):
+        s = _storage_with_locs('A', 'B')
+        self._store(s, 'L1', 'A')
+        s.handle_transfer_requests([
+            TransferRequestCriteria(
+                container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='L1')),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='B')),
+            )
+        ])
+        self.assertEqual(s.get_container_loc_id('L1'), 'B')
+        self.assertEqual(s.ContainerLocIds, {'L1': 'B'})
+
+    def test_lookup_cleared_on_remove(self):
+        s = _storage_with_locs('A')
+        self._store(s, 'L1', 'A')
+        s.handle_transfer_requests([
+            TransferRequestCriteria(
+                container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='L1')),
+                delete_container_on_transfer=True,
+            )
+        ])
+        self.assertIsNone(s.get_container_loc_id('L1'))
+        self.assertEqual(s.StoredContainerCount, 0)
+
+    def test_non_str_ids_resolve_by_str(self):
+        s = _storage_with_locs('A')
+        self._store(s, 7, 'A')
+        self.assertEqual(s.get_container_loc_id(7), 'A')
+        self.assertEqual(s.get_container_loc_id('7'), 'A')
+
+    def test_clear_containers_empties_index(self):
+        s = _storage_with_locs('A', 'B')
+        self._store(s, 'L1', 'A')
+        s.clear_containers()
+        self.assertEqual(s.StoredContainerCount, 0)
+        self.assertIsNone(s.get_container_loc_id('L1'))
+
+    def test_clear_all_empties_index(self):
+        s = _storage_with_locs('A')
+        self._store(s, 'L1', 'A')
+        s.clear_all()
+        self.assertEqual(s.StoredContainerCount, 0)
+
+    def test_registered_loc_with_channel_state_is_indexed(self):
+        s = Storage()
+        s.register_locs([Location(id='A', location_meta=_meta(), coords=(0, 0, 0),
+                                  channel_state={0: 'X1'})])
+        self.assertEqual(s.get_container_loc_id('X1'), 'A')
+
+    def test_prepopulated_data_store_indexed_lazily(self):
+        ds = StorageDataStore()
+        ds.LocationsData.add([Location(id='A', location_meta=_meta(), coords=(0, 0, 0),
+                                       channel_state={1: 'X1'})])
+        s = Storage(data_store=ds)
+        self.assertEqual(s.get_container_loc_id('X1'), 'A')
+
+
+# ── free-capacity index ───────────────────────────────────────────────────────
+
+class TestLocationCapacityIndex(unittest.TestCase):
+
+    def _fill(self, s, loc_id, n):
+        for ii in range(n):
+            s.handle_transfer_requests([
+                TransferRequestCriteria(
+                    new_container=_load(f'{loc_id}-{ii}'),
+                    dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)),
+                )
+            ])
+
+    def test_key_tracks_container_moves(self):
+        s = _storage_with_locs('A', capacity=2)
+        index = s._data_store.LocationsData.CapacityIndex
+        self.assertEqual(index.get_key('A'), ('AllAvailableChannelProcessor', True, 2, False))
+        self._fill(s, 'A', 2)
+        self.assertEqual(index.get_key('A'), ('AllAvailableChannelProcessor', False, 0, True))
+
+    def test_filter_matches_full_scan(self):
+        s = _storage_with_locs('A', 'B', 'C', 'D', capacity=3)
+        self._fill(s, 'A', 3)
+        self._fill(s, 'B', 1)
+        for q in (LocationQualifier(at_least_capacity=2),
+                  LocationQualifier(is_occupied=True),
+                  LocationQualifier(has_addable_position=False),
+                  LocationQualifier(at_least_capacity=1, is_occupied=False)):
+            expected = {loc.Id for loc in s.get_locs().values() if q.check_if_qualifies(loc)}
+            self.assertEqual({loc.Id for loc in s.filter(q)}, expected, q)
+
+    def test_select_follows_registration_order(self):
+        # First fit in layout order, as a front-to-back scan picks it
+        s = _storage_with_locs('A', 'B', 'C', 'D', capacity=3)
+        self._fill(s, 'C', 2)
+        self._fill(s, 'A', 1)
+        q = LocationQualifier(at_least_capacity=1, has_addable_position=True)
+        self.assertEqual(s.select_location(q).Id, 'A')
+        self.assertEqual([loc.Id for loc in s.filter(q)], ['A', 'B', 'C', 'D'])
+        self.assertEqual(list(s._data_store.LocationsData.get(qualifier=q)), ['A', 'B', 'C', 'D'])
+
+    def test_default_putaway_destination_order(self):
+        s = _storage_with_locs('A', 'B', 'C', 'D', capacity=2)
+        self._fill(s, 'C', 1)
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=_load('c1'), dest_loc_query_args=LocationQualifier(has_addable_position=True))])
+        self.assertEqual(s.get_container_loc_id('c1'), 'A')
+        results = s.handle_transfer_request_batch([TransferRequestCriteria(
+            new_container=_load(f'b{ii}'), dest_loc_query_args=LocationQualifier(has_addable_position=True))
+            for ii in range(3)])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual([s.get_container_loc_id(f'b{ii}') for ii in range(3)], ['A', 'B', 'B'])
+
+    def test_no_candidates_raises(self):
+        s = _storage_with_locs('A', capacity=1)
+        self._fill(s, 'A', 1)
+        with self.assertRaises(NoLocationsMatchFilterCriteriaException):
+            s.select_location(LocationQualifier(has_addable_position=True))
+
+    def test_channel_processor_types(self):
+        s = Storage()
+        s.register_locs([
+            _loc('A'),
+            Location(id='B', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+                dims=(10, 10, 10), channel_processor=cps.FIFOFlowChannelProcessor(), capacity=3)),
+        ])
+        q = LocationQualifier(channel_processor_types=['FIFOFlowChannelProcessor'])
+        self.assertEqual([loc.Id for loc in s.filter(q)], ['B'])
+
+    def test_clear_containers_reindexes(self):
+        s = _storage_with_locs('A', capacity=1)
+        self._fill(s, 'A', 1)
+        s.clear_containers()
+        self.assertEqual(s.select_location(LocationQualifier(is_occupied=False)).Id, 'A')
+
+    def test_removed_location_not_a_candidate(self):
+        s = _storage_with_locs('A', 'B')
+        s._data_store.LocationsData.remove(ids=['A'])
+        self.assertEqual([loc.Id for loc in s.filter(LocationQualifier(is_occupied=False))], ['B'])
+
+
 # ── from_meta factory ─────────────────────────────────────────────────────────
 
 class TestFromMeta(unittest.TestCase):
@@ -379,6 +763,243 @@ class TestThreadSafety(unittest.TestCase):
         self.assertEqual(len(s.get_containers()), 50)
 
 
+
+class TestStripedConcurrency(unittest.TestCase):
+
+    def _striped(self, *loc_ids, capacity=3, **kwargs):
+        s = Storage(concurrency_mode=ConcurrencyMode.STRIPED, **kwargs)
+        s.register_locs([_loc(i, capacity) for i in loc_ids])
+        return s
+
+    def _run(self, fns):
+        errors = []
+
+        def wrap(fn):
+            try:
+                fn()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=wrap, args=(fn,)) for fn in fns]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return errors
+
+    def _add(self, s, cid):
+        return lambda: s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=_load(cid),
+            dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True))])
+
+    def test_concurrent_adds_fill_exactly_to_capacity(self):
+        s = self._striped(*[f'A{i}' for i in range(10)], capacity=4)
+        errors = self._run([self._add(s, f'C{i}') for i in range(40)])
+        self.assertEqual(errors, [])
+        self.assertEqual(s.StoredContainerCount, 40)
+        for loc in s.get_locs().values():
+            self.assertEqual(len(loc.ContainerIds), 4)
+
+    def test_concurrent_moves_keep_index_consistent(self):
+        s = self._striped(*[f'A{i}' for i in range(6)], capacity=4)
+        for i in range(12):
+            self._add(s, f'C{i}')()
+        moves = [lambda cid=f'C{i}': s.handle_transfer_requests([TransferRequestCriteria(
+                     container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id=cid)),
+                     dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True))])
+                 for i in range(12)]
+        self.assertEqual(self._run(moves), [])
+        stored = {str(cid): loc.Id for loc in s.get_locs().values() for cid in loc.ContainerIds}
+        self.assertEqual(len(stored), 12)
+        self.assertEqual(s.ContainerLocIds, stored)
+
+    def test_reads_not_blocked_by_pending_reservation(self):
+        entered, release = threading.Event(), threading.Event()
+
+        class _SlowProvider(PassthroughReservationProvider):
+            def reserve(self, resource, requester, resource_type=None):
+                entered.set()
+                release.wait(5)
+                return resource
+
+        s = self._striped('A', 'B', reservation_provider=_SlowProvider())
+        worker = threading.Thread(target=self._add(s, 'C1'))
+        worker.start()
+        try:
+            self.assertTrue(entered.wait(5))
+            done = threading.Event()
+            reader = threading.Thread(target=lambda: (s.get_locs(), done.set()))
+            reader.start()
+            self.assertTrue(done.wait(2), "get_locs blocked behind a pending reservation")
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(s.StoredContainerCount, 1)
+
+    def _assert_reads_not_blocked(self, provider, entered, release, transfer):
+        s = self._striped('A', 'B', reservation_provider=provider)
+        worker = threading.Thread(target=lambda: transfer(s))
+        worker.start()
+        try:
+            self.assertTrue(entered.wait(5))
+            done = threading.Event()
+            reader = threading.Thread(target=lambda: (s.get_locs(), done.set()))
+            reader.start()
+            self.assertTrue(done.wait(2), "get_locs blocked behind a reservation provider call")
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(s.StoredContainerCount, 1)
+
+    def test_reads_not_blocked_by_reserved_id_lookup(self):
+        entered, release = threading.Event(), threading.Event()
+
+        class _SlowProvider(PassthroughReservationProvider):
+            def get_reserved_ids(self, resource_ids):
+                entered.set()
+                release.wait(5)
+                return set()
+
+        self._assert_reads_not_blocked(_SlowProvider(), entered, release,
+                                       lambda s: s.handle_transfer_requests([TransferRequestCriteria(
+                                           new_container=_load('C1'),
+                                           dest_loc_query_args=LocationQualifier(at_least_capacity=1, reserved=False))]))
+
+    def test_reads_not_blocked_by_reservation_release(self):
+        entered, release = threading.Event(), threading.Event()
+
+        class _SlowProvider(PassthroughReservationProvider):
+            def unreserve(self, resource, requester, token):
+                entered.set()
+                release.wait(5)
+                return True
+
+        self._assert_reads_not_blocked(_SlowProvider(), entered, release, lambda s: self._add(s, 'C1')())
+
+    def test_move_within_one_location(self):
+        s = self._striped('A')
+        self._add(s, 'C1')()
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C1')),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='A')))])
+        self.assertEqual(s.get_container_loc_id('C1'), 'A')
+        self.assertEqual(s.get_locs()['A'].ContainerIds, ['C1'])
+
+    def test_blocked_source_falls_back_to_exclusive(self):
+        s = Storage(concurrency_mode=ConcurrencyMode.STRIPED)
+        s.register_locs([
+            Location(id='LIFO', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+                dims=(10, 10, 10), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=2)),
+            _loc('B'),
+        ])
+        for cid in ('C1', 'C2'):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                new_container=_load(cid),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='LIFO')))])
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C1')),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='B')))])
+        self.assertEqual(s.get_container_loc_id('C1'), 'B')
+
+
+# ── snapshot reads ────────────────────────────────────────────────────────────
+
+class TestStorageSnapshot(unittest.TestCase):
+
+    def _store(self, s, container_id, loc_id):
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=_load(container_id),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)))])
+
+    def test_snapshot_covers_registered_locs(self):
+        s = _storage_with_locs('A', 'B')
+        snap = s.snapshot()
+        self.assertEqual(set(snap.locations.keys()), {'A', 'B'})
+        self.assertEqual(snap.get('A').Capacity, 3)
+
+    def test_unchanged_storage_returns_same_snapshot(self):
+        s = _storage_with_locs('A', 'B')
+        self.assertIs(s.snapshot(), s.snapshot())
+
+    def test_snapshot_unaffected_by_later_transfers(self):
+        s = _storage_with_locs('A', 'B')
+        before = s.snapshot()
+        self._store(s, 'C1', 'A')
+        after = s.snapshot()
+        self.assertGreater(after.version, before.version)
+        self.assertEqual(before.get('A').ContainerIds, [])
+        self.assertEqual(after.get('A').ContainerIds, ['C1'])
+        # Untouched locations are shared between versions
+        self.assertIs(before.get('B'), after.get('B'))
+
+    def test_view_serialises_like_location(self):
+        s = _storage_with_locs('A')
+        self._store(s, 'C1', 'A')
+        self.assertEqual(s.snapshot().get('A').to_jsonable_dict(),
+                         Location.to_jsonable_dict(s.get_locs()['A']))
+
+    def test_returns_published_snapshot_while_writer_holds_lock(self):
+        s = _storage_with_locs('A')
+        published = s.snapshot()
+        held, release = threading.Event(), threading.Event()
+
+        def writer():
+            with s._lock:
+                self._store(s, 'C1', 'A')
+                held.set()
+                release.wait(5)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        try:
+            self.assertTrue(held.wait(5))
+            self.assertIs(s.snapshot(), published)
+        finally:
+            release.set()
+            t.join()
+        self.assertEqual(s.snapshot().get('A').ContainerIds, ['C1'])
+
+    def test_writer_republishes_stale_snapshot(self):
+        s = Storage(locs=[_loc('A'), _loc('B')], snapshot_max_age=0)
+        s.snapshot()
+        held, release = threading.Event(), threading.Event()
+
+        def writer():
+            with s._lock:
+                self._store(s, 'C1', 'A')
+                held.set()
+                release.wait(5)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        try:
+            self.assertTrue(held.wait(5))
+            snap = s.snapshot()
+            self.assertEqual(snap.get('A').ContainerIds, ['C1'])
+            self.assertEqual(snap.version, s.SnapshotVersion)
+        finally:
+            release.set()
+            t.join()
+
+    def test_snapshot_reports_age(self):
+        s = _storage_with_locs('A')
+        snap = s.snapshot()
+        self.assertGreaterEqual(snap.age, 0)
+        self.assertLess(snap.age, 60)
+
+    def test_clear_all_empties_snapshot(self):
+        s = _storage_with_locs('A', 'B')
+        s.snapshot()
+        s.clear_all()
+        self.assertEqual(len(s.snapshot()), 0)
+
+    def test_removed_loc_drops_from_snapshot(self):
+        s = _storage_with_locs('A', 'B')
+        s.snapshot()
+        s._data_store.LocationsData.remove(ids=['B'])
+        self.assertIsNone(s.snapshot().get('B'))
+        self.assertIsNotNone(s.snapshot().get('A'))
+
+
 # ── add/remove content at location ────────────────────────────────────────────
 
 EACH = UnitOfMeasure(name="EA")
@@ -762,5 +1383,304 @@ class TestStorageReservationQueries(unittest.TestCase):
         self.assertEqual(loc.Id, 'A')
 
 
+
+# ── batched transfers ─────────────────────────────────────────────────────────
+
+class _BulkTrackingReservationProvider(_TrackingReservationProvider):
+    """Tracking provider with a bulk reserve that denies resources in *deny*."""
+
+    def __init__(self, deny=()):
+        super().__init__()
+        self._deny = set(deny)
+        self.reserve_many_calls = 0
+        self.reserved_id_checks = 0
+
+    def reserve_many(self, asks):
+        self.reserve_many_calls += 1
+        return [None if resource in self._deny else self.reserve(resource, requester)
+                for resource, requester, _ in asks]
+
+    def get_reserved_ids(self, resource_ids) -> set:
+        self.reserved_id_checks += 1
+        return super().get_reserved_ids(resource_ids)
+
+
+def _putaway(container_id, dest_filter=None):
+    return TransferRequestCriteria(
+        new_container=_load(container_id),
+        dest_loc_query_args=dest_filter or LocationQualifier(at_least_capacity=1, has_addable_position=True))
+
+
+class TestTransferRequestBatch(unittest.TestCase):
+
+    def test_putaways_succeed_in_order(self):
+        s = _storage_with_locs('A', 'B', capacity=2)
+        results = s.handle_transfer_request_batch([_putaway(f'C{i}') for i in range(4)])
+        self.assertEqual([r.criteria.new_container.id for r in results], ['C0', 'C1', 'C2', 'C3'])
+        self.assertTrue(all(r.Succeeded for r in results))
+        self.assertEqual(s.StoredContainerCount, 4)
+
+    def test_overflow_reported_per_item(self):
+        s = _storage_with_locs('A', 'B', capacity=1)
+        results = s.handle_transfer_request_batch([_putaway(f'C{i}') for i in range(3)])
+        self.assertEqual([r.Succeeded for r in results], [True, True, False])
+        self.assertIsInstance(results[2].error, NoLocationsMatchFilterCriteriaException)
+        self.assertEqual({r.request.dest_loc.Id for r in results[:2]}, {'A', 'B'})
+
+    def test_placements_match_sequential(self):
+        for evaluator in (None, evaluators.fewest_containers):
+            batch, sequential = _storage_with_locs('A', 'B', 'C'), _storage_with_locs('A', 'B', 'C')
+            batch.handle_transfer_request_batch([_putaway(f'C{i}') for i in range(7)], dest_loc_evaluator=evaluator)
+            for i in range(7):
+                sequential.handle_transfer_requests([_putaway(f'C{i}')], dest_loc_evaluator=evaluator)
+            self.assertEqual(batch.summary(), sequential.summary())
+
+    def test_mixed_batch_keeps_order(self):
+        s = _storage_with_locs('A', capacity=1)
+        results = s.handle_transfer_request_batch([
+            _putaway('C1'),
+            TransferRequestCriteria(source_loc_query_args=LocationQualifier(is_occupied=True),
+                                    delete_container_on_transfer=True),
+            _putaway('C2'),
+        ])
+        self.assertTrue(all(r.Succeeded for r in results))
+        self.assertEqual(s.get_container_loc_id('C2'), 'A')
+        self.assertIsNone(s.get_container_loc_id('C1'))
+
+    def test_reservations_acquired_in_one_call(self):
+        provider = _BulkTrackingReservationProvider()
+        s = Storage(reservation_provider=provider)
+        s.register_locs([_loc(i) for i in ('A', 'B')])
+        dest_filter = LocationQualifier(at_least_capacity=1, reserved=False)
+        results = s.handle_transfer_request_batch([_putaway(f'C{i}', dest_filter) for i in range(5)])
+        self.assertTrue(all(r.Succeeded for r in results))
+        self.assertEqual(provider.reserve_many_calls, 1)
+        self.assertEqual(provider.reserved_id_checks, 1)
+        self.assertEqual(provider.get_reserved_ids(['A', 'B', 'C0']), set())
+
+    def test_denied_reservation_fails_only_that_item(self):
+        provider = _BulkTrackingReservationProvider(deny={'C1'})
+        s = Storage(reservation_provider=provider)
+        s.register_locs([_loc('A')])
+        results = s.handle_transfer_request_batch([_putaway(f'C{i}') for i in range(3)])
+        self.assertEqual([r.Succeeded for r in results], [True, False, True])
+        self.assertIsNone(s.get_container_loc_id('C1'))
+        # The denied item's destination reservation was released
+        self.assertFalse(provider.is_reserved('A'))
+
+
+# ── unblock planning ─────────────────────────────────────────────────────────
+
+def _lane_storage(lane_capacity, dests, **storage_kwargs):
+    """A LIFO lane filled C0 (deepest) .. C{n-1}, plus *dests* (id, processor, capacity, stored ids)."""
+    s = Storage(**storage_kwargs)
+    big = (1000 * lane_capacity, 1000, 1000)
+    s.register_locs([Location(id='LANE', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+        dims=big, channel_processor=cps.LIFOFlowChannelProcessor(), capacity=lane_capacity))])
+    s.register_locs([Location(id=loc_id, coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+        dims=big, channel_processor=processor, capacity=capacity)) for loc_id, processor, capacity, _ in dests])
+    for loc_id, stored in [('LANE', [f'C{i}' for i in range(lane_capacity)])] + [(d[0], d[3]) for d in dests]:
+        for cid in stored:
+            s.handle_transfer_requests([_putaway(cid, LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)))])
+    return s
+
+
+class TestUnblockPlanner(unittest.TestCase):
+
+    def test_plan_moves_every_blocker_in_order(self):
+        s = _lane_storage(5, [('D', cps.AllAvailableChannelProcessor(), 10, [])])
+        plan = s.plan_unblock('C0')
+        self.assertEqual(plan.MoveCount, 4)
+        self.assertEqual([m.container.id for m in plan.moves], ['C4', 'C3', 'C2', 'C1'])
+        self.assertEqual({m.dest_loc_id for m in plan.moves}, {'D'})
+        self.assertGreater(plan.compute_time_s, 0)
+
+    def test_plan_has_no_side_effects(self):
+        s = _lane_storage(4, [('D', cps.AllAvailableChannelProcessor(), 10, [])])
+        before = s.summary()
+        s.plan_unblock('C0')
+        self.assertEqual(s.summary(), before)
+
+    def test_accessible_container_needs_no_moves(self):
+        s = _lane_storage(3, [('D', cps.AllAvailableChannelProcessor(), 10, [])])
+        self.assertEqual(s.plan_unblock('C2').MoveCount, 0)
+
+    def test_retrieval_executes_plan(self):
+        s = _lane_storage(4, [('D', cps.AllAvailableChannelProcessor(), 10, [])])
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C0')))])
+        self.assertIsNone(s.get_container_loc_id('C0'))
+        self.assertEqual(sorted(s.get_locs()['D'].ContainerIds), ['C1', 'C2', 'C3'])
+
+    def test_prefers_destinations_that_bury_nothing(self):
+        # The evaluator favours X, a LIFO lane whose stored container a blocker would bury
+        s = _lane_storage(2, [('X', cps.LIFOFlowChannelProcessor(), 3, ['K']),
+                              ('Y', cps.LIFOFlowChannelProcessor(), 3, [])])
+        plan = s.plan_unblock('C0', unblock_dest_evaluator=lambda loc: 1 if loc.Id == 'X' else 0)
+        self.assertEqual([m.dest_loc_id for m in plan.moves], ['Y'])
+        self.assertEqual(plan.newly_blocked, 0)
+
+    def test_no_destination_moves_nothing(self):
+        s = _lane_storage(3, [('D', cps.AllAvailableChannelProcessor(), 1, [])])
+        before = s.summary()
+        with self.assertRaises(NoLocationsMatchFilterCriteriaException):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C0')))])
+        self.assertEqual(s.summary(), before)
+
+    def test_moves_reserved_in_one_call(self):
+        provider = _BulkTrackingReservationProvider()
+        s = _lane_storage(4, [('D', cps.AllAvailableChannelProcessor(), 10, [])], reservation_provider=provider)
+        calls = provider.reserve_many_calls
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C0')))])
+        self.assertEqual(provider.reserve_many_calls, calls + 1)
+        self.assertFalse(provider.is_reserved('D'))
+
+    def test_penalty_for_full_lane_is_its_capacity(self):
+        s = _lane_storage(3, [])
+        self.assertEqual(BlockagePenalty()(s.get_locs()['LANE']), 3)
+
+    def test_penalty_does_not_swallow_processor_bugs(self):
+        class _Broken(cps.LIFOFlowChannelProcessor):
+            def process(self, *args, **kwargs):
+                raise TypeError('bug')
+        loc = Location(id='B', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+            dims=(3000, 1000, 1000), channel_processor=_Broken(), capacity=3))
+        with self.assertRaises(TypeError):
+            BlockagePenalty()(loc)
+
+
+class TestSourceSelection(unittest.TestCase):
+
+    def _retrieve(self, s, pattern):
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=pattern), delete_container_on_transfer=True)])
+
+    def test_retrieval_cost_counts_blockers(self):
+        s = _lane_storage(4, [])
+        self.assertEqual([s.retrieval_cost(f'C{i}') for i in range(4)], [3, 2, 1, 0])
+
+    def test_cost_model_shares_simulations_across_locations(self):
+        s = _lane_storage(3, [('X', cps.LIFOFlowChannelProcessor(), 3, ['K1', 'K2', 'K3'])])
+        model = RetrievalCostModel()
+        locs = s.get_locs()
+        self.assertEqual(model.position_costs(locs['LANE']), model.position_costs(locs['X']))
+        self.assertEqual(len(model), 1)
+        self.assertEqual(model.moves(locs['X'], 'K1'), 2)
+
+    def test_cost_model_cache_is_bounded(self):
+        model = RetrievalCostModel(cache_size=2)
+        cp = cps.LIFOFlowChannelProcessor()
+        for occupied in ((True, False), (True, True), (False, False)):
+            model.blocking_positions(cp, occupied)
+        self.assertEqual(len(model), 2)
+        self.assertEqual(model.blocking_positions(cp, (True, True)), ((), (0,)))
+
+    def test_cost_model_rejections_are_none(self):
+        model = RetrievalCostModel()
+        cp = cps.LIFOFlowChannelProcessor()
+        self.assertIsNone(model.after_add(cp, (True, True)))
+        self.assertIsNone(model.after_remove(cp, (True, True), 1))
+
+    def test_cost_model_does_not_cache_processor_bugs(self):
+        class _Broken(cps.LIFOFlowChannelProcessor):
+            def process(self, *args, **kwargs):
+                raise TypeError('bug')
+        model = RetrievalCostModel()
+        for _ in range(2):
+            with self.assertRaises(TypeError):
+                model.after_add(_Broken(), (True, False))
+            with self.assertRaises(TypeError):
+                model.after_remove(_Broken(), (True, False), 0)
+
+    def test_cheapest_retrieval_needs_no_moves(self):
+        s = _lane_storage(4, [('D', cps.AllAvailableChannelProcessor(), 10, [])],
+                          source_selection=SourceSelectionMode.CHEAPEST_RETRIEVAL)
+        self._retrieve(s, PatternMatchQualifier(regex='^C'))
+        self.assertEqual(set(s.get_locs()['LANE'].ContainerIds), {'C0', 'C1', 'C2'})
+        self.assertEqual(s.get_locs()['D'].ContainerIds, [])
+
+    def test_cheapest_retrieval_prefers_shallower_lane(self):
+        # C0 sits under two blockers in LANE, C9 under one in X
+        s = _lane_storage(3, [('X', cps.LIFOFlowChannelProcessor(), 3, ['C9', 'K']),
+                              ('D', cps.AllAvailableChannelProcessor(), 10, [])],
+                          source_selection=SourceSelectionMode.CHEAPEST_RETRIEVAL)
+        self._retrieve(s, PatternMatchQualifier(regex='^C[09]$'))
+        self.assertIsNone(s.get_container_loc_id('C9'))
+        self.assertEqual(s.get_container_loc_id('C0'), 'LANE')
+        self.assertEqual(s.get_locs()['D'].ContainerIds, ['K'])
+
+    def test_no_match_raises(self):
+        s = _lane_storage(2, [], source_selection=SourceSelectionMode.CHEAPEST_RETRIEVAL)
+        with self.assertRaises(NoLocationsMatchFilterCriteriaException):
+            self._retrieve(s, PatternMatchQualifier(regex='^Z'))
+
+
+class TestFutureBlockingPutaway(unittest.TestCase):
+
+    def _storage(self):
+        # X holds a container needed soon, Y one needed late
+        s = Storage()
+        meta = dcs.LocationMeta(dims=(3000, 1000, 1000), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=3)
+        s.register_locs([Location(id=loc_id, coords=(0, 0, 0), location_meta=meta) for loc_id in ('X', 'Y')])
+        for loc_id, cid, dwell in (('X', 'SOON', 1), ('Y', 'LATE', 100)):
+            s.handle_transfer_requests([TransferRequestCriteria(
+                new_container=dcs.Container(id=cid, expected_dwell=dwell),
+                dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id=loc_id)))])
+        return s
+
+    def _putaway(self, cid, dwell):
+        return TransferRequestCriteria(new_container=dcs.Container(id=cid, expected_dwell=dwell),
+                                       dest_loc_query_args=LocationQualifier(has_addable_position=True))
+
+    def test_scores_expected_added_moves(self):
+        s = self._storage()
+        evaluator = s.future_blocking_evaluator()
+        bound = evaluators.bind_container(evaluator, dcs.Container(id='N', expected_dwell=10))
+        locs = s.get_locs()
+        self.assertEqual((bound(locs['X']), bound(locs['Y'])), (-1, 0))
+        # Unknown dwell counts as even odds of burying either
+        self.assertEqual((evaluator(locs['X']), evaluator(locs['Y'])), (-0.5, -0.5))
+
+    def test_non_blocking_processor_scores_zero(self):
+        s = _lane_storage(2, [('D', cps.AllAvailableChannelProcessor(), 4, ['K'])])
+        self.assertEqual(s.future_blocking_evaluator()(s.get_locs()['D']), 0)
+
+    def test_dest_loc_evaluator_avoids_burying_sooner_container(self):
+        s = self._storage()
+        s.handle_transfer_requests([self._putaway('N', 10)], dest_loc_evaluator=s.future_blocking_evaluator())
+        self.assertEqual(s.get_container_loc_id('N'), 'Y')
+
+    def test_batch_binds_each_container(self):
+        s = self._storage()
+        # N2 outlives everything: X would then cost one move (SOON), Y two (N1, LATE)
+        results = s.handle_transfer_request_batch([self._putaway('N1', 10), self._putaway('N2', 200)],
+                                                  dest_loc_evaluator=s.future_blocking_evaluator())
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(s.get_container_loc_id('N1'), 'Y')
+        self.assertEqual(s.get_container_loc_id('N2'), 'X')
+
+    def test_unblock_moves_are_counted(self):
+        s = _lane_storage(4, [('D', cps.AllAvailableChannelProcessor(), 10, [])])
+        self.assertEqual(s.UnblockMoveCount, 0)
+        s.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='C0')))])
+        self.assertEqual(s.UnblockMoveCount, 3)
+
+
+class TestCachedReservationChecks(unittest.TestCase):
+
+    def test_repeated_reserved_false_putaways_check_provider_once(self):
+        inner = _BulkTrackingReservationProvider()
+        s = Storage(reservation_provider=CachingReservationProvider(inner, ttl=60))
+        s.register_locs([_loc(i, capacity=1) for i in ('A', 'B', 'C')])
+        for i in range(3):
+            s.handle_transfer_requests([_putaway(f'C{i}', LocationQualifier(at_least_capacity=1, reserved=False))])
+        self.assertEqual(s.StoredContainerCount, 3)
+        self.assertEqual(inner.reserved_id_checks, 1)
+        self.assertEqual(s.get_reserved_location_ids(), set())
+
+
 if __name__ == "__main__":
     unittest.main()
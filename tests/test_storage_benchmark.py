@@ -5,7 +5,8 @@ All three sizes exercise the same backbone:
   - N locations spread evenly across all 10 channel processor types
   - Fill-to-80% / drain-to-40% cycle via handle_transfer_requests
   - Periodic invariant validation + tracked-container location accuracy checks
-  - Printed benchmark report (requires -s flag to see output)
+  - Printed benchmark report, including add latency per 10% fill band
+    (requires -s flag to see output)
 
 Typical usage:
     # fast — runs in CI:
@@ -16,20 +17,58 @@ Typical usage:
 
     # full stress:
     python -m pytest tests/test_storage_benchmark.py -v -s -k Large
+
+    # million-scale memory / cold-start cases (many minutes each):
+    COOPSTORAGE_BENCHMARK_HUGE=1 python -m pytest tests/test_storage_benchmark.py -v -s -k Large
+
+Each size also runs these side benchmarks:
+  - qualifier: compiled (LocationQualifier.compile) vs interpreted (check_if_qualifies)
+  - concurrency: multi-threaded throughput under GLOBAL vs STRIPED modes
+  - reservation cache: putaway with and without a CachingReservationProvider
+  - evaluator: batch (NumPy) vs per-location distance scoring
+  - unblock: deep-lane retrieval plan size and compute time
+  - source selection: RANDOM vs CHEAPEST_RETRIEVAL retrieval
+  - putaway scoring: unblock moves per 1k ops, random vs fewest_future_unblocks
+  - compact channel: memory and add/remove throughput, list-backed vs arena-backed
+  - lane matrix: what-if replay, vectorised LaneMatrix vs per-Channel loop
+  - tracing: store/remove throughput with tracing off and on
+  - memory: bytes per location and per container
+  - SQL transfer: SQLite-file moves/sec, single vs batched transfers
+  - SQL register: SQLite-file locations/sec for bulk layout registration
+  - SQL cache: SQLite-file full reload vs in-place removal vs delta refresh
+  - SQL cold start: LayoutManager start time and peak memory, eager vs lazy by zone
+  - batch: fill/drain with one handle_transfer_request_batch call per add batch
 """
 
+from collections import defaultdict
 from dataclasses import dataclass, field
+from datetime import datetime
 import logging
+import math
+import os
 import random
+import tempfile
+import threading
 import time
+import tracemalloc
 import unittest
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 import coopstorage.storage.loc_load.channel_processors as cps
 import coopstorage.storage.loc_load.dcs as dcs
-from coopstorage.storage.loc_load.qualifiers import LocationQualifier
+import coopstorage.storage.loc_load.evaluators as evaluators
+from pubsub import pub
+from coopstorage.enums import ConcurrencyMode, SourceSelectionMode, StorageTopic
+from coopstorage.lane_matrix import LaneMatrix, OK, NO_ROOM, NOT_FOUND, BLOCKED
+from coopstorage.storage.loc_load.channel import Channel
+from coopstorage.storage.loc_load.compact_channel import CompactChannel, SlotArena
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import LocationQualifier, ContainerQualifier
+from coopstorage.storage.loc_load import tracing
+from coopstorage.storage.loc_load.reservation_provider import PassthroughReservationProvider, CachingReservationProvider
+from cooptools.qualifiers import PatternMatchQualifier, WhiteBlackListQualifier
 from coopstorage.storage.loc_load.storage import Storage
 from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
 from coopstorage.storage_generators import build_all_processor_storage
@@ -107,6 +146,10 @@ LARGE = BenchmarkConfig(
     validate_every    = 10_000,
 )
 
+# Million-scale cases take many minutes each, so -k Large skips them unless opted in
+HUGE_ENV_VAR = 'COOPSTORAGE_BENCHMARK_HUGE'
+huge = unittest.skipUnless(os.environ.get(HUGE_ENV_VAR) == '1', f"set {HUGE_ENV_VAR}=1 to run")
+
 # ── shared backbone ───────────────────────────────────────────────────────────
 
 def run_benchmark(
@@ -114,6 +157,7 @@ def run_benchmark(
     cfg: BenchmarkConfig,
     delay_provider: Optional[Callable[[], float]] = None,
     storage: Optional[Storage] = None,
+    batched: bool = False,
 ) -> None:
     """
     Execute the full fill/drain workload defined by cfg, running invariant
@@ -128,6 +172,9 @@ def run_benchmark(
                         benchmark operates on it directly (useful for sharing a
                         storage with an API server). If None a fresh storage is
                         built from cfg.
+        batched:        Fill each add batch with one handle_transfer_request_batch
+                        call instead of one handle_transfer_requests call per
+                        container (see run_batch_benchmark). Ignores delay_provider.
     """
     if storage is None:
         storage = build_all_processor_storage(
@@ -149,8 +196,15 @@ def run_benchmark(
         'add_times':          [],
         'remove_times':       [],
         'validate_times':     [],
+        # fill band (10% of max_concurrent each) -> [seconds adding, containers added]
+        'add_by_band':        defaultdict(lambda: [0.0, 0]),
     }
 
+    def _record_add(seconds: float, count: int, fill_count: int):
+        band = min(fill_count * 10 // cfg.max_concurrent, 9)
+        metrics['add_by_band'][band][0] += seconds
+        metrics['add_by_band'][band][1] += count
+
     # ── validation ────────────────────────────────────────────────────────────
 
     def _validate(label: str):
@@ -226,22 +280,39 @@ def run_benchmark(
         # add a batch
         batch = min(cfg.add_batch_size, cfg.total_to_add - total_added)
         t0 = time.perf_counter()
-        for batch_idx in range(batch):
-            cid = f"C{container_counter:07d}"
-            container_counter += 1
-            storage.handle_transfer_requests([
+        if batched:
+            # Whole batch in one call: one reservation snapshot, one candidate scan
+            criteria = [
                 TransferRequestCriteria(
-                    new_container=dcs.Container(id=cid),
+                    new_container=dcs.Container(id=f"C{container_counter + batch_idx:07d}"),
                     dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True),
                 )
-            ])
-            if delay_provider is not None:
-                time.sleep(delay_provider())
-            now = time.perf_counter()
-            if now - last_status_time >= STATUS_INTERVAL:
-                _print_heartbeat('add', total_added + batch_idx + 1,
-                                 current_count + batch_idx + 1)
-                last_status_time = now
+                for batch_idx in range(batch)
+            ]
+            container_counter += batch
+            results = storage.handle_transfer_request_batch(criteria)
+            _record_add(time.perf_counter() - t0, batch, current_count)
+            failed = [r for r in results if not r.Succeeded]
+            test.assertEqual(failed, [], f"{len(failed)} putaways failed, first: {failed[:1]}")
+        else:
+            for batch_idx in range(batch):
+                cid = f"C{container_counter:07d}"
+                container_counter += 1
+                t_add = time.perf_counter()
+                storage.handle_transfer_requests([
+                    TransferRequestCriteria(
+                        new_container=dcs.Container(id=cid),
+                        dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True),
+                    )
+                ])
+                _record_add(time.perf_counter() - t_add, 1, current_count + batch_idx)
+                if delay_provider is not None:
+                    time.sleep(delay_provider())
+                now = time.perf_counter()
+                if now - last_status_time >= STATUS_INTERVAL:
+                    _print_heartbeat('add', total_added + batch_idx + 1,
+                                     current_count + batch_idx + 1)
+                    last_status_time = now
         current_count += batch
         total_added   += batch
         metrics['total_added'] += batch
@@ -311,7 +382,7 @@ def run_benchmark(
     avg_valid_ms = (sum(metrics['validate_times']) / len(metrics['validate_times'])) * 1_000
 
     print(f"\n{'='*62}")
-    print(f"  STORAGE BENCHMARK  [{type(test).__name__}]")
+    print(f"  STORAGE BENCHMARK{' (BATCHED)' if batched else ''}  [{type(test).__name__}]")
     print(f"{'='*62}")
     print(f"  Locations:            {cfg.num_locations:,}  "
           f"({len(cps.ChannelProcessorType)} types × {cfg.locs_per_type:,} each)")
@@ -324,11 +395,781 @@ def run_benchmark(
     print(f"  Peak concurrent:      {metrics['peak_concurrent']:,}")
     print(f"  Throughput:           {throughput:,.0f} containers/sec")
     print(f"  Avg add latency:      {avg_add_ms:.3f} ms/container")
+    print(f"  Add latency by fill (ms/container):")
+    for band, (seconds, count) in sorted(metrics['add_by_band'].items()):
+        label = f"{band * 10}-{band * 10 + 10}%"
+        print(f"    {label:<18}{seconds / count * 1_000:.3f}  (n={count:,})")
     print(f"  Avg validation time:  {avg_valid_ms:.0f} ms")
     print(f"  Validations passed:   {metrics['validations_passed']}")
+    print(f"  Unblock moves/1k ops: {storage.UnblockMoveCount * 1000 / (metrics['total_added'] + metrics['total_removed']):.1f}")
+    print(f"{'='*62}")
+
+
+def run_batch_benchmark(test: unittest.TestCase, cfg: BenchmarkConfig) -> None:
+    """run_benchmark with each add batch filled by one handle_transfer_request_batch call.
+
+    Compare its throughput with run_benchmark on the same cfg.
+    """
+    run_benchmark(test, cfg, batched=True)
+
+
+# ── qualifier micro-benchmark ─────────────────────────────────────────────────
+
+def run_qualifier_benchmark(test: unittest.TestCase, cfg: BenchmarkConfig, passes: int = 20) -> None:
+    """Time compiled vs interpreted LocationQualifier evaluation over every location
+    of a half-full storage, asserting that both agree on every location."""
+    storage = build_all_processor_storage(
+        locs_per_type=cfg.locs_per_type,
+        location_capacity=cfg.location_capacity,
+    )
+    for ii in range(cfg.max_concurrent // 2):
+        storage.handle_transfer_requests([TransferRequestCriteria(
+            new_container=dcs.Container(id=f"Q{ii:08d}"),
+            dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True),
+        )])
+
+    locs      = list(storage.get_locs().values())
+    container = dcs.Container(id="PROBE")
+    qualifiers = {
+        'putaway':   LocationQualifier(at_least_capacity=1, has_addable_position=True),
+        'blacklist': LocationQualifier(at_least_capacity=1, has_addable_position=True,
+                                       id_pattern=PatternMatchQualifier(
+                                           white_list_black_list_qualifier=WhiteBlackListQualifier(
+                                               black_list=[locs[0].Id]))),
+        'regex':     LocationQualifier(id_pattern=PatternMatchQualifier(regex='^FIFO'), is_occupied=True),
+    }
+
+    print(f"\n{'='*62}")
+    print(f"  QUALIFIER BENCHMARK  [{type(test).__name__}]  "
+          f"{len(locs):,} locations × {passes} passes")
+    print(f"{'='*62}")
+    for name, q in qualifiers.items():
+        t0 = time.perf_counter()
+        for _ in range(passes):
+            interpreted = [q.check_if_qualifies(loc, container=container) for loc in locs]
+        interpreted_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(passes):
+            qualifies = q.compile(container=container)
+            compiled = [qualifies(loc) for loc in locs]
+        compiled_time = time.perf_counter() - t0
+
+        test.assertEqual(compiled, interpreted, f"compiled/interpreted mismatch for '{name}'")
+        print(f"  {name:<10}  interpreted={interpreted_time * 1_000:8.1f} ms"
+              f"  compiled={compiled_time * 1_000:8.1f} ms"
+              f"  speedup={interpreted_time / compiled_time if compiled_time > 0 else float('inf'):.1f}x")
+    print(f"{'='*62}")
+
+
+
+# ── multi-threaded throughput ─────────────────────────────────────────────────
+
+class _LatentReservationProvider(PassthroughReservationProvider):
+    """Grants every reservation after a fixed delay, standing in for an HTTP round trip.
+    Reservation checks take *check_latency_s*."""
+    def __init__(self, latency_s: float, check_latency_s: float = 0.0):
+        self._latency_s = latency_s
+        self._check_latency_s = check_latency_s
+
+    def reserve(self, resource: str, requester: str, resource_type: str = None):
+        time.sleep(self._latency_s)
+        return resource
+
+    def reserve_many(self, asks):
+        # Concurrency benchmark measures per-item reserve latency; keep one delay per ask
+        return [self.reserve(resource, requester, resource_type) for resource, requester, resource_type in asks]
+
+    def get_reserved_ids(self, resource_ids) -> set:
+        if self._check_latency_s:
+            time.sleep(self._check_latency_s)
+        return set()
+
+
+def run_concurrency_benchmark(test: unittest.TestCase,
+                              cfg: BenchmarkConfig,
+                              n_threads: int = 8,
+                              reservation_latency_s: float = 0.001) -> None:
+    """Fill storage to cfg.fill_threshold from *n_threads* threads under each
+    ConcurrencyMode and report containers/sec, checking no location overfills."""
+    to_add = min(cfg.total_to_add, cfg.fill_threshold)
+    per_thread = to_add // n_threads
+
+    print(f"\n{'='*62}")
+    print(f"  CONCURRENCY BENCHMARK  [{type(test).__name__}]  "
+          f"{n_threads} threads × {per_thread:,} adds, reserve latency={reservation_latency_s * 1_000:.1f} ms")
+    print(f"{'='*62}")
+    for mode in ConcurrencyMode:
+        storage = build_all_processor_storage(
+            locs_per_type=cfg.locs_per_type,
+            location_capacity=cfg.location_capacity,
+            reservation_provider=_LatentReservationProvider(reservation_latency_s),
+            concurrency_mode=mode,
+        )
+        errors = []
+
+        def _worker(t_idx: int):
+            try:
+                for ii in range(per_thread):
+                    storage.handle_transfer_requests([TransferRequestCriteria(
+                        new_container=dcs.Container(id=f"T{t_idx:02d}_{ii:08d}"),
+                        dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True),
+                    )])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_worker, args=(t,)) for t in range(n_threads)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+        test.assertEqual(errors, [], f"{mode.name}: worker errors")
+        test.assertEqual(storage.StoredContainerCount, per_thread * n_threads, f"{mode.name}: lost containers")
+        for loc in storage.get_locs().values():
+            test.assertLessEqual(len(loc.ContainerIds), loc.Capacity, f"{mode.name}: {loc.Id} overfilled")
+        print(f"  {mode.name:<8}  {elapsed:6.2f}s  {per_thread * n_threads / elapsed:10,.0f} containers/sec")
+    print(f"{'='*62}")
+
+
+# ── reservation cache ─────────────────────────────────────────────────────────
+
+def run_reservation_cache_benchmark(test: unittest.TestCase,
+                                    cfg: BenchmarkConfig,
+                                    check_latency_s: float = 0.001,
+                                    ttl_s: float = 5.0) -> None:
+    """Put away containers into unreserved locations with and without a
+    CachingReservationProvider in front of a provider whose reservation checks cost
+    *check_latency_s*, and report containers/sec and the cache hit rate."""
+    to_add = min(cfg.total_to_add, cfg.fill_threshold, 2_000)
+
+    print(f"\n{'='*62}")
+    print(f"  RESERVATION CACHE BENCHMARK  [{type(test).__name__}]  "
+          f"{to_add:,} adds, check latency={check_latency_s * 1_000:.1f} ms, ttl={ttl_s:.0f}s")
+    print(f"{'='*62}")
+    for label in ('uncached', 'cached'):
+        provider = _LatentReservationProvider(0.0, check_latency_s=check_latency_s)
+        if label == 'cached':
+            provider = CachingReservationProvider(provider, ttl=ttl_s)
+        storage = build_all_processor_storage(
+            locs_per_type=cfg.locs_per_type,
+            location_capacity=cfg.location_capacity,
+            reservation_provider=provider,
+        )
+        t0 = time.perf_counter()
+        for ii in range(to_add):
+            storage.handle_transfer_requests([TransferRequestCriteria(
+                new_container=dcs.Container(id=f"R{ii:08d}"),
+                dest_loc_query_args=LocationQualifier(at_least_capacity=1, has_addable_position=True, reserved=False),
+            )])
+        elapsed = time.perf_counter() - t0
+
+        test.assertEqual(storage.StoredContainerCount, to_add, f"{label}: lost containers")
+        hit_rate = f"  hit rate={provider.Stats.hit_rate:.1%}" if label == 'cached' else ""
+        print(f"  {label:<9} {elapsed:6.2f}s  {to_add / elapsed:10,.0f} containers/sec{hit_rate}")
+    print(f"{'='*62}")
+
+
+# ── vectorised evaluators ─────────────────────────────────────────────────────
+
+def run_evaluator_benchmark(test: unittest.TestCase, n_locations: int, passes: int = 5) -> None:
+    """Time distance-based putaway scoring over *n_locations* with the batch form of
+    evaluators.closest_to against calling it per location, asserting both select the
+    same location."""
+    side = math.ceil(math.sqrt(n_locations))
+    meta = dcs.LocationMeta(dims=(1, 1, 1), capacity=5, channel_processor=cps.AllAvailableChannelProcessor())
+    storage = Storage(locs=[Location(id=f"L{i:06d}", location_meta=meta, coords=(i % side, i // side, 0))
+                            for i in range(n_locations)])
+    evaluator = evaluators.closest_to((side * 0.37, side * 0.61, 0))
+    per_location = lambda loc: evaluator(loc)
+    putaway = LocationQualifier(at_least_capacity=1, has_addable_position=True)
+
+    locs = list(storage.get_locs().values())
+    arrays = storage._data_store.LocationsData.Arrays
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        evaluators.get_batch(evaluator)(arrays, arrays.rows(loc.Id for loc in locs))
+    batch_score_ms = (time.perf_counter() - t0) / passes * 1_000
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        [per_location(loc) for loc in locs]
+    loop_score_ms = (time.perf_counter() - t0) / passes * 1_000
+
+    timings = {}
+    for label, fn in (('batch', evaluator), ('loop', per_location)):
+        t0 = time.perf_counter()
+        for _ in range(passes):
+            selected = storage.select_location(putaway, evaluator=fn)
+        timings[label] = ((time.perf_counter() - t0) / passes * 1_000, selected.Id)
+    test.assertEqual(timings['batch'][1], timings['loop'][1], "batch and per-location selection disagree")
+
+    print(f"\n{'='*62}")
+    print(f"  EVALUATOR BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations, closest_to")
+    print(f"{'='*62}")
+    print(f"  score all       batch={batch_score_ms:8.2f} ms  loop={loop_score_ms:8.2f} ms"
+          f"  speedup={loop_score_ms / batch_score_ms:.1f}x")
+    print(f"  select_location batch={timings['batch'][0]:8.2f} ms  loop={timings['loop'][0]:8.2f} ms"
+          f"  speedup={timings['loop'][0] / timings['batch'][0]:.1f}x")
+    print(f"{'='*62}")
+
+
+# ── deep-lane unblocking ──────────────────────────────────────────────────────
+
+def run_unblock_benchmark(test: unittest.TestCase,
+                          n_locations: int,
+                          lane_capacities=(4, 16, 64)) -> None:
+    """Retrieve the deepest container of a full LIFO lane of each capacity, among
+    *n_locations* single-slot locations, and report the unblock plan's move count,
+    planning time and total retrieval time."""
+    print(f"\n{'='*62}")
+    print(f"  UNBLOCK BENCHMARK  [{type(test).__name__}]  {n_locations:,} other locations")
+    print(f"{'='*62}")
+    for capacity in lane_capacities:
+        lane = Location(id='LANE', coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+            dims=(1000 * capacity, 1000, 1000), capacity=capacity, channel_processor=cps.LIFOFlowChannelProcessor()))
+        meta = dcs.LocationMeta(dims=(1000, 1000, 1000), capacity=1, channel_processor=cps.AllAvailableChannelProcessor())
+        storage = Storage(locs=[lane] + [Location(id=f"L{i:06d}", location_meta=meta, coords=(i, 0, 0))
+                                         for i in range(n_locations)])
+        lane_filter = LocationQualifier(id_pattern=PatternMatchQualifier(id='LANE'))
+        storage.handle_transfer_request_batch([TransferRequestCriteria(
+            new_container=dcs.Container(id=f"D{i:04d}"), dest_loc_query_args=lane_filter) for i in range(capacity)])
+
+        plan = storage.plan_unblock('D0000')
+        t0 = time.perf_counter()
+        storage.handle_transfer_requests([TransferRequestCriteria(
+            container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id='D0000')),
+            delete_container_on_transfer=True)])
+        elapsed_ms = (time.perf_counter() - t0) * 1_000
+
+        test.assertEqual(plan.MoveCount, capacity - 1)
+        test.assertIsNone(storage.get_container_loc_id('D0000'))
+        print(f"  lane capacity {capacity:>4}  moves={plan.MoveCount:>4}  "
+              f"plan={plan.compute_time_s * 1_000:8.2f} ms  retrieval={elapsed_ms:8.2f} ms")
+    print(f"{'='*62}")
+
+
+# ── retrieval-cost source selection ───────────────────────────────────────────
+
+def run_source_selection_benchmark(test: unittest.TestCase,
+                                   n_lanes: int,
+                                   lane_capacity: int = 8,
+                                   n_skus: int = 10,
+                                   seed: int = 7) -> None:
+    """Retrieve half of the stock of 75%-full LIFO lanes by SKU (container id prefix) with
+    RANDOM and CHEAPEST_RETRIEVAL source selection, reporting relocation moves per
+    retrieval and elapsed time."""
+    rng = random.Random(seed)
+    stock = [f"S{rng.randrange(n_skus):02d}-{i:06d}" for i in range(n_lanes * lane_capacity * 3 // 4)]
+    # SKUs drawn from the stock itself, so none runs out
+    to_retrieve = [int(cid[1:3]) for cid in rng.sample(stock, len(stock) // 2)]
+
+    print(f"\n{'='*62}")
+    print(f"  SOURCE SELECTION BENCHMARK  [{type(test).__name__}]  "
+          f"{n_lanes:,} LIFO lanes x {lane_capacity}, {len(to_retrieve):,} retrievals")
+    print(f"{'='*62}")
+    for mode in (SourceSelectionMode.RANDOM, SourceSelectionMode.CHEAPEST_RETRIEVAL):
+        lane_meta = dcs.LocationMeta(dims=(1000 * lane_capacity, 1000, 1000), capacity=lane_capacity,
+                                     channel_processor=cps.LIFOFlowChannelProcessor())
+        storage = Storage(locs=[Location(id=f"LANE{i:05d}", location_meta=lane_meta, coords=(i, 0, 0))
+                                for i in range(n_lanes)],
+                          source_selection=mode)
+        storage.handle_transfer_request_batch([TransferRequestCriteria(
+            new_container=dcs.Container(id=cid), dest_loc_query_args=LocationQualifier(has_addable_position=True))
+            for cid in stock])
+
+        relocations = [0]
+        def _on_moved(payload):
+            if payload['from_loc_id'] is not None and payload['to_loc_id'] is not None:
+                relocations[0] += 1
+        pub.subscribe(_on_moved, StorageTopic.CONTAINER_MOVED.value)
+        random.seed(seed)
+        t0 = time.perf_counter()
+        try:
+            for sku in to_retrieve:
+                storage.handle_transfer_requests([TransferRequestCriteria(
+                    container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(regex=f"^S{sku:02d}-")),
+                    delete_container_on_transfer=True)])
+        finally:
+            pub.unsubscribe(_on_moved, StorageTopic.CONTAINER_MOVED.value)
+        elapsed = time.perf_counter() - t0
+
+        test.assertEqual(storage.StoredContainerCount, len(stock) - len(to_retrieve))
+        print(f"  {mode.name:<19} moves/retrieval={relocations[0] / len(to_retrieve):6.2f}  "
+              f"{elapsed:6.2f}s  {len(to_retrieve) / elapsed:8,.0f} retrievals/sec")
+    print(f"{'='*62}")
+
+
+# ── future-blocking putaway scoring ───────────────────────────────────────────
+
+def run_putaway_scoring_benchmark(test: unittest.TestCase,
+                                  n_lanes: int,
+                                  lane_capacity: int = 6,
+                                  ops: int = 2_000,
+                                  seed: int = 11) -> None:
+    """Steady-state LIFO workload: each container gets a random due time as its
+    expected_dwell, puts and retrievals of the next-due container alternate around
+    60% fill. Compares random_score with fewest_future_unblocks as the putaway
+    evaluator, reporting unblock moves per 1k ops."""
+    print(f"\n{'='*62}")
+    print(f"  PUTAWAY SCORING BENCHMARK  [{type(test).__name__}]  "
+          f"{n_lanes:,} LIFO lanes x {lane_capacity}, {ops:,} ops")
+    print(f"{'='*62}")
+    for label in ('random', 'future'):
+        rng = random.Random(seed)
+        random.seed(seed)
+        lane_meta = dcs.LocationMeta(dims=(1000 * lane_capacity, 1000, 1000), capacity=lane_capacity,
+                                     channel_processor=cps.LIFOFlowChannelProcessor())
+        storage = Storage(locs=[Location(id=f"LANE{i:05d}", location_meta=lane_meta, coords=(i, 0, 0))
+                                for i in range(n_lanes)])
+        evaluator = storage.future_blocking_evaluator() if label == 'future' else evaluators.random_score
+        due: Dict[str, float] = {}
+        now = 0.0
+        target = n_lanes * lane_capacity * 3 // 5
+        count = 0
+
+        def _put():
+            nonlocal count
+            cid = f"C{count:07d}"
+            count += 1
+            due[cid] = now + rng.uniform(0, target)
+            storage.handle_transfer_requests([TransferRequestCriteria(
+                new_container=dcs.Container(id=cid, expected_dwell=due[cid]),
+                dest_loc_query_args=LocationQualifier(has_addable_position=True))],
+                dest_loc_evaluator=evaluator)
+
+        for _ in range(target):
+            _put()
+        start_moves = storage.UnblockMoveCount
+        t0 = time.perf_counter()
+        for i in range(ops):
+            now += 0.5
+            if i % 2 == 0:
+                _put()
+            else:
+                cid = min(due, key=due.get)
+                del due[cid]
+                storage.handle_transfer_requests([TransferRequestCriteria(
+                    container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id=cid)),
+                    delete_container_on_transfer=True)])
+        elapsed = time.perf_counter() - t0
+
+        test.assertEqual(storage.StoredContainerCount, len(due))
+        moves = storage.UnblockMoveCount - start_moves
+        print(f"  {label:<7} unblock moves/1k ops={moves * 1000 / ops:8.1f}  "
+              f"{elapsed:6.2f}s  {ops / elapsed:8,.0f} ops/sec")
+    print(f"{'='*62}")
+
+
+# ── compact channel state ─────────────────────────────────────────────────────
+
+_FLOW_PROCESSORS = (cps.FIFOFlowChannelProcessor, cps.LIFOFlowChannelProcessor,
+                    cps.LIFOFlowBackwardChannelProcessor, cps.AllAvailableFlowChannelProcessor,
+                    cps.OMNIFlowChannelProcessor)
+
+
+def run_compact_channel_benchmark(test: unittest.TestCase,
+                                  n_channels: int,
+                                  capacity: int = 16,
+                                  cycles: int = 3,
+                                  seed: int = 5) -> None:
+    """Fills *n_channels* flow channels to 80% and reports their traced memory
+    (container ids are created up front, as the container store already holds them),
+    then times remove/re-add cycles through the accessible positions, for list-backed
+    Channel and CompactChannel. Both must end in identical states."""
+    print(f"\n{'='*62}")
+    print(f"  COMPACT CHANNEL BENCHMARK  [{type(test).__name__}]  "
+          f"{n_channels:,} channels x {capacity} slots")
+    print(f"{'='*62}")
+    processors = [p() for p in _FLOW_PROCESSORS]
+    ids = [[f"C{ii:06d}_{jj}" for jj in range(capacity * 4 // 5)] for ii in range(n_channels)]
+    states = []
+    for label in ('list', 'compact'):
+        rng = random.Random(seed)
+        tracemalloc.start()
+        arena = SlotArena()
+        channels = [CompactChannel(processors[ii % len(processors)], arena, capacity=capacity)
+                    if label == 'compact' else Channel(processors[ii % len(processors)], capacity=capacity)
+                    for ii in range(n_channels)]
+        for channel, channel_ids in zip(channels, ids):
+            for cid in channel_ids:
+                channel.store([cid])
+        mem, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        ops = 0
+        t0 = time.perf_counter()
+        for _ in range(cycles):
+            for channel in channels:
+                removable = channel.get_removable_ids()
+                cid = removable[rng.choice(list(removable))]
+                channel.remove([cid])
+                channel.get_addable_positions()
+                channel.store([cid])
+                ops += 2
+        elapsed = time.perf_counter() - t0
+        states.append([channel.State for channel in channels])
+        print(f"  {label:<8} memory={mem / 1024:10,.0f} KiB  ({mem / n_channels:6.0f} B/channel)  "
+              f"{elapsed:6.2f}s  {ops / elapsed:10,.0f} ops/sec")
+    test.assertEqual(states[0], states[1])
     print(f"{'='*62}")
 
 
+_ALL_PROCESSORS = tuple(type(p.value) for p in cps.ChannelProcessorType) + (cps.OMNIChannelProcessor,)
+
+
+def run_lane_matrix_benchmark(test: unittest.TestCase,
+                              n_lanes: int,
+                              capacity: int = 8,
+                              batches: int = 20,
+                              seed: int = 11) -> None:
+    """Replays the same random add/retrieve event stream (2 events per lane per batch,
+    retrievals drawn from ids previously sent to the lane, so some are blocked or
+    gone) through one Channel per lane and through a LaneMatrix, and reports events/sec.
+    Per-event outcomes and final lane states must match."""
+    print(f"\n{'='*62}")
+    print(f"  LANE MATRIX BENCHMARK  [{type(test).__name__}]  "
+          f"{n_lanes:,} lanes x {capacity} slots, {batches} batches")
+    print(f"{'='*62}")
+    rng = random.Random(seed)
+    processors = [_ALL_PROCESSORS[ii % len(_ALL_PROCESSORS)] for ii in range(n_lanes)]
+    sent = [[] for _ in range(n_lanes)]
+    stream = []
+    for bb in range(batches):
+        events = []
+        for ee in range(2 * n_lanes):
+            lane = rng.randrange(n_lanes)
+            if sent[lane] and rng.random() < 0.45:
+                events.append((False, lane, rng.choice(sent[lane])))
+            else:
+                cid = f"C{bb:03d}_{ee:07d}"
+                sent[lane].append(cid)
+                events.append((True, lane, cid))
+        stream.append(events)
+    n_events = sum(len(events) for events in stream)
+
+    channels = [Channel(p(), capacity=capacity) for p in processors]
+    channel_status = []
+    t0 = time.perf_counter()
+    for events in stream:
+        for is_add, lane, cid in events:
+            try:
+                if is_add:
+                    channels[lane].store([cid])
+                else:
+                    channels[lane].remove([cid])
+                channel_status.append(OK)
+            except (cps.NoRoomToAddException, cps.ItemBlockingToAddException):
+                channel_status.append(NO_ROOM)
+            except cps.ItemNotFoundToRemoveException:
+                channel_status.append(NOT_FOUND)
+            except cps.ItemNotAccessibleToRemoveException:
+                channel_status.append(BLOCKED)
+    channel_elapsed = time.perf_counter() - t0
+
+    matrix = LaneMatrix(processors, [capacity] * n_lanes)
+    encoded = [([e[0] for e in events], [e[1] for e in events], matrix.encode(e[2] for e in events))
+               for events in stream]
+    matrix_status = []
+    t0 = time.perf_counter()
+    for is_add, lanes, codes in encoded:
+        matrix_status.extend(matrix.apply(is_add, lanes, codes).tolist())
+    matrix_elapsed = time.perf_counter() - t0
+
+    stats = matrix.stats()
+    print(f"  channel loop  {channel_elapsed:7.3f}s  {n_events / channel_elapsed:12,.0f} events/sec")
+    print(f"  lane matrix   {matrix_elapsed:7.3f}s  {n_events / matrix_elapsed:12,.0f} events/sec  "
+          f"({channel_elapsed / matrix_elapsed:.1f}x)")
+    print(f"  fill={stats.fill_pct:.1%}  rejected_adds={stats.rejected_adds:,}  "
+          f"blocked={stats.blocked_retrievals:,}  blocking_moves={stats.blocking_moves:,}  "
+          f"not_found={stats.not_found:,}")
+    print(f"{'='*62}")
+    test.assertEqual(matrix_status, channel_status)
+    test.assertEqual([matrix.lane_state(ii) for ii in range(n_lanes)], [c.State for c in channels])
+
+
+def run_tracing_benchmark(test: unittest.TestCase,
+                          n_locations: int,
+                          capacity: int = 8,
+                          cycles: int = 3) -> None:
+    """Times fill/drain cycles of Location.store_containers/remove_containers with
+    channel and location tracing off, on into a RecordingTraceSink, and on into a
+    LoggingTraceSink whose logger is below its level (events built, never formatted)."""
+    print(f"\n{'='*62}")
+    print(f"  TRACING BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations x {capacity} slots")
+    print(f"{'='*62}")
+    metas = [dcs.LocationMeta(dims=(10, 10, 10), channel_processor=p(), capacity=capacity) for p in _FLOW_PROCESSORS]
+    ids = [[f"C{ii:06d}_{jj}" for jj in range(capacity)] for ii in range(n_locations)]
+    recording = tracing.RecordingTraceSink(maxlen=1_000)
+    modes = (('off', None), ('recording', recording), ('logging', tracing.LoggingTraceSink(level=logging.DEBUG)))
+    trace_loggers = [logging.getLogger(f'coopstorage.trace.{s}') for s in (tracing.CHANNEL, tracing.LOCATION)]
+    levels = [lg.level for lg in trace_loggers]
+    base = None
+    try:
+        for lg in trace_loggers:
+            lg.setLevel(logging.INFO)
+        for label, sink in modes:
+            if sink is not None:
+                tracing.enable(tracing.CHANNEL, tracing.LOCATION, sink=sink)
+            locs = [Location(id=f"L{ii:06d}", coords=(0, 0, 0), location_meta=metas[ii % len(metas)])
+                    for ii in range(n_locations)]
+            ops = 0
+            t0 = time.perf_counter()
+            for _ in range(cycles):
+                for loc, loc_ids in zip(locs, ids):
+                    for cid in loc_ids:
+                        loc.store_containers([cid])
+                    for cid in loc.Meta.channel_processor.removal_order(loc.Slots):
+                        loc.remove_containers([cid])
+                    ops += 2 * len(loc_ids)
+            elapsed = time.perf_counter() - t0
+            tracing.disable()
+            rate = ops / elapsed
+            base = base or rate
+            print(f"  {label:<10} {elapsed:6.2f}s  {rate:10,.0f} ops/sec  ({rate / base - 1:+6.1%} vs off)")
+            test.assertTrue(all(not loc.ContainerIds for loc in locs))
+    finally:
+        tracing.disable()
+        for lg, level in zip(trace_loggers, levels):
+            lg.setLevel(level)
+    test.assertEqual(len(recording.Events), 1_000)
+    print(f"{'='*62}")
+
+
+def run_memory_benchmark(test: unittest.TestCase, n: int) -> None:
+    """Traces the memory of *n* locations (ids, channels, shared metas/geometry) and of
+    *n* default containers (ids included) and reports bytes per object."""
+    print(f"\n{'='*62}")
+    print(f"  MEMORY BENCHMARK  [{type(test).__name__}]  {n:,} locations / containers")
+    print(f"{'='*62}")
+    tracemalloc.start()
+    metas = [dcs.LOCATION_METAS.intern(dcs.LocationMeta(dims=(10, 10, 10), channel_processor=p(), capacity=4))
+             for p in _FLOW_PROCESSORS]
+    locs = [Location(id=f"L{ii:07d}", coords=(float(ii), 0.0, 0.0), location_meta=metas[ii % len(metas)])
+            for ii in range(n)]
+    loc_mem, _ = tracemalloc.get_traced_memory()
+    containers = [dcs.Container(id=f"C{ii:07d}") for ii in range(n)]
+    total_mem, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    container_mem = total_mem - loc_mem
+    print(f"  locations   {loc_mem / 2**20:9,.1f} MiB  {loc_mem / n:7.0f} B/location")
+    print(f"  containers  {container_mem / 2**20:9,.1f} MiB  {container_mem / n:7.0f} B/container")
+    print(f"  peak        {peak / 2**20:9,.1f} MiB")
+    print(f"{'='*62}")
+    test.assertEqual(len({id(loc.Meta) for loc in locs}), len(metas))
+    test.assertEqual(len({id(c.uom) for c in containers}), 1)
+
+
+def run_sql_transfer_benchmark(test: unittest.TestCase, n_locations: int, moves: int, batch_size: int = 50) -> None:
+    """Moves containers between locations of a Storage backed by a SQLite file, one
+    handle_transfer_requests call per move and then in handle_transfer_request_batch
+    chunks of *batch_size*, and reports moves/sec. Slots must survive a cold reload."""
+    from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
+    from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+    from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
+    from coopstorage.storage.loc_load.data.storageDataStore import StorageDataStore
+
+    print(f"\n{'='*62}")
+    print(f"  SQL TRANSFER BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations, {moves:,} moves")
+    print(f"{'='*62}")
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        sqlite_db.set_url(f'sqlite:///{path}')
+        sqlite_db.init_db()
+        layout_id = SqlLayoutDataStore(sqlite_db.get_session).create('bench').id
+        store = SqlLocationDataStore(layout_id, sqlite_db.get_session)
+        meta = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.AllAvailableChannelProcessor(), capacity=4)
+        store.add([Location(id=f"L{ii:06d}", coords=(float(ii), 0.0, 0.0), location_meta=meta)
+                   for ii in range(n_locations)])
+        storage = Storage(data_store=StorageDataStore(location_data_store=store))
+
+        def _to(ii: int, **kwargs) -> TransferRequestCriteria:
+            return TransferRequestCriteria(dest_loc_query_args=LocationQualifier(
+                id_pattern=PatternMatchQualifier(id=f"L{ii % n_locations:06d}")), **kwargs)
+
+        storage.handle_transfer_request_batch([_to(ii, new_container=dcs.Container(id=f"C{ii:06d}"))
+                                               for ii in range(n_locations)])
+        hop = 0
+
+        def _moves(count):
+            nonlocal hop
+            hop += 1
+            return [_to(ii + hop, container_query_args=ContainerQualifier(pattern=PatternMatchQualifier(id=f"C{ii:06d}")))
+                    for ii in range(count)]
+
+        t0 = time.perf_counter()
+        for criteria in _moves(moves):
+            storage.handle_transfer_requests([criteria])
+        single = time.perf_counter() - t0
+
+        criteria = _moves(moves)
+        t0 = time.perf_counter()
+        for start in range(0, moves, batch_size):
+            results = storage.handle_transfer_request_batch(criteria[start:start + batch_size])
+            test.assertTrue(all(r.error is None for r in results))
+        batched = time.perf_counter() - t0
+
+        print(f"  single transfers  {single:6.2f}s  {moves / single:8,.0f} moves/sec")
+        print(f"  batches of {batch_size:<5}  {batched:6.2f}s  {moves / batched:8,.0f} moves/sec")
+        print(f"{'='*62}")
+        reloaded = SqlLocationDataStore(layout_id, sqlite_db.get_session).get()
+        test.assertEqual({k: v.Slots for k, v in reloaded.items()}, {k: v.Slots for k, v in store.get().items()})
+    finally:
+        sqlite_db.get_engine().dispose()
+        os.unlink(path)
+
+
+def run_sql_register_benchmark(test: unittest.TestCase, n_locations: int) -> None:
+    """Registers a labelled layout of *n_locations* through Storage.register_locs on a
+    Storage backed by a SQLite file (the generate / put_locations path) and reports
+    locations/sec. Locations and tree labels must survive a cold reload."""
+    from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
+    from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+    from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
+    from coopstorage.storage.loc_load.data.storageDataStore import StorageDataStore
+
+    print(f"\n{'='*62}")
+    print(f"  SQL REGISTER BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations")
+    print(f"{'='*62}")
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        sqlite_db.set_url(f'sqlite:///{path}')
+        sqlite_db.init_db()
+        layout_id = SqlLayoutDataStore(sqlite_db.get_session).create('bench').id
+        storage = Storage(data_store=StorageDataStore(
+            location_data_store=SqlLocationDataStore(layout_id, sqlite_db.get_session)))
+        meta = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.AllAvailableChannelProcessor(), capacity=4)
+        locs = [Location(id=f"L{ii:07d}", coords=(float(ii), 0.0, 0.0), location_meta=meta)
+                for ii in range(n_locations)]
+        for ii, loc in enumerate(locs):
+            storage.LocationMapTree.register(loc.Id, zone=f"Z{ii // 10_000}", aisle=str(ii // 100 % 100), bay=str(ii % 100))
+
+        t0 = time.perf_counter()
+        storage.register_locs(locs=locs)
+        elapsed = time.perf_counter() - t0
+
+        print(f"  register_locs     {elapsed:6.2f}s  {n_locations / elapsed:8,.0f} locations/sec")
+        print(f"{'='*62}")
+        reloaded = SqlLocationDataStore(layout_id, sqlite_db.get_session)
+        test.assertEqual(reloaded.count(), n_locations)
+        last = locs[-1].Id
+        test.assertEqual(reloaded.get_tree_labels(last), storage.LocationMapTree.get_path(last))
+    finally:
+        sqlite_db.get_engine().dispose()
+        os.unlink(path)
+
+
+def run_sql_cache_benchmark(test: unittest.TestCase, n_locations: int, changes: int = 100) -> None:
+    """Against a SQLite-file layout of *n_locations*, times a cold full load, removing
+    one location from a warm store, and a refresh() that picks up *changes* slot
+    updates made through a second store."""
+    from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
+    from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+    from coopstorage.storage.loc_load.data.sql.tables import channels as chan_table
+    from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
+    from sqlalchemy import update
+
+    print(f"\n{'='*62}")
+    print(f"  SQL CACHE BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations, {changes:,} changes")
+    print(f"{'='*62}")
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        sqlite_db.set_url(f'sqlite:///{path}')
+        sqlite_db.init_db()
+        layout_id = SqlLayoutDataStore(sqlite_db.get_session).create('bench').id
+        meta = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.AllAvailableChannelProcessor(), capacity=4)
+        SqlLocationDataStore(layout_id, sqlite_db.get_session).add(
+            [Location(id=f"L{ii:07d}", coords=(float(ii), 0.0, 0.0), location_meta=meta) for ii in range(n_locations)])
+        # Stamp the layout as written well before any store syncs
+        with sqlite_db.get_session() as sess:
+            sess.execute(update(chan_table).values(updated_at=datetime(2000, 1, 1)))
+
+        store = SqlLocationDataStore(layout_id, sqlite_db.get_session)
+        t0 = time.perf_counter()
+        store.count()
+        full_load = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        store.remove(ids=["L0000000"])
+        store.count()
+        remove_one = time.perf_counter() - t0
+
+        other = SqlLocationDataStore(layout_id, sqlite_db.get_session)
+        targets = other.get(ids=[f"L{ii:07d}" for ii in range(1, changes + 1)])
+        other.update([loc.store_containers([f"C{ii}"]) for ii, loc in enumerate(targets.values())])
+        t0 = time.perf_counter()
+        changed, removed = store.refresh()
+        delta = time.perf_counter() - t0
+
+        print(f"  full load          {full_load * 1000:8.1f} ms")
+        print(f"  remove one         {remove_one * 1000:8.1f} ms")
+        print(f"  refresh            {delta * 1000:8.1f} ms  ({len(changed):,} rows read)")
+        print(f"{'='*62}")
+        test.assertEqual(store.count(), n_locations - 1)
+        test.assertEqual(store.get(ids=["L0000001"])["L0000001"].ContainerIds, ["C0"])
+    finally:
+        sqlite_db.get_engine().dispose()
+        os.unlink(path)
+
+
+def run_sql_cold_start_benchmark(test: unittest.TestCase, n_locations: int) -> None:
+    """Cold-starts a LayoutManager Storage over a SQLite-file layout of *n_locations*
+    labelled locations, loading everything up front and lazily by zone, and reports
+    startup time and peak traced memory (measured in a separate, untimed start)."""
+    from coopstorage.storage.layout_manager import sqlite_layout_manager
+    from coopstorage.storage.loc_load.data.sql.sql_layout_data_store import SqlLayoutDataStore
+    from coopstorage.storage.loc_load.data.sql.sql_location_data_store import SqlLocationDataStore
+    from coopstorage.storage.loc_load.data.sqlite import db as sqlite_db
+
+    print(f"\n{'='*62}")
+    print(f"  SQL COLD START BENCHMARK  [{type(test).__name__}]  {n_locations:,} locations")
+    print(f"{'='*62}")
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        sqlite_db.set_url(f'sqlite:///{path}')
+        sqlite_db.init_db()
+        layout_id = SqlLayoutDataStore(sqlite_db.get_session).create('bench').id
+        meta = dcs.LocationMeta(dims=(10, 10, 10), channel_processor=cps.AllAvailableChannelProcessor(), capacity=4)
+        writer = SqlLocationDataStore(layout_id, sqlite_db.get_session)
+        for start in range(0, n_locations, 50_000):
+            ids = range(start, min(n_locations, start + 50_000))
+            writer.add([Location(id=f"L{ii:07d}", coords=(float(ii), 0.0, 0.0), location_meta=meta) for ii in ids],
+                       tree_labels={f"L{ii:07d}": {'zone': f"Z{ii // 10_000}", 'aisle': str(ii // 100 % 100)}
+                                    for ii in ids})
+        sqlite_db.get_engine().dispose()
+
+        for lazy_level in (None, 'zone'):
+            t0 = time.perf_counter()
+            storage = sqlite_layout_manager(f'sqlite:///{path}', lazy_level=lazy_level).get_storage(layout_id)
+            startup = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            first = storage._data_store.LocationsData.get(ids=["L0000001"])
+            first_read = time.perf_counter() - t0
+            test.assertEqual(list(first), ["L0000001"])
+            test.assertEqual(len(storage.LocationMapTree), n_locations)
+            del storage, first
+            sqlite_db.get_engine().dispose()
+
+            tracemalloc.start()
+            storage = sqlite_layout_manager(f'sqlite:///{path}', lazy_level=lazy_level).get_storage(layout_id)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del storage
+            sqlite_db.get_engine().dispose()
+
+            print(f"  {lazy_level or 'eager':<6}  startup {startup:6.2f}s  peak {peak / 2**20:7,.1f} MiB  "
+                  f"first read {first_read * 1000:7.1f} ms")
+        print(f"{'='*62}")
+    finally:
+        sqlite_db.get_engine().dispose()
+        os.unlink(path)
+
+
 # ── parameterized test classes ────────────────────────────────────────────────
 
 class TestStorageBenchmarkSmall(unittest.TestCase):
@@ -336,21 +1177,170 @@ class TestStorageBenchmarkSmall(unittest.TestCase):
     def test_benchmark(self):
         run_benchmark(self, SMALL)
 
+    def test_batch_benchmark(self):
+        run_batch_benchmark(self, SMALL)
+
+    def test_qualifier_benchmark(self):
+        run_qualifier_benchmark(self, SMALL)
+
+    def test_concurrency_benchmark(self):
+        run_concurrency_benchmark(self, SMALL)
+
+    def test_reservation_cache_benchmark(self):
+        run_reservation_cache_benchmark(self, SMALL)
+
+    def test_evaluator_benchmark(self):
+        run_evaluator_benchmark(self, SMALL.num_locations)
+
+    def test_unblock_benchmark(self):
+        run_unblock_benchmark(self, SMALL.num_locations)
+
+    def test_source_selection_benchmark(self):
+        run_source_selection_benchmark(self, n_lanes=20)
+
+    def test_putaway_scoring_benchmark(self):
+        run_putaway_scoring_benchmark(self, n_lanes=20, ops=400)
+
+    def test_compact_channel_benchmark(self):
+        run_compact_channel_benchmark(self, 1_000)
+
+    def test_lane_matrix_benchmark(self):
+        run_lane_matrix_benchmark(self, 200)
+
+    def test_tracing_benchmark(self):
+        run_tracing_benchmark(self, 500)
+
+    def test_memory_benchmark(self):
+        run_memory_benchmark(self, 10_000)
+
+    def test_sql_transfer_benchmark(self):
+        run_sql_transfer_benchmark(self, 200, moves=200)
+
+    def test_sql_register_benchmark(self):
+        run_sql_register_benchmark(self, 1_000)
+
+    def test_sql_cache_benchmark(self):
+        run_sql_cache_benchmark(self, 1_000)
+
+    def test_sql_cold_start_benchmark(self):
+        run_sql_cold_start_benchmark(self, 5_000)
+
 
 class TestStorageBenchmarkMedium(unittest.TestCase):
     """1,000 locations, 5,000 container ops — moderate run."""
     def test_benchmark(self):
         run_benchmark(self, MEDIUM)
 
+    def test_batch_benchmark(self):
+        run_batch_benchmark(self, MEDIUM)
+
+    def test_qualifier_benchmark(self):
+        run_qualifier_benchmark(self, MEDIUM)
+
+    def test_concurrency_benchmark(self):
+        run_concurrency_benchmark(self, MEDIUM)
+
+    def test_reservation_cache_benchmark(self):
+        run_reservation_cache_benchmark(self, MEDIUM)
+
+    def test_evaluator_benchmark(self):
+        run_evaluator_benchmark(self, MEDIUM.num_locations)
+
+    def test_unblock_benchmark(self):
+        run_unblock_benchmark(self, MEDIUM.num_locations)
+
+    def test_source_selection_benchmark(self):
+        run_source_selection_benchmark(self, n_lanes=100)
+
+    def test_putaway_scoring_benchmark(self):
+        run_putaway_scoring_benchmark(self, n_lanes=100)
+
+    def test_compact_channel_benchmark(self):
+        run_compact_channel_benchmark(self, 10_000)
+
+    def test_lane_matrix_benchmark(self):
+        run_lane_matrix_benchmark(self, 2_000)
+
+    def test_tracing_benchmark(self):
+        run_tracing_benchmark(self, 5_000)
+
+    def test_memory_benchmark(self):
+        run_memory_benchmark(self, 100_000)
+
+    def test_sql_transfer_benchmark(self):
+        run_sql_transfer_benchmark(self, 1_000, moves=500)
+
+    def test_sql_register_benchmark(self):
+        run_sql_register_benchmark(self, 20_000)
+
+    def test_sql_cache_benchmark(self):
+        run_sql_cache_benchmark(self, 20_000)
+
+    def test_sql_cold_start_benchmark(self):
+        run_sql_cold_start_benchmark(self, 100_000)
+
 
 class TestStorageBenchmarkLarge(unittest.TestCase):
-    """10,000 locations, 100,000 container ops — full stress test.
+    """10,000 locations, 100,000 containers added — full stress test.
+
+    Side benchmarks run at up to 100,000 locations; the 1,000,000-location memory
+    and 500,000-location cold-start cases only run with COOPSTORAGE_BENCHMARK_HUGE=1.
 
     Run with: python -m pytest tests/test_storage_benchmark.py -v -s -k Large
     """
     def test_benchmark(self):
         run_benchmark(self, LARGE)
 
+    def test_batch_benchmark(self):
+        run_batch_benchmark(self, LARGE)
+
+    def test_qualifier_benchmark(self):
+        run_qualifier_benchmark(self, LARGE, passes=5)
+
+    def test_concurrency_benchmark(self):
+        run_concurrency_benchmark(self, LARGE, n_threads=16)
+
+    def test_reservation_cache_benchmark(self):
+        run_reservation_cache_benchmark(self, LARGE)
+
+    def test_evaluator_benchmark(self):
+        run_evaluator_benchmark(self, 50_000)
+
+    def test_unblock_benchmark(self):
+        run_unblock_benchmark(self, LARGE.num_locations, lane_capacities=(4, 16, 64, 256))
+
+    def test_source_selection_benchmark(self):
+        run_source_selection_benchmark(self, n_lanes=500)
+
+    def test_putaway_scoring_benchmark(self):
+        run_putaway_scoring_benchmark(self, n_lanes=500, ops=10_000)
+
+    def test_compact_channel_benchmark(self):
+        run_compact_channel_benchmark(self, 62_500)
+
+    def test_lane_matrix_benchmark(self):
+        run_lane_matrix_benchmark(self, 20_000)
+
+    def test_tracing_benchmark(self):
+        run_tracing_benchmark(self, 50_000)
+
+    @huge
+    def test_memory_benchmark(self):
+        run_memory_benchmark(self, 1_000_000)
+
+    def test_sql_transfer_benchmark(self):
+        run_sql_transfer_benchmark(self, 5_000, moves=1_000)
+
+    def test_sql_register_benchmark(self):
+        run_sql_register_benchmark(self, 100_000)
+
+    def test_sql_cache_benchmark(self):
+        run_sql_cache_benchmark(self, 100_000)
+
+    @huge
+    def test_sql_cold_start_benchmark(self):
+        run_sql_cold_start_benchmark(self, 500_000)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for tracing.py
+
+Covers:
+- Channel, location and storage events reach the sink only for enabled subsystems
+- Nothing is recorded after disable()
+- Generator ids are still stored when channel tracing is on
+- LoggingTraceSink formats events only when the logger would emit them
+- Unknown subsystems raise ValueError
+"""
+import logging
+import unittest
+
+import coopstorage.storage.loc_load.channel_processors as cps
+import coopstorage.storage.loc_load.dcs as dcs
+from coopstorage.storage.loc_load import tracing
+from coopstorage.storage.loc_load.channel import Channel
+from coopstorage.storage.loc_load.location import Location
+from coopstorage.storage.loc_load.qualifiers import LocationQualifier
+from coopstorage.storage.loc_load.storage import Storage
+from coopstorage.storage.loc_load.transferRequest import TransferRequestCriteria
+from cooptools.qualifiers import PatternMatchQualifier
+
+
+def _loc(loc_id='LOC-A', capacity=3):
+    return Location(id=loc_id, coords=(0, 0, 0), location_meta=dcs.LocationMeta(
+        dims=(10, 10, 10), channel_processor=cps.LIFOFlowChannelProcessor(), capacity=capacity))
+
+
+class _CountingRepr:
+    calls = 0
+
+    def __repr__(self):
+        type(self).calls += 1
+        return 'counted'
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = tracing.RecordingTraceSink()
+
+    def tearDown(self):
+        tracing.disable()
+
+    def test_all_subsystems(self):
+        tracing.enable(sink=self.sink)
+        s = Storage(locs=[_loc()])
+        s.handle_transfer_requests([TransferRequestCriteria(
+            new_container=dcs.Container(id='C1'),
+            dest_loc_query_args=LocationQualifier(id_pattern=PatternMatchQualifier(id='LOC-A')))])
+
+        events = {(e.subsystem, e.event): e.fields for e in self.sink.Events}
+        self.assertEqual(events[(tracing.CHANNEL, 'stored')]['ids'], ['C1'])
+        self.assertEqual(events[(tracing.CHANNEL, 'stored')]['state'], (None, None, 'C1'))
+        self.assertEqual(events[(tracing.LOCATION, 'stored')], {'location': 'LOC-A', 'ids': ['C1']})
+        self.assertEqual(events[(tracing.STORAGE, 'transferred')], {'container': 'C1', 'source': None, 'dest': 'LOC-A'})
+
+    def test_only_enabled_subsystems(self):
+        tracing.enable(tracing.LOCATION, sink=self.sink)
+        loc = _loc()
+        loc.store_containers(['C1'])
+        loc.remove_containers(['C1'])
+        self.assertTrue(tracing.is_enabled(tracing.LOCATION))
+        self.assertFalse(tracing.is_enabled(tracing.CHANNEL))
+        self.assertEqual([(e.subsystem, e.event) for e in self.sink.Events],
+                         [(tracing.LOCATION, 'stored'), (tracing.LOCATION, 'removed')])
+
+    def test_disable_stops_events(self):
+        tracing.enable(sink=self.sink)
+        tracing.disable()
+        _loc().store_containers(['C1'])
+        self.assertEqual(self.sink.Events, [])
+
+    def test_generator_ids_still_stored(self):
+        tracing.enable(tracing.CHANNEL, sink=self.sink)
+        channel = Channel(cps.FIFOFlowChannelProcessor(), capacity=3)
+        channel.store(x for x in ['a', 'b'])
+        self.assertEqual(channel.StoredIds, ['b', 'a'])
+        self.assertEqual(self.sink.Events[0].fields['ids'], ['a', 'b'])
+
+    def test_logging_sink_is_lazy(self):
+        trace_logger = logging.getLogger('coopstorage.trace.location')
+        level = trace_logger.level
+        try:
+            tracing.enable(tracing.LOCATION, sink=tracing.LoggingTraceSink(level=logging.DEBUG))
+            item = _CountingRepr()
+            trace_logger.setLevel(logging.INFO)
+            _loc().store_containers([item])
+            self.assertEqual(_CountingRepr.calls, 0)
+
+            trace_logger.setLevel(logging.DEBUG)
+            with self.assertLogs(trace_logger, logging.DEBUG) as logs:
+                _loc().store_containers([item])
+            self.assertGreater(_CountingRepr.calls, 0)
+            self.assertIn("location.stored location='LOC-A'", logs.output[0])
+        finally:
+            trace_logger.setLevel(level)
+
+    def test_unknown_subsystem_raises(self):
+        with self.assertRaises(ValueError):
+            tracing.enable('nope', sink=self.sink)
+
+
+if __name__ == '__main__':
+    unittest.main()